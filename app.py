@@ -2,18 +2,47 @@ import os
 import json
 import stripe
 import logging
-from flask import Flask, render_template, request, redirect, url_for, jsonify, flash, send_from_directory, make_response, Response, session
+from flask import Flask, render_template, request, redirect, url_for, jsonify, flash, send_from_directory, make_response, Response, session, stream_with_context, has_request_context
 from logging_config import setup_logging
 from flask_sqlalchemy import SQLAlchemy
 from flask_httpauth import HTTPBasicAuth
 from werkzeug.security import generate_password_hash, check_password_hash
 from dotenv import load_dotenv
-from models import db, Reservation, Table, MenuItem, Order, OrderItem
-from datetime import datetime, timedelta
-from sqlalchemy import or_
+from models import db, Reservation, Table, MenuItem, MenuItemAlias, Order, OrderItem, Callback, Customer, AuditEvent
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import and_, or_
 import queue
 import threading
 import time
+from callback_queue import get_callback_scheduler, parse_preferred_time, CALLBACK_STATUSES
+from caller_prefetch import get_caller_prefetcher, phone_digits, phone_variants, snapshot_order, snapshot_reservation
+from booking_window import get_booking_window, register_booking_window_loaders, all_booking_windows
+from ics_feed import calendar_header, calendar_footer, reservation_event, feed_etag
+from calendar_summary import get_daily_summary_cache
+from booking_fingerprint import find_duplicate_reservation, group_duplicates
+from customer_profiles import build_customer_profile, get_customer_profile_updater
+from audit_log import (
+    audit_source, channel_for_path, compact_events, compaction_cutoff, entity_changes,
+    get_audit_log_writer, reset_audit_source, retention_cutoff, set_audit_actor, set_audit_source
+)
+from db_backup import BACKUP_INTERVAL_HOURS, get_backup_scheduler, list_snapshots
+from prep_list import DEFAULT_WINDOWS, PREP_STATUSES, get_prep_list, register_prep_list_loader, all_prep_lists
+from item_pairings import PAIRINGS_REBUILD_HOUR, all_item_pairings, get_item_pairings, register_item_pairings_loader, seconds_until_rebuild
+from item_sales import DAYPART_NAMES, all_item_sales, get_item_sales, register_item_sales_loader
+from swaig_documents import dumps as dumps_swaig_document, get_swaig_document_cache
+from payload_capture import get_payload_capture
+from order_status import ORDER_STATUSES, plan_transitions, source_statuses
+from menu_catalog import CatalogAlias, MenuItemSnapshot, all_menu_catalogs, get_menu_catalog, menu_snapshot, register_menu_catalog_loader, resolve_order_lines
+from menu_matcher import seed_alias_rows
+from menu_http import get_menu_body_cache
+from menu_render import get_menu_render_cache
+from sqlalchemy import event, case, inspect as sa_inspect
+from sqlalchemy.orm import Session as SASession, selectinload, with_loader_criteria
+from models import RestaurantScopedMixin
+from locations import (
+    LOCATIONS, current_restaurant_id, set_current_restaurant, reset_current_restaurant,
+    resolve_restaurant_id, release_call, use_location, get_location, location_engine
+)
 # Import moved to avoid circular import
 
 load_dotenv()
@@ -37,6 +66,8 @@ reservation_logger = loggers['reservations']
 payment_logger = loggers['payments']
 sms_logger = loggers['sms']
 
+payload_capture = get_payload_capture()
+
 # Global payment session storage for persistence across Flask contexts
 payment_sessions_global = {}
 
@@ -143,6 +174,29 @@ def verify_password(username, password):
     if username in users and check_password_hash(users.get(username), password):
         return username
 
+# Multi-location routing: web/API requests pick a location with ?restaurant_id= or
+# the X-Restaurant-Id header; SWAIG requests are routed by the dialed number
+@app.before_request
+def select_restaurant_location():
+    from flask import g
+    restaurant_id = request.args.get('restaurant_id') or request.headers.get('X-Restaurant-Id')
+    g.restaurant_token = set_current_restaurant(restaurant_id if restaurant_id in LOCATIONS else None)
+
+@app.teardown_request
+def clear_restaurant_location(exc=None):
+    from flask import g
+    reset_current_restaurant(g.pop('restaurant_token', None))
+
+@app.before_request
+def tag_audit_source():
+    from flask import g
+    g.audit_token = set_audit_source(channel_for_path(request.path))
+
+@app.teardown_request
+def clear_audit_source(exc=None):
+    from flask import g
+    reset_audit_source(g.pop('audit_token', None))
+
 # Use this block instead
 with app.app_context():
     # Ensure instance directory exists
@@ -223,7 +277,7 @@ with app.app_context():
 
         # Database migration: Add missing payment_method column to reservations table
         def migrate_reservations_table():
-            """Add payment_method column to reservations table if it doesn't exist"""
+            """Add payment_method, updated_at and booking_fingerprint columns to reservations table if they don't exist"""
             try:
                 import sqlite3
 
@@ -254,7 +308,9 @@ with app.app_context():
 
                 # Define new columns to add
                 new_columns = [
-                    ('payment_method', "VARCHAR(50)")
+                    ('payment_method', "VARCHAR(50)"),
+                    ('updated_at', "DATETIME"),
+                    ('booking_fingerprint', "VARCHAR(40)")
                 ]
 
                 migration_needed = False
@@ -264,6 +320,27 @@ with app.app_context():
                         cursor.execute(f"ALTER TABLE reservations ADD COLUMN {col_name} {col_def}")
                         migration_needed = True
 
+                if 'updated_at' not in columns:
+                    cursor.execute("UPDATE reservations SET updated_at = COALESCE(created_at, CURRENT_TIMESTAMP)")
+
+                if 'booking_fingerprint' not in columns:
+                    # Backfill fingerprints in chunks so large histories don't load at once
+                    from booking_fingerprint import booking_fingerprint
+                    last_id = 0
+                    while True:
+                        cursor.execute(
+                            "SELECT id, phone_number, date, time, party_size FROM reservations WHERE id > ? ORDER BY id LIMIT 1000",
+                            (last_id,)
+                        )
+                        rows = cursor.fetchall()
+                        if not rows:
+                            break
+                        last_id = rows[-1][0]
+                        cursor.executemany(
+                            "UPDATE reservations SET booking_fingerprint = ? WHERE id = ?",
+                            [(booking_fingerprint(phone, date, time, size), res_id) for res_id, phone, date, time, size in rows]
+                        )
+
                 if migration_needed:
                     conn.commit()
                     print("SUCCESS: Reservations table migration completed")
@@ -282,9 +359,52 @@ with app.app_context():
                 import traceback
                 traceback.print_exc()
 
+        # Database migration: Partition restaurant data by location
+        def migrate_restaurant_partitions():
+            """Add restaurant_id (default 'main') and the per-location indexes to existing tables"""
+            try:
+                import sqlite3
+
+                db_path = 'instance/restaurant.db'
+                if not os.path.exists(db_path):
+                    return
+
+                conn = sqlite3.connect(db_path)
+                cursor = conn.cursor()
+
+                migration_needed = False
+                for table_name in ('reservations', 'orders', 'menu_items', 'tables'):
+                    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (table_name,))
+                    if not cursor.fetchone():
+                        continue
+                    cursor.execute(f"PRAGMA table_info({table_name})")
+                    columns = [col[1] for col in cursor.fetchall()]
+                    if 'restaurant_id' not in columns:
+                        print(f"🔧 Adding restaurant_id to {table_name}")
+                        cursor.execute(f"ALTER TABLE {table_name} ADD COLUMN restaurant_id VARCHAR(32) NOT NULL DEFAULT 'main'")
+                        migration_needed = True
+
+                for model in (Reservation, Order, OrderItem, MenuItem, Table):
+                    for index in model.__table__.indexes:
+                        columns = ', '.join(column.name for column in index.columns)
+                        cursor.execute(
+                            f"CREATE INDEX IF NOT EXISTS {index.name} ON {model.__tablename__} ({columns})"
+                        )
+
+                conn.commit()
+                conn.close()
+                if migration_needed:
+                    print("SUCCESS: Restaurant partition migration completed")
+
+            except Exception as e:
+                print(f"WARNING: Restaurant partition migration error: {e}")
+                import traceback
+                traceback.print_exc()
+
         # Run migrations
         migrate_orders_table()
         migrate_reservations_table()
+        migrate_restaurant_partitions()
 
     except Exception as e:
         print(f"WARNING: Database initialization error: {e}")
@@ -415,7 +535,14 @@ def calendar():
 @app.route('/api/reservations/calendar')
 def get_calendar_events():
     try:
-        reservations = Reservation.query.all()
+        # FullCalendar sends the visible range as start/end; without them return everything
+        query = Reservation.query
+        if request.args.get('start'):
+            query = query.filter(Reservation.date >= request.args['start'][:10])
+        if request.args.get('end'):
+            # end is exclusive
+            query = query.filter(Reservation.date < request.args['end'][:10])
+        reservations = query.order_by(Reservation.date, Reservation.time).all()
         events = []
 
         for reservation in reservations:
@@ -461,6 +588,137 @@ def get_calendar_events():
         print(f"Error in calendar events API: {str(e)}")
         return jsonify([]), 500
 
+# Per-day aggregates for month grids, cached per month (see calendar_summary.py)
+def load_daily_summaries(start_date, end_date):
+    """Reservation count, covers and cancellations per day with one GROUP BY"""
+    is_cancelled = Reservation.status == 'cancelled'
+    rows = db.session.query(
+        Reservation.date,
+        db.func.sum(case((is_cancelled, 0), else_=1)),
+        db.func.sum(case((is_cancelled, 0), else_=Reservation.party_size)),
+        db.func.sum(case((is_cancelled, 1), else_=0))
+    ).filter(
+        Reservation.date >= start_date,
+        Reservation.date <= end_date
+    ).group_by(Reservation.date).all()
+    return [
+        {'date': date, 'reservations': int(count or 0), 'covers': int(covers or 0), 'cancelled': int(cancelled or 0)}
+        for date, count, covers, cancelled in rows
+    ]
+
+daily_summary_cache = get_daily_summary_cache(load_daily_summaries)
+
+@app.route('/api/reservations/calendar/summary')
+def get_calendar_summary():
+    """
+    Per-day reservation aggregates for month and multi-month views.
+
+    Query params: start and end (YYYY-MM-DD or ISO datetimes; end is exclusive,
+    as sent by FullCalendar). Ranges are limited to about a year.
+    """
+    try:
+        start_param, end_param = request.args.get('start'), request.args.get('end')
+        if not start_param or not end_param:
+            return jsonify({'success': False, 'error': 'start and end are required'}), 400
+        try:
+            start_day = datetime.strptime(start_param[:10], '%Y-%m-%d').date()
+            end_day = datetime.strptime(end_param[:10], '%Y-%m-%d').date() - timedelta(days=1)
+        except ValueError:
+            return jsonify({'success': False, 'error': 'start and end must be YYYY-MM-DD'}), 400
+        if end_day < start_day or (end_day - start_day).days > 400:
+            return jsonify({'success': False, 'error': 'Date range must be between 1 and 400 days'}), 400
+
+        days = daily_summary_cache.days_between(
+            current_restaurant_id() or 'all',
+            start_day.strftime('%Y-%m-%d'),
+            end_day.strftime('%Y-%m-%d')
+        )
+        return jsonify({
+            'success': True,
+            'start': start_day.strftime('%Y-%m-%d'),
+            'end': end_day.strftime('%Y-%m-%d'),
+            'days': days
+        })
+    except Exception as e:
+        print(f"Error in calendar summary API: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/reservations/calendar.ics')
+@auth.login_required
+def reservations_ics_feed():
+    """
+    iCalendar feed of reservations for staff calendar subscriptions.
+
+    Query params: start/end (YYYY-MM-DD, default last 7 to next 90 days) and
+    status (comma-separated, default everything except cancelled; "all" for all).
+    The feed carries a strong ETag and Last-Modified so polling clients get a 304.
+    """
+    try:
+        today = datetime.now().date()
+        start_date = request.args.get('start') or (today - timedelta(days=7)).strftime('%Y-%m-%d')
+        end_date = request.args.get('end') or (today + timedelta(days=90)).strftime('%Y-%m-%d')
+        try:
+            start_day = datetime.strptime(start_date, '%Y-%m-%d').date()
+            end_day = datetime.strptime(end_date, '%Y-%m-%d').date()
+        except ValueError:
+            return jsonify({'success': False, 'error': 'start and end must be YYYY-MM-DD'}), 400
+        if end_day < start_day or (end_day - start_day).days > 366:
+            return jsonify({'success': False, 'error': 'Date range must be between 0 and 366 days'}), 400
+
+        status_param = (request.args.get('status') or '').strip().lower()
+        statuses = sorted({s.strip() for s in status_param.split(',') if s.strip()}) if status_param else []
+
+        filters = [Reservation.date >= start_date, Reservation.date <= end_date]
+        if status_param == 'all':
+            statuses = ['all']
+        elif statuses:
+            filters.append(Reservation.status.in_(statuses))
+        else:
+            filters.append(or_(Reservation.status.is_(None), Reservation.status != 'cancelled'))
+
+        # Version check: one aggregate over the same indexed range
+        count, max_updated, max_id = db.session.query(
+            db.func.count(Reservation.id),
+            db.func.max(Reservation.updated_at),
+            db.func.max(Reservation.id)
+        ).filter(*filters).one()
+        restaurant_id = current_restaurant_id() or 'all'
+        etag = feed_etag(restaurant_id, start_date, end_date, ','.join(statuses), count, max_updated, max_id)
+        last_modified = (max_updated or datetime(2000, 1, 1)).replace(microsecond=0, tzinfo=timezone.utc)
+
+        if request.if_none_match:
+            not_modified = request.if_none_match.contains(etag)
+        else:
+            not_modified = bool(request.if_modified_since) and request.if_modified_since >= last_modified
+        if not_modified:
+            response = Response(status=304)
+        else:
+            columns = (
+                Reservation.id, Reservation.reservation_number, Reservation.name, Reservation.party_size,
+                Reservation.date, Reservation.time, Reservation.phone_number, Reservation.status,
+                Reservation.special_requests, Reservation.created_at, Reservation.updated_at
+            )
+            rows = db.session.query(*columns).filter(*filters).order_by(Reservation.date, Reservation.time)
+            calendar_name = f"{get_location().name} Reservations"
+            host = request.host.split(':')[0]
+
+            def generate():
+                yield from calendar_header(calendar_name)
+                for row in rows.yield_per(500):
+                    yield reservation_event(row, host=host)
+                yield from calendar_footer()
+
+            response = Response(stream_with_context(generate()), mimetype='text/calendar')
+            response.headers['Content-Disposition'] = 'inline; filename="reservations.ics"'
+
+        response.set_etag(etag)
+        response.last_modified = last_modified
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+    except Exception as e:
+        print(f"Error in reservations ICS feed: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 # REST API endpoints
 @app.route('/api/reservations', methods=['GET'])
 @auth.login_required
@@ -470,16 +728,19 @@ def api_list_reservations():
 
 @app.route('/api/menu_items')
 def api_menu_items():
-    items = MenuItem.query.filter_by(is_available=True).all()
-    return jsonify([
-        {
-            'id': item.id,
-            'name': item.name,
-            'description': item.description,
-            'price': item.price,
-            'category': item.category
-        } for item in items
-    ])
+    def render():
+        items = menu_snapshot().available
+        return jsonify([
+            {
+                'id': item.id,
+                'name': item.name,
+                'description': item.description,
+                'price': item.price,
+                'category': item.category
+            } for item in items
+        ]).get_data(), 'application/json'
+
+    return cached_menu_response('items', render)
 
 @app.route('/api/reservations', methods=['POST'])
 def api_create_reservation():
@@ -491,6 +752,17 @@ def api_create_reservation():
     special_requests = request.form.get('special_requests')
     party_orders_json = request.form.get('party_orders')
     try:
+        # A repeated submit of the same booking returns the existing reservation
+        existing_reservation = find_duplicate_reservation(phone_number, date, time, party_size)
+        if existing_reservation:
+            print(f"🔁 Duplicate booking request matched reservation {existing_reservation.reservation_number}")
+            return jsonify({
+                'success': True,
+                'duplicate': True,
+                'reservation': existing_reservation.to_dict(),
+                'total_reservation_amount': sum(order.total_amount or 0 for order in existing_reservation.orders)
+            })
+
         # Generate a unique 6-digit reservation number
         import random
         while True:
@@ -582,6 +854,99 @@ def api_create_reservation():
         db.session.rollback()
         return jsonify({'success': False, 'error': str(e)})
 
+@app.route('/api/reservations/duplicates', methods=['GET'])
+@auth.login_required
+def api_reservation_duplicates():
+    """
+    Dedupe report over reservation history: bookings sharing a fingerprint
+    (phone, date, time slot, party size). Optional start/end (YYYY-MM-DD) limit the range.
+    """
+    try:
+        duplicate_fingerprints = db.session.query(Reservation.booking_fingerprint).filter(
+            Reservation.booking_fingerprint.isnot(None)
+        )
+        if request.args.get('start'):
+            duplicate_fingerprints = duplicate_fingerprints.filter(Reservation.date >= request.args['start'])
+        if request.args.get('end'):
+            duplicate_fingerprints = duplicate_fingerprints.filter(Reservation.date <= request.args['end'])
+        duplicate_fingerprints = duplicate_fingerprints.group_by(
+            Reservation.booking_fingerprint
+        ).having(db.func.count(Reservation.id) > 1)
+
+        reservations = Reservation.query.filter(
+            Reservation.booking_fingerprint.in_(duplicate_fingerprints.scalar_subquery())
+        ).all()
+        groups = group_duplicates(reservations)
+
+        return jsonify({
+            'success': True,
+            'group_count': len(groups),
+            'duplicate_count': sum(len(group['duplicates']) for group in groups),
+            'groups': groups
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/backups', methods=['GET'])
+@auth.login_required
+def api_list_backups():
+    """Snapshots on disk plus the metrics of the last backup of each database"""
+    try:
+        return jsonify({
+            'success': True,
+            'snapshots': {
+                path: [
+                    {'path': snapshot, 'size_bytes': os.path.getsize(snapshot)}
+                    for snapshot in list_snapshots(backup_scheduler.backup_dir, path)
+                ] for path in backup_database_files()
+            },
+            'last_results': backup_scheduler.last_results,
+            'stats': backup_scheduler.stats
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/backups', methods=['POST'])
+@auth.login_required
+def api_run_backup():
+    """Start a backup now; it runs in the background, poll GET /api/backups for metrics"""
+    threading.Thread(target=backup_scheduler.run_once, name='db-backup-manual', daemon=True).start()
+    return jsonify({'success': True, 'message': 'Backup started'}), 202
+
+@app.route('/api/audit', methods=['GET'])
+@auth.login_required
+def api_audit_log():
+    """
+    Audit history, newest first. Filters: entity_type and entity_id, channel,
+    since/until (ISO timestamps, UTC). Page with before_id (the last id returned).
+    """
+    try:
+        limit = min(request.args.get('limit', 100, type=int), 1000)
+        query = AuditEvent.query
+        if request.args.get('entity_type'):
+            query = query.filter(AuditEvent.entity_type == request.args['entity_type'])
+        if request.args.get('entity_id'):
+            query = query.filter(AuditEvent.entity_id == request.args.get('entity_id', type=int))
+        if request.args.get('channel'):
+            query = query.filter(AuditEvent.channel == request.args['channel'])
+        if request.args.get('since'):
+            query = query.filter(AuditEvent.created_at >= datetime.fromisoformat(request.args['since']))
+        if request.args.get('until'):
+            query = query.filter(AuditEvent.created_at < datetime.fromisoformat(request.args['until']))
+        if request.args.get('before_id'):
+            query = query.filter(AuditEvent.id < request.args.get('before_id', type=int))
+
+        events = query.order_by(AuditEvent.created_at.desc(), AuditEvent.id.desc()).limit(limit).all()
+        return jsonify({
+            'success': True,
+            'events': [event.to_dict() for event in events],
+            'next_before_id': events[-1].id if len(events) == limit else None
+        })
+    except ValueError as e:
+        return jsonify({'success': False, 'error': f'Invalid filter: {e}'}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @app.route('/api/reservations/<int:res_id>', methods=['GET'])
 def api_get_reservation(res_id):
     reservation = Reservation.query.get_or_404(res_id)
@@ -798,24 +1163,30 @@ def api_delete_reservation(res_id):
     db.session.commit()
     return '', 204
 
-@app.route('/api/menu', methods=['GET'])
-def get_menu():
-    # Get menu items from database and organize by category
-    menu_items = MenuItem.query.filter_by(is_available=True).all()
-    menu_data = {}
-
-    for item in menu_items:
-        if item.category not in menu_data:
-            menu_data[item.category] = []
-
-        # Convert database item to template format
-        menu_item = {
-            'id': str(item.id),
-            'name': item.name,
-            'description': item.description,
-            'price': item.price
-        }
-        menu_data[item.category].append(menu_item)
+def cached_menu_response(representation, render):
+    """
+    Serve a menu body rendered and compressed once per menu version.
+
+    The strong ETag is a hash of the body, so a client (or CDN) revalidating an
+    unchanged menu gets a 304, and otherwise the best pre-compressed variant.
+    """
+    body = get_menu_body_cache().get(menu_snapshot(), representation, render)
+    if body.matches(request.if_none_match):
+        response = Response(status=304)
+        encoding = body.choose_encoding(request.accept_encodings)
+    else:
+        encoding = body.choose_encoding(request.accept_encodings)
+        response = Response(body.encodings[encoding], mimetype=body.mimetype)
+        if encoding != 'identity':
+            response.headers['Content-Encoding'] = encoding
+    response.set_etag(body.etag(encoding))
+    response.headers['Cache-Control'] = 'public, no-cache'
+    response.vary.update(('Accept-Encoding', 'X-Restaurant-Id'))
+    return response
+
+def render_menu_page():
+    # Menu items grouped by category, shared with the agents via the menu catalog
+    menu_data = {category: list(items) for category, items in menu_snapshot().categories.items()}
 
     # Check if menu data was found and log error if empty
     if not menu_data:
@@ -826,31 +1197,185 @@ def get_menu():
     return render_template('menu.html', menu=menu_data)
 
 @app.route('/menu')
+@app.route('/api/menu', methods=['GET'])
 def menu():
-    # Get menu items from database and organize by category
-    menu_items = MenuItem.query.filter_by(is_available=True).all()
-    menu_data = {}
-
-    for item in menu_items:
-        if item.category not in menu_data:
-            menu_data[item.category] = []
-
-        # Convert database item to template format
-        menu_item = {
-            'id': str(item.id),
-            'name': item.name,
-            'description': item.description,
-            'price': item.price
-        }
-        menu_data[item.category].append(menu_item)
+    # Pending flash messages are per session, so that page can't come from the cache
+    if session.get('_flashes'):
+        return render_menu_page()
+    return cached_menu_response('page', lambda: (render_menu_page().encode('utf-8'), 'text/html'))
+
+# In-memory menu catalog, reloaded only after MenuItem rows change
+def load_menu_catalog():
+    """Every menu item of the current location, in one query"""
+    with app.app_context():
+        rows = db.session.query(
+            MenuItem.id, MenuItem.name, MenuItem.description, MenuItem.price, MenuItem.category, MenuItem.is_available
+        ).order_by(MenuItem.id).all()
+        return [MenuItemSnapshot(*row) for row in rows]
+
+def load_menu_aliases():
+    """Every menu item alias and exclusion of the current location, in one query"""
+    with app.app_context():
+        rows = db.session.query(
+            MenuItemAlias.menu_item_id, MenuItemAlias.alias, MenuItemAlias.priority, MenuItemAlias.exclude
+        ).order_by(MenuItemAlias.id).all()
+        return [CatalogAlias(*row) for row in rows]
+
+register_menu_catalog_loader(load_menu_catalog, load_menu_aliases)
+
+@app.route('/api/menu_items/<int:menu_item_id>/aliases', methods=['GET'])
+@auth.login_required
+def list_menu_item_aliases(menu_item_id):
+    aliases = MenuItemAlias.query.filter_by(menu_item_id=menu_item_id).order_by(MenuItemAlias.id).all()
+    return jsonify([alias.to_dict() for alias in aliases])
 
-    # Check if menu data was found and log error if empty
-    if not menu_data:
-        print("ERROR: ERROR: No menu items found in database!")
-        print("   This indicates a database setup issue.")
-        print("   Run 'python init_test_data.py' to populate menu items.")
-    
-    return render_template('menu.html', menu=menu_data)
+@app.route('/api/menu_items/<int:menu_item_id>/aliases', methods=['POST'])
+@auth.login_required
+def add_menu_item_alias(menu_item_id):
+    """Add an alias (or, with "exclude": true, an exclusion); the menu matcher picks it up on its next version"""
+    try:
+        data = request.get_json() or {}
+        alias = str(data.get('alias') or '').strip().lower()
+        if not alias:
+            return jsonify({'success': False, 'error': 'alias is required'}), 400
+        if not db.session.get(MenuItem, menu_item_id):
+            return jsonify({'success': False, 'error': 'Menu item not found'}), 404
+
+        menu_item_alias = MenuItemAlias(
+            menu_item_id=menu_item_id,
+            alias=alias,
+            priority=int(data.get('priority', 2)),
+            exclude=bool(data.get('exclude', False))
+        )
+        db.session.add(menu_item_alias)
+        db.session.commit()
+        return jsonify({'success': True, 'alias': menu_item_alias.to_dict()}), 201
+    except ValueError:
+        return jsonify({'success': False, 'error': 'priority must be an integer'}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/menu_item_aliases/<int:alias_id>', methods=['DELETE'])
+@auth.login_required
+def delete_menu_item_alias(alias_id):
+    menu_item_alias = db.session.get(MenuItemAlias, alias_id)
+    if not menu_item_alias:
+        return jsonify({'success': False, 'error': 'Alias not found'}), 404
+    db.session.delete(menu_item_alias)
+    db.session.commit()
+    return '', 204
+
+# Item pairings: which menu items guests order together
+def load_item_pairing_rows(order_ids=None):
+    """(order_id, menu_item_id) for every item of orders that will be served, or of the given orders"""
+    with app.app_context():
+        query = db.session.query(OrderItem.order_id, OrderItem.menu_item_id).join(
+            Order, Order.id == OrderItem.order_id
+        ).outerjoin(
+            Reservation, Reservation.id == Order.reservation_id
+        ).filter(
+            or_(Order.status.is_(None), Order.status != 'cancelled'),
+            or_(Reservation.id.is_(None), Reservation.status != 'cancelled')
+        )
+        if order_ids is not None:
+            query = query.filter(OrderItem.order_id.in_(list(order_ids)))
+        return query.distinct().all()
+
+register_item_pairings_loader(load_item_pairing_rows)
+
+@app.route('/api/menu_items/<int:menu_item_id>/pairings', methods=['GET'])
+@auth.login_required
+def api_menu_item_pairings(menu_item_id):
+    """Items most often ordered with this one, from the precomputed pairings table"""
+    try:
+        snapshot = menu_snapshot()
+        if menu_item_id not in snapshot.by_id:
+            return jsonify({'success': False, 'error': 'Menu item not found'}), 404
+        item_pairings = get_item_pairings()
+        pairings = []
+        for pairing in item_pairings.pairings_for(menu_item_id):
+            item = snapshot.by_id.get(pairing.menu_item_id)
+            if item:
+                pairings.append({**item.to_dict(), 'score': pairing.score, 'orders': pairing.orders})
+        return jsonify({'success': True, 'menu_item_id': menu_item_id, 'pairings': pairings, 'status': item_pairings.status()})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+# Item sales rollup: top sellers and velocity by day and daypart
+def load_item_sales_rows(since=None, order_ids=None):
+    """Per-order item quantities of orders that will be served, sold since a date or by id"""
+    with app.app_context():
+        query = db.session.query(
+            Order.id, Order.target_date, Order.target_time, Order.created_at,
+            OrderItem.menu_item_id, db.func.sum(OrderItem.quantity)
+        ).join(OrderItem, OrderItem.order_id == Order.id).outerjoin(
+            Reservation, Reservation.id == Order.reservation_id
+        ).filter(
+            or_(Order.status.is_(None), Order.status != 'cancelled'),
+            or_(Reservation.id.is_(None), Reservation.status != 'cancelled')
+        )
+        if order_ids is not None:
+            query = query.filter(Order.id.in_(list(order_ids)))
+        else:
+            query = query.filter(or_(
+                Order.target_date >= since,
+                and_(Order.target_date.is_(None), Order.created_at >= datetime.strptime(since, '%Y-%m-%d'))
+            ))
+        return query.group_by(Order.id, OrderItem.menu_item_id).all()
+
+register_item_sales_loader(load_item_sales_rows)
+
+@app.route('/api/sales/top-sellers', methods=['GET'])
+@auth.login_required
+def api_top_sellers():
+    """
+    Ranked top sellers per daypart over the last ?days= days (default 7), plus
+    what is selling in the current daypart. Filter to one daypart with ?daypart=.
+    """
+    try:
+        days = request.args.get('days', 7, type=int)
+        limit = min(request.args.get('limit', 10, type=int), 100)
+        daypart = request.args.get('daypart')
+        if daypart and daypart not in DAYPART_NAMES:
+            return jsonify({'success': False, 'error': f"daypart must be one of {', '.join(DAYPART_NAMES)}"}), 400
+
+        snapshot = menu_snapshot()
+        item_sales = get_item_sales()
+
+        def describe(entry):
+            item = snapshot.by_id.get(entry['menu_item_id'])
+            return {**entry, 'name': item.name if item else None, 'category': item.category if item else None}
+
+        dayparts = {}
+        for name in ([daypart] if daypart else [None, *DAYPART_NAMES]):
+            sellers = item_sales.top_sellers(daypart=name, days=days, limit=limit)
+            dayparts[name or 'all_day'] = [describe(seller._asdict()) for seller in sellers]
+        velocity = item_sales.velocity(limit=limit)
+        velocity['items'] = [describe(entry) for entry in velocity['items']]
+
+        return jsonify({
+            'success': True,
+            'days': days,
+            'dayparts': dayparts,
+            'now': velocity,
+            'status': item_sales.status()
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+def insert_order_items(order_id, resolved_items, notes=None):
+    """Insert all of an order's items in one statement, priced from the catalog"""
+    if resolved_items:
+        db.session.execute(db.insert(OrderItem), [
+            {
+                'order_id': order_id,
+                'menu_item_id': item.id,
+                'quantity': quantity,
+                'price_at_time': item.price,
+                'notes': notes
+            } for item, quantity in resolved_items
+        ])
 
 @app.route('/api/order', methods=['POST'])
 def place_order():
@@ -861,29 +1386,20 @@ def place_order():
     if not reservation_id or not items:
         return jsonify({'error': 'Invalid data'}), 400
 
+    resolved_items, total_amount, errors = resolve_order_lines(get_menu_catalog().snapshot(), items)
+    if errors:
+        return jsonify({'error': 'Some items could not be ordered', 'items': errors}), 400
+
     order = Order(
         order_number=generate_order_number(),
         reservation_id=reservation_id, 
-        status='pending'
+        status='pending',
+        total_amount=total_amount
     )
     db.session.add(order)
     db.session.flush()  # Get the order ID
 
-    total_amount = 0
-    for item in items:
-        menu_item = MenuItem.query.get(item['menu_item_id'])
-        if not menu_item or not menu_item.is_available:
-            continue
-        order_item = OrderItem(
-            order_id=order.id,
-            menu_item_id=menu_item.id,
-            quantity=item['quantity'],
-            price_at_time=menu_item.price
-        )
-        db.session.add(order_item)
-        total_amount += menu_item.price * item['quantity']
-
-    order.total_amount = total_amount
+    insert_order_items(order.id, resolved_items)
     db.session.commit()
 
     return jsonify(order.to_dict()), 201
@@ -913,6 +1429,11 @@ def create_standalone_order():
         if not customer_name or not customer_phone:
             return jsonify({'success': False, 'error': 'Customer name and phone number are required'}), 400
 
+        # Resolve and price every line from the menu catalog (client prices are ignored)
+        resolved_items, total_amount, errors = resolve_order_lines(get_menu_catalog().snapshot(), items)
+        if errors:
+            return jsonify({'success': False, 'error': 'Some items could not be ordered', 'items': errors}), 400
+
         # Create order
         order = Order(
             order_number=generate_order_number(),
@@ -925,34 +1446,15 @@ def create_standalone_order():
             order_type=order_type,
             customer_phone=customer_phone,
             customer_address=customer_address,
-            special_instructions=special_instructions
+            special_instructions=special_instructions,
+            total_amount=total_amount
         )
         db.session.add(order)
         db.session.flush()  # Get order ID
 
-        total_amount = 0
-
-        # Add order items
-        for item_data in items:
-            # Find menu item by name (since we're using generated IDs)
-            menu_item = MenuItem.query.filter_by(name=item_data['name']).first()
-            if menu_item:
-                # Only add special instructions to item notes, not order type/phone info
-                item_notes = ""
-                if special_instructions:
-                    item_notes = f"Instructions: {special_instructions}"
-
-                order_item = OrderItem(
-                    order_id=order.id,
-                    menu_item_id=menu_item.id,
-                    quantity=item_data['quantity'],
-                    price_at_time=item_data['price'],
-                    notes=item_notes
-                )
-                db.session.add(order_item)
-                total_amount += item_data['price'] * item_data['quantity']
-
-        order.total_amount = total_amount
+        # Only add special instructions to item notes, not order type/phone info
+        item_notes = f"Instructions: {special_instructions}" if special_instructions else ""
+        insert_order_items(order.id, resolved_items, item_notes)
         db.session.commit()
 
         # Calculate estimated time (15-30 minutes for pickup, 30-45 for delivery)
@@ -1026,6 +1528,162 @@ def kitchen_orders():
                          start_time=start_time,
                          end_time=end_time)
 
+# Kitchen prep list: item counts due in the next 30/60 minutes
+def load_prep_rows(dates=None, order_ids=None, reservation_ids=None):
+    """Per-order item quantities for orders the kitchen still has to fire, by target date or by id"""
+    # A pre-order is fired for its reservation's current slot: target_date/time
+    # are only copied from the reservation when the order is created
+    due_date = db.func.coalesce(Reservation.date, Order.target_date)
+    due_time = db.func.coalesce(Reservation.time, Order.target_time)
+    with app.app_context():
+        query = db.session.query(
+            Order.id, Order.reservation_id, due_date, due_time, Order.status,
+            OrderItem.menu_item_id, MenuItem.name, MenuItem.category, db.func.sum(OrderItem.quantity)
+        ).join(OrderItem, OrderItem.order_id == Order.id).join(
+            MenuItem, MenuItem.id == OrderItem.menu_item_id
+        ).outerjoin(Reservation, Reservation.id == Order.reservation_id).filter(
+            Order.status.in_(PREP_STATUSES),
+            # Pre-orders of cancelled reservations won't be served
+            or_(Reservation.id.is_(None), Reservation.status != 'cancelled')
+        )
+        if dates is not None:
+            query = query.filter(due_date.in_(list(dates)))
+        else:
+            query = query.filter(or_(
+                Order.id.in_(list(order_ids or ())),
+                Order.reservation_id.in_(list(reservation_ids or ()))
+            ))
+        return query.group_by(Order.id, OrderItem.menu_item_id).all()
+
+register_prep_list_loader(load_prep_rows)
+
+def prep_list_windows():
+    """Look-ahead windows from ?windows=30,60 (minutes)"""
+    raw = request.args.get('windows')
+    if not raw:
+        return DEFAULT_WINDOWS
+    windows = sorted({int(minutes) for minutes in raw.split(',') if minutes.strip()})
+    if not windows or windows[0] <= 0 or windows[-1] > 24 * 60:
+        raise ValueError('windows must be between 1 and 1440 minutes')
+    return windows
+
+@app.route('/api/kitchen/prep-list', methods=['GET'])
+def api_kitchen_prep_list():
+    """How many of each item must be fired in the next 30/60 minutes (plus overdue)"""
+    try:
+        return jsonify({'success': True, **get_prep_list().snapshot(windows=prep_list_windows())})
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/kitchen/prep-list/stream')
+def kitchen_prep_list_stream():
+    """Server-Sent Events feed of the prep list: sent on every order change and at least once a minute"""
+    try:
+        windows = prep_list_windows()
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    prep_list = get_prep_list()
+
+    def event_generator():
+        version = None
+        try:
+            while True:
+                snapshot = prep_list.snapshot(windows=windows)
+                version = snapshot['version']
+                yield f"data: {json.dumps(snapshot)}\n\n"
+                # Counts shift as time passes, so refresh even without changes
+                prep_list.wait_for_change(version, timeout=60)
+        except Exception as e:
+            print(f"ERROR: Prep list stream error: {e}")
+            yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
+
+    return Response(
+        event_generator(),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'Connection': 'keep-alive',
+            'X-Accel-Buffering': 'no'
+        }
+    )
+
+@app.route('/api/orders/status', methods=['PUT'])
+def bulk_update_order_status():
+    """
+    Move many orders to one status, e.g. clearing a table's tickets at the pass.
+
+    Body: {"order_ids": [...], "status": "ready"}. Each order's change is checked
+    against the order state machine; allowed ones are applied with one UPDATE
+    in one transaction, and the change feed publishes the batch as one event.
+    """
+    try:
+        data = request.get_json() or {}
+        new_status = data.get('status')
+        order_ids = data.get('order_ids')
+
+        if new_status not in ORDER_STATUSES:
+            return jsonify({'success': False, 'error': 'Invalid status'}), 400
+        if not isinstance(order_ids, list) or not order_ids or len(order_ids) > 500:
+            return jsonify({'success': False, 'error': 'order_ids must be a list of 1 to 500 order ids'}), 400
+        try:
+            order_ids = {int(order_id) for order_id in order_ids}
+        except (TypeError, ValueError):
+            return jsonify({'success': False, 'error': 'order_ids must be integers'}), 400
+
+        orders = {
+            row.id: row for row in db.session.query(
+                Order.id, Order.status, Order.reservation_id, Order.customer_phone, Order.restaurant_id
+            ).filter(Order.id.in_(order_ids)).all()
+        }
+        to_update, unchanged, rejected = plan_transitions({oid: row.status for oid, row in orders.items()}, new_status)
+        rejected += [{'id': oid, 'status': None, 'error': 'Order not found'} for oid in sorted(order_ids - set(orders))]
+
+        updated = []
+        if to_update:
+            # Guard on the current status so a concurrent change isn't overwritten
+            db.session.execute(
+                db.update(Order).where(
+                    Order.id.in_(to_update),
+                    or_(Order.status.in_(source_statuses(new_status)), Order.status.is_(None))
+                ).values(status=new_status).execution_options(synchronize_session=False)
+            )
+            updated = [row.id for row in db.session.query(Order.id).filter(
+                Order.id.in_(to_update), Order.status == new_status
+            )]
+            rejected += [
+                {'id': oid, 'status': None, 'error': 'Order changed during the update'}
+                for oid in sorted(set(to_update) - set(updated))
+            ]
+
+            # A bulk UPDATE bypasses the flush hooks; hand the batch to the change feed directly
+            info = db.session.info
+            now = datetime.utcnow()
+            for order_id in updated:
+                row = orders[order_id]
+                info.setdefault('changed_order_ids', set()).add(order_id)
+                if row.reservation_id:
+                    info.setdefault('changed_reservation_ids', set()).add(row.reservation_id)
+                info.setdefault('prefetch_dirty_phones', set()).add(row.customer_phone)
+                info.setdefault('audit_events', []).append(audit_event(
+                    'order', order_id, 'update', {'status': [row.status, new_status]}, row.restaurant_id, now
+                ))
+        db.session.commit()
+
+        return jsonify({
+            'success': not rejected,
+            'status': new_status,
+            'updated': updated,
+            'unchanged': unchanged,
+            'rejected': rejected,
+            'message': f'{len(updated)} orders updated to {new_status}'
+        }), 200 if updated or unchanged or not rejected else 409
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @app.route('/api/orders/<int:order_id>/status', methods=['PUT'])
 def update_order_status(order_id):
     """Update order status for kitchen management"""
@@ -1034,11 +1692,17 @@ def update_order_status(order_id):
         data = request.get_json()
         new_status = data.get('status')
 
-        if new_status not in ['pending', 'preparing', 'ready', 'completed', 'cancelled']:
+        if new_status not in ORDER_STATUSES:
             return jsonify({'success': False, 'error': 'Invalid status'}), 400
 
-        order.status = new_status
-        db.session.commit()
+        # Same state machine as the bulk endpoint (no completed -> pending)
+        to_update, unchanged, rejected = plan_transitions({order.id: order.status}, new_status)
+        if rejected:
+            return jsonify({'success': False, 'error': rejected[0]['error'], 'status': rejected[0]['status']}), 409
+
+        if to_update:
+            order.status = new_status
+            db.session.commit()
 
         return jsonify({'success': True, 'message': f'Order status updated to {new_status}'})
 
@@ -1847,6 +2511,284 @@ def get_receptionist_agent():
     return _agent_instance
 
 # Add SWAIG routes to Flask app
+# SWAIG documents: built once per tool registry and served as pre-serialized bytes
+def receptionist_function_names(agent):
+    """Names of the functions the receptionist offers, from the agent's tool registry"""
+    # Get function names dynamically from the agent's registered SWAIG functions
+    try:
+        if hasattr(agent, '_tool_registry') and hasattr(agent._tool_registry, '_swaig_functions'):
+            available_functions = list(agent._tool_registry._swaig_functions.keys())
+            print(f"   Found {len(available_functions)} available functions in agent registry: {available_functions}")
+        else:
+            # Fallback to hardcoded list if agent registry not available
+            available_functions = [
+                'create_reservation',
+                'get_reservation', 
+                'update_reservation',
+                'cancel_reservation',
+
+                'create_order',
+                'get_order_details',
+                'update_order_status',
+                'pay_reservation',
+                'pay_order',
+                'send_payment_receipt',
+                'transfer_to_manager',
+                'schedule_callback'
+            ]
+            print(f"   Found {len(available_functions)} available functions in fallback list: {available_functions}")
+    except Exception as e:
+        print(f"   Error getting functions from agent registry: {e}")
+        # Fallback to hardcoded list
+        available_functions = [
+            'create_reservation',
+            'get_reservation', 
+            'update_reservation',
+            'cancel_reservation',
+
+            'create_order',
+            'get_order_details',
+            'update_order_status',
+            'pay_reservation',
+            'pay_order',
+            'send_payment_receipt',
+            'transfer_to_manager',
+            'schedule_callback'
+        ]
+        print(f"   Found {len(available_functions)} available functions in fallback list: {available_functions}")
+    return available_functions
+
+def receptionist_signatures(agent):
+    """
+    Signatures for get_signature requests: the hand-written ones below, plus the
+    registry definition of any other tool the agent has registered.
+    """
+    all_signatures = {
+        'create_reservation': {
+            'function': 'create_reservation',
+            'purpose': ('Create a new restaurant reservation with optional food pre-ordering. '
+                       'ALWAYS ask customers if they want to pre-order from the menu when making reservations. '
+                       'For parties larger than one, ask for each person\'s name and food preferences. '
+                       'If customers mention specific food items during the call, extract them and include in party_orders. '
+                       'IMPORTANT: Always confirm the complete order details before creating the reservation.'),
+            'argument': {
+                'type': 'object',
+                'properties': {
+                    'name': {'type': 'string', 'description': 'Customer full name (extract from conversation if mentioned)'},
+                    'party_size': {'type': 'integer', 'description': 'Number of people (extract from conversation)'},
+                    'date': {'type': 'string', 'description': 'Reservation date in YYYY-MM-DD format (extract from conversation - today, tomorrow, specific dates)'},
+                    'time': {'type': 'string', 'description': 'Reservation time in 24-hour HH:MM format (extract from conversation - convert PM/AM to 24-hour)'},
+                    'phone_number': {'type': 'string', 'description': 'Customer phone number with country code (extract from conversation or use caller ID)'},
+                    'special_requests': {'type': 'string', 'description': 'Optional special requests or dietary restrictions (extract from conversation)'},
+                    'old_school': {'type': 'boolean', 'description': 'True for old school reservation (no pre-ordering), false if customer wants to pre-order'},
+                    'party_orders': {
+                        'type': 'array',
+                        'description': 'Required when customers want to pre-order food. Create one entry per person with their menu items. Always ask "What would [person name] like to eat?" for each person.',
+                        'items': {
+                            'type': 'object',
+                            'properties': {
+                                'person_name': {'type': 'string', 'description': 'Name of person ordering (ask for each person: "Person 1", "Person 2", or actual names like "Jim", "Tom")'},
+                                'items': {
+                                    'type': 'array',
+                                    'description': 'Menu items ordered by this person. IMPORTANT: Always confirm each item before adding.',
+                                    'items': {
+                                        'type': 'object',
+                                        'properties': {
+                                            'menu_item_id': {'type': 'integer', 'description': 'ID of the menu item (get from menu lookup)'},
+                                            'quantity': {'type': 'integer', 'description': 'Quantity ordered (default 1)'}
+                                        },
+                                        'required': ['menu_item_id', 'quantity']
+                                    }
+                                }
+                            },
+                            'required': ['person_name', 'items']
+                        }
+                    },
+                    'pre_order': {
+                        'type': 'array',
+                        'description': 'Alternative format for pre-orders using menu item names. Use when menu_item_id is not readily available.',
+                        'items': {
+                            'type': 'object',
+                            'properties': {
+                                'name': {'type': 'string', 'description': 'Exact menu item name (e.g., "Kraft Lemonade", "Buffalo Wings")'},
+                                'quantity': {'type': 'integer', 'description': 'Quantity ordered'}
+                            },
+                            'required': ['name', 'quantity']
+                        }
+                    }
+                },
+                'required': ['name', 'party_size', 'date', 'time', 'phone_number']
+            }
+        },
+        'get_reservation': {
+            'function': 'get_reservation',
+            'purpose': 'Look up existing reservations by reservation number (preferred) or name. When found by reservation number, asks for confirmation using the name from the database.',
+            'argument': {
+                'type': 'object',
+                'properties': {
+                    'reservation_number': {'type': 'string', 'description': '6-digit reservation number to find (preferred search method)'},
+                    'reservation_id': {'type': 'integer', 'description': 'Specific reservation ID to find'},
+                    'name': {'type': 'string', 'description': 'Customer full name, first name, or last name to search by (partial matches work)'},
+                    'first_name': {'type': 'string', 'description': 'Customer first name to search by'},
+                    'last_name': {'type': 'string', 'description': 'Customer last name to search by'},
+                    'date': {'type': 'string', 'description': 'Reservation date to search by (YYYY-MM-DD)'},
+                    'time': {'type': 'string', 'description': 'Reservation time to search by (HH:MM)'},
+                    'party_size': {'type': 'integer', 'description': 'Number of people to search by'},
+                    'email': {'type': 'string', 'description': 'Customer email address to search by'},
+                    'phone_number': {'type': 'string', 'description': 'Customer phone number (fallback search method only)'}
+                }
+            }
+        },
+        'update_reservation': {
+            'function': 'update_reservation',
+            'purpose': 'Update an existing reservation - can search by reservation number first, then fallback to other methods',
+            'argument': {
+                'type': 'object',
+                'properties': {
+                    'reservation_number': {'type': 'string', 'description': '6-digit reservation number (preferred method)'},
+                    'reservation_id': {'type': 'integer', 'description': 'Reservation ID (alternative method)'},
+                    'name': {'type': 'string', 'description': 'Customer name'},
+                    'party_size': {'type': 'integer', 'description': 'Number of people'},
+                    'date': {'type': 'string', 'description': 'Reservation date (YYYY-MM-DD)'},
+                    'time': {'type': 'string', 'description': 'Reservation time (HH:MM)'},
+                    'phone_number': {'type': 'string', 'description': 'Customer phone number'},
+                    'special_requests': {'type': 'string', 'description': 'Special requests or dietary restrictions'}
+                },
+                'required': []
+            }
+        },
+        'cancel_reservation': {
+            'function': 'cancel_reservation',
+            'purpose': 'Cancel a reservation - can search by reservation number first, then fallback to other methods',
+            'argument': {
+                'type': 'object',
+                'properties': {
+                    'reservation_number': {'type': 'string', 'description': '6-digit reservation number (preferred method)'},
+                    'reservation_id': {'type': 'integer', 'description': 'Reservation ID (alternative method)'},
+                    'phone_number': {'type': 'string', 'description': 'Customer phone number for verification'}
+                },
+                'required': []
+            }
+        },
+        'create_order': {
+            'function': 'create_order',
+            'purpose': 'Create a standalone food order for pickup or delivery',
+            'argument': {
+                'type': 'object',
+                'properties': {
+                    'items': {
+                        'type': 'array', 
+                        'description': 'List of menu items to order. IMPORTANT: Always confirm each item with the customer before adding.',
+                        'items': {
+                            'type': 'object',
+                            'properties': {
+                                'name': {'type': 'string', 'description': 'Exact menu item name as it appears on the menu'},
+                                'quantity': {'type': 'integer', 'description': 'Quantity to order (default 1)'}
+                            },
+                            'required': ['name', 'quantity']
+                        }
+                    },
+                    'customer_name': {'type': 'string', 'description': 'Customer full name for the order'},
+                    'customer_phone': {'type': 'string', 'description': 'Customer phone number (use caller ID if not provided)'},
+                    'order_type': {'type': 'string', 'description': 'Type of order: "pickup" (customer picks up) or "delivery" (we deliver)', 'enum': ['pickup', 'delivery']},
+                    'pickup_time': {'type': 'string', 'description': 'Requested pickup time in HH:MM format (for pickup orders)'},
+                    'delivery_address': {'type': 'string', 'description': 'Full delivery address (required for delivery orders)'},
+                    'special_instructions': {'type': 'string', 'description': 'Special cooking instructions or delivery notes'},
+                    'payment_preference': {'type': 'string', 'description': 'Payment preference: "now" to pay immediately with credit card, "pickup" to pay at pickup/delivery (default)', 'enum': ['now', 'pickup']}
+                },
+                'required': ['items', 'customer_name', 'order_type']
+            }
+        },
+        'get_order_details': {
+            'function': 'get_order_details',
+            'purpose': 'Get order details and status for a to-go order for pickup or delivery. Search by order number, customer phone number, or customer name. Use this when customers ask about their order status',
+            'argument': {
+                'type': 'object',
+                'properties': {
+                    'order_number': {'type': 'string', 'description': '5-digit order number (preferred method - ask customer for this)'},
+                    'customer_name': {'type': 'string', 'description': 'Customer name (alternative search method)'},
+                    'customer_phone': {'type': 'string', 'description': 'Customer phone number for verification (use caller ID if not provided)'},
+                    'order_type': {'type': 'string', 'description': 'Order type to help narrow search', 'enum': ['pickup', 'delivery', 'reservation']}
+                },
+                'required': []
+            }
+        },
+        'update_order_status': {
+            'function': 'update_order_status',
+            'purpose': 'Update the status of an order - can search by order number first, then fallback to other methods',
+            'argument': {
+                'type': 'object',
+                'properties': {
+                    'order_number': {'type': 'string', 'description': '5-digit order number (preferred method)'},
+                    'order_id': {'type': 'integer', 'description': 'Order ID (alternative method)'},
+                    'status': {'type': 'string', 'description': 'New order status'}
+                },
+                'required': []
+            }
+        },
+
+
+        'pay_order': {
+            'function': 'pay_order',
+            'purpose': 'Process payment for an existing order using SignalWire Pay and Stripe. Use this when customers want to pay for their order over the phone.',
+            'argument': {
+                'type': 'object',
+                'properties': {
+                    'order_number': {'type': 'string', 'description': '5-digit order number to pay for'},
+                    'order_id': {'type': 'integer', 'description': 'Order ID (alternative to order_number)'},
+                    'customer_name': {'type': 'string', 'description': 'Customer name for verification'},
+                    'phone_number': {'type': 'string', 'description': 'Phone number for SMS receipt (will use caller ID if not provided)'}
+                },
+                'required': []
+            }
+        },
+        'transfer_to_manager': {
+            'function': 'transfer_to_manager',
+            'purpose': 'Transfer to manager'
+        },
+                        'schedule_callback': {
+            'function': 'schedule_callback',
+            'purpose': 'Schedule a callback'
+        },
+        'pay_reservation': {
+            'function': 'pay_reservation',
+            'purpose': 'Collect payment for an existing reservation. Use this function to collect payment for an existing reservation. Give the payment results to the customer.',
+            'argument': {
+                'type': 'object',
+                'properties': {
+                    'reservation_number': {'type': 'string', 'description': '6-digit reservation number to pay for (will be extracted from conversation if not provided)'},
+                    'cardholder_name': {'type': 'string', 'description': 'Name on the credit card (auto-filled from reservation name)'},
+                    'phone_number': {'type': 'string', 'description': 'SMS number for receipt (will use caller ID if not provided)'}
+                },
+                'required': []
+            },
+            'response': {
+                'type': 'object',
+                'properties': {
+                    'success': {'type': 'boolean', 'description': 'Whether the payment was successful'},
+                    'confirmation_number': {'type': 'string', 'description': 'Payment confirmation number (if successful)'},
+                    'amount_charged': {'type': 'number', 'description': 'Amount charged in USD'},
+                    'error_message': {'type': 'string', 'description': 'Error details (if payment failed)'},
+                    'receipt_sent': {'type': 'boolean', 'description': 'Whether SMS receipt was sent successfully'}
+                }
+            }
+        }
+    }
+
+    registry = getattr(getattr(agent, '_tool_registry', None), '_swaig_functions', None) or {}
+    for name, function in registry.items():
+        if name in all_signatures:
+            continue
+        if isinstance(function, dict):
+            all_signatures[name] = function
+        else:
+            all_signatures[name] = {
+                'function': name,
+                'purpose': function.description,
+                'argument': function._ensure_parameter_structure()
+            }
+    return all_signatures
+
 @app.route('/receptionist', methods=['POST'])
 def swaig_receptionist():
     """Handle SWAIG requests for the receptionist agent"""
@@ -1863,19 +2805,13 @@ def swaig_receptionist():
             print("ERROR: Agent not available")
             return jsonify({'error': 'Agent not available'}), 503
 
-        # Enhanced raw data logging
-        raw_data = request.get_data(as_text=True)
-        print(f"📋 Raw request data (first 1000 chars): {raw_data[:1000]}")
-        print(f"📋 Raw request data length: {len(raw_data) if raw_data else 0}")
+        raw_data = request.get_data()
+        print(f"📋 Raw request data length: {len(raw_data)}")
 
         # Better error handling for JSON parsing
         try:
             data = request.get_json()
-            if data:
-                import json as json_module
-                print(f"📋 Parsed JSON data (full):")
-                print(json_module.dumps(data, indent=2))
-            else:
+            if not data:
                 print("📋 Parsed JSON data: None")
         except Exception as json_error:
             print(f"ERROR: JSON parsing error: {json_error}")
@@ -1896,6 +2832,19 @@ def swaig_receptionist():
 
 
 
+        # Sampled, redacted copy of the payload while payload capture is on (see /debug/payloads)
+        capture_payload = payload_capture.wants()
+        if capture_payload:
+            payload_capture.capture('request', raw_data, call_id=data.get('call_id'), function=data.get('function'))
+
+        # Route the rest of this request to the location that was dialed
+        restaurant_id = resolve_restaurant_id(data)
+        set_current_restaurant(restaurant_id)
+        set_audit_actor(data.get('call_id') or (data.get('call') or {}).get('call_id'))
+
+        # Warm the caller's reservations and orders on the first request of a call
+        prefetch_caller_for_request(data)
+
         # Check if this is a signature request
         action = data.get('action')
         if action == 'get_signature':
@@ -1905,280 +2854,16 @@ def swaig_receptionist():
             requested_functions = data.get('functions', [])
             print(f"   Requested functions: {requested_functions}")
 
+            swaig_documents = get_swaig_document_cache()
+
             # If functions array is empty, return list of available function names
             if not requested_functions:
                 print("📋 Returning available function names")
-
-                # Get function names dynamically from the agent's registered SWAIG functions
-                try:
-                    if hasattr(agent, '_tool_registry') and hasattr(agent._tool_registry, '_swaig_functions'):
-                        available_functions = list(agent._tool_registry._swaig_functions.keys())
-                        print(f"   Returning {len(available_functions)} available functions from agent registry: {available_functions}")
-                    else:
-                        # Fallback to hardcoded list if agent registry not available
-                        available_functions = [
-                            'create_reservation',
-                            'get_reservation', 
-                            'update_reservation',
-                            'cancel_reservation',
-                
-                            'create_order',
-                            'get_order_details',
-                            'update_order_status',
-                            'pay_reservation',
-                            'pay_order',
-                            'send_payment_receipt',
-                            'transfer_to_manager',
-                            'schedule_callback'
-                        ]
-                        print(f"   Returning {len(available_functions)} available functions from fallback list: {available_functions}")
-                except Exception as e:
-                    print(f"   Error getting functions from agent registry: {e}")
-                    # Fallback to hardcoded list
-                    available_functions = [
-                        'create_reservation',
-                        'get_reservation', 
-                        'update_reservation',
-                        'cancel_reservation',
-            
-                        'create_order',
-                        'get_order_details',
-                        'update_order_status',
-                        'pay_reservation',
-                        'pay_order',
-                        'send_payment_receipt',
-                        'transfer_to_manager',
-                        'schedule_callback'
-                    ]
-                    print(f"   Returning {len(available_functions)} available functions from fallback list: {available_functions}")
-
-                return jsonify({"functions": available_functions})
+                return Response(swaig_documents.function_names(agent), mimetype='application/json')
 
             # If specific functions are requested, return their signatures
             print(f"📋 Returning signatures for specific functions: {requested_functions}")
-
-            # Define all available function signatures
-            all_signatures = {
-                'create_reservation': {
-                    'function': 'create_reservation',
-                    'purpose': ('Create a new restaurant reservation with optional food pre-ordering. '
-                               'ALWAYS ask customers if they want to pre-order from the menu when making reservations. '
-                               'For parties larger than one, ask for each person\'s name and food preferences. '
-                               'If customers mention specific food items during the call, extract them and include in party_orders. '
-                               'IMPORTANT: Always confirm the complete order details before creating the reservation.'),
-                    'argument': {
-                        'type': 'object',
-                        'properties': {
-                            'name': {'type': 'string', 'description': 'Customer full name (extract from conversation if mentioned)'},
-                            'party_size': {'type': 'integer', 'description': 'Number of people (extract from conversation)'},
-                            'date': {'type': 'string', 'description': 'Reservation date in YYYY-MM-DD format (extract from conversation - today, tomorrow, specific dates)'},
-                            'time': {'type': 'string', 'description': 'Reservation time in 24-hour HH:MM format (extract from conversation - convert PM/AM to 24-hour)'},
-                            'phone_number': {'type': 'string', 'description': 'Customer phone number with country code (extract from conversation or use caller ID)'},
-                            'special_requests': {'type': 'string', 'description': 'Optional special requests or dietary restrictions (extract from conversation)'},
-                            'old_school': {'type': 'boolean', 'description': 'True for old school reservation (no pre-ordering), false if customer wants to pre-order'},
-                            'party_orders': {
-                                'type': 'array',
-                                'description': 'Required when customers want to pre-order food. Create one entry per person with their menu items. Always ask "What would [person name] like to eat?" for each person.',
-                                'items': {
-                                    'type': 'object',
-                                    'properties': {
-                                        'person_name': {'type': 'string', 'description': 'Name of person ordering (ask for each person: "Person 1", "Person 2", or actual names like "Jim", "Tom")'},
-                                        'items': {
-                                            'type': 'array',
-                                            'description': 'Menu items ordered by this person. IMPORTANT: Always confirm each item before adding.',
-                                            'items': {
-                                                'type': 'object',
-                                                'properties': {
-                                                    'menu_item_id': {'type': 'integer', 'description': 'ID of the menu item (get from menu lookup)'},
-                                                    'quantity': {'type': 'integer', 'description': 'Quantity ordered (default 1)'}
-                                                },
-                                                'required': ['menu_item_id', 'quantity']
-                                            }
-                                        }
-                                    },
-                                    'required': ['person_name', 'items']
-                                }
-                            },
-                            'pre_order': {
-                                'type': 'array',
-                                'description': 'Alternative format for pre-orders using menu item names. Use when menu_item_id is not readily available.',
-                                'items': {
-                                    'type': 'object',
-                                    'properties': {
-                                        'name': {'type': 'string', 'description': 'Exact menu item name (e.g., "Kraft Lemonade", "Buffalo Wings")'},
-                                        'quantity': {'type': 'integer', 'description': 'Quantity ordered'}
-                                    },
-                                    'required': ['name', 'quantity']
-                                }
-                            }
-                        },
-                        'required': ['name', 'party_size', 'date', 'time', 'phone_number']
-                    }
-                },
-                'get_reservation': {
-                    'function': 'get_reservation',
-                    'purpose': 'Look up existing reservations by reservation number (preferred) or name. When found by reservation number, asks for confirmation using the name from the database.',
-                    'argument': {
-                        'type': 'object',
-                        'properties': {
-                            'reservation_number': {'type': 'string', 'description': '6-digit reservation number to find (preferred search method)'},
-                            'reservation_id': {'type': 'integer', 'description': 'Specific reservation ID to find'},
-                            'name': {'type': 'string', 'description': 'Customer full name, first name, or last name to search by (partial matches work)'},
-                            'first_name': {'type': 'string', 'description': 'Customer first name to search by'},
-                            'last_name': {'type': 'string', 'description': 'Customer last name to search by'},
-                            'date': {'type': 'string', 'description': 'Reservation date to search by (YYYY-MM-DD)'},
-                            'time': {'type': 'string', 'description': 'Reservation time to search by (HH:MM)'},
-                            'party_size': {'type': 'integer', 'description': 'Number of people to search by'},
-                            'email': {'type': 'string', 'description': 'Customer email address to search by'},
-                            'phone_number': {'type': 'string', 'description': 'Customer phone number (fallback search method only)'}
-                        }
-                    }
-                },
-                'update_reservation': {
-                    'function': 'update_reservation',
-                    'purpose': 'Update an existing reservation - can search by reservation number first, then fallback to other methods',
-                    'argument': {
-                        'type': 'object',
-                        'properties': {
-                            'reservation_number': {'type': 'string', 'description': '6-digit reservation number (preferred method)'},
-                            'reservation_id': {'type': 'integer', 'description': 'Reservation ID (alternative method)'},
-                            'name': {'type': 'string', 'description': 'Customer name'},
-                            'party_size': {'type': 'integer', 'description': 'Number of people'},
-                            'date': {'type': 'string', 'description': 'Reservation date (YYYY-MM-DD)'},
-                            'time': {'type': 'string', 'description': 'Reservation time (HH:MM)'},
-                            'phone_number': {'type': 'string', 'description': 'Customer phone number'},
-                            'special_requests': {'type': 'string', 'description': 'Special requests or dietary restrictions'}
-                        },
-                        'required': []
-                    }
-                },
-                'cancel_reservation': {
-                    'function': 'cancel_reservation',
-                    'purpose': 'Cancel a reservation - can search by reservation number first, then fallback to other methods',
-                    'argument': {
-                        'type': 'object',
-                        'properties': {
-                            'reservation_number': {'type': 'string', 'description': '6-digit reservation number (preferred method)'},
-                            'reservation_id': {'type': 'integer', 'description': 'Reservation ID (alternative method)'},
-                            'phone_number': {'type': 'string', 'description': 'Customer phone number for verification'}
-                        },
-                        'required': []
-                    }
-                },
-                'create_order': {
-                    'function': 'create_order',
-                    'purpose': 'Create a standalone food order for pickup or delivery',
-                    'argument': {
-                        'type': 'object',
-                        'properties': {
-                            'items': {
-                                'type': 'array', 
-                                'description': 'List of menu items to order. IMPORTANT: Always confirm each item with the customer before adding.',
-                                'items': {
-                                    'type': 'object',
-                                    'properties': {
-                                        'name': {'type': 'string', 'description': 'Exact menu item name as it appears on the menu'},
-                                        'quantity': {'type': 'integer', 'description': 'Quantity to order (default 1)'}
-                                    },
-                                    'required': ['name', 'quantity']
-                                }
-                            },
-                            'customer_name': {'type': 'string', 'description': 'Customer full name for the order'},
-                            'customer_phone': {'type': 'string', 'description': 'Customer phone number (use caller ID if not provided)'},
-                            'order_type': {'type': 'string', 'description': 'Type of order: "pickup" (customer picks up) or "delivery" (we deliver)', 'enum': ['pickup', 'delivery']},
-                            'pickup_time': {'type': 'string', 'description': 'Requested pickup time in HH:MM format (for pickup orders)'},
-                            'delivery_address': {'type': 'string', 'description': 'Full delivery address (required for delivery orders)'},
-                            'special_instructions': {'type': 'string', 'description': 'Special cooking instructions or delivery notes'},
-                            'payment_preference': {'type': 'string', 'description': 'Payment preference: "now" to pay immediately with credit card, "pickup" to pay at pickup/delivery (default)', 'enum': ['now', 'pickup']}
-                        },
-                        'required': ['items', 'customer_name', 'order_type']
-                    }
-                },
-                'get_order_details': {
-                    'function': 'get_order_details',
-                    'purpose': 'Get order details and status for a to-go order for pickup or delivery. Search by order number, customer phone number, or customer name. Use this when customers ask about their order status',
-                    'argument': {
-                        'type': 'object',
-                        'properties': {
-                            'order_number': {'type': 'string', 'description': '5-digit order number (preferred method - ask customer for this)'},
-                            'customer_name': {'type': 'string', 'description': 'Customer name (alternative search method)'},
-                            'customer_phone': {'type': 'string', 'description': 'Customer phone number for verification (use caller ID if not provided)'},
-                            'order_type': {'type': 'string', 'description': 'Order type to help narrow search', 'enum': ['pickup', 'delivery', 'reservation']}
-                        },
-                        'required': []
-                    }
-                },
-                'update_order_status': {
-                    'function': 'update_order_status',
-                    'purpose': 'Update the status of an order - can search by order number first, then fallback to other methods',
-                    'argument': {
-                        'type': 'object',
-                        'properties': {
-                            'order_number': {'type': 'string', 'description': '5-digit order number (preferred method)'},
-                            'order_id': {'type': 'integer', 'description': 'Order ID (alternative method)'},
-                            'status': {'type': 'string', 'description': 'New order status'}
-                        },
-                        'required': []
-                    }
-                },
-
-
-                'pay_order': {
-                    'function': 'pay_order',
-                    'purpose': 'Process payment for an existing order using SignalWire Pay and Stripe. Use this when customers want to pay for their order over the phone.',
-                    'argument': {
-                        'type': 'object',
-                        'properties': {
-                            'order_number': {'type': 'string', 'description': '5-digit order number to pay for'},
-                            'order_id': {'type': 'integer', 'description': 'Order ID (alternative to order_number)'},
-                            'customer_name': {'type': 'string', 'description': 'Customer name for verification'},
-                            'phone_number': {'type': 'string', 'description': 'Phone number for SMS receipt (will use caller ID if not provided)'}
-                        },
-                        'required': []
-                    }
-                },
-                'transfer_to_manager': {
-                    'function': 'transfer_to_manager',
-                    'purpose': 'Transfer to manager'
-                },
-                                'schedule_callback': {
-                    'function': 'schedule_callback',
-                    'purpose': 'Schedule a callback'
-                },
-                'pay_reservation': {
-                    'function': 'pay_reservation',
-                    'purpose': 'Collect payment for an existing reservation. Use this function to collect payment for an existing reservation. Give the payment results to the customer.',
-                    'argument': {
-                        'type': 'object',
-                        'properties': {
-                            'reservation_number': {'type': 'string', 'description': '6-digit reservation number to pay for (will be extracted from conversation if not provided)'},
-                            'cardholder_name': {'type': 'string', 'description': 'Name on the credit card (auto-filled from reservation name)'},
-                            'phone_number': {'type': 'string', 'description': 'SMS number for receipt (will use caller ID if not provided)'}
-                        },
-                        'required': []
-                    },
-                    'response': {
-                        'type': 'object',
-                        'properties': {
-                            'success': {'type': 'boolean', 'description': 'Whether the payment was successful'},
-                            'confirmation_number': {'type': 'string', 'description': 'Payment confirmation number (if successful)'},
-                            'amount_charged': {'type': 'number', 'description': 'Amount charged in USD'},
-                            'error_message': {'type': 'string', 'description': 'Error details (if payment failed)'},
-                            'receipt_sent': {'type': 'boolean', 'description': 'Whether SMS receipt was sent successfully'}
-                        }
-                    }
-                }
-            }
-
-            # Return only the requested function signatures
-            signatures = {}
-            for func_name in requested_functions:
-                if func_name in all_signatures:
-                    signatures[func_name] = all_signatures[func_name]
-                else:
-                    print(f"WARNING:  Requested function '{func_name}' not found")
-
-            return jsonify(signatures)
+            return Response(swaig_documents.signatures(agent, requested_functions), mimetype='application/json')
 
         # Check if this is a call state notification (not a SWAIG function call)
         if 'call' in data and 'call_state' in data.get('call', {}):
@@ -2203,16 +2888,14 @@ def swaig_receptionist():
                 # Return SWML document to start the conversation
                 print(f"📞 Returning SWML document to start conversation for call {call_id}")
 
-                # Get the SWML document from the GET endpoint
+                # Get the SWML document from the GET endpoint, personalized from the caller's profile
                 try:
-                    swml_response = swaig_receptionist_info()
-                    if hasattr(swml_response, 'get_json'):
-                        swml_data = swml_response.get_json()
-                    else:
-                        swml_data = swml_response
+                    customer = find_customer_profile(from_number)
+                    if customer:
+                        print(f"👤 Returning caller {customer.phone} ({customer.visit_count} visits)")
 
                     print(f"📋 Returning SWML document for call initialization")
-                    return jsonify(swml_data)
+                    return Response(receptionist_swml_body(agent, customer), mimetype='application/json')
                 except Exception as e:
                     print(f"ERROR: Error generating SWML document: {e}")
                     # Fallback SWML response
@@ -2245,6 +2928,8 @@ def swaig_receptionist():
                     end_payment_session(call_id)
                 except Exception as e:
                     print(f"WARNING: Error cleaning up payment session: {e}")
+                caller_prefetcher.discard(call_id)
+                release_call(call_id)
 
             # Return success response for other call state notifications
             return jsonify({
@@ -2289,13 +2974,13 @@ def swaig_receptionist():
                 params = argument if argument else {}
 
         import json as json_module
-        print(f"📋 Extracted parameters: {json_module.dumps(params, indent=2)[:300]}...")
+        print(f"📋 Extracted parameters: {sorted(params) if isinstance(params, dict) else type(params).__name__}")
 
         # Extract meta_data for context
         meta_data = data.get('meta_data', {})
         meta_data_token = data.get('meta_data_token', '')
 
-        print(f"   Meta Data: {meta_data}")
+        print(f"   Meta Data keys: {sorted(meta_data) if isinstance(meta_data, dict) else None}")
         print(f"   Meta Data Token: {meta_data_token}")
 
         print(f"SUCCESS: Function blocking disabled - allowing {function_name} to proceed")
@@ -2371,7 +3056,10 @@ def swaig_receptionist():
                 if function_name in ['pay_order', 'pay_reservation'] and call_id:
                     session_data = get_payment_session_data(call_id)
                     if session_data:
-                        print(f"🔍 Adding payment session data to function call: {session_data}")
+                        # Keys only: the session holds payment details; full copies go through the redacting capture
+                        print(f"🔍 Adding payment session data to function call: {sorted(session_data)}")
+                        if capture_payload:
+                            payload_capture.capture('payment_session', dict(session_data), call_id=call_id, function=function_name)
                         data['_payment_session'] = session_data
                     else:
                         print(f"🔍 No payment session data found for {call_id}")
@@ -2393,8 +3081,12 @@ def swaig_receptionist():
                     print(f"   Corrected params: {params}")
 
                 print(f"🔧 Executing function: {function_name}")
-                print(f"📥 Function parameters: {json_module.dumps(params, indent=2) if params else 'None'}")
-                print(f"🧠 Context provided: {extracted_info}")
+                if capture_payload:
+                    payload_capture.capture('params', dict(params or {}), call_id=call_id, function=function_name)
+                print(f"🧠 Context provided: {sorted(extracted_info)}")
+                if capture_payload:
+                    # A copy: the conversation memory keeps changing after this call
+                    payload_capture.capture('context', dict(extracted_info), call_id=call_id, function=function_name)
 
                 # Get the function handler from the tool registry
                 if not hasattr(agent, '_tool_registry') or not agent._tool_registry:
@@ -2571,14 +3263,9 @@ def swaig_receptionist():
         print(f"   Traceback: {traceback.format_exc()}")
         return jsonify({'success': False, 'message': f'Error processing request: {str(e)}'}), 500
 
-@app.route('/receptionist', methods=['GET'])
-def swaig_receptionist_info():
-    """Provide SWML document for the SWAIG agent"""
-    agent = get_receptionist_agent()
-    if not agent:
-        return jsonify({'error': 'Agent not available'}), 503
-
-    # Return SWML document that includes function definitions
+def build_receptionist_swml(agent, url_root):
+    """SWML document for the receptionist, with its webhooks under url_root"""
+    # SWML document that includes function definitions
     swml_response = {
         "version": "1.0.0",
         "sections": {
@@ -2637,7 +3324,7 @@ def swaig_receptionist_info():
                         },
                         "SWAIG": {
                             "defaults": {
-                                "web_hook_url": f"{request.url_root}receptionist"
+                                "web_hook_url": f"{url_root}receptionist"
                             },
                             "functions": [
                                 {
@@ -2835,14 +3522,49 @@ def swaig_receptionist_info():
                             ]
                         },
                         "prompt": {
-                            "text": "Hi there! I'm Bobby from Bobby's Table. Great to have you call us today! How can I help you out? Whether you're looking to make a reservation, check on an existing one, hear about our menu, or place an order, I'm here to help make it easy for you.\n\nIMPORTANT CONVERSATION GUIDELINES:\n\n**RESERVATION LOOKUPS - CRITICAL:**\n- When customers want to check their reservation, ALWAYS ask for their reservation number FIRST\n- Say: 'Do you have your reservation number? It's a 6-digit number we sent you when you made the reservation.' (6 digits = reservation, 5 digits = order)\n- Only if they don't have it, then ask for their name as backup\n- Reservation numbers are the fastest and most accurate way to find reservations\n- Handle spoken numbers like 'seven eight nine zero one two' which becomes '789012'\n\n**🚨 PAYMENTS - SIMPLE PAYMENT RULE 🚨:**\n**Use the pay_reservation function for all existing reservation payments!**\n\n**SIMPLE PAYMENT FLOW:**\n1. Customer explicitly asks to pay (\"I want to pay\", \"Pay now\", \"Can I pay?\") → IMMEDIATELY call pay_reservation function\n2. pay_reservation handles everything: finds reservation, shows bill total, collects card details, and processes payment\n3. The function will guide the customer through each step conversationally and securely\n\n**PAYMENT EXAMPLES:**\n- Customer: 'I want to pay my bill' → YOU: Call pay_reservation function\n- Customer: 'Pay now' → YOU: Call pay_reservation function\n- Customer: 'Can I pay for my reservation?' → YOU: Call pay_reservation function\n\n**CRITICAL: Use pay_reservation for existing reservations only!**\n- ERROR: NEVER use pay_reservation for new reservation creation (use create_reservation instead)\n- ERROR: NEVER call pay_reservation when customer is just confirming order details\n\n**PRICING AND PRE-ORDERS - CRITICAL:**\n- When customers mention food items, ALWAYS provide the price immediately using data from get_menu function\n- 🚨 NEVER use hardcoded prices - ONLY use actual database prices from get_menu function\n- 🚨 For individual price questions: Search the cached_menu data for the exact item and price\n- Example: '[MENU ITEM NAME] are [ACTUAL PRICE FROM DATABASE]'\n- When creating reservations with pre-orders, ALWAYS mention the total cost using actual database prices\n- Example: 'Your [ITEMS] total [ACTUAL CALCULATED TOTAL FROM DATABASE PRICES]'\n- ALWAYS ask if customers want to pay for their pre-order after confirming the total\n- Example: 'Would you like to pay for your pre-order now to complete your reservation?'\n\n**🚨 MENU PRICE QUESTION ROUTING - CRITICAL:**\n- \"How much is French toast?\" → YOU: Call get_menu function (NEVER get_reservation!)\n- \"What's the price of the burger?\" → YOU: Call get_menu function (NEVER get_reservation!)\n- \"How much does [item] cost?\" → YOU: Call get_menu function (NEVER get_reservation!)\n- \"Tell me about your menu\" → YOU: Call get_menu function (NEVER get_reservation!)\n- ANY menu or price question → YOU: Call get_menu function FIRST\n\n**🔄 CORRECT PREORDER WORKFLOW:**\n- When customers want to create reservations with pre-orders, show them an order confirmation FIRST\n- The order confirmation shows: reservation details, each person's food items, individual prices, and total cost\n- Wait for customer to confirm their order details before proceeding (say 'Yes, that's correct')\n- After order confirmation, CREATE THE RESERVATION IMMEDIATELY\n- The correct flow is: Order Details → Customer Confirms → Create Reservation → Give Number → Offer Payment\n- After creating the reservation:\n  1. Give the customer their reservation number clearly\n  1.1 Mention that SMS confirmation is available if they'd like their reservation details sent to their phone\n  1.2 If the user requests SMS confirmation, send the reservation details via sms message\n 2. Ask if they want to pay now: 'Would you like to pay for your pre-order now?'\n- Payment is OPTIONAL - customers can always pay when they arrive\n\n**🔄 ORDER CONFIRMATION vs PAYMENT REQUESTS - CRITICAL:**\n- \"Yes, that's correct\" = Order confirmation → Call create_reservation function\n- \"Yes, create my reservation\" = Order confirmation → Call create_reservation function\n- \"That looks right\" = Order confirmation → Call create_reservation function\n- \"Pay now\" = Payment request → Call pay_reservation function\n- \"I want to pay\" = Payment request → Call pay_reservation function\n- \"Can I pay?\" = Payment request → Call pay_reservation function\n\n**🚨 CRITICAL: NEVER CALL pay_reservation WHEN USER IS CONFIRMING ORDER DETAILS 🚨:**\n- If user says \"Yes\" after order summary → Call create_reservation function\n- If user says \"That's correct\" after order summary → Call create_reservation function\n- If user says \"Looks good\" after order summary → Call create_reservation function\n- If user says \"Perfect\" after order summary → Call create_reservation function\n- ONLY call pay_reservation when user explicitly asks to pay AFTER reservation is created\n\n**🔍 CRITICAL: DISTINGUISH BETWEEN RESERVATIONS AND ORDERS:**\n- RESERVATIONS = table bookings (use get_reservation)\n- ORDERS = pickup/delivery food orders (use get_order_details)\n- If customer says \"pickup order\", \"delivery order\", \"food order\" → use get_order_details\n- If customer says \"reservation\", \"table booking\", \"dinner reservation\" → use get_reservation\n\n**🔍 ORDER STATUS CHECKS - CRITICAL:**\n- When customers ask to check their ORDER status, use get_order_details function\n- Examples: \"Check my order status\", \"Where is my order?\", \"Is my order ready?\"\n- NEVER use update_order_status - this function doesn't exist\n- NEVER use get_reservation for pickup/delivery orders\n- Use get_order_details with the order number the customer provides\n- Handle spoken numbers: \"nine two six five seven\" becomes \"92657\"\n- Always provide complete status information including estimated ready time\n\n**🚨 MANDATORY FUNCTION ROUTING RULES 🚨:**\n- 5-digit number (like 91576, 62879, 12345) = ORDER → MUST use get_order_details\n- 6-digit number (like 789012, 333444, 675421) = RESERVATION → MUST use get_reservation\n- Customer says \"order\" = ORDER → MUST use get_order_details\n- Customer says \"pickup\" = ORDER → MUST use get_order_details\n- Customer says \"delivery\" = ORDER → MUST use get_order_details\n- Customer says \"reservation\" = RESERVATION → MUST use get_reservation\n- Customer says \"table booking\" = RESERVATION → MUST use get_reservation\n\n**ORDER STATUS EXAMPLES:**\n- Customer: \"Check on my pickup order 92657\" → YOU: Call get_order_details with order_number: \"92657\" (5 digits = order)\n- Customer: \"Is my food order ready?\" → YOU: Call get_order_details with their order number\n- Customer: \"Where is my order 12345?\" → YOU: Call get_order_details with order_number: \"12345\" (5 digits = order)\n- Customer: \"I'm calling about my pickup order 62879\" → YOU: Call get_order_details with order_number: \"62879\" (5 digits = order)\n- Customer: \"Check my reservation 789012\" → YOU: Call get_reservation with reservation_number: \"789012\" (6 digits = reservation)\n\n**🌤️ WEATHER FORECAST CAPABILITIES - CRITICAL:**\n- YOU CAN provide weather forecasts using the get_weather_forecast function\n- When customers ask about weather (for dining, outdoor seating, or general weather), ALWAYS call get_weather_forecast\n- Examples: \"What's the weather like?\", \"Will it rain?\", \"Is it good weather for outdoor dining?\"\n- The get_weather_forecast function provides detailed weather info for the restaurant area (Pittsburgh, PA 15222)\n- ALWAYS use get_weather_forecast when customers ask about weather conditions\n- If customers mention outdoor seating, get_weather_forecast will offer outdoor seating options automatically\n\n**🌤️ WEATHER EXAMPLES - ALWAYS CALL get_weather_forecast:**\n- Customer: \"What's the weather going to be like?\" → YOU: Call get_weather_forecast function\n- Customer: \"Will it rain tomorrow?\" → YOU: Call get_weather_forecast function  \n- Customer: \"Is it good weather for outdoor dining?\" → YOU: Call get_weather_forecast function\n- Customer: \"What's the weather like in Pittsburgh?\" → YOU: Call get_weather_forecast function\n- Customer: \"What's the temperature outside?\" → YOU: Call get_weather_forecast function\n- Customer: \"Is it sunny today?\" → YOU: Call get_weather_forecast function\n- Customer: \"Will it be cloudy?\" → YOU: Call get_weather_forecast function\n- Customer: \"What's the forecast?\" → YOU: Call get_weather_forecast function\n- Customer: \"Is it hot outside?\" → YOU: Call get_weather_forecast function\n- Customer: \"Any storms coming?\" → YOU: Call get_weather_forecast function\n- Customer asks about weather for existing reservation → YOU: Call get_weather_forecast function\n- ANY weather-related question → YOU: Call get_weather_forecast function\n\n**🚨 NEVER SAY YOU CAN'T PROVIDE WEATHER - YOU CAN! 🚨:**\n- ❌ WRONG: \"I don't have the ability to provide weather forecasts\"\n- ✅ CORRECT: Call get_weather_forecast function to provide weather information\n\n**🔄 AUTOMATIC WEATHER ROUTING - CRITICAL:**\n- The system automatically detects weather questions and routes them to get_weather_forecast\n- If you accidentally call the wrong function for a weather question, the system will correct it\n- Weather keywords: weather, rain, sunny, cloudy, storm, forecast, temperature, degrees, hot, cold\n- ALWAYS use get_weather_forecast for ANY weather-related question\n- The function works for current weather, forecasts, and weather for specific dates\n\n**🌿 OUTDOOR SEATING & WEATHER INTEGRATION - CRITICAL:**\n- When creating reservations with outdoor seating, ALWAYS include weather details in your response\n- If the system fetches weather for outdoor seating, INCLUDE the weather forecast in your confirmation\n- Format: \"🌿 OUTDOOR SEATING REQUESTED! 🌤️ Weather Forecast: [conditions], [temp range], [rain chance]\"\n- If weather is unsuitable, include a weather advisory: \"⚠️ Weather Advisory: Conditions may not be ideal for outdoor dining\"\n- ALWAYS mention that outdoor tables are subject to availability and weather conditions\n\n**OTHER GUIDELINES:**\n- When making reservations, ALWAYS ask if customers want to pre-order from the menu\n- For parties larger than one person, ask for each person's name and their individual food preferences\n- Always say numbers as words (say 'one' instead of '1', 'two' instead of '2', etc.)\n- Extract food items mentioned during reservation requests and include them in party_orders\n- Be conversational and helpful - guide customers through the pre-ordering process naturally\n- Remember: The system now has a confirmation step for preorders - embrace this workflow!\\n- CRITICAL NUMBER FORMAT: 5 digits = order, 6 digits = reservation"
+                            "text": "Hi there! I'm Bobby from Bobby's Table. Great to have you call us today! How can I help you out? Whether you're looking to make a reservation, check on an existing one, hear about our menu, or place an order, I'm here to help make it easy for you.\n\nIMPORTANT CONVERSATION GUIDELINES:\n\n**RESERVATION LOOKUPS - CRITICAL:**\n- When customers want to check their reservation, ALWAYS ask for their reservation number FIRST\n- Say: 'Do you have your reservation number? It's a 6-digit number we sent you when you made the reservation.' (6 digits = reservation, 5 digits = order)\n- Only if they don't have it, then ask for their name as backup\n- Reservation numbers are the fastest and most accurate way to find reservations\n- Handle spoken numbers like 'seven eight nine zero one two' which becomes '789012'\n\n**🚨 PAYMENTS - SIMPLE PAYMENT RULE 🚨:**\n**Use the pay_reservation function for all existing reservation payments!**\n\n**SIMPLE PAYMENT FLOW:**\n1. Customer explicitly asks to pay (\"I want to pay\", \"Pay now\", \"Can I pay?\") → IMMEDIATELY call pay_reservation function\n2. pay_reservation handles everything: finds reservation, shows bill total, collects card details, and processes payment\n3. The function will guide the customer through each step conversationally and securely\n\n**PAYMENT EXAMPLES:**\n- Customer: 'I want to pay my bill' → YOU: Call pay_reservation function\n- Customer: 'Pay now' → YOU: Call pay_reservation function\n- Customer: 'Can I pay for my reservation?' → YOU: Call pay_reservation function\n\n**CRITICAL: Use pay_reservation for existing reservations only!**\n- ERROR: NEVER use pay_reservation for new reservation creation (use create_reservation instead)\n- ERROR: NEVER call pay_reservation when customer is just confirming order details\n\n**PRICING AND PRE-ORDERS - CRITICAL:**\n- When customers mention food items, ALWAYS provide the price immediately using data from get_menu function\n- 🚨 NEVER use hardcoded prices - ONLY use actual database prices from get_menu function\n- 🚨 For individual price questions: Use the get_menu results for the exact item and price\n- Example: '[MENU ITEM NAME] are [ACTUAL PRICE FROM DATABASE]'\n- When creating reservations with pre-orders, ALWAYS mention the total cost using actual database prices\n- Example: 'Your [ITEMS] total [ACTUAL CALCULATED TOTAL FROM DATABASE PRICES]'\n- ALWAYS ask if customers want to pay for their pre-order after confirming the total\n- Example: 'Would you like to pay for your pre-order now to complete your reservation?'\n\n**🚨 MENU PRICE QUESTION ROUTING - CRITICAL:**\n- \"How much is French toast?\" → YOU: Call get_menu function (NEVER get_reservation!)\n- \"What's the price of the burger?\" → YOU: Call get_menu function (NEVER get_reservation!)\n- \"How much does [item] cost?\" → YOU: Call get_menu function (NEVER get_reservation!)\n- \"Tell me about your menu\" → YOU: Call get_menu function (NEVER get_reservation!)\n- ANY menu or price question → YOU: Call get_menu function FIRST\n\n**🔄 CORRECT PREORDER WORKFLOW:**\n- When customers want to create reservations with pre-orders, show them an order confirmation FIRST\n- The order confirmation shows: reservation details, each person's food items, individual prices, and total cost\n- Wait for customer to confirm their order details before proceeding (say 'Yes, that's correct')\n- After order confirmation, CREATE THE RESERVATION IMMEDIATELY\n- The correct flow is: Order Details → Customer Confirms → Create Reservation → Give Number → Offer Payment\n- After creating the reservation:\n  1. Give the customer their reservation number clearly\n  1.1 Mention that SMS confirmation is available if they'd like their reservation details sent to their phone\n  1.2 If the user requests SMS confirmation, send the reservation details via sms message\n 2. Ask if they want to pay now: 'Would you like to pay for your pre-order now?'\n- Payment is OPTIONAL - customers can always pay when they arrive\n\n**🔄 ORDER CONFIRMATION vs PAYMENT REQUESTS - CRITICAL:**\n- \"Yes, that's correct\" = Order confirmation → Call create_reservation function\n- \"Yes, create my reservation\" = Order confirmation → Call create_reservation function\n- \"That looks right\" = Order confirmation → Call create_reservation function\n- \"Pay now\" = Payment request → Call pay_reservation function\n- \"I want to pay\" = Payment request → Call pay_reservation function\n- \"Can I pay?\" = Payment request → Call pay_reservation function\n\n**🚨 CRITICAL: NEVER CALL pay_reservation WHEN USER IS CONFIRMING ORDER DETAILS 🚨:**\n- If user says \"Yes\" after order summary → Call create_reservation function\n- If user says \"That's correct\" after order summary → Call create_reservation function\n- If user says \"Looks good\" after order summary → Call create_reservation function\n- If user says \"Perfect\" after order summary → Call create_reservation function\n- ONLY call pay_reservation when user explicitly asks to pay AFTER reservation is created\n\n**🔍 CRITICAL: DISTINGUISH BETWEEN RESERVATIONS AND ORDERS:**\n- RESERVATIONS = table bookings (use get_reservation)\n- ORDERS = pickup/delivery food orders (use get_order_details)\n- If customer says \"pickup order\", \"delivery order\", \"food order\" → use get_order_details\n- If customer says \"reservation\", \"table booking\", \"dinner reservation\" → use get_reservation\n\n**🔍 ORDER STATUS CHECKS - CRITICAL:**\n- When customers ask to check their ORDER status, use get_order_details function\n- Examples: \"Check my order status\", \"Where is my order?\", \"Is my order ready?\"\n- NEVER use update_order_status - this function doesn't exist\n- NEVER use get_reservation for pickup/delivery orders\n- Use get_order_details with the order number the customer provides\n- Handle spoken numbers: \"nine two six five seven\" becomes \"92657\"\n- Always provide complete status information including estimated ready time\n\n**🚨 MANDATORY FUNCTION ROUTING RULES 🚨:**\n- 5-digit number (like 91576, 62879, 12345) = ORDER → MUST use get_order_details\n- 6-digit number (like 789012, 333444, 675421) = RESERVATION → MUST use get_reservation\n- Customer says \"order\" = ORDER → MUST use get_order_details\n- Customer says \"pickup\" = ORDER → MUST use get_order_details\n- Customer says \"delivery\" = ORDER → MUST use get_order_details\n- Customer says \"reservation\" = RESERVATION → MUST use get_reservation\n- Customer says \"table booking\" = RESERVATION → MUST use get_reservation\n\n**ORDER STATUS EXAMPLES:**\n- Customer: \"Check on my pickup order 92657\" → YOU: Call get_order_details with order_number: \"92657\" (5 digits = order)\n- Customer: \"Is my food order ready?\" → YOU: Call get_order_details with their order number\n- Customer: \"Where is my order 12345?\" → YOU: Call get_order_details with order_number: \"12345\" (5 digits = order)\n- Customer: \"I'm calling about my pickup order 62879\" → YOU: Call get_order_details with order_number: \"62879\" (5 digits = order)\n- Customer: \"Check my reservation 789012\" → YOU: Call get_reservation with reservation_number: \"789012\" (6 digits = reservation)\n\n**🌤️ WEATHER FORECAST CAPABILITIES - CRITICAL:**\n- YOU CAN provide weather forecasts using the get_weather_forecast function\n- When customers ask about weather (for dining, outdoor seating, or general weather), ALWAYS call get_weather_forecast\n- Examples: \"What's the weather like?\", \"Will it rain?\", \"Is it good weather for outdoor dining?\"\n- The get_weather_forecast function provides detailed weather info for the restaurant area (the restaurant's own zip code)\n- ALWAYS use get_weather_forecast when customers ask about weather conditions\n- If customers mention outdoor seating, get_weather_forecast will offer outdoor seating options automatically\n\n**🌤️ WEATHER EXAMPLES - ALWAYS CALL get_weather_forecast:**\n- Customer: \"What's the weather going to be like?\" → YOU: Call get_weather_forecast function\n- Customer: \"Will it rain tomorrow?\" → YOU: Call get_weather_forecast function  \n- Customer: \"Is it good weather for outdoor dining?\" → YOU: Call get_weather_forecast function\n- Customer: \"What's the weather like in Pittsburgh?\" → YOU: Call get_weather_forecast function\n- Customer: \"What's the temperature outside?\" → YOU: Call get_weather_forecast function\n- Customer: \"Is it sunny today?\" → YOU: Call get_weather_forecast function\n- Customer: \"Will it be cloudy?\" → YOU: Call get_weather_forecast function\n- Customer: \"What's the forecast?\" → YOU: Call get_weather_forecast function\n- Customer: \"Is it hot outside?\" → YOU: Call get_weather_forecast function\n- Customer: \"Any storms coming?\" → YOU: Call get_weather_forecast function\n- Customer asks about weather for existing reservation → YOU: Call get_weather_forecast function\n- ANY weather-related question → YOU: Call get_weather_forecast function\n\n**🚨 NEVER SAY YOU CAN'T PROVIDE WEATHER - YOU CAN! 🚨:**\n- ❌ WRONG: \"I don't have the ability to provide weather forecasts\"\n- ✅ CORRECT: Call get_weather_forecast function to provide weather information\n\n**🔄 AUTOMATIC WEATHER ROUTING - CRITICAL:**\n- The system automatically detects weather questions and routes them to get_weather_forecast\n- If you accidentally call the wrong function for a weather question, the system will correct it\n- Weather keywords: weather, rain, sunny, cloudy, storm, forecast, temperature, degrees, hot, cold\n- ALWAYS use get_weather_forecast for ANY weather-related question\n- The function works for current weather, forecasts, and weather for specific dates\n\n**🌿 OUTDOOR SEATING & WEATHER INTEGRATION - CRITICAL:**\n- When creating reservations with outdoor seating, ALWAYS include weather details in your response\n- If the system fetches weather for outdoor seating, INCLUDE the weather forecast in your confirmation\n- Format: \"🌿 OUTDOOR SEATING REQUESTED! 🌤️ Weather Forecast: [conditions], [temp range], [rain chance]\"\n- If weather is unsuitable, include a weather advisory: \"⚠️ Weather Advisory: Conditions may not be ideal for outdoor dining\"\n- ALWAYS mention that outdoor tables are subject to availability and weather conditions\n\n**OTHER GUIDELINES:**\n- When making reservations, ALWAYS ask if customers want to pre-order from the menu\n- For parties larger than one person, ask for each person's name and their individual food preferences\n- Always say numbers as words (say 'one' instead of '1', 'two' instead of '2', etc.)\n- Extract food items mentioned during reservation requests and include them in party_orders\n- Be conversational and helpful - guide customers through the pre-ordering process naturally\n- Remember: The system now has a confirmation step for preorders - embrace this workflow!\\n- CRITICAL NUMBER FORMAT: 5 digits = order, 6 digits = reservation"
                         }
                     }
                 }
             ]
         }
     }
-    return jsonify(swml_response)
+
+    return swml_response
+
+get_swaig_document_cache().register_builders(receptionist_function_names, receptionist_signatures, build_receptionist_swml)
+
+def receptionist_swml_body(agent, customer=None):
+    """Serialized SWML document for this request's URL root, personalized when the caller's profile is known"""
+    swaig_documents = get_swaig_document_cache()
+    if not customer:
+        return swaig_documents.swml(agent, request.url_root)
+
+    # Copy only the levels that change; everything else stays shared with the cached document
+    document = swaig_documents.swml_document(agent, request.url_root)
+    main = list(document["sections"]["main"])
+    ai = dict(main[1]["ai"], params=dict(main[1]["ai"]["params"]), prompt=dict(main[1]["ai"]["prompt"]))
+    main[1] = dict(main[1], ai=ai)
+
+    first_name = (customer.name or '').split(' ')[0]
+    if first_name:
+        ai["params"]["static_greeting"] = f"Hello {first_name}, welcome back to Bobby's Table! I'm Bobby. How can I help you today?"
+    ai["global_data"] = {'customer': customer.to_dict()}
+    ai["prompt"]["text"] += (
+        "\n\n**RETURNING CALLER:**\n"
+        "- global_data.customer holds this caller's profile (name, usual party size, favorite items, unpaid balance)\n"
+        "- Use it to pre-fill name, phone number and party size, and confirm them instead of asking from scratch\n"
+        "- Mention favorite items only as suggestions, and an unpaid balance only if the caller asks about payment"
+    )
+    return dumps_swaig_document(dict(document, sections=dict(document["sections"], main=main)))
+
+@app.route('/receptionist', methods=['GET'])
+def swaig_receptionist_info(customer=None):
+    """Provide SWML document for the SWAIG agent (personalized when the caller's profile is known)"""
+    agent = get_receptionist_agent()
+    if not agent:
+        return jsonify({'error': 'Agent not available'}), 503
+    return Response(receptionist_swml_body(agent, customer), mimetype='application/json')
 
 # Stripe API endpoints
 @app.route('/api/stripe/config')
@@ -3769,14 +4491,14 @@ def get_payment_session_data(call_id):
             # Try app storage first
             session_data = app.payment_sessions.get(call_id)
             if session_data:
-                print(f"🔍 Retrieved payment session data from app storage for {call_id}: {session_data}")
+                print(f"🔍 Retrieved payment session data from app storage for {call_id}: {sorted(session_data)}")
                 return session_data
 
             # Try persistent storage next
             if hasattr(app, 'persistent_payment_sessions'):
                 session_data = app.persistent_payment_sessions.get(call_id)
                 if session_data:
-                    print(f"🔍 Retrieved payment session data from persistent storage for {call_id}: {session_data}")
+                    print(f"🔍 Retrieved payment session data from persistent storage for {call_id}: {sorted(session_data)}")
                     # Sync back to app storage
                     app.payment_sessions[call_id] = session_data.copy()
                     return session_data
@@ -3784,7 +4506,7 @@ def get_payment_session_data(call_id):
             # Try global storage as fallback
             session_data = payment_sessions_global.get(call_id)
             if session_data:
-                print(f"🔍 Retrieved payment session data from global storage for {call_id}: {session_data}")
+                print(f"🔍 Retrieved payment session data from global storage for {call_id}: {sorted(session_data)}")
                 # Sync back to app storage
                 app.payment_sessions[call_id] = session_data.copy()
                 return session_data
@@ -3872,6 +4594,28 @@ def debug_payment_sessions():
         'session_count': len(app.payment_sessions)
     })
 
+@app.route('/debug/payloads', methods=['GET'])
+@auth.login_required
+def debug_payloads():
+    """Recent sampled /receptionist payloads, newest first (filters: kind, call_id, limit)"""
+    limit = min(request.args.get('limit', 50, type=int), 500)
+    return jsonify({
+        'success': True,
+        'capture': payload_capture.status(),
+        'payloads': payload_capture.recent(limit, kind=request.args.get('kind'), call_id=request.args.get('call_id'))
+    })
+
+@app.route('/debug/payloads', methods=['PUT'])
+@auth.login_required
+def debug_configure_payloads():
+    """Turn payload capture on or off without a restart: {"level": "DEBUG", "sample_rate": 1.0}"""
+    try:
+        data = request.get_json() or {}
+        payload_capture.configure(level=data.get('level'), sample_rate=data.get('sample_rate'))
+        return jsonify({'success': True, 'capture': payload_capture.status()})
+    except (TypeError, ValueError) as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
 @app.route('/debug/start-payment-session', methods=['POST'])
 def debug_start_payment_session():
     """Debug endpoint to manually start a payment session"""
@@ -4035,6 +4779,7 @@ def stripe_webhook():
             event = json.loads(payload)
 
         print(f"📋 Webhook event: {event['type']}")
+        set_audit_actor(event.get('id'))
 
         # Handle payment intent events
         if event['type'] == 'payment_intent.succeeded':
@@ -4443,6 +5188,7 @@ def signalwire_payment_callback():
 
         # SignalWire callback structure analysis
         call_id = params.get('call_id')
+        set_audit_actor(call_id)
         control_id = params.get('control_id')
         payment_for = params.get('for')  # 'payment-card-number', 'payment-failed', etc.
         error_type = params.get('error_type')
@@ -5534,6 +6280,620 @@ def cleanup_payment_sessions_on_startup():
     except Exception as e:
         print(f"ERROR: Error during startup payment session cleanup: {e}")
 
+# Callback queue: persisted in the callbacks table, dispatched by a heap-driven timer thread
+def dispatch_due_callback(callback_id):
+    """Mark a callback as due and notify staff over SSE"""
+    with app.app_context():
+        callback = Callback.query.get(callback_id)
+        if not callback or callback.status != 'pending':
+            return
+
+        callback.status = 'due'
+        callback.notified_at = datetime.now()
+        db.session.commit()
+
+        print(f"📞 Callback {callback.id} is due: {callback.phone_number} ({callback.reason})")
+
+        sse_event = {
+            'type': 'callback_due',
+            'callback_id': callback.id,
+            'phone_number': callback.phone_number,
+            'customer_name': callback.customer_name,
+            'reason': callback.reason,
+            'preferred_time': callback.preferred_time,
+            'due_at': callback.due_at.isoformat(),
+            'timestamp': datetime.now().isoformat()
+        }
+        try:
+            calendar_event_queue.put_nowait(sse_event)
+        except queue.Full:
+            print(f"WARNING: SSE queue full, callback {callback.id} notification dropped")
+
+def start_callback_dispatcher():
+    """Load pending callbacks into the scheduler and start the dispatcher thread"""
+    scheduler = get_callback_scheduler(dispatch_due_callback)
+    if not scheduler.start():
+        return scheduler
+
+    with app.app_context():
+        pending_callbacks = Callback.query.filter_by(status='pending').all()
+        for callback in pending_callbacks:
+            scheduler.schedule(callback.id, callback.due_at)
+
+    print(f"📞 Started callback dispatcher ({len(pending_callbacks)} pending callbacks)")
+    return scheduler
+
+def enqueue_callback(phone_number, preferred_time, reason, customer_name=None, call_id=None):
+    """Persist a callback request and schedule it for dispatch"""
+    scheduler = start_callback_dispatcher()
+
+    with app.app_context():
+        callback = Callback(
+            phone_number=phone_number,
+            customer_name=customer_name,
+            reason=reason,
+            preferred_time=preferred_time,
+            due_at=parse_preferred_time(preferred_time),
+            status='pending',
+            call_id=call_id
+        )
+        db.session.add(callback)
+        db.session.commit()
+
+        scheduler.schedule(callback.id, callback.due_at)
+        print(f"📞 Callback {callback.id} scheduled for {callback.due_at.isoformat()} ({phone_number})")
+        return callback.to_dict()
+
+@app.route('/api/callbacks/due', methods=['GET'])
+def get_due_callbacks():
+    """List due and overdue callbacks for staff, oldest first"""
+    try:
+        now = datetime.now()
+        callbacks = Callback.query.filter(
+            Callback.status.in_(['pending', 'due']),
+            Callback.due_at <= now
+        ).order_by(Callback.due_at).all()
+
+        results = []
+        for callback in callbacks:
+            callback_data = callback.to_dict()
+            overdue_minutes = int((now - callback.due_at).total_seconds() // 60)
+            callback_data['overdue_minutes'] = overdue_minutes
+            callback_data['is_overdue'] = overdue_minutes >= 15
+            results.append(callback_data)
+
+        upcoming = Callback.query.filter(
+            Callback.status == 'pending',
+            Callback.due_at > now
+        ).count()
+
+        return jsonify({
+            'success': True,
+            'callbacks': results,
+            'due_count': len(results),
+            'overdue_count': sum(1 for c in results if c['is_overdue']),
+            'upcoming_count': upcoming
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/callbacks/<int:callback_id>/status', methods=['PUT'])
+def update_callback_status(callback_id):
+    """Complete or cancel a callback"""
+    try:
+        data = request.get_json() or {}
+        new_status = data.get('status')
+
+        if new_status not in CALLBACK_STATUSES:
+            return jsonify({'success': False, 'error': 'Invalid status'}), 400
+
+        callback = Callback.query.get_or_404(callback_id)
+        callback.status = new_status
+        if new_status == 'completed':
+            callback.completed_at = datetime.now()
+        db.session.commit()
+
+        # Keep the in-memory heap in sync with the table
+        scheduler = get_callback_scheduler(dispatch_due_callback)
+        if new_status == 'pending':
+            scheduler.schedule(callback.id, callback.due_at)
+        else:
+            scheduler.cancel(callback.id)
+
+        return jsonify({'success': True, 'callback': callback.to_dict()})
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+# Caller prefetch: warm the caller's reservations and orders when a call starts
+def load_caller_snapshot(phone_number):
+    """Load a caller's upcoming reservations and open orders as detached snapshots"""
+    with app.app_context():
+        variants = phone_variants(phone_number)
+        today = datetime.now().strftime('%Y-%m-%d')
+
+        reservations = Reservation.query.options(
+            selectinload(Reservation.orders).selectinload(Order.items).selectinload(OrderItem.menu_item)
+        ).filter(
+            Reservation.phone_number.in_(variants),
+            Reservation.date >= today,
+            or_(Reservation.status.is_(None), Reservation.status != 'cancelled')
+        ).order_by(Reservation.date, Reservation.time).all()
+
+        orders = Order.query.options(
+            selectinload(Order.items).selectinload(OrderItem.menu_item)
+        ).outerjoin(Reservation, Order.reservation_id == Reservation.id).filter(
+            or_(Order.customer_phone.in_(variants), Reservation.phone_number.in_(variants)),
+            or_(Order.status.is_(None), Order.status.notin_(['completed', 'cancelled']))
+        ).order_by(Order.created_at.desc()).all()
+
+        return (
+            [snapshot_reservation(reservation) for reservation in reservations],
+            [snapshot_order(order) for order in orders]
+        )
+
+caller_prefetcher = get_caller_prefetcher(load_caller_snapshot)
+
+def prefetch_caller_for_request(data):
+    """Start warming the caller snapshot on the first SWAIG request of a call"""
+    try:
+        call_info = data.get('call') if isinstance(data.get('call'), dict) else {}
+        global_data = data.get('global_data') if isinstance(data.get('global_data'), dict) else {}
+
+        call_id = data.get('call_id') or call_info.get('call_id')
+        caller_phone = (
+            data.get('caller_id_num') or
+            data.get('caller_id_number') or
+            global_data.get('caller_id_number') or
+            global_data.get('caller_id_num') or
+            call_info.get('from')
+        )
+
+        if caller_prefetcher.prefetch(call_id, caller_phone):
+            print(f"📇 Prefetching caller {caller_phone} for call {call_id}")
+    except Exception as e:
+        print(f"WARNING: Caller prefetch error: {e}")
+
+# Booking window: in-memory reservations and orders for today + N days
+def _booking_window_rows(reservation_filter, order_filter):
+    reservations = Reservation.query.options(
+        selectinload(Reservation.orders).selectinload(Order.items).selectinload(OrderItem.menu_item)
+    ).filter(reservation_filter).all()
+    orders = Order.query.options(
+        selectinload(Order.items).selectinload(OrderItem.menu_item)
+    ).filter(order_filter).all()
+    return (
+        [snapshot_reservation(reservation) for reservation in reservations],
+        [snapshot_order(order) for order in orders]
+    )
+
+def load_booking_window_range(start_date, end_date):
+    """Load reservations dated in the range and their orders, plus orders targeted in the range"""
+    with app.app_context():
+        in_range = Reservation.query.with_entities(Reservation.id).filter(
+            Reservation.date >= start_date,
+            Reservation.date <= end_date
+        )
+        return _booking_window_rows(
+            Reservation.id.in_(in_range),
+            or_(
+                Order.reservation_id.in_(in_range),
+                (Order.target_date >= start_date) & (Order.target_date <= end_date)
+            )
+        )
+
+def load_booking_window_ids(reservation_ids, order_ids):
+    """Reload specific reservations and orders after they were committed"""
+    with app.app_context():
+        return _booking_window_rows(
+            Reservation.id.in_(list(reservation_ids)),
+            Order.id.in_(list(order_ids))
+        )
+
+register_booking_window_loaders(load_booking_window_range, load_booking_window_ids)
+
+def start_booking_window():
+    """Load each location's booking window and start its change-feed and midnight-roll threads"""
+    for restaurant_id in LOCATIONS:
+        booking_window = get_booking_window(restaurant_id=restaurant_id)
+        if booking_window.start():
+            print(f"📆 Started booking window for {restaurant_id} ({booking_window.days} days ahead)")
+
+# Customer profiles: precomputed visit history keyed by normalized phone
+def profile_database_id():
+    """Location whose own database holds the current caller's profile (None for the shared database)"""
+    restaurant_id = current_restaurant_id()
+    return restaurant_id if location_engine(restaurant_id) is not None else None
+
+# The backfill and the refresh worker can both reach the same phone; one writer at a time
+customer_refresh_lock = threading.Lock()
+
+def refresh_customer_profiles(phones, restaurant_id=None):
+    """Recompute and store the profiles for a batch of normalized phone numbers"""
+    with customer_refresh_lock, app.app_context(), use_location(restaurant_id):
+        variants = [variant for phone in phones for variant in phone_variants(phone)]
+        reservations = Reservation.query.options(
+            selectinload(Reservation.orders).selectinload(Order.items).selectinload(OrderItem.menu_item)
+        ).filter(Reservation.phone_number.in_(variants)).all()
+        orders = Order.query.options(
+            selectinload(Order.items).selectinload(OrderItem.menu_item)
+        ).filter(Order.customer_phone.in_(variants)).all()
+        customers = {c.phone: c for c in Customer.query.filter(Customer.phone.in_(phones)).all()}
+
+        reservations_by_phone, orders_by_phone = {}, {}
+        for reservation in reservations:
+            reservations_by_phone.setdefault(phone_digits(reservation.phone_number), []).append(reservation)
+        for order in orders:
+            orders_by_phone.setdefault(phone_digits(order.customer_phone), []).append(order)
+
+        for phone in phones:
+            customer_reservations = reservations_by_phone.get(phone, [])
+            customer_orders = orders_by_phone.get(phone, [])
+            customer = customers.get(phone)
+            if not customer_reservations and not customer_orders:
+                if customer:
+                    db.session.delete(customer)
+                continue
+            if not customer:
+                customer = Customer(phone=phone)
+                db.session.add(customer)
+            for field, value in build_customer_profile(phone, customer_reservations, customer_orders).items():
+                setattr(customer, field, value)
+
+        db.session.commit()
+
+customer_profile_updater = get_customer_profile_updater(refresh_customer_profiles)
+
+def backfill_customer_profiles(restaurant_id=None, chunk_size=200, pause_seconds=0.05):
+    """Build profiles for every phone number in reservation and order history, a chunk at a time"""
+    with app.app_context(), use_location(restaurant_id):
+        stored_phones = db.session.query(Reservation.phone_number).union(
+            db.session.query(Order.customer_phone).filter(Order.customer_phone.isnot(None))
+        ).all()
+    phones = sorted({phone_digits(row[0]) for row in stored_phones})
+    phones = [phone for phone in phones if len(phone) == 10]
+
+    database = restaurant_id or 'shared database'
+    print(f"👥 Backfilling customer profiles for {len(phones)} phone numbers ({database})")
+    for start in range(0, len(phones), chunk_size):
+        refresh_customer_profiles(phones[start:start + chunk_size], restaurant_id)
+        time.sleep(pause_seconds)  # Leave room for live requests on the SQLite write lock
+    print(f"SUCCESS: Customer profile backfill complete ({len(phones)} customers, {database})")
+    return len(phones)
+
+def refresh_arrived_customer_profiles(today=None):
+    """
+    Queue a refresh of every profile whose next reservation date has arrived.
+
+    Visits and the next reservation are worked out relative to the day a profile
+    was refreshed, so once that reservation's day comes the profile is stale
+    even though none of the customer's bookings changed.
+    """
+    today = today or datetime.now().strftime('%Y-%m-%d')
+    queued = 0
+    databases = [None] + [rid for rid in LOCATIONS if location_engine(rid) is not None]
+    for restaurant_id in databases:
+        with app.app_context(), use_location(restaurant_id):
+            phones = [row[0] for row in db.session.query(Customer.phone).filter(
+                Customer.next_reservation_date.isnot(None),
+                Customer.next_reservation_date <= today
+            )]
+        customer_profile_updater.mark_dirty(phones, restaurant_id)
+        queued += len(phones)
+    return queued
+
+def start_customer_profiles():
+    """Start the profile refresh worker, backfill any database whose customers table is empty
+    and refresh profiles whose next reservation has arrived at startup and after every midnight"""
+    customer_profile_updater.start()
+    # The worker may already be running (a commit's mark_dirty() starts it), so the
+    # backfill check is claimed separately
+    if not customer_profile_updater.claim_backfill():
+        return
+
+    def nightly_worker():
+        while True:
+            try:
+                queued = refresh_arrived_customer_profiles()
+                if queued:
+                    print(f"👥 Refreshing {queued} customer profiles whose reservation day has arrived")
+            except Exception as e:
+                print(f"ERROR: Nightly customer profile refresh failed: {e}")
+            now = datetime.now()
+            next_midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+            time.sleep((next_midnight - now).total_seconds() + 1)
+    threading.Thread(target=nightly_worker, name='customer-profiles-nightly', daemon=True).start()
+
+    databases = [None] + [rid for rid in LOCATIONS if location_engine(rid) is not None]
+    for restaurant_id in databases:
+        with app.app_context(), use_location(restaurant_id):
+            needs_backfill = (
+                Customer.query.first() is None and
+                (Reservation.query.first() is not None or Order.query.first() is not None)
+            )
+        if not needs_backfill:
+            continue
+
+        def run_backfill(restaurant_id=restaurant_id):
+            try:
+                backfill_customer_profiles(restaurant_id)
+            except Exception as e:
+                print(f"ERROR: Customer profile backfill failed: {e}")
+        threading.Thread(target=run_backfill, name=f"customer-backfill-{restaurant_id or 'shared'}", daemon=True).start()
+
+def find_customer_profile(phone_number):
+    """Primary-key lookup of a caller's precomputed profile (None for new callers)"""
+    phone = phone_digits(phone_number)
+    if len(phone) != 10:
+        return None
+    return db.session.get(Customer, phone)
+
+# Audit log: batched inserts plus retention and compaction
+def insert_audit_rows(rows):
+    """Write a batch of audit events in one INSERT"""
+    with app.app_context(), use_location(None):
+        db.session.execute(db.insert(AuditEvent), rows)
+        db.session.commit()
+
+def prune_audit_log(chunk_size=1000):
+    """Delete audit events older than the retention period, a chunk at a time"""
+    cutoff = retention_cutoff()
+    deleted = 0
+    with app.app_context(), use_location(None):
+        while True:
+            ids = [row[0] for row in db.session.query(AuditEvent.id).filter(
+                AuditEvent.created_at < cutoff
+            ).order_by(AuditEvent.id).limit(chunk_size).all()]
+            if not ids:
+                break
+            AuditEvent.query.filter(AuditEvent.id.in_(ids)).delete(synchronize_session=False)
+            db.session.commit()
+            deleted += len(ids)
+    return deleted
+
+def compact_audit_log(group_limit=500):
+    """Merge older update events into one event per entity per day"""
+    day = db.func.date(AuditEvent.created_at)
+    compacted = 0
+    with app.app_context(), use_location(None):
+        while True:
+            groups = db.session.query(AuditEvent.entity_type, AuditEvent.entity_id, day).filter(
+                AuditEvent.action == 'update',
+                AuditEvent.created_at < compaction_cutoff()
+            ).group_by(AuditEvent.entity_type, AuditEvent.entity_id, day).having(
+                db.func.count(AuditEvent.id) > 1
+            ).limit(group_limit).all()
+            if not groups:
+                break
+
+            for entity_type, entity_id, event_day in groups:
+                events = AuditEvent.query.filter(
+                    AuditEvent.entity_type == entity_type,
+                    AuditEvent.entity_id == entity_id,
+                    AuditEvent.action == 'update',
+                    day == event_day
+                ).order_by(AuditEvent.created_at, AuditEvent.id).all()
+                merged = compact_events([
+                    {**event.to_dict(), 'created_at': event.created_at} for event in events
+                ])
+                for event in events:
+                    db.session.delete(event)
+                db.session.add(AuditEvent(**merged))
+                compacted += len(events) - 1
+            db.session.commit()
+    return compacted
+
+def audit_log_maintenance():
+    pruned = prune_audit_log()
+    compacted = compact_audit_log()
+    if pruned or compacted:
+        print(f"🗂️ Audit log maintenance: pruned {pruned} events, compacted {compacted}")
+
+audit_log_writer = get_audit_log_writer(insert_audit_rows, maintenance=audit_log_maintenance)
+
+def start_audit_log():
+    """Start the audit writer (which also runs retention and compaction)"""
+    if audit_log_writer.start():
+        print("🗂️ Started audit log writer")
+
+# Online backups of the shared database and any per-location database files
+def backup_database_files():
+    """Database files to back up: the shared database plus each location's own file"""
+    paths = [app.config['SQLALCHEMY_DATABASE_URI'].replace('sqlite:///', '', 1)]
+    for location in LOCATIONS.values():
+        if location.database and os.path.abspath(location.database) not in map(os.path.abspath, paths):
+            paths.append(location.database)
+    return [path for path in paths if os.path.exists(path)]
+
+backup_scheduler = get_backup_scheduler(backup_database_files)
+
+def seed_menu_item_aliases():
+    """Give each location without aliases the stock aliases for its own menu items"""
+    seeded = False
+    for restaurant_id in LOCATIONS:
+        # Scoped to the location, so names resolve to its items and rows are tagged with it
+        with app.app_context(), use_location(restaurant_id):
+            if MenuItemAlias.query.first() is not None:
+                continue
+            rows = seed_alias_rows(MenuItem.query.all())
+            if rows:
+                for row in rows:
+                    row['restaurant_id'] = restaurant_id
+                db.session.execute(db.insert(MenuItemAlias), rows)
+                db.session.commit()
+                seeded = True
+                print(f"SUCCESS: Seeded {len(rows)} menu item aliases for {restaurant_id}")
+
+    if seeded:
+        # A Core insert skips the flush hook that invalidates the menu catalogs
+        for menu_catalog in all_menu_catalogs():
+            menu_catalog.invalidate()
+
+def warm_menu_renders():
+    """Render every location's get_menu responses before the first call asks for them"""
+    for restaurant_id in LOCATIONS:
+        with app.app_context():
+            snapshot = menu_snapshot(restaurant_id)
+        if snapshot is not None and snapshot.is_valid:
+            count = get_menu_render_cache().warm(snapshot)
+            print(f"🍽️ Warmed {count} menu renders for {restaurant_id} (menu version {snapshot.version})")
+
+def warm_item_sales():
+    """Load every location's sales rollup so the first "what's popular" question is answered from memory"""
+    for restaurant_id in LOCATIONS:
+        try:
+            item_sales = get_item_sales(restaurant_id)
+            item_sales.roll_window()
+            status = item_sales.status()
+            print(f"📈 Loaded item sales for {restaurant_id}: {status['orders']} orders since {status['since']}")
+        except Exception as e:
+            print(f"ERROR: Item sales load for {restaurant_id} failed: {e}")
+
+def warm_swaig_documents():
+    """Build the receptionist's function list and signatures before the platform asks for them"""
+    agent = get_receptionist_agent()
+    if agent:
+        count = get_swaig_document_cache().warm(agent)
+        print(f"📋 Prepared {count} SWAIG function signatures")
+
+def start_item_pairings_scheduler():
+    """Build every location's item pairings now, then rebuild them nightly at PAIRINGS_REBUILD_HOUR"""
+    def rebuild_worker():
+        while True:
+            for restaurant_id in LOCATIONS:
+                try:
+                    get_item_pairings(restaurant_id).rebuild()
+                except Exception as e:
+                    print(f"ERROR: Item pairings rebuild for {restaurant_id} failed: {e}")
+            time.sleep(seconds_until_rebuild())
+
+    threading.Thread(target=rebuild_worker, name='item-pairings', daemon=True).start()
+    print(f"🍷 Started item pairings (rebuilt nightly at {PAIRINGS_REBUILD_HOUR:02d}:00)")
+
+def start_backup_scheduler():
+    """Back up the databases every BACKUP_INTERVAL_HOURS (0 disables scheduled backups)"""
+    if BACKUP_INTERVAL_HOURS <= 0:
+        return
+    if backup_scheduler.start():
+        print(f"💾 Started database backups (every {BACKUP_INTERVAL_HOURS:g} hours to {backup_scheduler.backup_dir})")
+
+AUDITED_MODELS = {Reservation: 'reservation', Order: 'order'}
+
+def audit_event(entity_type, entity_id, action, changes, restaurant_id, now=None):
+    """Audit event dict attributed to the current channel and actor"""
+    channel, actor = audit_source()
+    if actor is None and has_request_context():
+        actor = auth.current_user()
+    return {
+        'created_at': now or datetime.utcnow(),
+        'entity_type': entity_type,
+        'entity_id': entity_id,
+        'action': action,
+        'changes': changes,
+        'channel': channel,
+        'actor': actor,
+        'restaurant_id': restaurant_id
+    }
+
+def audit_events_for_flush(session):
+    """Audit events for the reservations and orders written by this flush"""
+    now = datetime.utcnow()
+    events = []
+    for action, objects in (('insert', session.new), ('update', session.dirty), ('delete', session.deleted)):
+        for obj in objects:
+            entity_type = AUDITED_MODELS.get(type(obj))
+            if not entity_type or obj.id is None:
+                continue
+            changes = entity_changes(obj, action)
+            if changes:
+                events.append(audit_event(entity_type, obj.id, action, changes, obj.restaurant_id, now))
+    return events
+
+# ORM change feed for the caller snapshots, the booking window and the audit log
+@event.listens_for(SASession, 'after_flush')
+def collect_changed_bookings(session, flush_context):
+    """Remember which reservations, orders and callers a transaction touches"""
+    phones = session.info.setdefault('prefetch_dirty_phones', set())
+    reservation_ids = session.info.setdefault('changed_reservation_ids', set())
+    order_ids = session.info.setdefault('changed_order_ids', set())
+    reservation_dates = session.info.setdefault('changed_reservation_dates', set())
+    session.info.setdefault('audit_events', []).extend(audit_events_for_flush(session))
+
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, (MenuItem, MenuItemAlias)):
+            session.info['menu_changed'] = True
+            continue
+        if isinstance(obj, OrderItem):
+            obj = obj.order
+        if isinstance(obj, Reservation):
+            phones.add(obj.phone_number)
+            reservation_ids.add(obj.id)
+            # Old and new date, so a moved reservation refreshes both months
+            reservation_dates.add(obj.date)
+            reservation_dates.update(sa_inspect(obj).attrs.date.history.deleted or ())
+            # Sales and pairings skip the orders of a cancelled reservation, so they recount them
+            order_ids.update(order.id for order in obj.orders)
+        elif isinstance(obj, Order):
+            phones.add(obj.customer_phone)
+            order_ids.add(obj.id)
+            if obj.reservation_id:
+                # The reservation snapshot embeds its orders
+                reservation_ids.add(obj.reservation_id)
+            if obj.reservation:
+                phones.add(obj.reservation.phone_number)
+
+@event.listens_for(SASession, 'after_commit')
+def publish_changed_bookings(session):
+    """Refresh caller snapshots, customer profiles, the booking window and calendar day summaries after a commit"""
+    dirty_phones = session.info.pop('prefetch_dirty_phones', set())
+    for phone_number in dirty_phones:
+        if phone_number:
+            caller_prefetcher.invalidate_phone(phone_number)
+    customer_profile_updater.mark_dirty(dirty_phones, profile_database_id())
+
+    reservation_ids = session.info.pop('changed_reservation_ids', set())
+    order_ids = session.info.pop('changed_order_ids', set())
+    reservation_ids.discard(None)
+    order_ids.discard(None)
+    # Each window reloads the ids under its own location filter, so rows from
+    # other locations simply aren't found there
+    for booking_window in all_booking_windows():
+        booking_window.notify_changes(reservation_ids, order_ids)
+    for prep_list in all_prep_lists():
+        prep_list.notify_changes(reservation_ids, order_ids)
+    for item_pairings in all_item_pairings():
+        item_pairings.notify_changes(order_ids)
+    for item_sales in all_item_sales():
+        item_sales.notify_changes(order_ids)
+
+    daily_summary_cache.invalidate(session.info.pop('changed_reservation_dates', set()))
+    if session.info.pop('menu_changed', False):
+        for menu_catalog in all_menu_catalogs():
+            menu_catalog.invalidate()
+    audit_log_writer.record(session.info.pop('audit_events', []))
+
+@event.listens_for(SASession, 'after_rollback')
+def clear_changed_bookings(session):
+    for key in ('prefetch_dirty_phones', 'changed_reservation_ids', 'changed_order_ids', 'changed_reservation_dates',
+                'audit_events', 'menu_changed'):
+        session.info.pop(key, None)
+
+# Location partitioning: scope every ORM query to the current restaurant
+@event.listens_for(SASession, 'do_orm_execute')
+def filter_by_restaurant(execute_state):
+    """Add restaurant_id criteria to selects, bulk updates and deletes of partitioned models"""
+    restaurant_id = current_restaurant_id()
+    if not restaurant_id or execute_state.is_column_load or execute_state.is_relationship_load:
+        return
+    if execute_state.is_select or execute_state.is_update or execute_state.is_delete:
+        execute_state.statement = execute_state.statement.options(
+            with_loader_criteria(
+                RestaurantScopedMixin,
+                lambda cls: cls.restaurant_id == restaurant_id,
+                include_aliases=True
+            )
+        )
+
 # Add the missing reservation payment API endpoint
 @app.route('/api/reservations/payment', methods=['POST'])
 def update_reservation_payment():
@@ -5921,5 +7281,35 @@ if __name__ == '__main__':
     # Start automatic cleanup scheduler
     start_payment_session_cleanup_scheduler()
 
+    # Start the callback dispatcher
+    start_callback_dispatcher()
+
+    # Load the in-memory booking window
+    start_booking_window()
+
+    # Keep customer profiles current (backfills on first run)
+    start_customer_profiles()
+
+    # Batched audit log writes, retention and compaction
+    start_audit_log()
+
+    # Scheduled online database backups
+    start_backup_scheduler()
+
+    # Stock menu aliases for the conversation matcher
+    seed_menu_item_aliases()
+
+    # Spoken get_menu responses for the current menus
+    warm_menu_renders()
+
+    # Item pairings for surprise picks and "goes well with" suggestions
+    start_item_pairings_scheduler()
+
+    # Top sellers by daypart for "what's popular" questions
+    warm_item_sales()
+
+    # Serialized SWAIG signatures for get_signature requests
+    warm_swaig_documents()
+
     # Start the Flask development server
     app.run(host='0.0.0.0', port=8080, debug=False)
\ No newline at end of file
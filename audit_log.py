@@ -0,0 +1,269 @@
+"""
+Audit log for Bobby's Table Restaurant
+Records who or what changed which reservation and order fields, when, and
+through which channel (web, voice, Stripe webhook, SignalWire callback).
+Changes are captured from the ORM session and written by a background batcher
+so requests never wait on the audit insert.
+"""
+
+import atexit
+import os
+import queue
+import threading
+import time
+from contextvars import ContextVar
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from sqlalchemy import inspect as sa_inspect
+
+
+# Retention: events older than this are deleted
+AUDIT_RETENTION_DAYS = int(os.getenv('AUDIT_RETENTION_DAYS', '365'))
+# Compaction: older update events are merged into one event per entity per day
+AUDIT_COMPACT_AFTER_DAYS = int(os.getenv('AUDIT_COMPACT_AFTER_DAYS', '30'))
+
+# Fields that change on every write and carry no audit value
+IGNORED_FIELDS = {'updated_at', 'booking_fingerprint'}
+
+# Request paths that identify the channel a change came through
+CHANNEL_PREFIXES = (
+    ('/stripe-webhook', 'stripe'),
+    ('/api/signalwire/', 'signalwire'),
+    ('/api/payment-processor', 'signalwire'),
+    ('/receptionist', 'voice'),
+)
+
+_audit_source = ContextVar('audit_source', default=('system', None))
+
+
+def channel_for_path(path):
+    """Channel name for a request path ('web' unless it's a webhook or voice route)"""
+    for prefix, channel in CHANNEL_PREFIXES:
+        if path.startswith(prefix):
+            return channel
+    return 'web'
+
+
+def set_audit_source(channel, actor=None):
+    """Attribute changes made in this request/thread; returns a reset token"""
+    return _audit_source.set((channel, actor))
+
+
+def set_audit_actor(actor):
+    """Name the actor (user, call ID, webhook event) while keeping the channel"""
+    channel, _ = _audit_source.get()
+    _audit_source.set((channel, actor))
+
+
+def reset_audit_source(token=None):
+    if token is not None:
+        _audit_source.reset(token)
+    else:
+        _audit_source.set(('system', None))
+
+
+def audit_source():
+    """(channel, actor) for changes made right now"""
+    return _audit_source.get()
+
+
+def _json_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def entity_changes(obj, action):
+    """
+    Field-level changes of a flushed object.
+
+    Args:
+        obj: ORM instance from session.new, session.dirty or session.deleted
+        action (str): 'insert', 'update' or 'delete'
+
+    Returns:
+        dict: {field: [old, new]}; empty if nothing auditable changed
+    """
+    state = sa_inspect(obj)
+    changes = {}
+    for attr in state.mapper.column_attrs:
+        if attr.key in IGNORED_FIELDS:
+            continue
+        history = state.attrs[attr.key].history
+        if action == 'insert':
+            value = getattr(obj, attr.key)
+            if value is not None:
+                changes[attr.key] = [None, _json_value(value)]
+        elif action == 'delete':
+            value = history.deleted[0] if history.deleted else getattr(obj, attr.key)
+            if value is not None:
+                changes[attr.key] = [_json_value(value), None]
+        elif history.has_changes():
+            old = history.deleted[0] if history.deleted else None
+            new = history.added[0] if history.added else None
+            if old != new:
+                changes[attr.key] = [_json_value(old), _json_value(new)]
+    return changes
+
+
+def compact_events(events):
+    """
+    Merge one entity's update events into a single event.
+
+    Args:
+        events (list): Update event dicts for the same entity, oldest first
+
+    Returns:
+        dict: One event with each field's first old value and last new value,
+        timestamped with the last event
+    """
+    changes = {}
+    for event in events:
+        for field, (old, new) in (event.get('changes') or {}).items():
+            if field in changes:
+                changes[field][1] = new
+            else:
+                changes[field] = [old, new]
+    changes = {field: values for field, values in changes.items() if values[0] != values[1]}
+
+    channels = {event.get('channel') for event in events}
+    actors = {event.get('actor') for event in events}
+    last = events[-1]
+    return {
+        'created_at': last['created_at'],
+        'entity_type': last['entity_type'],
+        'entity_id': last['entity_id'],
+        'action': 'update',
+        'changes': changes,
+        'channel': channels.pop() if len(channels) == 1 else 'mixed',
+        'actor': actors.pop() if len(actors) == 1 else None,
+        'restaurant_id': last.get('restaurant_id')
+    }
+
+
+class AuditLogWriter:
+    """
+    Background batcher for audit events.
+
+    record() only enqueues; the worker inserts whatever has queued up in one
+    statement every flush_interval seconds (or as soon as batch_size events are
+    waiting), and runs retention/compaction every maintenance_interval seconds.
+    """
+
+    def __init__(self, insert_rows, batch_size=200, flush_interval=1.0,
+                 maintenance=None, maintenance_interval=6 * 3600, max_pending=50000):
+        """
+        Args:
+            insert_rows (callable): insert_rows(rows) writes a list of event dicts
+            batch_size (int): Maximum events per insert
+            flush_interval (float): Seconds to wait for a batch to fill
+            maintenance (callable): Optional retention/compaction job
+            maintenance_interval (float): Seconds between maintenance runs
+            max_pending (int): Events beyond this are dropped rather than
+                letting a stalled database grow memory without bound
+        """
+        self._insert_rows = insert_rows
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._maintenance = maintenance
+        self._maintenance_interval = maintenance_interval
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._thread = None
+        self._lock = threading.Lock()
+        self.stats = {'written': 0, 'batches': 0, 'dropped': 0, 'errors': 0}
+
+    def record(self, events):
+        """Queue events for writing"""
+        if not events:
+            return
+        self.start()
+        for event in events:
+            try:
+                self._queue.put_nowait(event)
+            except queue.Full:
+                self.stats['dropped'] += 1
+
+    def _next_batch(self):
+        try:
+            batch = [self._queue.get(timeout=self._flush_interval)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self._flush_interval
+        while len(batch) < self._batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch):
+        try:
+            self._insert_rows(batch)
+            self.stats['written'] += len(batch)
+            self.stats['batches'] += 1
+        except Exception as e:
+            self.stats['errors'] += 1
+            print(f"ERROR: Audit log write failed for {len(batch)} events: {e}")
+        finally:
+            for _ in batch:
+                self._queue.task_done()
+
+    def _run(self):
+        next_maintenance = time.monotonic() + 60
+        while True:
+            batch = self._next_batch()
+            if batch:
+                self._write(batch)
+
+            if self._maintenance and time.monotonic() >= next_maintenance:
+                next_maintenance = time.monotonic() + self._maintenance_interval
+                try:
+                    self._maintenance()
+                except Exception as e:
+                    print(f"ERROR: Audit log maintenance failed: {e}")
+
+    def flush(self):
+        """Block until every queued event has been written"""
+        self._queue.join()
+
+    def start(self):
+        """Start the writer thread; returns False if it was already running"""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return False
+            first_start = self._thread is None
+            self._thread = threading.Thread(target=self._run, name='audit-log', daemon=True)
+            self._thread.start()
+            if first_start:
+                # Don't lose the last batch on a clean shutdown
+                atexit.register(self.flush)
+            return True
+
+
+def retention_cutoff(now=None, days=AUDIT_RETENTION_DAYS):
+    return (now or datetime.utcnow()) - timedelta(days=days)
+
+
+def compaction_cutoff(now=None, days=AUDIT_COMPACT_AFTER_DAYS):
+    return (now or datetime.utcnow()) - timedelta(days=days)
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_audit_log_writer(insert_rows=None, maintenance=None):
+    """Return the process-wide audit writer; app.py registers the insert function"""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            if insert_rows is None:
+                return None
+            _writer = AuditLogWriter(insert_rows, maintenance=maintenance)
+        return _writer
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Benchmark: menu mention extraction on long multi-party call logs
+Compares the Aho-Corasick MenuMatcher with the previous per-item substring and
+regex extractor, using the seed menu from init_test_data.py. No database needed.
+
+Usage:
+    python benchmarks/menu_extraction.py [parties] [repeats]
+"""
+
+import ast
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from menu_catalog import CatalogAlias, MenuItemSnapshot
+from menu_matcher import MenuMatcher, seed_alias_rows
+
+
+def seed_menu():
+    """Menu items listed in init_test_data.populate_menu_items, without touching the database"""
+    path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'init_test_data.py')
+    tree = ast.parse(open(path).read())
+    function = next(node for node in tree.body if isinstance(node, ast.FunctionDef) and node.name == 'populate_menu_items')
+    rows = next(ast.literal_eval(node.value) for node in function.body if isinstance(node, ast.Assign))
+    return [MenuItemSnapshot(100 + i, row['name'], row['description'], row['price'], row['category'], True)
+            for i, row in enumerate(rows)]
+
+
+def call_log(menu, parties, rng):
+    """A transcript where each guest orders a couple of items and the agent reads them back"""
+    quantities = ['one', 'two', 'a', '3', 'a couple of']
+    lines = ["Agent: Thanks for calling Bobby's Table, how can I help?",
+             f"Caller: I'd like a table for {parties} tonight at seven and we want to pre-order."]
+    for guest in range(parties):
+        picks = rng.sample(menu, 2)
+        lines.append(f"Caller: Guest {guest + 1} wants {rng.choice(quantities)} {picks[0].name.lower()} "
+                     f"and {rng.choice(quantities)} {picks[1].name} please, no onions on anything.")
+        lines.append(f"Agent: Got it, {picks[0].name} and {picks[1].name} for guest {guest + 1}. Anything else?")
+    lines.append("Caller: That's everything, thanks!")
+    return '\n'.join(lines)
+
+
+def legacy_extract(conversation_text, menu_items):
+    """The previous extractor, kept here for comparison (item-specific aliases trimmed to three)"""
+    quantity_patterns = {'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5, 'six': 6, 'seven': 7, 'eight': 8,
+                         'nine': 9, 'ten': 10, 'a': 1, 'an': 1, 'single': 1, 'couple': 2, 'few': 3,
+                         **{str(n): n for n in range(1, 11)}}
+    conversation_lower = conversation_text.lower()
+    extracted_items = []
+    for menu_item in sorted(menu_items, key=lambda item: len(item.name.lower()), reverse=True):
+        item_name = menu_item.name.lower()
+        if any(existing['menu_item_id'] == menu_item.id for existing in extracted_items):
+            continue
+        name_variations = [item_name]
+        if item_name == 'pepsi':
+            name_variations.extend(['pepsi', 'soda', 'cola'])
+        elif 'chicken tenders' in item_name:
+            name_variations.extend(['chicken tenders', 'chicken tender', 'tenders', 'chicken fingers', 'fingers'])
+        elif 'eggs benedict' in item_name:
+            name_variations.extend(['eggs benedict', 'egg benedict', 'benedict'])
+        else:
+            name_variations.append(item_name.replace(' ', ''))
+            if ' ' in item_name:
+                name_variations.extend(word for word in item_name.split()
+                                       if word not in ['and', 'or', 'the', 'a', 'an', 'with', 'of', 'in', 'on'] and len(word) >= 3)
+        for variation in name_variations:
+            if len(variation) > 2 and variation in conversation_lower:
+                quantity = 1
+                for pattern in (rf'(\d+)\s*{re.escape(variation)}', rf'{re.escape(variation)}\s*(\d+)',
+                                rf'(\w+)\s*{re.escape(variation)}', rf'{re.escape(variation)}\s*(\w+)'):
+                    match = re.search(pattern, conversation_lower)
+                    if match:
+                        qty_text = match.group(1).lower()
+                        if qty_text.isdigit():
+                            quantity = int(qty_text)
+                        elif qty_text in quantity_patterns:
+                            quantity = quantity_patterns[qty_text]
+                        break
+                extracted_items.append({'menu_item_id': menu_item.id, 'quantity': quantity,
+                                        'name': menu_item.name, 'matched_variation': variation})
+                break
+    filtered_items = []
+    for item in extracted_items:
+        variation = item['matched_variation']
+        if not any(other['matched_variation'] != variation and len(other['matched_variation']) > len(variation)
+                   and variation in other['matched_variation'] for other in extracted_items):
+            filtered_items.append(item)
+    return filtered_items
+
+
+def timed(function, repeats):
+    started = time.perf_counter()
+    for _ in range(repeats):
+        result = function()
+    return (time.perf_counter() - started) / repeats * 1000, result
+
+
+def main(argv):
+    parties = int(argv[1]) if len(argv) > 1 else 12
+    repeats = int(argv[2]) if len(argv) > 2 else 50
+    rng = random.Random(7)
+    menu = seed_menu()
+
+    aliases = [CatalogAlias(**row) for row in seed_alias_rows(menu)]
+    compile_ms, matcher = timed(lambda: MenuMatcher(menu, aliases), repeats)
+    print(f"{len(menu)} menu items, {len(matcher.patterns)} phrases; compile once per version: {compile_ms:.2f} ms")
+    print(f"{'guests':>6} {'chars':>7} {'legacy ms':>10} {'matcher ms':>11} {'speedup':>8} {'legacy items':>13} {'matcher items':>14}")
+    for guests in sorted({2, parties // 2, parties, parties * 4}):
+        text = call_log(menu, guests, rng)
+        legacy_ms, legacy_items = timed(lambda: legacy_extract(text, menu), repeats)
+        matcher_ms, matcher_items = timed(lambda: matcher.extract(text), repeats)
+        print(f"{guests:>6} {len(text):>7} {legacy_ms:>10.2f} {matcher_ms:>11.3f} {legacy_ms / matcher_ms:>7.1f}x "
+              f"{len(legacy_items):>13} {len(matcher_items):>14}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,95 @@
+"""
+Booking fingerprints for Bobby's Table Restaurant
+A reservation's fingerprint hashes its normalized phone number, date, time slot
+and party size, so voice retries and repeated web submits can be matched against
+an existing booking with a single indexed lookup.
+"""
+
+import hashlib
+from collections import defaultdict
+from datetime import datetime
+
+from caller_prefetch import phone_digits
+
+
+# Bookings within the same slot are treated as the same request
+SLOT_MINUTES = 15
+
+
+def booking_slot(time_str, slot_minutes=SLOT_MINUTES):
+    """Round an 'HH:MM' time down to its slot ('19:07' -> '19:00')"""
+    try:
+        hours, minutes = (int(part) for part in str(time_str).strip()[:5].split(':'))
+    except (TypeError, ValueError):
+        return str(time_str or '').strip()
+    minutes -= minutes % slot_minutes
+    return f"{hours:02d}:{minutes:02d}"
+
+
+def booking_fingerprint(phone_number, date, time, party_size):
+    """SHA-1 hex digest identifying a booking request"""
+    try:
+        party_size = int(party_size)
+    except (TypeError, ValueError):
+        party_size = 0
+    key = f"{phone_digits(phone_number)}|{str(date or '').strip()}|{booking_slot(time)}|{party_size}"
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+
+def find_duplicate_reservation(phone_number, date, time, party_size):
+    """
+    Return an active reservation matching this booking request, or None.
+
+    Must be called inside an app context; cancelled reservations never match.
+    """
+    from models import Reservation
+    from sqlalchemy import or_
+
+    return Reservation.query.filter(
+        Reservation.booking_fingerprint == booking_fingerprint(phone_number, date, time, party_size),
+        or_(Reservation.status.is_(None), Reservation.status != 'cancelled')
+    ).order_by(Reservation.created_at).first()
+
+
+def group_duplicates(reservations):
+    """
+    Group reservations sharing a fingerprint into a dedupe report.
+
+    Args:
+        reservations (list): Reservations whose fingerprint occurs more than once
+
+    Returns:
+        list: One dict per fingerprint with the reservation to keep (the oldest
+        active one) and its duplicates
+    """
+    groups = defaultdict(list)
+    for reservation in reservations:
+        groups[reservation.booking_fingerprint].append(reservation)
+
+    report = []
+    for fingerprint, members in groups.items():
+        members.sort(key=lambda r: (r.status == 'cancelled', r.created_at or datetime.min, r.id))
+        keep, duplicates = members[0], members[1:]
+        report.append({
+            'fingerprint': fingerprint,
+            'phone_number': keep.phone_number,
+            'date': keep.date,
+            'slot': booking_slot(keep.time),
+            'party_size': keep.party_size,
+            'keep': _report_row(keep),
+            'duplicates': [_report_row(r) for r in duplicates]
+        })
+    report.sort(key=lambda group: (group['date'], group['slot']))
+    return report
+
+
+def _report_row(reservation):
+    return {
+        'id': reservation.id,
+        'reservation_number': reservation.reservation_number,
+        'name': reservation.name,
+        'time': reservation.time,
+        'status': reservation.status,
+        'payment_status': reservation.payment_status,
+        'created_at': reservation.created_at.isoformat() if reservation.created_at else None
+    }
@@ -0,0 +1,369 @@
+"""
+Booking window read model for Bobby's Table Restaurant
+Keeps today's and the coming days' reservations and orders in memory, indexed
+by number, phone, date and time slot, so read-only voice tools don't query SQLite.
+The ORM change feed (see app.py) keeps it current and it rolls forward at midnight;
+both are applied by a background worker, so reads never touch the database.
+"""
+
+import os
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from caller_prefetch import phone_digits
+from locations import DEFAULT_RESTAURANT_ID, current_restaurant_id, use_location
+
+
+# Days after today held in memory; get_calendar_events defaults to a 30 day range
+BOOKING_WINDOW_DAYS = int(os.getenv('BOOKING_WINDOW_DAYS', '30'))
+
+
+def _date_str(day):
+    return day.strftime('%Y-%m-%d')
+
+
+class BookingWindow:
+    """
+    In-memory reservations and orders for [today, today + days].
+
+    Readers only see this model when the requested range is inside the window
+    and no committed change is still waiting to be applied; anything else (or a
+    failed load) should fall back to the database. Loads, changes and rolls are
+    applied by one worker thread: queries run without the lock, which is only
+    held while the results are swapped into the indexes.
+    """
+
+    def __init__(self, range_loader, id_loader, days=BOOKING_WINDOW_DAYS, restaurant_id=DEFAULT_RESTAURANT_ID):
+        """
+        Args:
+            range_loader (callable): range_loader(start_date, end_date) ->
+                (reservations, orders) snapshots for that date range
+            id_loader (callable): id_loader(reservation_ids, order_ids) ->
+                (reservations, orders) snapshots for those ids
+            days (int): Days after today to keep in memory
+            restaurant_id (str): Location whose bookings this window holds;
+                the loaders run with that location selected
+        """
+        self._range_loader = range_loader
+        self._id_loader = id_loader
+        self.days = days
+        self.restaurant_id = restaurant_id
+        self.start_date = None
+        self.end_date = None
+        self._lock = threading.RLock()
+        self._pending = (set(), set())
+        self._applying = (set(), set())
+        self._pending_event = threading.Event()
+        self._threads = []
+        self._reset()
+        self.stats = {'loads': 0, 'rolls': 0, 'changes_applied': 0, 'reads': 0}
+
+    def _reset(self):
+        self.reservations = {}
+        self.orders = {}
+        self.reservations_by_number = {}
+        self.reservations_by_phone = defaultdict(set)
+        self.reservations_by_date = defaultdict(set)
+        self.reservations_by_slot = defaultdict(set)
+        self.orders_by_number = {}
+        self.orders_by_phone = defaultdict(set)
+        self.orders_by_reservation = defaultdict(set)
+
+    @property
+    def loaded(self):
+        return self.start_date is not None
+
+    # Index maintenance
+
+    def _index_reservation(self, reservation):
+        self._unindex_reservation(reservation.id)
+        self.reservations[reservation.id] = reservation
+        self.reservations_by_number[reservation.reservation_number] = reservation.id
+        self.reservations_by_phone[phone_digits(reservation.phone_number)].add(reservation.id)
+        self.reservations_by_date[reservation.date].add(reservation.id)
+        self.reservations_by_slot[(reservation.date, reservation.time)].add(reservation.id)
+
+    def _unindex_reservation(self, reservation_id):
+        reservation = self.reservations.pop(reservation_id, None)
+        if not reservation:
+            return
+        if self.reservations_by_number.get(reservation.reservation_number) == reservation_id:
+            del self.reservations_by_number[reservation.reservation_number]
+        self.reservations_by_phone[phone_digits(reservation.phone_number)].discard(reservation_id)
+        self.reservations_by_date[reservation.date].discard(reservation_id)
+        self.reservations_by_slot[(reservation.date, reservation.time)].discard(reservation_id)
+
+    def _index_order(self, order):
+        self._unindex_order(order.id)
+        self.orders[order.id] = order
+        self.orders_by_number[order.order_number] = order.id
+        if order.customer_phone:
+            self.orders_by_phone[phone_digits(order.customer_phone)].add(order.id)
+        if order.reservation_id:
+            self.orders_by_reservation[order.reservation_id].add(order.id)
+
+    def _unindex_order(self, order_id):
+        order = self.orders.pop(order_id, None)
+        if not order:
+            return
+        if self.orders_by_number.get(order.order_number) == order_id:
+            del self.orders_by_number[order.order_number]
+        if order.customer_phone:
+            self.orders_by_phone[phone_digits(order.customer_phone)].discard(order_id)
+        if order.reservation_id:
+            self.orders_by_reservation[order.reservation_id].discard(order_id)
+
+    def _in_window(self, date):
+        return bool(date) and self.start_date <= date <= self.end_date
+
+    def _order_in_window(self, order):
+        return self._in_window(order.target_date) or order.reservation_id in self.reservations
+
+    # Loading, change feed and rolling
+
+    def load(self, today=None):
+        """(Re)load the whole window with one range query"""
+        today = today or datetime.now().date()
+        start_date, end_date = _date_str(today), _date_str(today + timedelta(days=self.days))
+        with use_location(self.restaurant_id):
+            reservations, orders = self._range_loader(start_date, end_date)
+        with self._lock:
+            self._reset()
+            self.start_date, self.end_date = start_date, end_date
+            for reservation in reservations:
+                self._index_reservation(reservation)
+            for order in orders:
+                self._index_order(order)
+            self.stats['loads'] += 1
+        print(f"📆 Booking window ({self.restaurant_id}) loaded {start_date}..{end_date}: "
+              f"{len(self.reservations)} reservations, {len(self.orders)} orders")
+
+    def ensure_loaded(self):
+        """Load on first use; returns False if the window is unavailable"""
+        if self.loaded:
+            return True
+        try:
+            self.load()
+            return True
+        except Exception as e:
+            print(f"WARNING: Booking window load failed: {e}")
+            return False
+
+    def roll(self, today=None):
+        """Drop days before today and load the newly uncovered days"""
+        today = today or datetime.now().date()
+        new_start, new_end = _date_str(today), _date_str(today + timedelta(days=self.days))
+        with self._lock:
+            if not self.loaded or new_start > self.end_date:
+                return self.load(today)
+            if new_start == self.start_date:
+                return
+            old_end = self.end_date
+
+        first_new_day = _date_str(datetime.strptime(old_end, '%Y-%m-%d').date() + timedelta(days=1))
+        with use_location(self.restaurant_id):
+            reservations, orders = self._range_loader(first_new_day, new_end)
+
+        with self._lock:
+            for date in [d for d in self.reservations_by_date if d < new_start]:
+                for reservation_id in list(self.reservations_by_date[date]):
+                    self._unindex_reservation(reservation_id)
+                del self.reservations_by_date[date]
+            self.start_date, self.end_date = new_start, new_end
+            for order_id in [oid for oid, order in self.orders.items() if not self._order_in_window(order)]:
+                self._unindex_order(order_id)
+            for reservation in reservations:
+                self._index_reservation(reservation)
+            for order in orders:
+                self._index_order(order)
+            self.stats['rolls'] += 1
+        print(f"📆 Booking window ({self.restaurant_id}) rolled to {new_start}..{new_end}")
+
+    def notify_changes(self, reservation_ids, order_ids):
+        """Record ids changed by a committed transaction; applied by the change worker"""
+        if not reservation_ids and not order_ids:
+            return
+        with self._lock:
+            self._pending[0].update(reservation_ids)
+            self._pending[1].update(order_ids)
+        self._pending_event.set()
+
+    @property
+    def has_pending(self):
+        """True while committed changes are not in the indexes yet"""
+        return any(self._pending + self._applying)
+
+    def apply_pending(self):
+        """Apply pending changes (a single query per table, only when something changed)"""
+        with self._lock:
+            if not self.loaded or not (self._pending[0] or self._pending[1]):
+                return
+            reservation_ids, order_ids = self._applying = self._pending
+            self._pending = (set(), set())
+        try:
+            with use_location(self.restaurant_id):
+                reservations, orders = self._id_loader(reservation_ids, order_ids)
+        except Exception:
+            with self._lock:
+                self._pending[0].update(reservation_ids)
+                self._pending[1].update(order_ids)
+                self._applying = (set(), set())
+            raise
+
+        with self._lock:
+            self._applying = (set(), set())
+            found_reservations = {r.id for r in reservations}
+            found_orders = {o.id for o in orders}
+            for reservation_id in reservation_ids - found_reservations:
+                self._unindex_reservation(reservation_id)
+            for order_id in order_ids - found_orders:
+                self._unindex_order(order_id)
+            for reservation in reservations:
+                if self._in_window(reservation.date):
+                    self._index_reservation(reservation)
+                else:
+                    self._unindex_reservation(reservation.id)
+            for order in orders:
+                if self._order_in_window(order):
+                    self._index_order(order)
+                else:
+                    self._unindex_order(order.id)
+            self.stats['changes_applied'] += len(reservation_ids) + len(order_ids)
+
+    def _behind(self):
+        # A day has started since the window was loaded or last rolled
+        return datetime.now().date() > datetime.strptime(self.start_date, '%Y-%m-%d').date()
+
+    def _work(self):
+        """One pass of the change worker: load or roll if needed, then apply pending changes"""
+        if not self.ensure_loaded():
+            return
+        if self._behind():
+            self.roll()
+        self.apply_pending()
+
+    def _change_worker(self):
+        while True:
+            self._pending_event.wait()
+            self._pending_event.clear()
+            try:
+                self._work()
+            except Exception as e:
+                print(f"ERROR: Booking window change feed error: {e}")
+
+    def _midnight_worker(self):
+        while True:
+            now = datetime.now()
+            next_midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+            time.sleep((next_midnight - now).total_seconds() + 1)
+            # The change worker does the roll, so it never races a change being applied
+            self._pending_event.set()
+
+    def start(self):
+        """Start the change-feed and midnight-roll threads; the change worker does the first load"""
+        with self._lock:
+            if self._threads:
+                return False
+            for target, name in ((self._change_worker, 'booking-window-changes'),
+                                 (self._midnight_worker, 'booking-window-roll')):
+                thread = threading.Thread(target=target, name=f"{name}-{self.restaurant_id}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+        self._pending_event.set()
+        return True
+
+    # Reads
+
+    def _ready_for(self, start_date, end_date):
+        if not self.loaded or self.has_pending or self._behind():
+            # The change worker loads, rolls or applies it; the database answers meanwhile
+            if not self.start():
+                self._pending_event.set()
+            if not self.loaded or self.has_pending:
+                return False
+        return self.start_date <= start_date and end_date <= self.end_date
+
+    def covers(self, start_date, end_date=None):
+        """True if [start_date, end_date] can be answered from memory"""
+        try:
+            return self._ready_for(start_date, end_date or start_date)
+        except Exception as e:
+            print(f"WARNING: Booking window unavailable: {e}")
+            return False
+
+    def reservations_between(self, start_date, end_date, include_cancelled=False):
+        """Reservations in a date range ordered by date and time, or None if not covered"""
+        if not self.covers(start_date, end_date):
+            return None
+        with self._lock:
+            self.stats['reads'] += 1
+            results = [
+                self.reservations[reservation_id]
+                for date, ids in self.reservations_by_date.items() if start_date <= date <= end_date
+                for reservation_id in ids
+            ]
+        if not include_cancelled:
+            results = [r for r in results if r.status != 'cancelled']
+        return sorted(results, key=lambda r: (r.date, r.time))
+
+    def reservations_at(self, date, time):
+        """Reservations in one time slot, or None if not covered"""
+        if not self.covers(date):
+            return None
+        with self._lock:
+            self.stats['reads'] += 1
+            return [self.reservations[i] for i in self.reservations_by_slot.get((date, time), ())]
+
+    def reservations_for_phone(self, phone_number):
+        """Reservations in the window for a phone number"""
+        if not self.covers(_date_str(datetime.now().date())):
+            return None
+        with self._lock:
+            self.stats['reads'] += 1
+            ids = self.reservations_by_phone.get(phone_digits(phone_number), ())
+            return sorted((self.reservations[i] for i in ids), key=lambda r: (r.date, r.time))
+
+    def order_by_number(self, order_number):
+        """Order snapshot by number, or None if it isn't in the window"""
+        if not self.covers(_date_str(datetime.now().date())):
+            return None
+        with self._lock:
+            self.stats['reads'] += 1
+            order_id = self.orders_by_number.get(order_number)
+            return self.orders.get(order_id) if order_id else None
+
+
+_loaders = None
+_windows = {}
+_window_lock = threading.Lock()
+
+
+def register_booking_window_loaders(range_loader, id_loader):
+    """Register the database loaders (app.py) used for every location's window"""
+    global _loaders
+    with _window_lock:
+        _loaders = (range_loader, id_loader)
+
+
+def get_booking_window(restaurant_id=None):
+    """
+    Return a location's booking window (default: the current location), creating it on first use.
+
+    Each location has its own window so a busy site's bookings never crowd out
+    another's. Returns None until app.py has registered the loaders.
+    """
+    restaurant_id = restaurant_id or current_restaurant_id() or DEFAULT_RESTAURANT_ID
+    with _window_lock:
+        if restaurant_id not in _windows:
+            if _loaders is None:
+                return None
+            _windows[restaurant_id] = BookingWindow(*_loaders, restaurant_id=restaurant_id)
+        return _windows[restaurant_id]
+
+
+def all_booking_windows():
+    """Every booking window created so far"""
+    with _window_lock:
+        return list(_windows.values())
@@ -0,0 +1,99 @@
+"""
+Calendar day summaries for Bobby's Table Restaurant
+Per-day reservation counts, covers and cancellations for month views, computed
+with a GROUP BY per month and cached until a reservation in that month changes.
+"""
+
+import threading
+from datetime import datetime, timedelta
+
+
+def month_key(date_str):
+    """'YYYY-MM' for a 'YYYY-MM-DD' date string"""
+    return date_str[:7]
+
+
+def months_between(start_date, end_date):
+    """Every 'YYYY-MM' month touched by [start_date, end_date]"""
+    year, month = int(start_date[:4]), int(start_date[5:7])
+    last = month_key(end_date)
+    months = []
+    while True:
+        key = f"{year:04d}-{month:02d}"
+        months.append(key)
+        if key >= last:
+            return months
+        month += 1
+        if month > 12:
+            year, month = year + 1, 1
+
+
+def month_bounds(key):
+    """First and last 'YYYY-MM-DD' of a 'YYYY-MM' month"""
+    first = datetime.strptime(f"{key}-01", '%Y-%m-%d').date()
+    next_month = (first.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return first.strftime('%Y-%m-%d'), (next_month - timedelta(days=1)).strftime('%Y-%m-%d')
+
+
+class DailySummaryCache:
+    """
+    Month-granular cache of per-day reservation aggregates.
+
+    Each (scope, month) entry is a dict of date -> summary. Months with no
+    reservations are cached as empty dicts so they cost nothing to re-serve.
+    """
+
+    def __init__(self, loader):
+        """
+        Args:
+            loader (callable): loader(start_date, end_date) -> list of dicts with
+                date, reservations, covers and cancelled for days that have bookings
+        """
+        self._loader = loader
+        self._months = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'invalidated': 0}
+
+    def days_between(self, scope, start_date, end_date):
+        """Per-day summaries for [start_date, end_date], loading uncached months"""
+        results = []
+        for key in months_between(start_date, end_date):
+            with self._lock:
+                days = self._months.get((scope, key))
+                generation = self._generation
+                self.stats['hits' if days is not None else 'misses'] += 1
+            if days is None:
+                days = {row['date']: row for row in self._loader(*month_bounds(key))}
+                with self._lock:
+                    # Don't cache a result that a concurrent commit already made stale
+                    if generation == self._generation:
+                        self._months[(scope, key)] = days
+            results.extend(row for date, row in sorted(days.items()) if start_date <= date <= end_date)
+        return results
+
+    def invalidate(self, dates):
+        """Drop cached months containing any of the given dates, for every scope"""
+        months = {month_key(date) for date in dates if date}
+        if not months:
+            return
+        with self._lock:
+            self._generation += 1
+            for cache_key in [k for k in self._months if k[1] in months]:
+                del self._months[cache_key]
+                self.stats['invalidated'] += 1
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_daily_summary_cache(loader=None):
+    """Return the process-wide summary cache; app.py registers the loader"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            if loader is None:
+                return None
+            _cache = DailySummaryCache(loader)
+        return _cache
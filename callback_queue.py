@@ -0,0 +1,211 @@
+"""
+Callback queue for Bobby's Table Restaurant
+Keeps pending customer callbacks in a min-heap keyed by due time and wakes a
+single dispatcher thread exactly when the earliest callback comes due.
+"""
+
+import heapq
+import re
+import threading
+from datetime import datetime, timedelta
+
+
+# Callback statuses stored in the callbacks table
+CALLBACK_STATUSES = ['pending', 'due', 'completed', 'cancelled']
+
+_WORD_NUMBERS = {
+    'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5, 'six': 6,
+    'seven': 7, 'eight': 8, 'nine': 9, 'ten': 10, 'eleven': 11, 'twelve': 12,
+    'fifteen': 15, 'twenty': 20, 'thirty': 30, 'forty five': 45, 'an': 1, 'a': 1
+}
+
+
+def parse_preferred_time(preferred_time, now=None):
+    """
+    Convert a spoken callback time into a concrete due datetime.
+
+    Args:
+        preferred_time (str): Free-form time such as "tomorrow at 3pm",
+            "in 30 minutes", "5:30 pm" or an ISO timestamp
+        now (datetime): Reference time (defaults to datetime.now())
+
+    Returns:
+        datetime: When the callback is due. Unrecognised text and requests
+        like "as soon as possible" are due immediately.
+    """
+    now = now or datetime.now()
+    if not preferred_time:
+        return now
+
+    text = str(preferred_time).strip().lower()
+
+    # ISO formats coming from the agent or the web UI
+    for fmt in ('%Y-%m-%dT%H:%M:%S', '%Y-%m-%dT%H:%M', '%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M'):
+        try:
+            return datetime.strptime(text.upper() if 'T' in fmt else text, fmt)
+        except ValueError:
+            continue
+
+    # Relative offsets: "in 30 minutes", "in two hours", "in an hour"
+    relative = re.search(r'\bin\s+(\d+|[a-z]+(?:\s+five)?)\s+(minute|min|hour|hr)s?\b', text)
+    if relative:
+        amount_text = relative.group(1)
+        amount = int(amount_text) if amount_text.isdigit() else _WORD_NUMBERS.get(amount_text)
+        if amount is not None:
+            if relative.group(2) in ('hour', 'hr'):
+                return now + timedelta(hours=amount)
+            return now + timedelta(minutes=amount)
+
+    # Day component
+    day = now.date()
+    explicit_day = False
+    if 'tomorrow' in text:
+        day = day + timedelta(days=1)
+        explicit_day = True
+    elif 'today' in text or 'tonight' in text or 'this evening' in text or 'this afternoon' in text:
+        explicit_day = True
+
+    # Clock component: "3pm", "3:30 pm", "15:00", "noon"
+    hour = minute = None
+    clock = re.search(r'(\bat\s+)?\b(\d{1,2})(?::(\d{2}))?\s*(a\.?m\.?|p\.?m\.?)?(?=\s|$|[^\w])', text)
+    if 'noon' in text:
+        hour, minute = 12, 0
+    elif clock and (clock.group(1) or clock.group(3) or clock.group(4)):
+        hour = int(clock.group(2))
+        minute = int(clock.group(3) or 0)
+        am_pm = (clock.group(4) or '').replace('.', '')
+        if am_pm == 'pm' and hour != 12:
+            hour += 12
+        elif am_pm == 'am' and hour == 12:
+            hour = 0
+        elif not am_pm and hour < 8:
+            # Restaurant hours: "call me at 5:30" means the evening
+            hour += 12
+    elif 'morning' in text:
+        hour, minute = 10, 0
+    elif 'afternoon' in text:
+        hour, minute = 14, 0
+    elif 'evening' in text or 'tonight' in text:
+        hour, minute = 18, 0
+
+    if hour is None or not (0 <= hour <= 23 and 0 <= minute <= 59):
+        if explicit_day and day != now.date():
+            return datetime.combine(day, datetime.min.time()).replace(hour=10)
+        return now
+
+    due_at = datetime.combine(day, datetime.min.time()).replace(hour=hour, minute=minute)
+    if due_at < now and not explicit_day:
+        # A bare clock time that already passed today means tomorrow
+        due_at += timedelta(days=1)
+    return due_at
+
+
+class CallbackScheduler:
+    """
+    Timer-driven dispatcher for pending callbacks.
+
+    schedule() and cancel() are O(log n) heap operations; the dispatcher thread
+    sleeps on a condition variable until the earliest due time (or until a new,
+    earlier callback is scheduled) instead of polling the callbacks table.
+    """
+
+    def __init__(self, on_due):
+        """
+        Args:
+            on_due (callable): Called with the callback id when it comes due
+        """
+        self._on_due = on_due
+        self._heap = []
+        self._due_times = {}
+        self._condition = threading.Condition()
+        self._thread = None
+
+    def __len__(self):
+        with self._condition:
+            return len(self._due_times)
+
+    def schedule(self, callback_id, due_at):
+        """Add or reschedule a callback"""
+        with self._condition:
+            self._due_times[callback_id] = due_at
+            heapq.heappush(self._heap, (due_at, callback_id))
+            # Only wake the dispatcher if the earliest deadline moved
+            if self._heap[0][1] == callback_id:
+                self._condition.notify()
+
+    def cancel(self, callback_id):
+        """Forget a callback; its heap entry is discarded lazily when popped"""
+        with self._condition:
+            self._due_times.pop(callback_id, None)
+
+    def next_due(self):
+        """Return the earliest live (due_at, callback_id) or None"""
+        with self._condition:
+            self._discard_stale()
+            return self._heap[0] if self._heap else None
+
+    def _discard_stale(self):
+        while self._heap:
+            due_at, callback_id = self._heap[0]
+            if self._due_times.get(callback_id) == due_at:
+                return
+            heapq.heappop(self._heap)
+
+    def pop_due(self, now=None):
+        """Pop every callback due at or before now"""
+        now = now or datetime.now()
+        due = []
+        with self._condition:
+            self._discard_stale()
+            while self._heap and self._heap[0][0] <= now:
+                due_at, callback_id = heapq.heappop(self._heap)
+                if self._due_times.get(callback_id) == due_at:
+                    del self._due_times[callback_id]
+                    due.append(callback_id)
+                self._discard_stale()
+        return due
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._discard_stale()
+                if not self._heap:
+                    self._condition.wait()
+                    continue
+                wait_seconds = (self._heap[0][0] - datetime.now()).total_seconds()
+                if wait_seconds > 0:
+                    self._condition.wait(timeout=wait_seconds)
+                    continue
+
+            for callback_id in self.pop_due():
+                try:
+                    self._on_due(callback_id)
+                except Exception as e:
+                    print(f"ERROR: Callback dispatch error for callback {callback_id}: {e}")
+
+    def start(self):
+        """Start the dispatcher thread; returns False if it was already running"""
+        with self._condition:
+            if self._thread and self._thread.is_alive():
+                return False
+            self._thread = threading.Thread(target=self._run, name='callback-dispatcher', daemon=True)
+            self._thread.start()
+            return True
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_callback_scheduler(on_due):
+    """
+    Return the process-wide callback scheduler, creating it on first use.
+
+    app.py is imported both as __main__ and as "app" (from the skills), so the
+    singleton lives here to keep a single heap and dispatcher per process.
+    """
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = CallbackScheduler(on_due)
+        return _scheduler
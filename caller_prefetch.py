@@ -0,0 +1,273 @@
+"""
+Caller prefetch for Bobby's Table Restaurant
+Warms a per-call snapshot of the caller's upcoming reservations, open orders and
+payment state in a background worker, so lookup tools can answer from memory
+and only fall back to the database on a miss.
+"""
+
+import queue
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from locations import current_restaurant_id, use_location
+
+
+# Keep at most this many call snapshots; calls that never send "ended" age out
+MAX_SNAPSHOTS = 500
+SNAPSHOT_TTL_SECONDS = 2 * 60 * 60
+
+
+def phone_digits(phone_number):
+    """Last 10 digits of a phone number, used to compare numbers across formats"""
+    if not phone_number:
+        return ''
+    return re.sub(r'\D', '', str(phone_number))[-10:]
+
+
+def phone_variants(phone_number):
+    """Stored formats a caller's number may appear in (+1XXXXXXXXXX, 1XXXXXXXXXX, XXXXXXXXXX)"""
+    digits = phone_digits(phone_number)
+    if len(digits) != 10:
+        return [phone_number] if phone_number else []
+    return [f"+1{digits}", f"1{digits}", digits]
+
+
+class RowSnapshot:
+    """Detached, read-only copy of an ORM row exposing the same attributes"""
+
+    def __init__(self, row, relations=None):
+        self._dict = row.to_dict() if hasattr(row, 'to_dict') else {}
+        for column in row.__table__.columns:
+            setattr(self, column.name, getattr(row, column.name))
+        for name, value in (relations or {}).items():
+            setattr(self, name, value)
+
+    def to_dict(self):
+        return self._dict
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__} {getattr(self, 'id', '?')}>"
+
+
+def snapshot_order(order):
+    """Copy an Order with its items and their menu items"""
+    items = [
+        RowSnapshot(item, {'menu_item': RowSnapshot(item.menu_item) if item.menu_item else None})
+        for item in order.items
+    ]
+    return RowSnapshot(order, {'items': items})
+
+
+def snapshot_reservation(reservation):
+    """Copy a Reservation with its party orders"""
+    return RowSnapshot(reservation, {'orders': [snapshot_order(order) for order in reservation.orders]})
+
+
+class CallerSnapshot:
+    """Everything we know about a caller when their call starts"""
+
+    def __init__(self, call_id, phone_number, reservations, orders):
+        self.call_id = call_id
+        self.phone_number = phone_number
+        self.digits = phone_digits(phone_number)
+        self.loaded_at = time.time()
+        self.reservations = reservations
+        self.orders = orders
+        self.reservations_by_number = {r.reservation_number: r for r in reservations}
+        self.orders_by_number = {o.order_number: o for o in orders}
+
+        unpaid_reservations = [r for r in reservations if r.payment_status != 'paid']
+        unpaid_orders = [o for o in orders if o.payment_status != 'paid']
+        self.payment_state = {
+            'unpaid_reservations': [r.reservation_number for r in unpaid_reservations],
+            'unpaid_orders': [o.order_number for o in unpaid_orders],
+            'balance_due': round(
+                sum(sum(order.total_amount or 0 for order in r.orders) for r in unpaid_reservations) +
+                sum(o.total_amount or 0 for o in unpaid_orders if not o.reservation_id), 2
+            )
+        }
+
+    def matches_phone(self, phone_number):
+        return bool(self.digits) and phone_digits(phone_number) == self.digits
+
+    def to_dict(self):
+        return {
+            'call_id': self.call_id,
+            'phone_number': self.phone_number,
+            'loaded_at': self.loaded_at,
+            'reservations': [r.reservation_number for r in self.reservations],
+            'orders': [o.order_number for o in self.orders],
+            'payment_state': self.payment_state
+        }
+
+
+class CallerPrefetcher:
+    """
+    Background loader for per-call caller snapshots.
+
+    prefetch() only enqueues work, so the SWAIG request that triggers it is not
+    delayed; get() never blocks and returns None until the snapshot is ready.
+    The loader runs with the restaurant location of the request that started
+    the call selected.
+    """
+
+    def __init__(self, loader):
+        """
+        Args:
+            loader (callable): loader(phone_number) -> (reservations, orders),
+                returning RowSnapshot lists
+        """
+        self._loader = loader
+        self._snapshots = OrderedDict()
+        self._seen = OrderedDict()  # call_id -> when it was first seen, oldest first
+        self._locations = {}
+        self._loading = {}   # call_id -> phone digits, for loads in flight
+        self._reload = set()  # in-flight loads invalidated before they finished
+        self._lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=1000)
+        self._thread = None
+        self.stats = {'prefetched': 0, 'hits': 0, 'misses': 0, 'invalidated': 0, 'errors': 0}
+
+    def prefetch(self, call_id, phone_number):
+        """Queue a snapshot load the first time a call_id is seen; returns True if queued"""
+        if not call_id or not phone_number or len(phone_digits(phone_number)) != 10:
+            return False
+        with self._lock:
+            now = time.time()
+            self._expire(now)
+            if call_id in self._seen:
+                return False
+            self._seen[call_id] = now
+            self._locations[call_id] = current_restaurant_id()
+        self._start()
+        try:
+            self._queue.put_nowait((call_id, phone_number))
+        except queue.Full:
+            print(f"WARNING: Caller prefetch queue full, skipping call {call_id}")
+            self._forget(call_id)
+            return False
+        return True
+
+    def get(self, call_id):
+        """Return the call's snapshot, or None if it is not loaded (yet)"""
+        with self._lock:
+            snapshot = self._snapshots.get(call_id) if call_id else None
+            if snapshot and time.time() - snapshot.loaded_at > SNAPSHOT_TTL_SECONDS:
+                # Forget the call too, so it can be prefetched again
+                del self._snapshots[call_id]
+                self._seen.pop(call_id, None)
+                self._locations.pop(call_id, None)
+                snapshot = None
+            self.stats['hits' if snapshot else 'misses'] += 1
+            return snapshot
+
+    def discard(self, call_id):
+        """Forget a call once it has ended"""
+        self._forget(call_id)
+
+    def _forget(self, call_id):
+        with self._lock:
+            self._snapshots.pop(call_id, None)
+            self._seen.pop(call_id, None)
+            self._locations.pop(call_id, None)
+
+    def _expire(self, now):
+        # Called with the lock held. Calls that never sent "ended" are dropped
+        # after the snapshot TTL, whether or not their snapshot ever loaded
+        while self._seen:
+            call_id, seen_at = next(iter(self._seen.items()))
+            if now - seen_at <= SNAPSHOT_TTL_SECONDS:
+                break
+            self._seen.popitem(last=False)
+            self._snapshots.pop(call_id, None)
+            self._locations.pop(call_id, None)
+
+    def invalidate_phone(self, phone_number):
+        """Reload snapshots for a caller whose reservations or orders changed"""
+        digits = phone_digits(phone_number)
+        if not digits:
+            return
+        with self._lock:
+            # Loads already in flight for this caller are redone when they finish
+            self._reload.update(call_id for call_id, loading in self._loading.items() if loading == digits)
+            stale = [s for s in self._snapshots.values() if s.digits == digits]
+            for snapshot in stale:
+                del self._snapshots[snapshot.call_id]
+                self.stats['invalidated'] += 1
+        for snapshot in stale:
+            try:
+                self._queue.put_nowait((snapshot.call_id, snapshot.phone_number))
+            except queue.Full:
+                pass
+
+    def _store(self, snapshot):
+        """Keep a loaded snapshot; returns False if the caller changed while it was loading"""
+        with self._lock:
+            self._loading.pop(snapshot.call_id, None)
+            if snapshot.call_id in self._reload:
+                self._reload.discard(snapshot.call_id)
+                self.stats['invalidated'] += 1
+                return False
+            if snapshot.call_id not in self._seen:
+                # Call ended while we were loading
+                return True
+            self._snapshots[snapshot.call_id] = snapshot
+            self._snapshots.move_to_end(snapshot.call_id)
+            while len(self._snapshots) > MAX_SNAPSHOTS:
+                old_call_id, _ = self._snapshots.popitem(last=False)
+                self._seen.pop(old_call_id, None)
+                self._locations.pop(old_call_id, None)
+            return True
+
+    def _run(self):
+        while True:
+            call_id, phone_number = self._queue.get()
+            try:
+                with self._lock:
+                    if call_id not in self._seen:
+                        # Call ended before its snapshot was loaded
+                        continue
+                    restaurant_id = self._locations.get(call_id)
+                    self._loading[call_id] = phone_digits(phone_number)
+                with use_location(restaurant_id):
+                    reservations, orders = self._loader(phone_number)
+                if not self._store(CallerSnapshot(call_id, phone_number, reservations, orders)):
+                    self._queue.put_nowait((call_id, phone_number))
+                    continue
+                self.stats['prefetched'] += 1
+                print(f"📇 Prefetched caller {phone_number} for call {call_id}: "
+                      f"{len(reservations)} reservations, {len(orders)} open orders")
+            except Exception as e:
+                with self._lock:
+                    self._loading.pop(call_id, None)
+                    self._reload.discard(call_id)
+                self.stats['errors'] += 1
+                print(f"ERROR: Caller prefetch failed for call {call_id}: {e}")
+
+    def _start(self):
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name='caller-prefetch', daemon=True)
+            self._thread.start()
+
+
+_prefetcher = None
+_prefetcher_lock = threading.Lock()
+
+
+def get_caller_prefetcher(loader=None):
+    """
+    Return the process-wide prefetcher, creating it on first use.
+
+    app.py registers the loader; the skills only read snapshots and pass no loader.
+    """
+    global _prefetcher
+    with _prefetcher_lock:
+        if _prefetcher is None:
+            if loader is None:
+                return None
+            _prefetcher = CallerPrefetcher(loader)
+        return _prefetcher
@@ -0,0 +1,160 @@
+"""
+Customer profiles for Bobby's Table Restaurant
+Precomputes each caller's visit history (visits, last visit, usual party size,
+favorite items, unpaid balance) into the customers table so the receptionist can
+personalize a call from one primary-key lookup. Profiles are refreshed in the
+background when a customer's reservations or orders change, and nightly once
+the day of their next reservation arrives (it then counts as a visit).
+"""
+
+import queue
+import threading
+from collections import Counter
+from datetime import datetime
+
+from caller_prefetch import phone_digits
+
+
+FAVORITE_ITEM_COUNT = 3
+
+
+def build_customer_profile(phone, reservations, orders, today=None):
+    """
+    Compute a customer's profile fields from their reservations and orders.
+
+    Args:
+        phone (str): Normalized 10-digit phone number
+        reservations (list): The customer's reservations (with .orders)
+        orders (list): Orders placed with the customer's phone number
+            (standalone or not; reservation orders are picked up from reservations)
+        today (str): 'YYYY-MM-DD' used to tell past visits from upcoming ones
+
+    Returns:
+        dict: Column values for the Customer row
+    """
+    today = today or datetime.now().strftime('%Y-%m-%d')
+    active_reservations = [r for r in reservations if r.status != 'cancelled']
+    visits = [r for r in active_reservations if r.date and r.date <= today]
+
+    all_orders = {order.id: order for order in orders}
+    for reservation in reservations:
+        for order in reservation.orders:
+            all_orders[order.id] = order
+    active_orders = [o for o in all_orders.values() if o.status != 'cancelled']
+
+    party_sizes = Counter(r.party_size for r in active_reservations if r.party_size)
+    item_counts = Counter()
+    for order in active_orders:
+        for item in order.items:
+            if item.menu_item:
+                item_counts[item.menu_item.name] += item.quantity or 1
+
+    # Most recent name the customer gave us
+    named = sorted(
+        [(r.created_at or datetime.min, r.name) for r in reservations if r.name] +
+        [(o.created_at or datetime.min, o.person_name) for o in orders if o.person_name and not o.reservation_id],
+        key=lambda entry: entry[0]
+    )
+
+    return {
+        'phone': phone,
+        'name': named[-1][1] if named else None,
+        'visit_count': len(visits),
+        'reservation_count': len(active_reservations),
+        'order_count': len([o for o in active_orders if not o.reservation_id]),
+        'last_visit_date': max((r.date for r in visits), default=None),
+        'next_reservation_date': min((r.date for r in active_reservations if r.date > today), default=None),
+        'usual_party_size': party_sizes.most_common(1)[0][0] if party_sizes else None,
+        'favorite_items': [name for name, _ in item_counts.most_common(FAVORITE_ITEM_COUNT)],
+        'unpaid_balance': round(sum(
+            o.total_amount or 0 for o in active_orders if o.payment_status != 'paid'
+        ), 2)
+    }
+
+
+class CustomerProfileUpdater:
+    """
+    Background refresher for customer profiles.
+
+    mark_dirty() is called after a commit with the phones it touched; the worker
+    batches whatever has queued up and refreshes those profiles together. Phones
+    are queued per database: restaurant_id names a location with its own
+    database file, None means the shared database (profiles span its locations).
+    """
+
+    def __init__(self, refresh, batch_size=100):
+        """
+        Args:
+            refresh (callable): refresh(phones, restaurant_id) recomputes and
+                stores the profiles for a list of normalized phone numbers
+            batch_size (int): Maximum phones refreshed per transaction
+        """
+        self._refresh = refresh
+        self._batch_size = batch_size
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._backfill_claimed = False
+        self.stats = {'refreshed': 0, 'errors': 0}
+
+    def mark_dirty(self, phone_numbers, restaurant_id=None):
+        """Queue profiles for refresh (phone numbers in any format)"""
+        phones = {phone_digits(p) for p in phone_numbers if p}
+        phones = {p for p in phones if len(p) == 10}
+        if not phones:
+            return
+        self.start()
+        for phone in phones:
+            self._queue.put((restaurant_id, phone))
+
+    def _run(self):
+        while True:
+            pending = {self._queue.get()}
+            while len(pending) < self._batch_size:
+                try:
+                    pending.add(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            batches = {}
+            for restaurant_id, phone in pending:
+                batches.setdefault(restaurant_id, set()).add(phone)
+            for restaurant_id, phones in batches.items():
+                try:
+                    self._refresh(sorted(phones), restaurant_id)
+                    self.stats['refreshed'] += len(phones)
+                except Exception as e:
+                    self.stats['errors'] += 1
+                    print(f"ERROR: Customer profile refresh failed for {len(phones)} customers: {e}")
+
+    def start(self):
+        """Start the refresh worker; returns False if it was already running"""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return False
+            self._thread = threading.Thread(target=self._run, name='customer-profiles', daemon=True)
+            self._thread.start()
+            return True
+
+    def claim_backfill(self):
+        """True only for the first caller, so the startup backfill check runs once per process"""
+        with self._lock:
+            if self._backfill_claimed:
+                return False
+            self._backfill_claimed = True
+            return True
+
+
+_updater = None
+_updater_lock = threading.Lock()
+
+
+def get_customer_profile_updater(refresh=None):
+    """Return the process-wide profile updater; app.py registers the refresh function"""
+    global _updater
+    with _updater_lock:
+        if _updater is None:
+            if refresh is None:
+                return None
+            _updater = CustomerProfileUpdater(refresh)
+        return _updater
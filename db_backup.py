@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Online SQLite backups for Bobby's Table Restaurant
+Copies the live database with sqlite3's backup API a few pages at a time,
+pausing between steps so writers keep getting the database lock, then
+(optionally) gzips the snapshot and rotates old ones. Safe during service hours.
+
+Usage:
+    python db_backup.py backup              # back up instance/restaurant.db
+    python db_backup.py list
+    python db_backup.py restore <snapshot>  # restore into instance/restaurant.db
+"""
+
+import gzip
+import hashlib
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+
+DEFAULT_DATABASE = os.path.join('instance', 'restaurant.db')
+BACKUP_DIR = os.getenv('BACKUP_DIR', os.path.join('instance', 'backups'))
+BACKUP_KEEP = int(os.getenv('BACKUP_KEEP', '7'))
+BACKUP_COMPRESS = os.getenv('BACKUP_COMPRESS', 'true').lower() == 'true'
+# Pages copied per step and the pause after each step; a step holds the read lock
+BACKUP_PAGES_PER_STEP = int(os.getenv('BACKUP_PAGES_PER_STEP', '256'))
+BACKUP_STEP_PAUSE = float(os.getenv('BACKUP_STEP_PAUSE', '0.02'))
+BACKUP_INTERVAL_HOURS = float(os.getenv('BACKUP_INTERVAL_HOURS', '24'))
+
+# A write through another connection restarts a paced copy from page one; after
+# a restart the copy is retried with bigger steps, and the last attempt is one step
+BACKUP_MAX_ATTEMPTS = 4
+
+SNAPSHOT_SUFFIXES = ('.db', '.db.gz')
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+def snapshot_name(database_path, when=None):
+    """'restaurant-20261018-213000.db' for instance/restaurant.db"""
+    stem = os.path.splitext(os.path.basename(database_path))[0]
+    return f"{stem}-{(when or datetime.now()).strftime('%Y%m%d-%H%M%S')}.db"
+
+
+def list_snapshots(backup_dir=BACKUP_DIR, database_path=DEFAULT_DATABASE):
+    """Snapshots of one database, newest first"""
+    if not os.path.isdir(backup_dir):
+        return []
+    stem = os.path.splitext(os.path.basename(database_path))[0] + '-'
+    snapshots = [
+        os.path.join(backup_dir, name) for name in os.listdir(backup_dir)
+        if name.startswith(stem) and name.endswith(SNAPSHOT_SUFFIXES)
+    ]
+    return sorted(snapshots, reverse=True)
+
+
+def rotate_snapshots(backup_dir=BACKUP_DIR, database_path=DEFAULT_DATABASE, keep=BACKUP_KEEP):
+    """Delete all but the newest `keep` snapshots; returns the deleted paths"""
+    removed = list_snapshots(backup_dir, database_path)[keep:]
+    for path in removed:
+        os.remove(path)
+    return removed
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(COPY_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _quick_check(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute('PRAGMA quick_check').fetchone()[0]
+    finally:
+        conn.close()
+
+
+class _CopyRestarted(Exception):
+    """The source changed mid-copy and SQLite started the backup over"""
+
+
+def backup_database(database_path=DEFAULT_DATABASE, backup_dir=BACKUP_DIR, compress=BACKUP_COMPRESS,
+                    keep=BACKUP_KEEP, pages=BACKUP_PAGES_PER_STEP, pause=BACKUP_STEP_PAUSE):
+    """
+    Take a consistent snapshot of a live SQLite database.
+
+    Args:
+        database_path (str): Database to back up
+        backup_dir (str): Directory that holds the rotating snapshots
+        compress (bool): Gzip the snapshot (streamed, not read into memory)
+        keep (int): Snapshots to keep after this one is written
+        pages (int): Pages copied per step
+        pause (float): Seconds to sleep between steps so writers can commit
+
+    Returns:
+        dict: Snapshot path and metrics (duration, pages per second, the longest
+        step the source was locked for, i.e. the worst writer stall, and restarts
+        caused by concurrent writes)
+    """
+    os.makedirs(backup_dir, exist_ok=True)
+    target = os.path.join(backup_dir, snapshot_name(database_path))
+    partial = target + '.partial'
+
+    metrics = {'steps': 0, 'restarts': 0, 'max_step_ms': 0.0, 'locked_ms': 0.0, 'paused_ms': 0.0}
+    state = {'remaining': None, 'step_started': None, 'final': False}
+
+    def progress(status, remaining, total):
+        # Called after each step; the time since the last step began is how
+        # long the source's read lock was held
+        step_ms = (time.perf_counter() - state['step_started']) * 1000
+        metrics['steps'] += 1
+        metrics['locked_ms'] += step_ms
+        metrics['max_step_ms'] = max(metrics['max_step_ms'], step_ms)
+        metrics['pages'] = total
+        # A write through another connection restarts the copy from page one;
+        # give up on this pace rather than chasing a busy writer forever
+        if state['remaining'] is not None and remaining > state['remaining']:
+            metrics['restarts'] += 1
+            if not state['final']:
+                raise _CopyRestarted()
+        state['remaining'] = remaining
+        if remaining and pause:
+            time.sleep(pause)
+            metrics['paused_ms'] += pause * 1000
+        state['step_started'] = time.perf_counter()
+
+    started = time.perf_counter()
+    for attempt in range(1, BACKUP_MAX_ATTEMPTS + 1):
+        state.update(remaining=None, final=attempt == BACKUP_MAX_ATTEMPTS)
+        metrics['attempts'] = attempt
+        step_pages = -1 if state['final'] else pages * 4 ** (attempt - 1)
+        source = sqlite3.connect(database_path, timeout=30)
+        destination = sqlite3.connect(partial)
+        try:
+            state['step_started'] = time.perf_counter()
+            source.backup(destination, pages=step_pages, progress=progress)
+            break
+        except _CopyRestarted:
+            continue
+        finally:
+            destination.close()
+            source.close()
+    copy_seconds = time.perf_counter() - started
+
+    integrity = _quick_check(partial)
+    if integrity != 'ok':
+        os.remove(partial)
+        raise RuntimeError(f"Backup of {database_path} failed integrity check: {integrity}")
+
+    if compress:
+        target += '.gz'
+        with open(partial, 'rb') as raw, gzip.open(target + '.partial', 'wb', compresslevel=6) as packed:
+            shutil.copyfileobj(raw, packed, COPY_CHUNK_SIZE)
+        os.remove(partial)
+        partial = target + '.partial'
+    os.replace(partial, target)
+
+    duration = time.perf_counter() - started
+    pages_copied = metrics.get('pages', 0)
+    metrics.update({
+        'database': database_path,
+        'path': target,
+        'size_bytes': os.path.getsize(target),
+        'sha256': _sha256(target),
+        'compressed': compress,
+        'duration_seconds': round(duration, 3),
+        'copy_seconds': round(copy_seconds, 3),
+        'pages_per_second': round(pages_copied / copy_seconds, 1) if copy_seconds else None,
+        'max_step_ms': round(metrics['max_step_ms'], 2),
+        'locked_ms': round(metrics['locked_ms'], 2),
+        'paused_ms': round(metrics['paused_ms'], 2),
+        'finished_at': datetime.now().isoformat(),
+        'rotated': rotate_snapshots(backup_dir, database_path, keep)
+    })
+    return metrics
+
+
+def restore_database(snapshot_path, database_path=DEFAULT_DATABASE):
+    """
+    Restore a snapshot (plain or gzipped) over a database.
+
+    The snapshot is checked first, then copied in with the backup API so the
+    target is replaced in one locked step instead of being overwritten on disk
+    under any open connections.
+    """
+    with tempfile.TemporaryDirectory() as workdir:
+        source_path = snapshot_path
+        if snapshot_path.endswith('.gz'):
+            source_path = os.path.join(workdir, 'restore.db')
+            with gzip.open(snapshot_path, 'rb') as packed, open(source_path, 'wb') as raw:
+                shutil.copyfileobj(packed, raw, COPY_CHUNK_SIZE)
+
+        integrity = _quick_check(source_path)
+        if integrity != 'ok':
+            raise RuntimeError(f"Snapshot {snapshot_path} failed integrity check: {integrity}")
+
+        os.makedirs(os.path.dirname(os.path.abspath(database_path)), exist_ok=True)
+        source = sqlite3.connect(source_path)
+        target = sqlite3.connect(database_path, timeout=30)
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
+    return database_path
+
+
+class BackupScheduler:
+    """Runs backups of one or more databases on an interval and keeps the last metrics"""
+
+    def __init__(self, database_paths, interval_hours=BACKUP_INTERVAL_HOURS, backup_dir=BACKUP_DIR):
+        """
+        Args:
+            database_paths (callable): Returns the database files to back up
+            interval_hours (float): Hours between backups
+            backup_dir (str): Directory that holds the rotating snapshots
+        """
+        self._database_paths = database_paths
+        self._interval = interval_hours * 3600
+        self.backup_dir = backup_dir
+        self._thread = None
+        self._lock = threading.Lock()
+        self._run_lock = threading.Lock()
+        self.last_results = {}
+        self.stats = {'backups': 0, 'errors': 0}
+
+    def run_once(self):
+        """Back up every database now (one at a time); returns the metrics per database"""
+        results = {}
+        with self._run_lock:
+            for path in self._database_paths():
+                try:
+                    results[path] = backup_database(path, self.backup_dir)
+                    self.stats['backups'] += 1
+                    print(f"💾 Backed up {path} -> {results[path]['path']} "
+                          f"({results[path]['duration_seconds']}s, {results[path]['pages_per_second']} pages/s, "
+                          f"max lock {results[path]['max_step_ms']}ms)")
+                except Exception as e:
+                    self.stats['errors'] += 1
+                    results[path] = {'database': path, 'error': str(e), 'finished_at': datetime.now().isoformat()}
+                    print(f"ERROR: Backup of {path} failed: {e}")
+            self.last_results.update(results)
+        return results
+
+    def _run(self):
+        while True:
+            time.sleep(self._interval)
+            self.run_once()
+
+    def start(self):
+        """Start the backup thread; returns False if it was already running"""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return False
+            self._thread = threading.Thread(target=self._run, name='db-backup', daemon=True)
+            self._thread.start()
+            return True
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_backup_scheduler(database_paths=None):
+    """Return the process-wide backup scheduler; app.py registers the database list"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            if database_paths is None:
+                return None
+            _scheduler = BackupScheduler(database_paths)
+        return _scheduler
+
+
+def main(argv):
+    command = argv[1] if len(argv) > 1 else 'backup'
+    if command == 'backup':
+        database_path = argv[2] if len(argv) > 2 else DEFAULT_DATABASE
+        result = backup_database(database_path)
+        print(f"✅ Backup written to {result['path']}")
+        for key in ('duration_seconds', 'pages', 'pages_per_second', 'max_step_ms', 'restarts', 'size_bytes'):
+            print(f"   {key}: {result.get(key)}")
+    elif command == 'list':
+        database_path = argv[2] if len(argv) > 2 else DEFAULT_DATABASE
+        for path in list_snapshots(BACKUP_DIR, database_path):
+            print(f"{path}  ({os.path.getsize(path)} bytes)")
+    elif command == 'restore' and len(argv) > 2:
+        database_path = argv[3] if len(argv) > 3 else DEFAULT_DATABASE
+        restore_database(argv[2], database_path)
+        print(f"✅ Restored {argv[2]} into {database_path}")
+    else:
+        print(__doc__)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
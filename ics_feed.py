@@ -0,0 +1,122 @@
+"""
+iCalendar (ICS) feed for Bobby's Table Restaurant
+Renders reservations as RFC 5545 VEVENTs, one row at a time, so the feed can be
+streamed straight from a range query.
+"""
+
+import hashlib
+from datetime import datetime, timedelta
+
+
+# Bump when the rendered event format changes so cached feeds are refetched
+ICS_FORMAT_VERSION = '1'
+
+# Reservations are assumed to last two hours (same as the web calendar)
+RESERVATION_DURATION = timedelta(hours=2)
+
+_ICS_STATUS = {
+    'confirmed': 'CONFIRMED',
+    'cancelled': 'CANCELLED',
+    'pending': 'TENTATIVE'
+}
+
+
+def escape_text(value):
+    """Escape a TEXT value (backslash, semicolon, comma and newlines)"""
+    return (
+        str(value or '')
+        .replace('\\', '\\\\')
+        .replace(';', '\\;')
+        .replace(',', '\\,')
+        .replace('\r\n', '\\n')
+        .replace('\n', '\\n')
+    )
+
+
+def fold_line(line):
+    """Fold a content line at 75 octets as required by RFC 5545"""
+    encoded = line.encode('utf-8')
+    if len(encoded) <= 75:
+        return line + '\r\n'
+
+    parts = []
+    limit = 75
+    while encoded:
+        # Don't split inside a multi-byte UTF-8 sequence
+        cut = min(limit, len(encoded))
+        while cut < len(encoded) and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(encoded[:cut].decode('utf-8'))
+        encoded = encoded[cut:]
+        limit = 74  # Continuation lines start with a space
+    return '\r\n '.join(parts) + '\r\n'
+
+
+def feed_etag(*parts):
+    """Strong ETag for a feed built from the given version parts"""
+    digest = hashlib.sha1('|'.join(str(p) for p in (ICS_FORMAT_VERSION,) + parts).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _ics_datetime(value):
+    return value.strftime('%Y%m%dT%H%M%S')
+
+
+def calendar_header(calendar_name):
+    yield fold_line('BEGIN:VCALENDAR')
+    yield fold_line('VERSION:2.0')
+    yield fold_line("PRODID:-//Bobby's Table//Reservations//EN")
+    yield fold_line('CALSCALE:GREGORIAN')
+    yield fold_line('METHOD:PUBLISH')
+    yield fold_line(f'X-WR-CALNAME:{escape_text(calendar_name)}')
+
+
+def calendar_footer():
+    yield fold_line('END:VCALENDAR')
+
+
+def reservation_event(row, host='bobbystable'):
+    """
+    Render one reservation as a VEVENT.
+
+    Args:
+        row: Object with id, reservation_number, name, party_size, date, time,
+            phone_number, status, special_requests, created_at and updated_at
+        host (str): Domain part of the event UID
+
+    Returns:
+        str: The VEVENT block, or '' if the row has an unparseable date/time
+    """
+    try:
+        start = datetime.strptime(f"{row.date} {row.time}", "%Y-%m-%d %H:%M")
+    except (TypeError, ValueError):
+        return ''
+
+    status = row.status or 'confirmed'
+    party_text = "person" if row.party_size == 1 else "people"
+    summary = f"{row.name} ({row.party_size} {party_text})"
+    if status == 'cancelled':
+        summary = f"[CANCELLED] {summary}"
+
+    description = [
+        f"Reservation #{row.reservation_number}",
+        f"Party size: {row.party_size}",
+        f"Phone: {row.phone_number}"
+    ]
+    if row.special_requests:
+        description.append(f"Special requests: {row.special_requests}")
+
+    stamp = row.updated_at or row.created_at or start
+    lines = [
+        'BEGIN:VEVENT',
+        f'UID:reservation-{row.id}@{host}',
+        f'DTSTAMP:{_ics_datetime(stamp)}Z',
+        f'DTSTART:{_ics_datetime(start)}',
+        f'DTEND:{_ics_datetime(start + RESERVATION_DURATION)}',
+        f'SUMMARY:{escape_text(summary)}',
+        f'DESCRIPTION:{escape_text(chr(10).join(description))}',
+        f'STATUS:{_ICS_STATUS.get(status, "CONFIRMED")}',
+        f'LAST-MODIFIED:{_ics_datetime(stamp)}Z',
+        'END:VEVENT'
+    ]
+    return ''.join(fold_line(line) for line in lines)
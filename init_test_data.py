@@ -1,5 +1,6 @@
 from app import app, db
-from models import Reservation, Table, MenuItem, Order, OrderItem
+from models import Reservation, Table, MenuItem, MenuItemAlias, Order, OrderItem
+from menu_matcher import seed_alias_rows
 from datetime import datetime, timedelta
 import random
 
@@ -33,6 +34,7 @@ def init_test_data():
         Order.query.delete()
         Reservation.query.delete()
         Table.query.delete()
+        MenuItemAlias.query.delete()
         MenuItem.query.delete()
 
         # Add test tables
@@ -739,6 +741,11 @@ def populate_menu_items():
         db.session.add(menu_item)  # Use add instead of merge since IDs are generated
     db.session.commit()
 
+    # Stock aliases for the conversation matcher ("coke", "wings", ...)
+    for row in seed_alias_rows(MenuItem.query.all()):
+        db.session.add(MenuItemAlias(**row))
+    db.session.commit()
+
 def create_demo_reservation_with_party_orders():
     """Create a demo reservation with party orders"""
     reservation = Reservation(
@@ -872,7 +879,7 @@ def create_additional_demo_reservations():
 
 def clear_existing_data():
     """Clear existing data from all tables"""
-    from models import OrderItem, Order, Reservation, MenuItem, Table, db
+    from models import OrderItem, Order, Reservation, MenuItem, MenuItemAlias, Table, db
 
     try:
         # Delete in order to respect foreign key constraints
@@ -880,6 +887,7 @@ def clear_existing_data():
         Order.query.delete()
         Reservation.query.delete()
         Table.query.delete()
+        MenuItemAlias.query.delete()
         MenuItem.query.delete()
         db.session.commit()
         print("Existing data cleared.")
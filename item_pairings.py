@@ -0,0 +1,323 @@
+"""
+Item pairings for Bobby's Table Restaurant
+Which menu items guests order together, from an item-by-item co-occurrence
+matrix over past orders. The matrix is rebuilt nightly with vectorized NumPy
+(one-hot orders times their transpose, a chunk of orders at a time) and patched
+order by order from the ORM change feed by a background worker, which then
+recomputes the best pairings of each item into a top-k table. Reads only look
+up the last published table, so "goes well with" answers and surprise picks
+are O(k) lookups on the call path.
+"""
+
+import os
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from locations import DEFAULT_RESTAURANT_ID, current_restaurant_id, use_location
+
+
+# Local hour of the nightly full rebuild
+PAIRINGS_REBUILD_HOUR = int(os.getenv('PAIRINGS_REBUILD_HOUR', '3'))
+# Pairings kept per item
+PAIRINGS_TOP_K = 5
+# Pairs seen together in fewer orders than this are noise, not a pairing
+MIN_PAIR_ORDERS = 2
+# Orders one-hot encoded per matrix product during a rebuild
+REBUILD_CHUNK_ORDERS = 4096
+
+# score: cosine similarity of the two items' order vectors; orders: how many orders had both
+Pairing = namedtuple('Pairing', ['menu_item_id', 'score', 'orders'])
+
+
+def _group(rows):
+    orders = {}
+    for order_id, menu_item_id in rows:
+        orders.setdefault(order_id, set()).add(menu_item_id)
+    return orders
+
+
+def cooccurrence_counts(order_columns, size, chunk=REBUILD_CHUNK_ORDERS):
+    """
+    Item-by-item co-occurrence counts of a list of orders.
+
+    Args:
+        order_columns (list): One sequence of distinct item columns per order
+        size (int): Number of item columns
+
+    Returns:
+        numpy.ndarray: size x size counts; [i, j] orders containing both i and j,
+        [i, i] orders containing i
+    """
+    counts = np.zeros((size, size), dtype=np.int64)
+    for start in range(0, len(order_columns), chunk):
+        batch = order_columns[start:start + chunk]
+        lengths = np.fromiter((len(columns) for columns in batch), dtype=np.int64, count=len(batch))
+        rows = np.repeat(np.arange(len(batch)), lengths)
+        columns = np.fromiter((column for order in batch for column in order), dtype=np.int64, count=int(lengths.sum()))
+        one_hot = np.zeros((len(batch), size), dtype=np.float32)
+        one_hot[rows, columns] = 1.0
+        # Exact in float32: no count in a chunk exceeds the chunk size
+        counts += (one_hot.T @ one_hot).astype(np.int64)
+    return counts
+
+
+def top_pairings(counts, item_ids, k=PAIRINGS_TOP_K, min_orders=MIN_PAIR_ORDERS):
+    """menu_item_id -> tuple of its k best Pairing, computed for every item at once"""
+    size = len(item_ids)
+    if size < 2:
+        return {}
+    totals = np.diag(counts).astype(np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scores = counts / np.sqrt(np.outer(totals, totals))
+    scores = np.nan_to_num(scores)
+    scores[counts < min_orders] = 0.0
+    np.fill_diagonal(scores, 0.0)
+
+    k = min(k, size - 1)
+    best = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    best_scores = np.take_along_axis(scores, best, axis=1)
+    order = np.argsort(-best_scores, axis=1, kind='stable')
+    best = np.take_along_axis(best, order, axis=1)
+
+    table = {}
+    for row, columns in enumerate(best):
+        pairings = tuple(
+            Pairing(item_ids[column], round(float(scores[row, column]), 3), int(counts[row, column]))
+            for column in columns if scores[row, column] > 0
+        )
+        if pairings:
+            table[item_ids[row]] = pairings
+    return table
+
+
+class ItemPairings:
+    """
+    Co-occurrence counts and top-k pairings for one location's orders.
+
+    The loader returns (order_id, menu_item_id) rows, one per item of each
+    order that will be served, for every order or only the given ones. Only
+    rebuild() and the change worker touch the counts (one at a time, under the
+    rebuild lock); readers get the published table, which is replaced whole.
+    """
+
+    def __init__(self, loader, restaurant_id=DEFAULT_RESTAURANT_ID, top_k=PAIRINGS_TOP_K):
+        """
+        Args:
+            loader (callable): loader(order_ids=None) -> rows
+            restaurant_id (str): Location whose orders the pairings come from
+            top_k (int): Pairings kept per item
+        """
+        self._loader = loader
+        self.restaurant_id = restaurant_id
+        self.top_k = top_k
+        self._lock = threading.Lock()
+        self._rebuild_lock = threading.Lock()
+        self._item_ids = []
+        self._columns = {}
+        self._counts = np.zeros((0, 0), dtype=np.int64)
+        self._order_columns = {}
+        self._table = {}
+        self._pending = set()
+        self._pending_event = threading.Event()
+        self._thread = None
+        self.built_at = None
+        self.version = 0
+        self.stats = {'rebuilds': 0, 'orders_applied': 0, 'reads': 0, 'errors': 0}
+
+    def rebuild(self, if_missing=False):
+        """Recount every order from scratch (at startup and nightly; with if_missing only if never built)"""
+        with self._rebuild_lock:
+            if if_missing and self.built_at is not None:
+                return
+            with self._lock:
+                # Changes committed while we load stay pending and are replayed after
+                self._pending.clear()
+            started = time.perf_counter()
+            with use_location(self.restaurant_id):
+                orders = _group(self._loader())
+
+            item_ids = sorted({menu_item_id for items in orders.values() for menu_item_id in items})
+            columns = {menu_item_id: column for column, menu_item_id in enumerate(item_ids)}
+            order_columns = {
+                order_id: tuple(sorted(columns[menu_item_id] for menu_item_id in items))
+                for order_id, items in orders.items()
+            }
+            counts = cooccurrence_counts(list(order_columns.values()), len(item_ids))
+            table = top_pairings(counts, item_ids, self.top_k)
+
+            with self._lock:
+                self._item_ids, self._columns = item_ids, columns
+                self._counts, self._order_columns = counts, order_columns
+                self._table = table
+                self.built_at = datetime.now()
+                self.version += 1
+                self.stats['rebuilds'] += 1
+            print(f"🍷 Rebuilt item pairings for {self.restaurant_id}: {len(order_columns)} orders, "
+                  f"{len(item_ids)} items in {time.perf_counter() - started:.2f}s")
+
+    def notify_changes(self, order_ids):
+        """Record orders touched by a commit; the change worker recounts their items"""
+        if not order_ids:
+            return
+        with self._lock:
+            # Nothing built or building yet: the first build counts current rows anyway
+            if self.built_at is None and not self._rebuild_lock.locked():
+                return
+            self._pending.update(order_ids)
+        self._wake()
+
+    def _column(self, menu_item_id):
+        column = self._columns.get(menu_item_id)
+        if column is None:
+            column = len(self._item_ids)
+            self._item_ids.append(menu_item_id)
+            self._columns[menu_item_id] = column
+            self._counts = np.pad(self._counts, ((0, 1), (0, 1)))
+        return column
+
+    def apply_pending(self):
+        """Swap the contribution of each changed order for its current items and publish a new table"""
+        with self._rebuild_lock:
+            with self._lock:
+                if self.built_at is None or not self._pending:
+                    return
+                order_ids, self._pending = self._pending, set()
+            with use_location(self.restaurant_id):
+                orders = _group(self._loader(order_ids=order_ids))
+            self._apply(order_ids, orders)
+
+    def _apply(self, order_ids, orders):
+        # Called with the rebuild lock held: the counts have no other writer
+        changed = False
+        for order_id in order_ids:
+            old = self._order_columns.pop(order_id, ())
+            new = tuple(sorted(self._column(menu_item_id) for menu_item_id in orders.get(order_id, ())))
+            if new:
+                self._order_columns[order_id] = new
+            if old == new:
+                continue
+            if old:
+                self._counts[np.ix_(old, old)] -= 1
+            if new:
+                self._counts[np.ix_(new, new)] += 1
+            changed = True
+        self.stats['orders_applied'] += len(order_ids)
+        if changed:
+            table = top_pairings(self._counts, self._item_ids, self.top_k)
+            with self._lock:
+                self._table = table
+                self.version += 1
+
+    def _change_worker(self):
+        while True:
+            self._pending_event.wait()
+            self._pending_event.clear()
+            try:
+                self.rebuild(if_missing=True)
+                self.apply_pending()
+            except Exception as e:
+                self.stats['errors'] += 1
+                print(f"ERROR: Item pairings update for {self.restaurant_id} failed: {e}")
+
+    def start(self):
+        """Start the change worker; returns False if it was already running"""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return False
+            self._thread = threading.Thread(target=self._change_worker, name=f"item-pairings-{self.restaurant_id}", daemon=True)
+            self._thread.start()
+            return True
+
+    def _wake(self):
+        self.start()
+        self._pending_event.set()
+
+    def _read(self):
+        if self.built_at is None:
+            # The worker builds it; until then there are no pairings to suggest
+            self._wake()
+        with self._lock:
+            self.stats['reads'] += 1
+            return self._table
+
+    def pairings_for(self, menu_item_id, limit=None):
+        """Best pairings of one item, best first (empty if it has none yet)"""
+        pairings = self._read().get(menu_item_id, ())
+        return pairings[:limit] if limit else pairings
+
+    def suggest(self, menu_item_ids, exclude=(), limit=3):
+        """
+        Items that go well with a set of items, from their precomputed pairings.
+
+        Scores of an item paired with several of the given items add up; the
+        given items and anything in `exclude` are never suggested.
+
+        Returns:
+            list: Pairing, best first
+        """
+        table = self._read()
+        skip = set(menu_item_ids) | set(exclude)
+        scores, orders = {}, {}
+        for menu_item_id in menu_item_ids:
+            for pairing in table.get(menu_item_id, ()):
+                if pairing.menu_item_id in skip:
+                    continue
+                scores[pairing.menu_item_id] = scores.get(pairing.menu_item_id, 0.0) + pairing.score
+                orders[pairing.menu_item_id] = orders.get(pairing.menu_item_id, 0) + pairing.orders
+        ranked = sorted(scores, key=lambda menu_item_id: (-scores[menu_item_id], -orders[menu_item_id], menu_item_id))
+        return [Pairing(menu_item_id, round(scores[menu_item_id], 3), orders[menu_item_id]) for menu_item_id in ranked[:limit]]
+
+    def status(self):
+        """Build time and size, for the admin endpoint"""
+        with self._lock:
+            return {
+                'restaurant_id': self.restaurant_id,
+                'built_at': self.built_at.isoformat() if self.built_at else None,
+                'version': self.version,
+                'orders': len(self._order_columns),
+                'items': len(self._item_ids),
+                'pending_orders': len(self._pending),
+                'stats': dict(self.stats)
+            }
+
+
+def seconds_until_rebuild(now=None, hour=PAIRINGS_REBUILD_HOUR):
+    """Seconds from now to the next nightly rebuild"""
+    now = now or datetime.now()
+    next_run = now.replace(hour=hour, minute=0, second=0, microsecond=0)
+    if next_run <= now:
+        next_run += timedelta(days=1)
+    return (next_run - now).total_seconds()
+
+
+_loader = None
+_pairings = {}
+_pairings_lock = threading.Lock()
+
+
+def register_item_pairings_loader(loader):
+    """Register the database loader (app.py) used for every location's pairings"""
+    global _loader
+    with _pairings_lock:
+        _loader = loader
+
+
+def get_item_pairings(restaurant_id=None):
+    """Return a location's pairings (default: the current location); None until a loader is registered"""
+    restaurant_id = restaurant_id or current_restaurant_id() or DEFAULT_RESTAURANT_ID
+    with _pairings_lock:
+        if restaurant_id not in _pairings:
+            if _loader is None:
+                return None
+            _pairings[restaurant_id] = ItemPairings(_loader, restaurant_id=restaurant_id)
+        return _pairings[restaurant_id]
+
+
+def all_item_pairings():
+    """Every location's pairings created so far"""
+    with _pairings_lock:
+        return list(_pairings.values())
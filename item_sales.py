@@ -0,0 +1,359 @@
+"""
+Item sales rollup for Bobby's Table Restaurant
+Units sold of each menu item per day and daypart (breakfast, lunch, dinner) over
+the last few weeks. A background worker loads the rollup with one grouped query
+and then patches it order by order from the ORM change feed, and ranked top
+sellers are cached per date range and daypart, so "what's popular" and "what's
+selling tonight" are answered from memory without touching order_items on the
+call path.
+"""
+
+import os
+import threading
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+from locations import DEFAULT_RESTAURANT_ID, current_restaurant_id, use_location
+
+
+# Dayparts by local order time: name, first minute, end minute (exclusive)
+DAYPARTS = (
+    ('breakfast', 0, 11 * 60),
+    ('lunch', 11 * 60, 16 * 60),
+    ('dinner', 16 * 60, 24 * 60),
+)
+DAYPART_NAMES = tuple(name for name, _, _ in DAYPARTS)
+# Days of sales kept in the rollup
+SALES_ROLLUP_DAYS = int(os.getenv('SALES_ROLLUP_DAYS', '28'))
+# Days the current daypart is compared against for velocity
+VELOCITY_TRAILING_DAYS = 7
+
+# quantity: units sold; orders: orders that had the item
+Seller = namedtuple('Seller', ['menu_item_id', 'quantity', 'orders'])
+
+
+def daypart_for(time):
+    """Daypart of an 'HH:MM' string or a datetime/time"""
+    if isinstance(time, str):
+        hours, minutes = time[:5].split(':')
+        minute = int(hours) * 60 + int(minutes)
+    else:
+        minute = time.hour * 60 + time.minute
+    for name, start, end in DAYPARTS:
+        if start <= minute < end:
+            return name
+    return DAYPARTS[-1][0]
+
+
+def _sold_at(target_date, target_time, created_at):
+    # Orders are counted when they are served; walk-in rows without a target fall back to creation
+    if target_date:
+        try:
+            return target_date, daypart_for(target_time or '12:00')
+        except ValueError:
+            return target_date, 'lunch'
+    if created_at:
+        return created_at.strftime('%Y-%m-%d'), daypart_for(created_at)
+    return None, None
+
+
+class ItemSales:
+    """
+    Per-day, per-daypart item sales of one location.
+
+    The loader returns rows of (order_id, target_date, target_time, created_at,
+    menu_item_id, quantity), one per order and menu item of orders that will be
+    served, for every order sold since a date or only for the given orders.
+    Only roll_window() and the change worker query it (one at a time, under
+    the update lock); readers use the rollup last published under the lock.
+    """
+
+    def __init__(self, loader, restaurant_id=DEFAULT_RESTAURANT_ID, days=SALES_ROLLUP_DAYS):
+        """
+        Args:
+            loader (callable): loader(since=None, order_ids=None) -> rows
+            restaurant_id (str): Location whose sales these are
+            days (int): Days of sales kept
+        """
+        self._loader = loader
+        self.restaurant_id = restaurant_id
+        self.days = days
+        self._lock = threading.Lock()
+        self._update_lock = threading.Lock()
+        self._orders = {}   # order_id -> (date, daypart, {menu_item_id: quantity})
+        self._rollup = {}   # (date, daypart) -> {menu_item_id: [quantity, orders]}
+        self._ranked = {}   # (first date, last date, daypart) -> (totals, ranked Sellers)
+        self._since = None
+        self._pending = set()
+        self._pending_event = threading.Event()
+        self._thread = None
+        self.version = 0
+        self.stats = {'loads': 0, 'orders_applied': 0, 'reads': 0, 'ranking_hits': 0, 'rankings': 0, 'errors': 0}
+
+    def _group(self, rows):
+        orders = {}
+        for order_id, target_date, target_time, created_at, menu_item_id, quantity in rows:
+            date, daypart = _sold_at(target_date, target_time, created_at)
+            if date is None:
+                continue
+            _, _, items = orders.setdefault(order_id, (date, daypart, {}))
+            items[menu_item_id] = items.get(menu_item_id, 0) + (quantity or 0)
+        return orders
+
+    @staticmethod
+    def _add(rollup, order, sign):
+        date, daypart, items = order
+        bucket = rollup.setdefault((date, daypart), {})
+        for menu_item_id, quantity in items.items():
+            totals = bucket.setdefault(menu_item_id, [0, 0])
+            totals[0] += sign * quantity
+            totals[1] += sign
+            if totals[1] <= 0:
+                del bucket[menu_item_id]
+        if not bucket:
+            del rollup[(date, daypart)]
+
+    def _forget_ranked(self, dates):
+        for key in [key for key in self._ranked if any(key[0] <= date <= key[1] for date in dates)]:
+            del self._ranked[key]
+
+    def _window_start(self, today):
+        return (today - timedelta(days=self.days - 1)).strftime('%Y-%m-%d')
+
+    def roll_window(self, today=None):
+        """Load the rollup if it never was; afterwards drop days that fell out of the window"""
+        today = today or datetime.now()
+        since = self._window_start(today)
+        with self._update_lock:
+            if self._since is None:
+                with self._lock:
+                    # Changes committed while we load stay pending and are replayed after
+                    self._pending.clear()
+                with use_location(self.restaurant_id):
+                    orders = self._group(self._loader(since=since))
+                rollup = {}
+                for order in orders.values():
+                    self._add(rollup, order, 1)
+                with self._lock:
+                    self._orders, self._rollup, self._ranked = orders, rollup, {}
+                    self._since = since
+                    self.version += 1
+                    self.stats['loads'] += 1
+            elif since > self._since:
+                with self._lock:
+                    for key in [key for key in self._rollup if key[0] < since]:
+                        del self._rollup[key]
+                    for order_id in [order_id for order_id, order in self._orders.items() if order[0] < since]:
+                        del self._orders[order_id]
+                    self._ranked = {key: value for key, value in self._ranked.items() if key[0] >= since}
+                    self._since = since
+
+    def notify_changes(self, order_ids):
+        """Record orders touched by a commit; the change worker recounts their items"""
+        if not order_ids:
+            return
+        with self._lock:
+            # Nothing loaded or loading yet: the first load counts current rows anyway
+            if self._since is None and not self._update_lock.locked():
+                return
+            self._pending.update(order_ids)
+        self._wake()
+
+    def apply_pending(self):
+        """Swap the counts of each changed order for its current items (one indexed lookup by order id)"""
+        with self._update_lock:
+            with self._lock:
+                if self._since is None or not self._pending:
+                    return
+                order_ids, self._pending = self._pending, set()
+            with use_location(self.restaurant_id):
+                orders = self._group(self._loader(order_ids=order_ids))
+
+            with self._lock:
+                changed_dates = set()
+                for order_id in order_ids:
+                    old = self._orders.pop(order_id, None)
+                    new = orders.get(order_id)
+                    if new and new[0] < self._since:
+                        new = None
+                    if new:
+                        self._orders[order_id] = new
+                    if old == new:
+                        continue
+                    for order, sign in ((old, -1), (new, 1)):
+                        if order:
+                            self._add(self._rollup, order, sign)
+                            changed_dates.add(order[0])
+                self.stats['orders_applied'] += len(order_ids)
+                if changed_dates:
+                    self._forget_ranked(changed_dates)
+                    self.version += 1
+
+    def _change_worker(self):
+        while True:
+            self._pending_event.wait()
+            self._pending_event.clear()
+            try:
+                self.roll_window()
+                self.apply_pending()
+            except Exception as e:
+                self.stats['errors'] += 1
+                print(f"ERROR: Item sales update for {self.restaurant_id} failed: {e}")
+
+    def start(self):
+        """Start the change worker; returns False if it was already running"""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return False
+            self._thread = threading.Thread(target=self._change_worker, name=f"item-sales-{self.restaurant_id}", daemon=True)
+            self._thread.start()
+            return True
+
+    def _wake(self):
+        self.start()
+        self._pending_event.set()
+
+    def _totals(self, first, last, daypart):
+        """Summed sales and their ranking for a date range and daypart (None: the whole day), cached"""
+        key = (first, last, daypart)
+        cached = self._ranked.get(key)
+        if cached is not None:
+            self.stats['ranking_hits'] += 1
+            return cached
+
+        totals = {}
+        dayparts = (daypart,) if daypart else DAYPART_NAMES
+        day = datetime.strptime(first, '%Y-%m-%d')
+        while day.strftime('%Y-%m-%d') <= last:
+            date = day.strftime('%Y-%m-%d')
+            for name in dayparts:
+                for menu_item_id, (quantity, orders) in self._rollup.get((date, name), {}).items():
+                    summed = totals.setdefault(menu_item_id, [0, 0])
+                    summed[0] += quantity
+                    summed[1] += orders
+            day += timedelta(days=1)
+        ranked = [
+            Seller(menu_item_id, quantity, orders)
+            for menu_item_id, (quantity, orders) in sorted(totals.items(), key=lambda entry: (-entry[1][0], -entry[1][1], entry[0]))
+        ]
+        self._ranked[key] = cached = (totals, ranked)
+        self.stats['rankings'] += 1
+        return cached
+
+    def _read(self, today):
+        with self._lock:
+            self.stats['reads'] += 1
+            stale = self._since is None or self._window_start(today) > self._since
+        if stale:
+            # The worker loads or rolls the window; until then reads use the last published rollup
+            self._wake()
+
+    def top_sellers(self, daypart=None, days=7, limit=5, today=None):
+        """
+        Best-selling items over the last `days` days, including today.
+
+        Args:
+            daypart (str): 'breakfast', 'lunch' or 'dinner'; None for the whole day
+            days (int): Days to cover, up to the rollup window
+            limit (int): Sellers returned (None for all)
+
+        Returns:
+            list: Seller, most units first
+        """
+        if daypart is not None and daypart not in DAYPART_NAMES:
+            raise ValueError(f"daypart must be one of {', '.join(DAYPART_NAMES)}")
+        today = today or datetime.now()
+        days = min(max(int(days), 1), self.days)
+        first = (today - timedelta(days=days - 1)).strftime('%Y-%m-%d')
+        self._read(today)
+        with self._lock:
+            _, ranked = self._totals(first, today.strftime('%Y-%m-%d'), daypart)
+            return ranked[:limit] if limit else list(ranked)
+
+    def velocity(self, now=None, limit=5, trailing_days=VELOCITY_TRAILING_DAYS):
+        """
+        What is selling in the current daypart, against the same daypart on previous days.
+
+        Returns:
+            dict: {'date', 'daypart', 'hours_elapsed', 'items': [{'menu_item_id',
+            'quantity', 'orders', 'per_hour', 'usual', 'pace'}]}; usual is the
+            average units per day in this daypart, pace is units so far over the
+            units usually sold by this point (None without history)
+        """
+        now = now or datetime.now()
+        daypart = daypart_for(now)
+        start, end = next((start, end) for name, start, end in DAYPARTS if name == daypart)
+        elapsed_minutes = max(now.hour * 60 + now.minute - start, 15)
+        fraction = min(elapsed_minutes / (end - start), 1.0)
+        trailing_days = min(trailing_days, self.days - 1)
+        date = now.strftime('%Y-%m-%d')
+
+        self._read(now)
+        with self._lock:
+            _, ranked = self._totals(date, date, daypart)
+            usual = {}
+            if trailing_days > 0:
+                usual, _ = self._totals(
+                    (now - timedelta(days=trailing_days)).strftime('%Y-%m-%d'),
+                    (now - timedelta(days=1)).strftime('%Y-%m-%d'),
+                    daypart
+                )
+
+            items = []
+            for seller in ranked[:limit] if limit else ranked:
+                usual_per_day = usual.get(seller.menu_item_id, (0, 0))[0] / trailing_days if trailing_days else 0
+                items.append({
+                    'menu_item_id': seller.menu_item_id,
+                    'quantity': seller.quantity,
+                    'orders': seller.orders,
+                    'per_hour': round(seller.quantity * 60 / elapsed_minutes, 2),
+                    'usual': round(usual_per_day, 2),
+                    'pace': round(seller.quantity / (usual_per_day * fraction), 2) if usual_per_day else None
+                })
+            return {
+                'date': date,
+                'daypart': daypart,
+                'hours_elapsed': round(elapsed_minutes / 60, 2),
+                'items': items
+            }
+
+    def status(self):
+        """Window and size, for the dashboard endpoint"""
+        with self._lock:
+            return {
+                'restaurant_id': self.restaurant_id,
+                'since': self._since,
+                'version': self.version,
+                'orders': len(self._orders),
+                'pending_orders': len(self._pending),
+                'stats': dict(self.stats)
+            }
+
+
+_loader = None
+_item_sales = {}
+_item_sales_lock = threading.Lock()
+
+
+def register_item_sales_loader(loader):
+    """Register the database loader (app.py) used for every location's sales rollup"""
+    global _loader
+    with _item_sales_lock:
+        _loader = loader
+
+
+def get_item_sales(restaurant_id=None):
+    """Return a location's sales rollup (default: the current location); None until a loader is registered"""
+    restaurant_id = restaurant_id or current_restaurant_id() or DEFAULT_RESTAURANT_ID
+    with _item_sales_lock:
+        if restaurant_id not in _item_sales:
+            if _loader is None:
+                return None
+            _item_sales[restaurant_id] = ItemSales(_loader, restaurant_id=restaurant_id)
+        return _item_sales[restaurant_id]
+
+
+def all_item_sales():
+    """Every location's sales rollup created so far"""
+    with _item_sales_lock:
+        return list(_item_sales.values())
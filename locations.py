@@ -0,0 +1,308 @@
+"""
+Multi-location support for Bobby's Table Restaurant
+Resolves which restaurant a request belongs to (by dialed number), partitions
+the ORM by restaurant_id, optionally routes a location to its own SQLite file,
+and keeps per-location caches so one busy site never evicts another's data.
+"""
+
+import contextvars
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from flask_sqlalchemy.session import Session as FlaskSession
+from sqlalchemy import create_engine
+
+
+DEFAULT_RESTAURANT_ID = os.getenv('DEFAULT_RESTAURANT_ID', 'main')
+
+# Restaurant the current request/thread works on; None means "all locations"
+_current_restaurant_id = contextvars.ContextVar('restaurant_id', default=None)
+
+
+class Location:
+    """A single restaurant location"""
+
+    def __init__(self, restaurant_id, name=None, phone_numbers=None, zip_code=None, database=None):
+        self.restaurant_id = restaurant_id
+        self.name = name or "Bobby's Table"
+        self.phone_numbers = [p for p in (phone_numbers or []) if p]
+        self.zip_code = zip_code
+        self.database = database  # Optional path to a per-location SQLite file
+
+    def to_dict(self):
+        return {
+            'restaurant_id': self.restaurant_id,
+            'name': self.name,
+            'phone_numbers': self.phone_numbers,
+            'zip_code': self.zip_code,
+            'database': self.database
+        }
+
+
+def _phone_key(phone_number):
+    return re.sub(r'\D', '', str(phone_number or ''))[-10:]
+
+
+def load_locations():
+    """
+    Load locations from RESTAURANT_LOCATIONS_FILE (JSON list) if set, otherwise
+    a single default location configured from the environment.
+    """
+    locations_file = os.getenv('RESTAURANT_LOCATIONS_FILE')
+    if locations_file and os.path.exists(locations_file):
+        with open(locations_file) as f:
+            entries = json.load(f)
+        locations = [Location(**entry) for entry in entries]
+        print(f"📍 Loaded {len(locations)} restaurant locations from {locations_file}")
+    else:
+        locations = [Location(
+            DEFAULT_RESTAURANT_ID,
+            phone_numbers=[os.getenv('SIGNALWIRE_FROM_NUMBER')],
+            zip_code=os.getenv('RESTAURANT_ZIP_CODE', '15222')
+        )]
+    return OrderedDict((location.restaurant_id, location) for location in locations)
+
+
+LOCATIONS = load_locations()
+_locations_by_phone = {
+    _phone_key(phone): location.restaurant_id
+    for location in LOCATIONS.values()
+    for phone in location.phone_numbers
+}
+
+
+def get_location(restaurant_id=None):
+    """Location for an id (default: the current one), falling back to the default location"""
+    restaurant_id = restaurant_id or current_restaurant_id()
+    return LOCATIONS.get(restaurant_id) or LOCATIONS.get(DEFAULT_RESTAURANT_ID) or next(iter(LOCATIONS.values()))
+
+
+def location_for_number(dialed_number):
+    """Restaurant id for a dialed number, or None if it isn't one of ours"""
+    return _locations_by_phone.get(_phone_key(dialed_number)) if dialed_number else None
+
+
+# Current location
+
+def current_restaurant_id():
+    """Restaurant id of the current request, or None outside a routed request"""
+    return _current_restaurant_id.get()
+
+
+def restaurant_id_for_insert():
+    """Column default for restaurant_id on new rows"""
+    return _current_restaurant_id.get() or DEFAULT_RESTAURANT_ID
+
+
+def set_current_restaurant(restaurant_id):
+    """Route the rest of this request/thread to a location; returns a reset token"""
+    return _current_restaurant_id.set(restaurant_id)
+
+
+def reset_current_restaurant(token=None):
+    if token is not None:
+        _current_restaurant_id.reset(token)
+    else:
+        _current_restaurant_id.set(None)
+
+
+class use_location:
+    """Context manager that routes queries to a location, e.g. in background threads"""
+
+    def __init__(self, restaurant_id):
+        self.restaurant_id = restaurant_id
+        self._token = None
+
+    def __enter__(self):
+        self._token = set_current_restaurant(self.restaurant_id)
+        return get_location(self.restaurant_id)
+
+    def __exit__(self, exc_type, exc, tb):
+        reset_current_restaurant(self._token)
+
+
+# SWAIG routing: calls are pinned to the location they were dialed into
+_call_locations = OrderedDict()
+_call_locations_lock = threading.Lock()
+
+
+def bind_call(call_id, restaurant_id):
+    with _call_locations_lock:
+        _call_locations[call_id] = restaurant_id
+        _call_locations.move_to_end(call_id)
+        while len(_call_locations) > 2000:
+            _call_locations.popitem(last=False)
+
+
+def release_call(call_id):
+    with _call_locations_lock:
+        _call_locations.pop(call_id, None)
+
+
+def resolve_restaurant_id(data):
+    """
+    Work out which location a SWAIG request is for.
+
+    Order: explicit restaurant_id in global_data/meta_data, the location the call
+    was pinned to, the dialed number, then the default location.
+    """
+    if not isinstance(data, dict):
+        return DEFAULT_RESTAURANT_ID
+
+    call_info = data.get('call') if isinstance(data.get('call'), dict) else {}
+    global_data = data.get('global_data') if isinstance(data.get('global_data'), dict) else {}
+    meta_data = data.get('meta_data') if isinstance(data.get('meta_data'), dict) else {}
+    call_id = data.get('call_id') or call_info.get('call_id')
+
+    for explicit in (global_data.get('restaurant_id'), meta_data.get('restaurant_id')):
+        if explicit in LOCATIONS:
+            return explicit
+
+    if call_id:
+        with _call_locations_lock:
+            pinned = _call_locations.get(call_id)
+        if pinned:
+            return pinned
+
+    dialed_number = (
+        call_info.get('to') or
+        data.get('call_to') or
+        data.get('to') or
+        global_data.get('to_number') or
+        global_data.get('called_id_num')
+    )
+    restaurant_id = location_for_number(dialed_number) or DEFAULT_RESTAURANT_ID
+    if call_id:
+        bind_call(call_id, restaurant_id)
+    return restaurant_id
+
+
+# Per-location SQLite files
+
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+def location_engine(restaurant_id):
+    """Engine for a location with its own database file, or None for the shared DB"""
+    location = LOCATIONS.get(restaurant_id) if restaurant_id else None
+    if not location or not location.database:
+        return None
+    with _engines_lock:
+        engine = _engines.get(restaurant_id)
+        if engine is None:
+            os.makedirs(os.path.dirname(os.path.abspath(location.database)), exist_ok=True)
+            engine = create_engine(f"sqlite:///{os.path.abspath(location.database)}")
+            from models import db
+            db.metadata.create_all(engine)
+            _engines[restaurant_id] = engine
+            print(f"📍 Opened database for {restaurant_id}: {location.database}")
+        return engine
+
+
+class LocationSession(FlaskSession):
+    """Session that sends queries for a location with its own database to that file"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None:
+            engine = location_engine(current_restaurant_id())
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+# Per-location caches
+
+class LocationCache:
+    """Small LRU/TTL cache; each location gets its own so capacity isn't shared"""
+
+    def __init__(self, max_entries=256, ttl_seconds=600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if not entry:
+                return None
+            stored_at, value = entry
+            if time.time() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.time(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def location_cache(name, restaurant_id=None, max_entries=256, ttl_seconds=600):
+    """The named cache for a location (default: the current one)"""
+    restaurant_id = get_location(restaurant_id).restaurant_id
+    with _caches_lock:
+        key = (restaurant_id, name)
+        if key not in _caches:
+            _caches[key] = LocationCache(max_entries, ttl_seconds)
+        return _caches[key]
+
+
+def fetch_location_weather(kind='forecast', days=7, timeout=10, restaurant_id=None):
+    """
+    Weather for a location's zip code from weatherapi.com, cached per location.
+
+    Args:
+        kind (str): 'forecast' or 'current'
+        days (int): Forecast days (forecast only)
+        timeout (int): Request timeout in seconds
+        restaurant_id (str): Location (default: the current one)
+
+    Returns:
+        dict: API response, or None if the key is missing or the request failed
+    """
+    import requests
+
+    api_key = os.getenv('WEATHER_API_KEY')
+    location = get_location(restaurant_id)
+    if not api_key or not location.zip_code:
+        return None
+
+    cache = location_cache('weather', location.restaurant_id, max_entries=16, ttl_seconds=1800)
+    cache_key = (kind, days if kind == 'forecast' else None)
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    if kind == 'forecast':
+        api_url = f"https://api.weatherapi.com/v1/forecast.json?key={api_key}&q={location.zip_code}&days={days}&aqi=no&alerts=no"
+    else:
+        api_url = f"https://api.weatherapi.com/v1/current.json?key={api_key}&q={location.zip_code}&aqi=no"
+
+    response = requests.get(api_url, timeout=timeout)
+    if response.status_code != 200:
+        print(f"⚠️ Weather API request failed for {location.restaurant_id}: {response.status_code}")
+        return None
+
+    weather_data = response.json()
+    cache.set(cache_key, weather_data)
+    return weather_data
@@ -7,6 +7,8 @@ import logging
 import os
 from datetime import datetime
 
+from payload_capture import PAYLOAD_LOG_LEVEL
+
 def setup_logging():
     """
     Setup logging configuration for the restaurant application
@@ -79,6 +81,18 @@ def setup_logging():
     sms_handler.setFormatter(detailed_formatter)
     sms_logger.addHandler(sms_handler)
     
+    # Configure SWAIG payload logger (captures are written only at DEBUG)
+    payloads_logger = logging.getLogger('bobbys_table.payloads')
+    payloads_logger.setLevel(PAYLOAD_LOG_LEVEL)
+    payloads_logger.propagate = False
+    
+    payloads_handler = logging.FileHandler(
+        os.path.join(log_dir, 'payloads.log'),
+        encoding='utf-8'
+    )
+    payloads_handler.setFormatter(detailed_formatter)
+    payloads_logger.addHandler(payloads_handler)
+    
     # Log startup message
     main_logger.info("Bobby's Table Restaurant - Logging initialized")
     main_logger.info(f"Log files created in: {os.path.abspath(log_dir)}")
@@ -88,7 +102,8 @@ def setup_logging():
         'main': main_logger,
         'reservations': reservations_logger,
         'payments': payments_logger,
-        'sms': sms_logger
+        'sms': sms_logger,
+        'payloads': payloads_logger
     }
 
 # For backwards compatibility, also provide individual logger functions
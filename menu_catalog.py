@@ -0,0 +1,301 @@
+"""
+Menu catalog for Bobby's Table Restaurant
+An immutable in-memory snapshot of the menu, loaded with one query and replaced
+(under a new, process-wide increasing version) whenever MenuItem rows change.
+Order pricing, both agent skills, the menu pages and the fuzzy matcher all read
+the same snapshot, and its items are validated once per version.
+"""
+
+import itertools
+import sys
+import threading
+from collections import namedtuple
+
+from locations import DEFAULT_RESTAURANT_ID, current_restaurant_id, use_location
+
+
+class MenuItemSnapshot:
+    """
+    One menu item as the catalog holds it: immutable, with attribute access only.
+
+    Slots instead of a per-item dict (or namedtuple plus a parallel record
+    dict) keep a snapshot of a few hundred items small, and items can be
+    shared by every call and thread without defensive copies.
+    """
+
+    __slots__ = ('id', 'name', 'description', 'price', 'category', 'is_available')
+
+    def __init__(self, id, name, description, price, category, is_available):
+        set_field = object.__setattr__
+        set_field(self, 'id', id)
+        set_field(self, 'name', name)
+        set_field(self, 'description', description)
+        set_field(self, 'price', price)
+        set_field(self, 'category', category)
+        set_field(self, 'is_available', is_available)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"MenuItemSnapshot is immutable (cannot set {name})")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"MenuItemSnapshot is immutable (cannot delete {name})")
+
+    def _fields(self):
+        return (self.id, self.name, self.description, self.price, self.category, self.is_available)
+
+    def __eq__(self, other):
+        if not isinstance(other, MenuItemSnapshot):
+            return NotImplemented
+        return self._fields() == other._fields()
+
+    def __hash__(self):
+        return hash(self._fields())
+
+    def __repr__(self):
+        return f"MenuItemSnapshot(id={self.id!r}, name={self.name!r}, price={self.price!r}, category={self.category!r}, is_available={self.is_available!r})"
+
+    def normalized(self):
+        """
+        A clean copy with well-typed fields, or None if the item is unusable.
+
+        Names are stripped, prices become floats and a missing category or
+        description gets a default; category strings are interned so the
+        items of one category share a single string.
+        """
+        try:
+            item = MenuItemSnapshot(
+                self.id,
+                str(self.name).strip(),
+                str(self.description or '').strip(),
+                float(self.price),
+                sys.intern(str(self.category or 'Uncategorized').strip()),
+                bool(self.is_available)
+            )
+        except (TypeError, ValueError):
+            return None
+        valid = isinstance(item.id, int) and item.id > 0 and item.name and item.price >= 0 and item.category
+        return item if valid else None
+
+    def to_dict(self):
+        """JSON-ready dict of the item"""
+        return {
+            'id': self.id,
+            'name': self.name,
+            'price': self.price,
+            'category': self.category,
+            'description': self.description,
+            'is_available': self.is_available
+        }
+
+
+# A menu_item_aliases row: a phrase for an item, or with exclude a phrase that must never match it
+CatalogAlias = namedtuple('CatalogAlias', ['menu_item_id', 'alias', 'priority', 'exclude'])
+
+# A menu outside these bounds is treated as broken rather than read to callers
+MIN_MENU_ITEMS = 5
+MAX_MENU_ITEMS = 500
+
+# Versions keep increasing across reloads and locations
+_versions = itertools.count(1)
+
+# meta_data keys from when the whole menu travelled with every SWAIG call
+LEGACY_MENU_KEYS = ('cached_menu', 'menu_cached_at', 'menu_item_count', 'cache_version', 'cache_source', 'last_cache_refresh')
+
+
+class MenuSnapshot:
+    """
+    One version of the menu. Never mutated after it is built; every index
+    below is computed here, once per version, and shared by all readers.
+
+    Attributes:
+        items: Every valid item, available or not, as MenuItemSnapshot
+        by_id: id -> item, over `items`
+        by_name: lowercase name -> item, preferring available items
+        available: Available items in menu order
+        available_by_id: id -> available item, for pricing order lines
+        longest_name_first: `available` sorted by descending name length, so
+            "Chicken Tenders" is tried before "Chicken" when scanning text
+        categories: category -> available items of that category, in menu order
+        invalid_ids: Ids of items that failed validation (left out of every index)
+        is_valid: Whether the menu as a whole looks sane (item count bounds)
+        aliases: CatalogAlias rows compiled into the mention matcher
+        restaurant_id: Location whose catalog built this snapshot
+    """
+
+    def __init__(self, items, version, aliases=(), restaurant_id=None):
+        self.version = version
+        self.aliases = tuple(aliases)
+        self.restaurant_id = restaurant_id
+
+        normalized, invalid_ids = [], []
+        for item in items:
+            clean = item.normalized()
+            if clean is None:
+                invalid_ids.append(item.id)
+            else:
+                normalized.append(clean)
+        self.items = tuple(normalized)
+        self.invalid_ids = tuple(invalid_ids)
+        self.by_id = {item.id: item for item in self.items}
+
+        self.available = tuple(item for item in self.items if item.is_available)
+        self.available_by_id = {item.id: item for item in self.available}
+        self.longest_name_first = tuple(sorted(self.available, key=lambda item: len(item.name), reverse=True))
+        categories = {}
+        for item in self.available:
+            categories.setdefault(item.category, []).append(item)
+        self.categories = {category: tuple(items) for category, items in categories.items()}
+        self.is_valid = MIN_MENU_ITEMS <= len(self.available) <= MAX_MENU_ITEMS
+
+        self.by_name = {}
+        for item in self.items:
+            # Prefer an available item when two share a name
+            key = item.name.lower()
+            existing = self.by_name.get(key)
+            if existing is None or (item.is_available and not existing.is_available):
+                self.by_name[key] = item
+
+    def find(self, menu_item_id=None, name=None):
+        """Item by id, falling back to its exact name; None if neither matches"""
+        if menu_item_id is not None:
+            try:
+                item = self.by_id.get(int(menu_item_id))
+            except (TypeError, ValueError):
+                item = None
+            if item:
+                return item
+        if name:
+            return self.by_name.get(str(name).strip().lower())
+        return None
+
+
+def resolve_order_lines(snapshot, lines):
+    """
+    Resolve and price order lines against a menu snapshot in one pass.
+
+    Args:
+        snapshot (MenuSnapshot): Current menu
+        lines (list): Dicts with menu_item_id (or id) and/or name, and quantity;
+            any client-sent price is ignored
+
+    Returns:
+        tuple: ([(MenuItemSnapshot, quantity)], total, errors); errors list the lines
+        that are unknown, unavailable or have a bad quantity
+    """
+    resolved, errors = [], []
+    total = 0.0
+    for line in lines:
+        if not isinstance(line, dict):
+            errors.append({'item': line, 'error': 'Invalid order line'})
+            continue
+        label = line.get('name') or line.get('menu_item_id') or line.get('id')
+        item = snapshot.find(line.get('menu_item_id', line.get('id')), line.get('name'))
+        try:
+            quantity = int(line.get('quantity', 1))
+        except (TypeError, ValueError):
+            quantity = 0
+
+        if item is None:
+            errors.append({'item': label, 'error': 'Not on the menu'})
+        elif not item.is_available:
+            errors.append({'item': item.name, 'error': 'Currently unavailable'})
+        elif quantity < 1:
+            errors.append({'item': item.name, 'error': 'Quantity must be at least 1'})
+        else:
+            resolved.append((item, quantity))
+            total += item.price * quantity
+    return resolved, round(total, 2), errors
+
+
+class MenuCatalog:
+    """Holds the current MenuSnapshot for a location; reloads lazily after invalidate()"""
+
+    def __init__(self, loader, restaurant_id=DEFAULT_RESTAURANT_ID, alias_loader=None):
+        """
+        Args:
+            loader (callable): loader() -> list of MenuItemSnapshot for the current location
+            restaurant_id (str): Location whose menu this catalog holds
+            alias_loader (callable): alias_loader() -> list of CatalogAlias for the current location
+        """
+        self._loader = loader
+        self._alias_loader = alias_loader
+        self.restaurant_id = restaurant_id
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._stale = True
+        self.stats = {'loads': 0, 'reads': 0}
+
+    def snapshot(self):
+        """Current menu snapshot, loading it if the menu changed since the last load"""
+        with self._lock:
+            self.stats['reads'] += 1
+            if self._stale or self._snapshot is None:
+                with use_location(self.restaurant_id):
+                    items = self._loader()
+                    aliases = self._alias_loader() if self._alias_loader else ()
+                self._snapshot = MenuSnapshot(items, next(_versions), aliases, restaurant_id=self.restaurant_id)
+                self._stale = False
+                self.stats['loads'] += 1
+                if self._snapshot.invalid_ids:
+                    print(f"⚠️ Menu version {self._snapshot.version} skipped invalid items: {list(self._snapshot.invalid_ids)}")
+            return self._snapshot
+
+    def invalidate(self):
+        """Mark the menu as changed; the next read reloads it"""
+        with self._lock:
+            self._stale = True
+
+
+_loader = None
+_alias_loader = None
+_catalogs = {}
+_catalog_lock = threading.Lock()
+
+
+def register_menu_catalog_loader(loader, alias_loader=None):
+    """Register the database loaders (app.py) used for every location's catalog"""
+    global _loader, _alias_loader
+    with _catalog_lock:
+        _loader = loader
+        _alias_loader = alias_loader
+
+
+def get_menu_catalog(restaurant_id=None):
+    """Return a location's catalog (default: the current location); None until a loader is registered"""
+    restaurant_id = restaurant_id or current_restaurant_id() or DEFAULT_RESTAURANT_ID
+    with _catalog_lock:
+        if restaurant_id not in _catalogs:
+            if _loader is None:
+                return None
+            _catalogs[restaurant_id] = MenuCatalog(_loader, restaurant_id=restaurant_id, alias_loader=_alias_loader)
+        return _catalogs[restaurant_id]
+
+
+def menu_snapshot(restaurant_id=None):
+    """Current snapshot of a location's menu, or None before app.py registers its loader"""
+    catalog = get_menu_catalog(restaurant_id)
+    return catalog.snapshot() if catalog else None
+
+
+def stamp_menu_version(meta_data, snapshot, restaurant_id):
+    """
+    Record which menu version a call has seen in its SWAIG meta_data.
+
+    Only the version token travels with the call; items are always resolved
+    from the catalog server-side. Returns the previous version if the menu
+    changed since the call last saw it (e.g. an item was 86'd), else None.
+    """
+    for key in LEGACY_MENU_KEYS:
+        meta_data.pop(key, None)
+    previous = meta_data.get('menu_version')
+    meta_data['menu_version'] = snapshot.version
+    meta_data['menu_restaurant_id'] = restaurant_id
+    if previous is not None and previous != snapshot.version:
+        return previous
+    return None
+
+
+def all_menu_catalogs():
+    """Every catalog created so far"""
+    with _catalog_lock:
+        return list(_catalogs.values())
@@ -0,0 +1,214 @@
+"""
+Fuzzy menu lookup for Bobby's Table Restaurant
+Resolves misspelled or partial item names ("ceasar salad", "kraft beer",
+"tiramisoo") against a trigram inverted index over item names, aliases and
+distinctive name words, built once per menu catalog version. A lookup only
+scores the few entries sharing the most trigrams with the query, using an edit
+distance that gives up as soon as the match can no longer be good enough.
+"""
+
+import re
+import unicodedata
+from collections import Counter, namedtuple
+
+from menu_matcher import STOP_WORDS
+from menu_versions import VersionedCache
+
+
+# A ranked lookup result: score in (0, 1], edit distance to the matched phrase
+FuzzyMatch = namedtuple('FuzzyMatch', ['item', 'score', 'distance', 'phrase'])
+
+# How much a match on each kind of phrase is worth
+WEIGHT_NAME = 1.0
+WEIGHT_ALIAS = 0.95
+WEIGHT_WORD = 0.85
+
+# Below this a match is a guess, not a lookup
+MIN_SCORE = 0.6
+# Entries sharing the most trigrams with the query that get an edit distance
+MAX_CANDIDATES = 12
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def normalize(text):
+    """Lowercase, accent-folded words joined by single spaces ("Crème Brûlée" -> "creme brulee")"""
+    folded = unicodedata.normalize('NFKD', str(text)).encode('ascii', 'ignore').decode('ascii')
+    return ' '.join(_WORD_RE.findall(folded.lower()))
+
+
+def trigrams(text):
+    """Character trigrams of normalized text, padded so word starts and ends count"""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def bounded_levenshtein(a, b, max_distance):
+    """
+    Levenshtein distance between a and b, or None once it must exceed max_distance.
+
+    Keeps two rows and stops as soon as every cell of a row is over the bound,
+    so a hopeless candidate costs a few rows rather than the full table.
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return None
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != char_b)
+            ))
+        if min(current) > max_distance:
+            return None
+        previous = current
+    return previous[-1] if previous[-1] <= max_distance else None
+
+
+def _contains_words(longer, shorter):
+    return f" {shorter} " in f" {longer} "
+
+
+class FuzzyMenuIndex:
+    """Trigram inverted index over the phrases that name each available menu item"""
+
+    def __init__(self, items, aliases=(), version=None):
+        """
+        Args:
+            items (iterable): Available menu items (anything with id and name)
+            aliases (iterable): CatalogAlias rows; exclusions drop that phrase for the item
+            version (int): Catalog version the index was built from
+        """
+        self.version = version
+        self._items = {}
+        self._order = {}
+        self._entries = []   # (phrase, weight, item_id)
+        self._exact = {}     # phrase -> entry indexes
+        self._postings = {}  # trigram -> entry indexes
+        self.stats = {'lookups': 0, 'distances': 0, 'ambiguous': 0}
+
+        excluded = {
+            (normalize(alias.alias), alias.menu_item_id) for alias in aliases if alias.exclude
+        }
+        seen = set()
+
+        def add(text, weight, item_id):
+            phrase = normalize(text)
+            if not phrase or (phrase, item_id) in excluded or (phrase, item_id) in seen:
+                return
+            seen.add((phrase, item_id))
+            index = len(self._entries)
+            self._entries.append((phrase, weight, item_id))
+            self._exact.setdefault(phrase, []).append(index)
+            for gram in trigrams(phrase):
+                self._postings.setdefault(gram, []).append(index)
+
+        for position, item in enumerate(items):
+            self._items[item.id] = item
+            self._order[item.id] = position
+            add(item.name, WEIGHT_NAME, item.id)
+
+        for alias in aliases:
+            if not alias.exclude and alias.menu_item_id in self._items:
+                add(alias.alias, WEIGHT_ALIAS, alias.menu_item_id)
+
+        for item in self._items.values():
+            words = [word for word in normalize(item.name).split() if word not in STOP_WORDS and len(word) >= 3]
+            if len(words) > 1:
+                for word in words:
+                    add(word, WEIGHT_WORD, item.id)
+
+    def _score(self, query, phrase, weight):
+        """(score, distance) of query against one phrase, or None below MIN_SCORE"""
+        if query == phrase:
+            return weight, 0
+        longest = max(len(query), len(phrase))
+        # "salmon" in "grilled salmon" or "the grilled salmon please": whole words only
+        if _contains_words(phrase, query) or _contains_words(query, phrase):
+            distance = longest - min(len(query), len(phrase))
+            score = weight * (0.6 + 0.4 * min(len(query), len(phrase)) / longest)
+            return (score, distance) if score >= MIN_SCORE else None
+        # Largest distance that can still reach MIN_SCORE for this phrase
+        max_distance = int(longest * (1 - MIN_SCORE / weight))
+        self.stats['distances'] += 1
+        distance = bounded_levenshtein(query, phrase, max_distance)
+        if distance is None:
+            return None
+        score = weight * (1 - distance / longest)
+        return (score, distance) if score >= MIN_SCORE else None
+
+    def search(self, name, limit=5):
+        """
+        Menu items that best match a (possibly misspelled) name.
+
+        Returns:
+            list: Up to `limit` FuzzyMatch, best first, one per item
+        """
+        query = normalize(name or '')
+        if not query:
+            return []
+        self.stats['lookups'] += 1
+
+        candidates = self._exact.get(query)
+        if candidates is None or all(self._entries[index][1] < WEIGHT_NAME for index in candidates):
+            shared = Counter()
+            for gram in trigrams(query):
+                shared.update(self._postings.get(gram, ()))
+            candidates = list(candidates or ()) + [index for index, _ in shared.most_common(MAX_CANDIDATES)]
+
+        best = {}
+        for index in dict.fromkeys(candidates):
+            phrase, weight, item_id = self._entries[index]
+            scored = self._score(query, phrase, weight)
+            if scored is None:
+                continue
+            score, distance = scored
+            current = best.get(item_id)
+            if current is None or score > current.score:
+                best[item_id] = FuzzyMatch(self._items[item_id], round(score, 3), distance, phrase)
+
+        # Ties go to the closer edit, then to the item listed first on the menu
+        ranked = sorted(best.values(), key=lambda match: (-match.score, match.distance, self._order[match.item.id]))
+        return ranked[:limit]
+
+    def best(self, name):
+        """
+        The best FuzzyMatch for a name, or None if nothing scores MIN_SCORE or
+        the top score is shared by several items ("chicken" with two chicken
+        dishes on the menu), so the caller is asked which one they meant.
+        """
+        matches = self.search(name, limit=2)
+        if not matches:
+            return None
+        if len(matches) > 1 and matches[0].score == matches[1].score:
+            self.stats['ambiguous'] += 1
+            return None
+        return matches[0]
+
+    def resolve_many(self, names):
+        """
+        Best match for every name of an order at once; repeated names are looked up once.
+
+        Returns:
+            list: FuzzyMatch or None (no match, or a tie) per name, in the same order
+        """
+        resolved = {}
+        results = []
+        for name in names:
+            key = normalize(name or '')
+            if key not in resolved:
+                resolved[key] = self.best(key) if key else None
+            results.append(resolved[key])
+        return results
+
+
+_indexes = VersionedCache()
+
+
+def fuzzy_index_for(snapshot):
+    """The fuzzy index built for a menu snapshot (built once per catalog version)"""
+    return _indexes.get(snapshot, lambda: FuzzyMenuIndex(snapshot.available, snapshot.aliases, version=snapshot.version))
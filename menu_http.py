@@ -0,0 +1,97 @@
+"""
+Cached menu responses for Bobby's Table Restaurant
+The menu page and the menu items JSON only change when the menu does, so each
+is rendered and compressed once per menu catalog version. ETags are hashes of
+the rendered body, so they stay valid across restarts and between workers (whose
+catalog version counters differ), and a matching If-None-Match is answered with
+a 304 without touching the body.
+"""
+
+import gzip
+import hashlib
+import threading
+
+try:
+    import brotli
+except ImportError:  # Optional; gzip is always available
+    brotli = None
+
+from menu_versions import VersionedCache
+
+
+# Bodies smaller than this are not worth compressing
+MIN_COMPRESS_BYTES = 512
+# Preferred first when the client accepts several
+ENCODINGS = ('br', 'gzip')
+
+
+class MenuBody:
+    """One rendered menu response and its compressed variants"""
+
+    def __init__(self, body, mimetype):
+        self.mimetype = mimetype
+        self.tag = hashlib.sha1(body).hexdigest()
+        self.encodings = {'identity': body}
+        if len(body) >= MIN_COMPRESS_BYTES:
+            self.encodings['gzip'] = gzip.compress(body, compresslevel=9, mtime=0)
+            if brotli is not None:
+                self.encodings['br'] = brotli.compress(body)
+
+    def etag(self, encoding='identity'):
+        """Strong ETag of one variant; each content coding gets its own, as strong ETags must"""
+        return self.tag if encoding == 'identity' else f"{self.tag}-{encoding}"
+
+    def matches(self, if_none_match):
+        """True if an If-None-Match header (werkzeug ETags) names any variant of this body"""
+        return any(if_none_match.contains(self.etag(encoding)) for encoding in self.encodings)
+
+    def choose_encoding(self, accept_encodings):
+        """Best variant for an Accept-Encoding header (werkzeug Accept)"""
+        for encoding in ENCODINGS:
+            if encoding in self.encodings and accept_encodings.quality(encoding) > 0:
+                return encoding
+        return 'identity'
+
+
+class MenuBodyCache:
+    """Rendered menu bodies of each location's current menu version, keyed by representation"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._bodies = VersionedCache()  # per snapshot: representation -> MenuBody
+        self.stats = {'hits': 0, 'renders': 0}
+
+    def get(self, snapshot, representation, render):
+        """
+        The cached body for a menu snapshot, rendering it on first use.
+
+        Args:
+            snapshot (MenuSnapshot): Menu the body is rendered from
+            representation (str): Which response this is ('page', 'items', ...)
+            render (callable): render() -> (bytes, mimetype)
+
+        Returns:
+            MenuBody
+        """
+        bodies = self._bodies.get(snapshot, dict)
+        with self._lock:
+            cached = bodies.get(representation)
+            if cached is not None:
+                self.stats['hits'] += 1
+                return cached
+
+        # Render outside the lock; a concurrent first request may render twice
+        body, mimetype = render()
+        menu_body = MenuBody(body, mimetype)
+        with self._lock:
+            bodies[representation] = menu_body
+            self.stats['renders'] += 1
+        return menu_body
+
+
+_body_cache = MenuBodyCache()
+
+
+def get_menu_body_cache():
+    """The process-wide menu body cache (one current menu version per location)"""
+    return _body_cache
@@ -0,0 +1,247 @@
+"""
+Menu mention matcher for Bobby's Table Restaurant
+Finds menu items mentioned in a call transcript with an Aho-Corasick automaton
+over word tokens, compiled once per menu catalog version from item names,
+distinctive name words and the menu_item_aliases table. Overlapping mentions
+resolve leftmost-longest ("diet pepsi" beats "pepsi", "bbq wings" beats
+"wings"), and the quantity next to each mention is read in the same pass.
+Aliases are data, so adding one needs no code change and scanning stays
+linear in the transcript however many there are.
+"""
+
+import re
+from collections import deque
+
+from menu_versions import VersionedCache
+
+
+# When mentions overlap or share a phrase, the higher priority wins
+PRIORITY_NAME = 3
+PRIORITY_ALIAS = 2
+PRIORITY_WORD = 1
+
+# Aliases seeded into an empty menu_item_aliases table:
+# (lowercase menu item name, phrase, priority, exclude)
+SEED_ALIASES = [
+    ('pepsi', 'soda', PRIORITY_ALIAS, False),
+    ('pepsi', 'cola', PRIORITY_ALIAS, False),
+    ('diet pepsi', 'diet soda', PRIORITY_ALIAS, False),
+    # "diet coke" is a Coca-Cola, not a Diet Pepsi
+    ('diet pepsi', 'diet', PRIORITY_WORD, True),
+    ('coca-cola', 'coke', PRIORITY_ALIAS, False),
+    ('coca-cola', 'coca cola', PRIORITY_ALIAS, False),
+    ('bbq wings', 'barbecue wings', PRIORITY_ALIAS, False),
+    # Plain "wings" means Buffalo; "bbq wings" still wins as the longer match
+    ('buffalo wings', 'wings', PRIORITY_ALIAS, False),
+    ('draft beer', 'beer', PRIORITY_ALIAS, False),
+    ('draft beer', 'draft', PRIORITY_ALIAS, False),
+    ('classic cheeseburger', 'cheeseburger', PRIORITY_ALIAS, False),
+    ('classic cheeseburger', 'classic burger', PRIORITY_ALIAS, False),
+    ('classic cheeseburger', 'burger', PRIORITY_ALIAS, False),
+    ('bbq ribs', 'barbecue ribs', PRIORITY_ALIAS, False),
+    ('bbq ribs', 'ribs', PRIORITY_ALIAS, False),
+    ('bbq burger', 'barbecue burger', PRIORITY_ALIAS, False),
+    ('mountain dew', 'dew', PRIORITY_ALIAS, False),
+    ('chicken tenders', 'chicken fingers', PRIORITY_ALIAS, False),
+    ('chicken tenders', 'fingers', PRIORITY_ALIAS, False),
+    ('chicken tenders', 'tenders', PRIORITY_ALIAS, False),
+    ('eggs benedict', 'egg benedict', PRIORITY_ALIAS, False),
+    ('eggs benedict', 'benedict', PRIORITY_ALIAS, False),
+]
+
+QUANTITY_WORDS = {
+    'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5,
+    'six': 6, 'seven': 7, 'eight': 8, 'nine': 9, 'ten': 10,
+    'a': 1, 'an': 1, 'single': 1, 'couple': 2, 'few': 3
+}
+MAX_QUANTITY = 99
+
+# Words skipped between a quantity and its item: "two orders of the wings"
+FILLER_WORDS = {'of', 'the', 'order', 'orders', 'plate', 'plates', 'side', 'sides', 'more', 'x'}
+# Name words too generic to stand for an item on their own
+STOP_WORDS = {'and', 'or', 'the', 'a', 'an', 'with', 'of', 'in', 'on'}
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def _normalize(token):
+    # Fold simple plurals so "wing"/"wings" and "fry"/"fries" share a pattern
+    if len(token) > 3 and token.endswith('s') and not token.endswith('ss'):
+        return token[:-1]
+    return token
+
+
+def tokenize(text):
+    """(raw, normalized) word tokens of lowercased text"""
+    return [(token, _normalize(token)) for token in _TOKEN_RE.findall(text.lower())]
+
+
+def _phrase(text):
+    return tuple(normalized for _, normalized in tokenize(text))
+
+
+def _quantity(token):
+    if token.isdigit():
+        quantity = int(token)
+        return quantity if 0 < quantity <= MAX_QUANTITY else None
+    return QUANTITY_WORDS.get(token)
+
+
+class MenuMatcher:
+    """Aho-Corasick automaton over the phrases that name each available menu item"""
+
+    def __init__(self, items, aliases=(), version=None):
+        """
+        Args:
+            items (iterable): Available menu items (anything with id and name)
+            aliases (iterable): CatalogAlias rows; exclusions remove a phrase from
+                an item whatever produced it (name word, joined name or alias)
+            version (int): Catalog version the matcher was compiled from
+        """
+        self.version = version
+        self._items = {}
+        candidates = {}  # phrase -> [(priority, item_id)]
+
+        def add(text, priority, item_id):
+            phrase = _phrase(text)
+            if phrase:
+                candidates.setdefault(phrase, []).append((priority, item_id))
+
+        for item in items:
+            self._items[item.id] = item
+            name = item.name.strip().lower()
+            add(name, PRIORITY_NAME, item.id)
+            words = [word for word in _TOKEN_RE.findall(name) if word not in STOP_WORDS and len(word) >= 3]
+            if len(words) > 1:
+                add(''.join(words), PRIORITY_ALIAS, item.id)  # "mountaindew"
+                # Distinctive single words ("salmon" for Grilled Salmon)
+                for word in words:
+                    add(word, PRIORITY_WORD, item.id)
+
+        excluded = set()
+        for alias in aliases:
+            if alias.menu_item_id not in self._items:
+                continue  # Unavailable or removed item
+            if alias.exclude:
+                excluded.add((_phrase(alias.alias), alias.menu_item_id))
+            else:
+                add(alias.alias, alias.priority if alias.priority is not None else PRIORITY_ALIAS, alias.menu_item_id)
+
+        # Keep each phrase's highest priority; a tie between different items is
+        # ambiguous ("chicken" on two dishes), except for an exact name
+        self.patterns = {}
+        for phrase, entries in candidates.items():
+            entries = [(priority, item_id) for priority, item_id in entries if (phrase, item_id) not in excluded]
+            if not entries:
+                continue
+            best = max(priority for priority, _ in entries)
+            item_ids = list(dict.fromkeys(item_id for priority, item_id in entries if priority == best))
+            if len(item_ids) == 1 or best == PRIORITY_NAME:
+                self.patterns[phrase] = (best, item_ids[0])
+
+        self._build()
+
+    def _build(self):
+        goto, fail, output = [{}], [0], [[]]
+        for phrase, (priority, item_id) in self.patterns.items():
+            state = 0
+            for token in phrase:
+                if token not in goto[state]:
+                    goto.append({})
+                    fail.append(0)
+                    output.append([])
+                    goto[state][token] = len(goto) - 1
+                state = goto[state][token]
+            output[state].append((len(phrase), priority, item_id, ' '.join(phrase)))
+
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, child in goto[state].items():
+                queue.append(child)
+                fallback = fail[state]
+                while fallback and token not in goto[fallback]:
+                    fallback = fail[fallback]
+                fail[child] = goto[fallback].get(token, 0)
+                output[child] = output[child] + output[fail[child]]
+
+        self._goto, self._fail, self._output = goto, fail, output
+
+    def find(self, text):
+        """
+        Every non-overlapping mention in text, leftmost-longest.
+
+        Returns:
+            list: (start, end, item, phrase, quantity) with token offsets
+            [start, end], in the order they appear
+        """
+        tokens = tokenize(text)
+        goto, fail, output = self._goto, self._fail, self._output
+
+        # One pass of the automaton; each token reports every phrase ending there
+        matches = []
+        state = 0
+        for end, (_, token) in enumerate(tokens):
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+            for length, priority, item_id, phrase in output[state]:
+                matches.append((end - length + 1, -length, -priority, end, item_id, phrase))
+
+        mentions = []
+        next_free = 0
+        for start, _, _, end, item_id, phrase in sorted(matches):
+            if start >= next_free:
+                mentions.append([start, end, item_id, phrase])
+                next_free = end + 1
+
+        results = []
+        for index, (start, end, item_id, phrase) in enumerate(mentions):
+            # The quantity just before the mention, else a number right after it
+            previous_end = mentions[index - 1][1] if index else -1
+            next_start = mentions[index + 1][0] if index + 1 < len(mentions) else len(tokens)
+            quantity = None
+            position = start - 1
+            while position > previous_end and tokens[position][0] in FILLER_WORDS:
+                position -= 1
+            if position > previous_end:
+                quantity = _quantity(tokens[position][0])
+            if quantity is None and end + 1 < next_start and tokens[end + 1][0].isdigit():
+                quantity = _quantity(tokens[end + 1][0])
+            results.append((start, end, self._items[item_id], phrase, quantity or 1))
+        return results
+
+    def extract(self, text):
+        """
+        Menu items mentioned in text, one entry per item in order of first mention.
+
+        Returns:
+            list: {'menu_item_id', 'quantity', 'name', 'matched_variation'} dicts
+        """
+        extracted = {}
+        for _, _, item, phrase, quantity in self.find(text):
+            if item.id not in extracted:
+                extracted[item.id] = {
+                    'menu_item_id': item.id,
+                    'quantity': quantity,
+                    'name': item.name,
+                    'matched_variation': phrase
+                }
+        return list(extracted.values())
+
+
+_matchers = VersionedCache()
+
+
+def matcher_for(snapshot):
+    """The matcher compiled for a menu snapshot (built once per catalog version)"""
+    return _matchers.get(snapshot, lambda: MenuMatcher(snapshot.available, snapshot.aliases, version=snapshot.version))
+
+
+def seed_alias_rows(items):
+    """menu_item_aliases rows for SEED_ALIASES whose item is on this menu"""
+    item_ids = {item.name.strip().lower(): item.id for item in items}
+    return [
+        {'menu_item_id': item_ids[name], 'alias': alias, 'priority': priority, 'exclude': exclude}
+        for name, alias, priority, exclude in SEED_ALIASES if name in item_ids
+    ]
@@ -0,0 +1,142 @@
+"""
+Voice menu renders for Bobby's Table Restaurant
+The spoken get_menu responses (whole menu, or one category a page at a time)
+only change when the menu does, so each is rendered once per menu catalog
+version and kept, keyed by (category, page), until that location's menu
+changes. A repeated menu request
+is a dict lookup; the renders for the current menus are warmed at startup.
+"""
+
+import json
+import threading
+from collections import namedtuple
+
+from menu_versions import VersionedCache
+
+
+# Finished TTS-ready text, and the same page as JSON for format="json"
+MenuRender = namedtuple('MenuRender', ['text', 'payload', 'page', 'pages'])
+
+# Items read out per category page, and per category in the whole-menu overview
+CATEGORY_PAGE_SIZE = 20
+OVERVIEW_ITEMS_PER_CATEGORY = 10
+
+
+def _category_items(snapshot):
+    # Same item order the agent has always read out
+    categories = {}
+    for item in snapshot.longest_name_first:
+        categories.setdefault(item.category.lower(), []).append(item)
+    return categories
+
+
+def _payload(category, page, pages, items):
+    return json.dumps({
+        'category': category,
+        'page': page,
+        'pages': pages,
+        'items': [{'id': item.id, 'name': item.name, 'price': item.price} for item in items]
+    })
+
+
+def _render_overview(snapshot):
+    available = snapshot.longest_name_first
+    categories = {}
+    for item in available:
+        categories.setdefault(item.category, []).append(item)
+
+    message = f"Here's our menu with {len(available)} items: "
+    shown = []
+    for category, items in categories.items():
+        category_display = category.replace('-', ' ').title()
+        limited_items = items[:OVERVIEW_ITEMS_PER_CATEGORY]
+        shown.extend(limited_items)
+        message += f"{category_display}: "
+        message += ", ".join(f"{item.name} (${item.price:.2f})" for item in limited_items)
+        if len(items) > OVERVIEW_ITEMS_PER_CATEGORY:
+            message += f" and {len(items) - OVERVIEW_ITEMS_PER_CATEGORY} more"
+        message += ". "
+    return MenuRender(message, _payload(None, 1, 1, shown), 1, 1)
+
+
+def _render_category(category, items, page):
+    pages = max(1, -(-len(items) // CATEGORY_PAGE_SIZE))
+    start = (page - 1) * CATEGORY_PAGE_SIZE
+    page_items = items[start:start + CATEGORY_PAGE_SIZE]
+
+    message = f"Here are our {category} items: " if page == 1 else f"More of our {category} items: "
+    message += ", ".join(f"{item.name} for ${item.price:.2f}" for item in page_items)
+    remaining = len(items) - start - len(page_items)
+    if remaining > 0:
+        message += f" and {remaining} more items"
+    return MenuRender(message, _payload(category, page, pages, page_items), page, pages)
+
+
+class MenuRenderCache:
+    """Rendered get_menu responses of each location's current menu version, keyed by (category, page)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Per snapshot: (lowercase category -> items, (category, page) -> MenuRender)
+        self._versions = VersionedCache()
+        self.stats = {'hits': 0, 'renders': 0}
+
+    def render(self, snapshot, category=None, page=1):
+        """
+        The get_menu response for a menu snapshot.
+
+        Args:
+            snapshot (MenuSnapshot): Current menu
+            category (str): Category to list (case-insensitive), or None for the whole menu
+            page (int): 1-based page of a category; clamped to the pages that exist
+
+        Returns:
+            MenuRender, or None if the category has no items
+        """
+        category = category.lower() if category else None
+        categories, renders = self._versions.get(snapshot, lambda: (_category_items(snapshot), {}))
+        with self._lock:
+            if category is not None:
+                items = categories.get(category)
+                if not items:
+                    return None
+                pages = max(1, -(-len(items) // CATEGORY_PAGE_SIZE))
+                try:
+                    page = min(max(int(page or 1), 1), pages)
+                except (TypeError, ValueError):
+                    page = 1
+            else:
+                page = 1
+
+            key = (category, page)
+            rendered = renders.get(key)
+            if rendered is not None:
+                self.stats['hits'] += 1
+                return rendered
+
+            if category is None:
+                rendered = _render_overview(snapshot)
+            else:
+                rendered = _render_category(category, items, page)
+            renders[key] = rendered
+            self.stats['renders'] += 1
+            return rendered
+
+    def warm(self, snapshot):
+        """Render the whole menu and every category page of a snapshot; returns how many renders exist for it"""
+        self.render(snapshot)
+        for category, items in _category_items(snapshot).items():
+            pages = max(1, -(-len(items) // CATEGORY_PAGE_SIZE))
+            for page in range(1, pages + 1):
+                self.render(snapshot, category, page)
+        _, renders = self._versions.get(snapshot, lambda: ({}, {}))
+        with self._lock:
+            return len(renders)
+
+
+_render_cache = MenuRenderCache()
+
+
+def get_menu_render_cache():
+    """The process-wide render cache (one current menu version per location)"""
+    return _render_cache
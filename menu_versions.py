@@ -0,0 +1,56 @@
+"""
+Per-version menu caches for Bobby's Table Restaurant
+Mention matchers, fuzzy indexes, get_menu renders and HTTP bodies are each
+built once per menu snapshot. Snapshot versions come from one counter shared
+by every location, so a low version number doesn't mean an entry is unused:
+a location whose menu hasn't changed keeps serving its old version. Each
+catalog therefore keeps the entry for its current version, and an entry is
+dropped only when that same catalog replaces it with a newer one.
+"""
+
+import threading
+
+
+class VersionedCache:
+    """One value per catalog: the one built for its current menu version"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._current = {}  # restaurant_id -> (version, value)
+        self.stats = {'hits': 0, 'builds': 0, 'replaced': 0}
+
+    def get(self, snapshot, build):
+        """
+        The value for a menu snapshot, building it on first use.
+
+        build() runs outside the lock; a concurrent first use may build twice,
+        and the first value stored wins. A snapshot older than its catalog's
+        current one (a call still holding it) gets a value that isn't kept.
+
+        Args:
+            snapshot: MenuSnapshot (anything with .restaurant_id and .version)
+            build (callable): build() -> value
+        """
+        key = snapshot.restaurant_id
+        with self._lock:
+            current = self._current.get(key)
+            if current is not None and current[0] == snapshot.version:
+                self.stats['hits'] += 1
+                return current[1]
+
+        value = build()
+        with self._lock:
+            self.stats['builds'] += 1
+            current = self._current.get(key)
+            if current is None or current[0] < snapshot.version:
+                if current is not None:
+                    self.stats['replaced'] += 1
+                self._current[key] = (snapshot.version, value)
+            elif current[0] == snapshot.version:
+                value = current[1]
+        return value
+
+    def versions(self):
+        """restaurant_id -> version currently cached"""
+        with self._lock:
+            return {key: version for key, (version, _) in self._current.items()}
@@ -1,10 +1,22 @@
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
+from sqlalchemy import event
+from locations import LocationSession, restaurant_id_for_insert
+from booking_fingerprint import booking_fingerprint
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': LocationSession})
 
-class Reservation(db.Model):
+class RestaurantScopedMixin:
+    """Partition key for models that belong to a single restaurant location"""
+    restaurant_id = db.Column(db.String(32), nullable=False, default=restaurant_id_for_insert, server_default='main')
+
+class Reservation(RestaurantScopedMixin, db.Model):
     __tablename__ = 'reservations'
+    __table_args__ = (
+        db.Index('ix_reservations_restaurant_date_time', 'restaurant_id', 'date', 'time'),
+        db.Index('ix_reservations_date_time', 'date', 'time'),
+        db.Index('ix_reservations_restaurant_phone', 'restaurant_id', 'phone_number'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     reservation_number = db.Column(db.String(6), unique=True, nullable=False)  # 6-digit random number
     name = db.Column(db.String(80), nullable=False)
@@ -15,6 +27,8 @@ class Reservation(db.Model):
     status = db.Column(db.String(20), default='confirmed')
     special_requests = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)  # Feed/cache versioning
+    booking_fingerprint = db.Column(db.String(40), index=True)  # Hash of phone, date, slot, party size (duplicate detection)
     payment_status = db.Column(db.String(20), default='unpaid')  # 'unpaid', 'paid', 'refunded'
     payment_intent_id = db.Column(db.String(100))  # Stripe payment intent ID
     payment_amount = db.Column(db.Float)  # Total amount paid
@@ -46,8 +60,19 @@ class Reservation(db.Model):
             'total_bill': total_bill
         }
 
-class Table(db.Model):
+@event.listens_for(Reservation, 'before_insert')
+@event.listens_for(Reservation, 'before_update')
+def set_booking_fingerprint(mapper, connection, target):
+    """Keep the duplicate-detection fingerprint in step with the booking details"""
+    target.booking_fingerprint = booking_fingerprint(
+        target.phone_number, target.date, target.time, target.party_size
+    )
+
+class Table(RestaurantScopedMixin, db.Model):
     __tablename__ = 'tables'
+    __table_args__ = (
+        db.Index('ix_tables_restaurant_table_number', 'restaurant_id', 'table_number'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     table_number = db.Column(db.Integer, nullable=False, unique=True)
     capacity = db.Column(db.Integer, nullable=False)
@@ -64,8 +89,11 @@ class Table(db.Model):
             'location': self.location
         }
 
-class MenuItem(db.Model):
+class MenuItem(RestaurantScopedMixin, db.Model):
     __tablename__ = 'menu_items'
+    __table_args__ = (
+        db.Index('ix_menu_items_restaurant_category', 'restaurant_id', 'category'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text)
@@ -84,8 +112,34 @@ class MenuItem(db.Model):
             'is_available': self.is_available
         }
 
-class Order(db.Model):
+class MenuItemAlias(RestaurantScopedMixin, db.Model):
+    """Another phrase callers use for a menu item ("coke" for Coca-Cola), or with exclude=True a phrase that must never match it"""
+    __tablename__ = 'menu_item_aliases'
+    __table_args__ = (
+        db.Index('ix_menu_item_aliases_menu_item_id', 'menu_item_id'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    menu_item_id = db.Column(db.Integer, db.ForeignKey('menu_items.id', ondelete='CASCADE'), nullable=False)
+    alias = db.Column(db.String(100), nullable=False)
+    priority = db.Column(db.Integer, nullable=False, default=2)  # Wins over lower priorities for the same phrase (names are 3, name words 1)
+    exclude = db.Column(db.Boolean, nullable=False, default=False)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'menu_item_id': self.menu_item_id,
+            'alias': self.alias,
+            'priority': self.priority,
+            'exclude': self.exclude
+        }
+
+class Order(RestaurantScopedMixin, db.Model):
     __tablename__ = 'orders'
+    __table_args__ = (
+        db.Index('ix_orders_restaurant_target_date', 'restaurant_id', 'target_date'),
+        db.Index('ix_orders_restaurant_status', 'restaurant_id', 'status'),
+        db.Index('ix_orders_target_date_time', 'target_date', 'target_time'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     order_number = db.Column(db.String(5), unique=True, nullable=False)  # 5-digit random number
     reservation_id = db.Column(db.Integer, db.ForeignKey('reservations.id'))
@@ -135,6 +189,9 @@ class Order(db.Model):
 
 class OrderItem(db.Model):
     __tablename__ = 'order_items'
+    __table_args__ = (
+        db.Index('ix_order_items_order_id', 'order_id'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     order_id = db.Column(db.Integer, db.ForeignKey('orders.id'))
     menu_item_id = db.Column(db.Integer, db.ForeignKey('menu_items.id'))
@@ -151,4 +208,92 @@ class OrderItem(db.Model):
             'price_at_time': self.price_at_time,
             'notes': self.notes,
             'menu_item': self.menu_item.to_dict() if self.menu_item else None
-        } 
\ No newline at end of file
+        }
+
+class Callback(db.Model):
+    __tablename__ = 'callbacks'
+    id = db.Column(db.Integer, primary_key=True)
+    phone_number = db.Column(db.String(20), nullable=False)
+    customer_name = db.Column(db.String(80))
+    reason = db.Column(db.Text)
+    preferred_time = db.Column(db.String(100))  # What the caller asked for, as spoken
+    due_at = db.Column(db.DateTime, nullable=False, index=True)  # Parsed from preferred_time
+    status = db.Column(db.String(20), default='pending', index=True)  # 'pending', 'due', 'completed', 'cancelled'
+    call_id = db.Column(db.String(100))  # Call that requested the callback
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    notified_at = db.Column(db.DateTime)  # When staff were notified it came due
+    completed_at = db.Column(db.DateTime)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'phone_number': self.phone_number,
+            'customer_name': self.customer_name,
+            'reason': self.reason,
+            'preferred_time': self.preferred_time,
+            'due_at': self.due_at.isoformat() if self.due_at else None,
+            'status': self.status,
+            'call_id': self.call_id,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'notified_at': self.notified_at.isoformat() if self.notified_at else None,
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None
+        }
+
+class Customer(db.Model):
+    __tablename__ = 'customers'
+    phone = db.Column(db.String(10), primary_key=True)  # Last 10 digits of the phone number
+    name = db.Column(db.String(80))  # Most recent name given
+    visit_count = db.Column(db.Integer, default=0)  # Past, non-cancelled reservations
+    reservation_count = db.Column(db.Integer, default=0)  # All non-cancelled reservations
+    order_count = db.Column(db.Integer, default=0)  # Pickup/delivery orders
+    last_visit_date = db.Column(db.String(10))  # YYYY-MM-DD
+    next_reservation_date = db.Column(db.String(10))  # YYYY-MM-DD
+    usual_party_size = db.Column(db.Integer)
+    favorite_items = db.Column(db.JSON, default=list)  # Most ordered menu item names
+    unpaid_balance = db.Column(db.Float, default=0.0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'phone': self.phone,
+            'name': self.name,
+            'visit_count': self.visit_count,
+            'reservation_count': self.reservation_count,
+            'order_count': self.order_count,
+            'last_visit_date': self.last_visit_date,
+            'next_reservation_date': self.next_reservation_date,
+            'usual_party_size': self.usual_party_size,
+            'favorite_items': self.favorite_items or [],
+            'unpaid_balance': self.unpaid_balance,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+class AuditEvent(db.Model):
+    """Append-only history of reservation and order changes"""
+    __tablename__ = 'audit_log'
+    __table_args__ = (
+        db.Index('ix_audit_log_entity', 'entity_type', 'entity_id', 'created_at'),
+        db.Index('ix_audit_log_created_at', 'created_at'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    entity_type = db.Column(db.String(20), nullable=False)  # reservation, order
+    entity_id = db.Column(db.Integer, nullable=False)
+    action = db.Column(db.String(10), nullable=False)  # insert, update, delete
+    changes = db.Column(db.JSON)  # {field: [old, new]}
+    channel = db.Column(db.String(20))  # web, voice, stripe, signalwire, system
+    actor = db.Column(db.String(100))  # Logged-in user, call ID or webhook event ID
+    restaurant_id = db.Column(db.String(32))
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'entity_type': self.entity_type,
+            'entity_id': self.entity_id,
+            'action': self.action,
+            'changes': self.changes or {},
+            'channel': self.channel,
+            'actor': self.actor,
+            'restaurant_id': self.restaurant_id
+        }
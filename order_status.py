@@ -0,0 +1,54 @@
+"""
+Order status state machine for Bobby's Table Restaurant
+Which kitchen status changes are allowed, and how a batch of orders splits
+into orders to update, orders already in the target status and rejections.
+"""
+
+ORDER_STATUSES = ['pending', 'preparing', 'ready', 'completed', 'cancelled']
+
+# status -> statuses it may move to
+ORDER_TRANSITIONS = {
+    'pending': {'preparing', 'ready', 'cancelled'},
+    'preparing': {'pending', 'ready', 'cancelled'},
+    'ready': {'preparing', 'completed', 'cancelled'},
+    'completed': set(),
+    'cancelled': set(),
+}
+
+
+def _normalize(status):
+    # Orders created before statuses were enforced may have none
+    return status or 'pending'
+
+
+def can_transition(current_status, new_status):
+    return new_status in ORDER_TRANSITIONS.get(_normalize(current_status), set())
+
+
+def source_statuses(new_status):
+    """Statuses an order may be in to move to new_status"""
+    return sorted(status for status, targets in ORDER_TRANSITIONS.items() if new_status in targets)
+
+
+def plan_transitions(current_statuses, new_status):
+    """
+    Split a batch of orders for a status change.
+
+    Args:
+        current_statuses (dict): order_id -> current status
+        new_status (str): Target status
+
+    Returns:
+        tuple: (order ids to update, ids already in new_status,
+        rejections as [{'id', 'status', 'error'}])
+    """
+    to_update, unchanged, rejected = [], [], []
+    for order_id, status in sorted(current_statuses.items()):
+        status = _normalize(status)
+        if status == new_status:
+            unchanged.append(order_id)
+        elif can_transition(status, new_status):
+            to_update.append(order_id)
+        else:
+            rejected.append({'id': order_id, 'status': status, 'error': f'Cannot change {status} order to {new_status}'})
+    return to_update, unchanged, rejected
@@ -0,0 +1,221 @@
+"""
+SWAIG payload capture for Bobby's Table Restaurant
+Debug copies of the requests the voice platform posts to /receptionist. A
+request is only captured while the payload logger is at DEBUG, and then only
+a sampled fraction of them; the request thread just queues the raw body, and a
+background thread parses it, summarizes bulky fields (call_log, cached_menu),
+redacts card details, truncates long values and keeps the result in a bounded
+ring buffer (and the payload log).
+"""
+
+import json
+import logging
+import os
+import queue
+import random
+import threading
+from collections import deque
+from datetime import datetime
+
+
+# Level of the payload logger; DEBUG turns capture on
+PAYLOAD_LOG_LEVEL = os.getenv('PAYLOAD_LOG_LEVEL', 'INFO').upper()
+# Fraction of requests captured while capture is on
+PAYLOAD_SAMPLE_RATE = float(os.getenv('PAYLOAD_SAMPLE_RATE', '0.1'))
+# Captures kept for /debug/payloads
+PAYLOAD_BUFFER_SIZE = int(os.getenv('PAYLOAD_BUFFER_SIZE', '200'))
+
+# Fields replaced by a summary of their size
+SUMMARIZED_FIELDS = {'call_log', 'raw_call_log', 'cached_menu', 'menu_items', 'conversation'}
+# Fields that never leave the request, even in debug captures
+# (ours and the names the SignalWire pay verb posts)
+REDACTED_FIELDS = {
+    'card_number', 'cardnumber', 'cvv', 'cvc', 'security_code',
+    'expiration_date', 'expiry', 'exp_month', 'exp_year', 'expiry_month', 'expiry_year',
+    'postal_code', 'payment_token', 'client_secret'
+}
+MAX_STRING_LENGTH = 300
+MAX_LIST_ITEMS = 20
+MAX_DEPTH = 6
+
+
+def _summary(value):
+    if isinstance(value, (list, tuple)):
+        return f"<{len(value)} entries>"
+    if isinstance(value, dict):
+        return f"<{len(value)} keys>"
+    if isinstance(value, str):
+        return f"<{len(value)} chars>"
+    return f"<{type(value).__name__}>"
+
+
+def redact(value, depth=0):
+    """
+    Copy of a decoded payload that is safe and small enough to log.
+
+    Bulky fields become a size summary, card fields become '<redacted>',
+    strings and lists are cut at MAX_STRING_LENGTH / MAX_LIST_ITEMS, and
+    anything nested deeper than MAX_DEPTH is summarized.
+    """
+    if depth >= MAX_DEPTH and isinstance(value, (dict, list, tuple)):
+        return _summary(value)
+    if isinstance(value, dict):
+        redacted = {}
+        for key, item in value.items():
+            name = str(key).lower()
+            if name in REDACTED_FIELDS:
+                redacted[key] = '<redacted>'
+            elif name in SUMMARIZED_FIELDS:
+                redacted[key] = _summary(item)
+            else:
+                redacted[key] = redact(item, depth + 1)
+        return redacted
+    if isinstance(value, (list, tuple)):
+        items = [redact(item, depth + 1) for item in value[:MAX_LIST_ITEMS]]
+        if len(value) > MAX_LIST_ITEMS:
+            items.append(f"<{len(value) - MAX_LIST_ITEMS} more>")
+        return items
+    if isinstance(value, str) and len(value) > MAX_STRING_LENGTH:
+        return f"{value[:MAX_STRING_LENGTH]}... <{len(value)} chars>"
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    return str(value)[:MAX_STRING_LENGTH]
+
+
+class PayloadCapture:
+    """
+    Sampled, redacted payload captures in a ring buffer.
+
+    wants() is the only cost on requests that aren't captured; capture() only
+    enqueues, and the processing thread does the decoding and redaction.
+    """
+
+    def __init__(self, logger, sample_rate=PAYLOAD_SAMPLE_RATE, buffer_size=PAYLOAD_BUFFER_SIZE, max_pending=1000):
+        """
+        Args:
+            logger (logging.Logger): Payload logger; capture is on while it is enabled for DEBUG
+            sample_rate (float): Fraction of requests captured, 0 to 1
+            buffer_size (int): Captures kept
+            max_pending (int): Captures waiting to be processed beyond this are dropped
+        """
+        self.logger = logger
+        self.sample_rate = sample_rate
+        self._buffer = deque(maxlen=buffer_size)
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._thread = None
+        self._lock = threading.Lock()
+        self._sequence = 0
+        self.stats = {'captured': 0, 'dropped': 0, 'errors': 0}
+
+    @property
+    def enabled(self):
+        return self.logger.isEnabledFor(logging.DEBUG) and self.sample_rate > 0
+
+    def wants(self):
+        """True if this request should be captured (payload logger at DEBUG, and sampled)"""
+        return self.enabled and (self.sample_rate >= 1 or random.random() < self.sample_rate)
+
+    def capture(self, kind, payload, **context):
+        """
+        Queue a payload for capture.
+
+        Args:
+            kind (str): What this is ('request', 'params', ...)
+            payload: Raw body (bytes/str) or an already decoded value; it must
+                not be changed by the caller afterwards
+            **context: Small fields stored with the capture (call_id, function)
+        """
+        self.start()
+        try:
+            self._queue.put_nowait((datetime.utcnow(), kind, payload, context))
+        except queue.Full:
+            self.stats['dropped'] += 1
+
+    def _process(self, captured_at, kind, payload, context):
+        size = len(payload) if isinstance(payload, (bytes, str)) else None
+        if isinstance(payload, (bytes, str)):
+            try:
+                payload = json.loads(payload)
+            except ValueError:
+                payload = payload.decode('utf-8', 'replace') if isinstance(payload, bytes) else payload
+        entry = {
+            'captured_at': captured_at.isoformat(),
+            'kind': kind,
+            'size': size,
+            **context,
+            'payload': redact(payload)
+        }
+        with self._lock:
+            self._sequence += 1
+            entry['id'] = self._sequence
+            self._buffer.append(entry)
+        self.stats['captured'] += 1
+        self.logger.debug(json.dumps(entry, default=str))
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                self._process(*item)
+            except Exception as e:
+                self.stats['errors'] += 1
+                print(f"ERROR: Payload capture failed: {e}")
+            finally:
+                self._queue.task_done()
+
+    def start(self):
+        """Start the processing thread; returns False if it was already running"""
+        if self._thread and self._thread.is_alive():
+            return False
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return False
+            self._thread = threading.Thread(target=self._run, name='payload-capture', daemon=True)
+            self._thread.start()
+            return True
+
+    def flush(self):
+        """Block until every queued capture has been processed"""
+        self._queue.join()
+
+    def recent(self, limit=50, kind=None, call_id=None):
+        """Latest captures, newest first"""
+        with self._lock:
+            entries = list(self._buffer)
+        entries.reverse()
+        if kind:
+            entries = [entry for entry in entries if entry['kind'] == kind]
+        if call_id:
+            entries = [entry for entry in entries if entry.get('call_id') == call_id]
+        return entries[:limit]
+
+    def configure(self, level=None, sample_rate=None):
+        """Change the capture level and sampling at runtime"""
+        if level is not None:
+            self.logger.setLevel(level.upper() if isinstance(level, str) else level)
+        if sample_rate is not None:
+            self.sample_rate = min(max(float(sample_rate), 0.0), 1.0)
+
+    def status(self):
+        return {
+            'enabled': self.enabled,
+            'level': logging.getLevelName(self.logger.getEffectiveLevel()),
+            'sample_rate': self.sample_rate,
+            'buffered': len(self._buffer),
+            'buffer_size': self._buffer.maxlen,
+            'pending': self._queue.qsize(),
+            'stats': dict(self.stats)
+        }
+
+
+_capture = None
+_capture_lock = threading.Lock()
+
+
+def get_payload_capture():
+    """The process-wide payload capture, on the bobbys_table.payloads logger"""
+    global _capture
+    with _capture_lock:
+        if _capture is None:
+            _capture = PayloadCapture(logging.getLogger('bobbys_table.payloads'))
+        return _capture
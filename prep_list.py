@@ -0,0 +1,212 @@
+"""
+Kitchen prep list for Bobby's Table Restaurant
+Counts how many of each menu item have to be fired in the next 30/60 minutes,
+including pre-orders due at upcoming reservation times. Per-order item counts
+come from one grouped query per day and are replaced order by order from the
+ORM change feed, so a kitchen display can poll or stream it cheaply.
+"""
+
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from locations import DEFAULT_RESTAURANT_ID, current_restaurant_id, use_location
+
+
+# Orders the kitchen still has to fire
+PREP_STATUSES = ('pending', 'preparing')
+# Look-ahead windows reported by default, in minutes
+DEFAULT_WINDOWS = (30, 60)
+# Late orders older than this stop being listed as overdue
+OVERDUE_LOOKBACK_MINUTES = 120
+
+
+def _due_at(date, time):
+    try:
+        return datetime.strptime(f"{date} {str(time)[:5]}", '%Y-%m-%d %H:%M')
+    except (TypeError, ValueError):
+        return None
+
+
+class PrepList:
+    """
+    Per-order item counts for the days the kitchen is looking at.
+
+    The loader returns rows of (order_id, reservation_id, target_date,
+    target_time, status, menu_item_id, name, category, quantity), one per order
+    and menu item, for either whole days or specific orders/reservations.
+    """
+
+    def __init__(self, loader, restaurant_id=DEFAULT_RESTAURANT_ID):
+        """
+        Args:
+            loader (callable): loader(dates=None, order_ids=None, reservation_ids=None) -> rows
+            restaurant_id (str): Location whose kitchen this list serves
+        """
+        self._loader = loader
+        self.restaurant_id = restaurant_id
+        self._lock = threading.RLock()
+        self._changed = threading.Condition(self._lock)
+        self._orders = {}
+        self._menu_items = {}
+        self._dates = set()
+        self._pending = (set(), set())
+        self.version = 0
+        self.stats = {'day_loads': 0, 'changes_applied': 0, 'reads': 0}
+
+    def _apply_rows(self, rows):
+        orders = {}
+        for order_id, reservation_id, date, time, status, menu_item_id, name, category, quantity in rows:
+            order = orders.setdefault(order_id, {
+                'reservation_id': reservation_id,
+                'date': date,
+                'due_at': _due_at(date, time),
+                'status': status,
+                'items': {}
+            })
+            order['items'][menu_item_id] = order['items'].get(menu_item_id, 0) + (quantity or 0)
+            self._menu_items[menu_item_id] = (name, category)
+        return orders
+
+    def _load_days(self, dates):
+        missing = sorted(set(dates) - self._dates)
+        if not missing:
+            return
+        with use_location(self.restaurant_id):
+            rows = self._loader(dates=missing)
+        for order_id, order in self._apply_rows(rows).items():
+            self._orders[order_id] = order
+        self._dates.update(missing)
+        self.stats['day_loads'] += len(missing)
+
+        # Forget days the kitchen has moved past
+        oldest = min(dates)
+        for date in [d for d in self._dates if d < oldest]:
+            self._dates.discard(date)
+        for order_id in [oid for oid, order in self._orders.items() if order['date'] < oldest]:
+            del self._orders[order_id]
+
+    def notify_changes(self, reservation_ids, order_ids):
+        """Record orders (and reservations, whose pre-orders may change) touched by a commit"""
+        if not reservation_ids and not order_ids:
+            return
+        with self._lock:
+            # Nothing cached yet: the first read loads current rows anyway
+            if self._dates:
+                self._pending[0].update(reservation_ids)
+                self._pending[1].update(order_ids)
+            self.version += 1
+            self._changed.notify_all()
+
+    def _drain(self):
+        """Replace the counts of changed orders with one query"""
+        reservation_ids, order_ids = self._pending
+        if not self._dates or not (reservation_ids or order_ids):
+            return
+        self._pending = (set(), set())
+        with use_location(self.restaurant_id):
+            rows = self._loader(order_ids=order_ids, reservation_ids=reservation_ids)
+
+        stale = set(order_ids) | {
+            order_id for order_id, order in self._orders.items() if order['reservation_id'] in reservation_ids
+        }
+        for order_id in stale:
+            self._orders.pop(order_id, None)
+        for order_id, order in self._apply_rows(rows).items():
+            if order['date'] in self._dates:
+                self._orders[order_id] = order
+        self.stats['changes_applied'] += len(reservation_ids) + len(order_ids)
+
+    def snapshot(self, now=None, windows=DEFAULT_WINDOWS, lookback_minutes=OVERDUE_LOOKBACK_MINUTES):
+        """
+        Item counts due in each look-ahead window.
+
+        Returns:
+            dict: {'generated_at', 'version', 'windows', 'items': [{'id', 'name',
+            'category', 'overdue', 'due': {minutes: quantity}, 'orders',
+            'next_due'}]}, items sorted by when they are next due
+        """
+        now = now or datetime.now()
+        windows = sorted(windows)
+        horizon = now + timedelta(minutes=windows[-1])
+        since = now - timedelta(minutes=lookback_minutes)
+        dates = {since.strftime('%Y-%m-%d'), now.strftime('%Y-%m-%d'), horizon.strftime('%Y-%m-%d')}
+
+        with self._lock:
+            self._load_days(dates)
+            self._drain()
+            self.stats['reads'] += 1
+
+            items = defaultdict(lambda: {'overdue': 0, 'due': dict.fromkeys(windows, 0), 'orders': set(), 'next_due': None})
+            for order_id, order in self._orders.items():
+                due_at = order['due_at']
+                if not due_at or due_at < since or due_at >= horizon:
+                    continue
+                for menu_item_id, quantity in order['items'].items():
+                    item = items[menu_item_id]
+                    item['orders'].add(order_id)
+                    if due_at < now:
+                        item['overdue'] += quantity
+                    else:
+                        for minutes in windows:
+                            if due_at < now + timedelta(minutes=minutes):
+                                item['due'][minutes] += quantity
+                    if item['next_due'] is None or due_at < item['next_due']:
+                        item['next_due'] = due_at
+
+            result = []
+            for menu_item_id, item in items.items():
+                name, category = self._menu_items.get(menu_item_id, (None, None))
+                result.append({
+                    'id': menu_item_id,
+                    'name': name,
+                    'category': category,
+                    'overdue': item['overdue'],
+                    'due': {str(minutes): quantity for minutes, quantity in item['due'].items()},
+                    'orders': len(item['orders']),
+                    'next_due': item['next_due'].strftime('%Y-%m-%d %H:%M')
+                })
+            result.sort(key=lambda entry: (entry['next_due'], entry['name'] or ''))
+
+            return {
+                'generated_at': now.strftime('%Y-%m-%d %H:%M:%S'),
+                'version': self.version,
+                'restaurant_id': self.restaurant_id,
+                'windows': windows,
+                'items': result
+            }
+
+    def wait_for_change(self, version, timeout):
+        """Block until the list changes past `version` (or timeout); returns the current version"""
+        with self._lock:
+            self._changed.wait_for(lambda: self.version != version, timeout=timeout)
+            return self.version
+
+
+_loader = None
+_prep_lists = {}
+_prep_list_lock = threading.Lock()
+
+
+def register_prep_list_loader(loader):
+    """Register the database loader (app.py) used for every location's prep list"""
+    global _loader
+    with _prep_list_lock:
+        _loader = loader
+
+
+def get_prep_list(restaurant_id=None):
+    """Return a location's prep list (default: the current location); None until a loader is registered"""
+    restaurant_id = restaurant_id or current_restaurant_id() or DEFAULT_RESTAURANT_ID
+    with _prep_list_lock:
+        if restaurant_id not in _prep_lists:
+            if _loader is None:
+                return None
+            _prep_lists[restaurant_id] = PrepList(_loader, restaurant_id=restaurant_id)
+        return _prep_lists[restaurant_id]
+
+
+def all_prep_lists():
+    """Every prep list created so far"""
+    with _prep_list_lock:
+        return list(_prep_lists.values())
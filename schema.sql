@@ -17,7 +17,10 @@ CREATE TABLE IF NOT EXISTS reservations (
     payment_date TIMESTAMP,
     confirmation_number TEXT,
     payment_method TEXT,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    restaurant_id TEXT NOT NULL DEFAULT 'main',
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    booking_fingerprint TEXT
 );
 
 CREATE TABLE IF NOT EXISTS tables (
@@ -25,7 +28,8 @@ CREATE TABLE IF NOT EXISTS tables (
     table_number INTEGER NOT NULL,
     capacity INTEGER NOT NULL,
     status TEXT DEFAULT 'available',
-    location TEXT
+    location TEXT,
+    restaurant_id TEXT NOT NULL DEFAULT 'main'
 );
 
 CREATE TABLE IF NOT EXISTS menu_items (
@@ -34,7 +38,8 @@ CREATE TABLE IF NOT EXISTS menu_items (
     description TEXT,
     price DECIMAL(10,2) NOT NULL,
     category TEXT NOT NULL,
-    is_available BOOLEAN DEFAULT true
+    is_available BOOLEAN DEFAULT true,
+    restaurant_id TEXT NOT NULL DEFAULT 'main'
 );
 
 CREATE TABLE IF NOT EXISTS orders (
@@ -58,6 +63,7 @@ CREATE TABLE IF NOT EXISTS orders (
     confirmation_number TEXT,
     payment_method TEXT,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    restaurant_id TEXT NOT NULL DEFAULT 'main',
     FOREIGN KEY (reservation_id) REFERENCES reservations(id),
     FOREIGN KEY (table_id) REFERENCES tables(id)
 );
@@ -73,6 +79,56 @@ CREATE TABLE IF NOT EXISTS order_items (
     FOREIGN KEY (menu_item_id) REFERENCES menu_items(id)
 );
 
+CREATE TABLE IF NOT EXISTS menu_item_aliases (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    menu_item_id INTEGER NOT NULL,
+    alias TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 2,
+    exclude BOOLEAN NOT NULL DEFAULT 0,
+    restaurant_id TEXT NOT NULL DEFAULT 'main',
+    FOREIGN KEY (menu_item_id) REFERENCES menu_items(id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS callbacks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    phone_number TEXT NOT NULL,
+    customer_name TEXT,
+    reason TEXT,
+    preferred_time TEXT,
+    due_at TIMESTAMP NOT NULL,
+    status TEXT DEFAULT 'pending',
+    call_id TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    notified_at TIMESTAMP,
+    completed_at TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS customers (
+    phone TEXT PRIMARY KEY,
+    name TEXT,
+    visit_count INTEGER DEFAULT 0,
+    reservation_count INTEGER DEFAULT 0,
+    order_count INTEGER DEFAULT 0,
+    last_visit_date TEXT,
+    next_reservation_date TEXT,
+    usual_party_size INTEGER,
+    favorite_items JSON,
+    unpaid_balance DECIMAL(10,2) DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS audit_log (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at TIMESTAMP NOT NULL,
+    entity_type TEXT NOT NULL,
+    entity_id INTEGER NOT NULL,
+    action TEXT NOT NULL,
+    changes JSON,
+    channel TEXT,
+    actor TEXT,
+    restaurant_id TEXT
+);
+
 -- Indexes
 CREATE INDEX IF NOT EXISTS idx_reservations_number ON reservations(reservation_number);
 CREATE INDEX IF NOT EXISTS idx_reservations_date ON reservations(date);
@@ -82,4 +138,28 @@ CREATE INDEX IF NOT EXISTS idx_tables_status ON tables(status);
 CREATE INDEX IF NOT EXISTS idx_menu_items_category ON menu_items(category);
 CREATE INDEX IF NOT EXISTS idx_orders_number ON orders(order_number);
 CREATE INDEX IF NOT EXISTS idx_orders_status ON orders(status);
-CREATE INDEX IF NOT EXISTS idx_orders_payment_status ON orders(payment_status); 
\ No newline at end of file
+CREATE INDEX IF NOT EXISTS idx_orders_payment_status ON orders(payment_status);
+
+-- Per-location partition indexes
+CREATE INDEX IF NOT EXISTS ix_reservations_restaurant_date_time ON reservations(restaurant_id, date, time);
+CREATE INDEX IF NOT EXISTS ix_reservations_restaurant_phone ON reservations(restaurant_id, phone_number);
+CREATE INDEX IF NOT EXISTS ix_tables_restaurant_table_number ON tables(restaurant_id, table_number);
+CREATE INDEX IF NOT EXISTS ix_menu_items_restaurant_category ON menu_items(restaurant_id, category);
+CREATE INDEX IF NOT EXISTS ix_menu_item_aliases_menu_item_id ON menu_item_aliases(menu_item_id);
+CREATE INDEX IF NOT EXISTS ix_orders_restaurant_target_date ON orders(restaurant_id, target_date);
+CREATE INDEX IF NOT EXISTS ix_orders_restaurant_status ON orders(restaurant_id, status);
+
+-- Kitchen prep list: orders due in a time range and their items
+CREATE INDEX IF NOT EXISTS ix_orders_target_date_time ON orders(target_date, target_time);
+CREATE INDEX IF NOT EXISTS ix_order_items_order_id ON order_items(order_id);
+
+-- Duplicate booking detection
+CREATE INDEX IF NOT EXISTS ix_reservations_booking_fingerprint ON reservations(booking_fingerprint);
+
+-- Callback dispatcher: pending callbacks by due time
+CREATE INDEX IF NOT EXISTS ix_callbacks_due_at ON callbacks(due_at);
+CREATE INDEX IF NOT EXISTS ix_callbacks_status ON callbacks(status);
+
+-- Audit log lookups by entity and by time (retention/compaction)
+CREATE INDEX IF NOT EXISTS ix_audit_log_entity ON audit_log(entity_type, entity_id, created_at);
+CREATE INDEX IF NOT EXISTS ix_audit_log_created_at ON audit_log(created_at);
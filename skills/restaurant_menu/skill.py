@@ -4,7 +4,6 @@ Restaurant Menu Skill for SignalWire AI Agents with Data Validation
 
 import os
 import json
-import copy
 from datetime import datetime, timedelta
 from signalwire_agents.core.skill_base import SkillBase
 from signalwire_agents.core.function_result import SwaigFunctionResult
@@ -52,8 +51,8 @@ class RestaurantMenuSkill(SkillBase):
         else:
             return phone_number  # return as-is if we can't format it
 
-    def _ensure_menu_cached(self, raw_data):
-        """Cache menu with validation"""
+    def _current_menu(self, raw_data):
+        """Current menu snapshot from the shared catalog; meta_data only records which version the call has seen"""
         try:
             import sys
             import os
@@ -62,142 +61,38 @@ class RestaurantMenuSkill(SkillBase):
             if parent_dir not in sys.path:
                 sys.path.insert(0, parent_dir)
             
-            from app import app
-            from models import MenuItem
+            import app  # registers the menu catalog loader
+            from menu_catalog import menu_snapshot, stamp_menu_version
+            from locations import get_location
             
-            with app.app_context():
-                meta_data = raw_data.get('meta_data', {}) if raw_data else {}
-                cache_time = meta_data.get('menu_cached_at')
-                cached_menu = meta_data.get('cached_menu', [])
-                
-                if cache_time and cached_menu:
-                    try:
-                        cached_at = datetime.fromisoformat(cache_time)
-                        if datetime.now() - cached_at < timedelta(minutes=10):
-                            if self._validate_menu_cache(cached_menu):
-                                print("Menu cache valid, using cached data")
-                                return cached_menu, meta_data
-                            else:
-                                print("Menu cache validation failed, refreshing")
-                                cached_menu = []
-                        else:
-                            print("Menu cache expired, refreshing")
-                            cached_menu = []
-                    except ValueError:
-                        print("Invalid cache timestamp, refreshing")
-                        cached_menu = []
-                
-                if not cached_menu:
-                    print("Caching menu with validation")
-                    menu_items = MenuItem.query.filter_by(is_available=True).all()
-                    menu_items = sorted(menu_items, key=lambda item: len(item.name.lower()), reverse=True)
-                    
-                    cached_menu = []
-                    for item in menu_items:
-                        try:
-                            menu_item_data = {
-                                'id': int(item.id),
-                                'name': str(item.name).strip(),
-                                'price': float(item.price),
-                                'category': str(item.category).strip(),
-                                'description': str(item.description).strip(),
-                                'is_available': bool(item.is_available)
-                            }
-                            
-                            if self._validate_menu_item(menu_item_data):
-                                cached_menu.append(menu_item_data)
-                            else:
-                                print(f"Skipping invalid menu item: {item.id}")
-                        except Exception as item_error:
-                            print(f"Error processing menu item {item.id}: {item_error}")
-                            continue
-                    
-                    if not self._validate_menu_cache(cached_menu):
-                        print("Menu cache validation failed after creation")
-                        return [], raw_data.get('meta_data', {}) if raw_data else {}
-                    
-                    cached_menu = copy.deepcopy(cached_menu)
-                    meta_data['cached_menu'] = cached_menu
-                    meta_data['menu_cached_at'] = datetime.now().isoformat()
-                    meta_data['menu_item_count'] = len(cached_menu)
-                    
-                    print(f"Successfully cached {len(cached_menu)} validated menu items")
-                else:
-                    print(f"Using validated cached menu with {len(cached_menu)} items")
-                
-                return cached_menu, meta_data
-                
-        except Exception as e:
-            print(f"Error ensuring menu cache: {e}")
-            return [], raw_data.get('meta_data', {}) if raw_data else {}
-
-    def _validate_menu_item(self, item_data):
-        """Validate a single menu item"""
-        try:
-            if not isinstance(item_data, dict):
-                return False
-            
-            required_fields = ['id', 'name', 'price', 'category', 'description', 'is_available']
-            for field in required_fields:
-                if field not in item_data:
-                    return False
-            
-            if not isinstance(item_data['id'], int) or item_data['id'] <= 0:
-                return False
-            
-            if not isinstance(item_data['name'], str) or len(item_data['name'].strip()) == 0:
-                return False
-            
-            if not isinstance(item_data['price'], (int, float)) or item_data['price'] < 0:
-                return False
-            
-            if not isinstance(item_data['category'], str) or len(item_data['category'].strip()) == 0:
-                return False
-            
-            if not isinstance(item_data['description'], str):
-                return False
-            
-            if not isinstance(item_data['is_available'], bool):
-                return False
-            
-            return True
+            meta_data = raw_data.get('meta_data', {}) if raw_data else {}
             
-        except Exception:
-            return False
-
-    def _validate_menu_cache(self, cached_menu):
-        """Validate the complete menu cache"""
-        try:
-            if not isinstance(cached_menu, list):
-                return False
+            # Menus differ per restaurant location; the catalog is per location too
+            restaurant_id = get_location().restaurant_id
+            snapshot = menu_snapshot(restaurant_id)
             
-            if len(cached_menu) == 0:
-                return False
+            # Validated once when this menu version was built
+            if snapshot is None or not snapshot.is_valid:
+                print("Menu catalog unavailable or failed validation")
+                return None, meta_data
             
-            seen_ids = set()
-            valid_items = 0
+            previous_version = stamp_menu_version(meta_data, snapshot, restaurant_id)
+            if previous_version is not None:
+                print(f"Menu changed during the call (version {previous_version} -> {snapshot.version})")
             
-            for i, item in enumerate(cached_menu):
-                if not self._validate_menu_item(item):
-                    return False
+            return snapshot, meta_data
                 
-                item_id = item.get('id')
-                if item_id in seen_ids:
-                    return False
-                seen_ids.add(item_id)
-                valid_items += 1
-            
-            if len(cached_menu) > 500:
-                return False
-            
-            if valid_items < 5:
-                return False
-            
-            print(f"Menu cache validation passed: {valid_items} valid items")
-            return True
-            
-        except Exception:
-            return False
+        except Exception as e:
+            print(f"Error ensuring menu cache: {e}")
+            return None, raw_data.get('meta_data', {}) if raw_data else {}
+
+    def _ensure_menu_cached(self, raw_data):
+        """Current available menu items from the shared catalog, with the call's meta_data"""
+        snapshot, meta_data = self._current_menu(raw_data)
+        if snapshot is None:
+            return [], meta_data
+        # Longest names first, so compound names match before their parts
+        return snapshot.longest_name_first, meta_data
 
     def register_tools(self):
         """Register menu tools"""
@@ -219,6 +114,11 @@ class RestaurantMenuSkill(SkillBase):
                             "enum": ["text", "json"],
                             "description": "Response format",
                             "default": "text"
+                        },
+                        "page": {
+                            "type": "integer",
+                            "description": "Page of a long category to read out, starting at 1",
+                            "default": 1
                         }
                     },
                     "required": []
@@ -514,76 +414,138 @@ class RestaurantMenuSkill(SkillBase):
             )
             print("Registered get_surprise_selections tool")
             
+            # Pairing suggestions while pre-ordering
+            self.agent.define_tool(
+                name="suggest_pairings",
+                description="Suggest items that go well with what the customer is ordering, based on what other guests order together. Use while taking a pre-order or order to offer a drink, side or dessert.",
+                parameters={
+                    "type": "object",
+                    "properties": {
+                        "items": {
+                            "type": "array",
+                            "items": {"type": "string"},
+                            "description": "Names of the menu items the customer is ordering"
+                        },
+                        "limit": {
+                            "type": "integer",
+                            "description": "How many suggestions to offer",
+                            "default": 2,
+                            "minimum": 1,
+                            "maximum": 5
+                        }
+                    },
+                    "required": ["items"]
+                },
+                handler=self._suggest_pairings_handler
+            )
+            print("Registered suggest_pairings tool")
+            
+            # Top sellers by daypart
+            self.agent.define_tool(
+                name="get_popular_items",
+                description="Get the most popular menu items from recent sales, optionally for one daypart or category. Use when customers ask what's popular, what people usually order, or what's selling tonight.",
+                parameters={
+                    "type": "object",
+                    "properties": {
+                        "daypart": {
+                            "type": "string",
+                            "description": "Daypart to rank: breakfast, lunch, dinner, or now for the current one. Leave out for the whole day.",
+                            "enum": ["breakfast", "lunch", "dinner", "now"]
+                        },
+                        "period": {
+                            "type": "string",
+                            "description": "How far back to look",
+                            "enum": ["today", "week", "month"],
+                            "default": "week"
+                        },
+                        "category": {
+                            "type": "string",
+                            "description": "Only rank items of this menu category (e.g. drinks, desserts)"
+                        },
+                        "limit": {
+                            "type": "integer",
+                            "description": "How many items to mention",
+                            "default": 3,
+                            "minimum": 1,
+                            "maximum": 5
+                        }
+                    },
+                    "required": []
+                },
+                handler=self._get_popular_items_handler
+            )
+            print("Registered get_popular_items tool")
+            
         except Exception as e:
             print(f"Error registering restaurant menu tools: {e}")
             import traceback
             traceback.print_exc()
 
     def _get_menu_handler(self, args, raw_data):
-        """Menu handler with validation"""
+        """Menu handler; responses are rendered once per menu version and category page"""
         try:
-            cached_menu, meta_data = self._ensure_menu_cached(raw_data)
+            from menu_render import get_menu_render_cache
             
-            if not cached_menu:
+            snapshot, meta_data = self._current_menu(raw_data)
+            
+            if snapshot is None:
                 result = SwaigFunctionResult("Sorry, the menu is currently unavailable.")
                 result.set_metadata(meta_data)
                 return result
             
-            if args.get('category'):
-                category = args['category'].lower()
-                filtered_items = [item for item in cached_menu if item['category'].lower() == category]
-                
-                if not filtered_items:
-                    result = SwaigFunctionResult(f"No items found in the {category} category.")
-                    result.set_metadata(meta_data)
-                    return result
-                
-                message = f"Here are our {category} items: "
-                item_list = []
-                for item in filtered_items[:20]:
-                    item_list.append(f"{item['name']} for ${item['price']:.2f}")
-                message += ", ".join(item_list)
-                
-                if len(filtered_items) > 20:
-                    message += f" and {len(filtered_items) - 20} more items"
-                
-                result = SwaigFunctionResult(message)
-                result.set_metadata(meta_data)
-                return result
-            else:
-                categories = {}
-                for item in cached_menu:
-                    if item['category'] not in categories:
-                        categories[item['category']] = []
-                    categories[item['category']].append(item)
-                
-                message = f"Here's our menu with {len(cached_menu)} items: "
-                for category, items in categories.items():
-                    category_display = category.replace('-', ' ').title()
-                    message += f"{category_display}: "
-                    limited_items = items[:10]
-                    item_list = []
-                    for item in limited_items:
-                        item_list.append(f"{item['name']} (${item['price']:.2f})")
-                    message += ", ".join(item_list)
-                    if len(items) > 10:
-                        message += f" and {len(items) - 10} more"
-                    message += ". "
-                
-                result = SwaigFunctionResult(message)
+            category = args.get('category')
+            rendered = get_menu_render_cache().render(snapshot, category, args.get('page', 1))
+            
+            if rendered is None:
+                result = SwaigFunctionResult(f"No items found in the {category.lower()} category.")
                 result.set_metadata(meta_data)
                 return result
+            
+            result = SwaigFunctionResult(rendered.payload if args.get('format') == 'json' else rendered.text)
+            result.set_metadata(meta_data)
+            return result
                 
         except Exception as e:
             print(f"Error in get_menu handler: {e}")
             return SwaigFunctionResult("Sorry, there was an error retrieving the menu.")
 
+    def _item_pairings(self):
+        """Precomputed item pairings of the caller's location (None if unavailable)"""
+        try:
+            from item_pairings import get_item_pairings
+            from locations import get_location
+            return get_item_pairings(get_location().restaurant_id)
+        except Exception as e:
+            print(f"Item pairings unavailable: {e}")
+            return None
+
+    def _item_sales(self):
+        """Sales rollup of the caller's location (None if unavailable)"""
+        try:
+            from item_sales import get_item_sales
+            from locations import get_location
+            return get_item_sales(get_location().restaurant_id)
+        except Exception as e:
+            print(f"Item sales unavailable: {e}")
+            return None
+
+    def _paired_choice(self, pairings, chosen_ids, candidates, used_items):
+        """The candidate that pairs best with what was already chosen, or None (an O(k) lookup)"""
+        if not pairings or not chosen_ids:
+            return None
+        candidates_by_id = {item.id: item for item in candidates}
+        for pairing in pairings.suggest(chosen_ids, exclude=used_items, limit=pairings.top_k):
+            if pairing.menu_item_id in candidates_by_id:
+                return candidates_by_id[pairing.menu_item_id]
+        return None
+
     def _get_random_party_orders(self, raw_data, party_names, food_per_person=1, drinks_per_person=1):
-        """Generate random party orders for multiple people"""
+        """Generate party orders: a random first dish, then what guests most often order with it"""
         import random
         
         try:
             cached_menu, meta_data = self._ensure_menu_cached(raw_data)
+            pairings = self._item_pairings()
             
             if not cached_menu:
                 return {'success': False, 'error': 'Menu not available'}
@@ -592,8 +554,8 @@ class RestaurantMenuSkill(SkillBase):
             food_categories = ['breakfast', 'appetizers', 'main-courses', 'desserts']
             drink_categories = ['drinks']
             
-            food_items = [item for item in cached_menu if item['category'] in food_categories]
-            drink_items = [item for item in cached_menu if item['category'] in drink_categories]
+            food_items = [item for item in cached_menu if item.category in food_categories]
+            drink_items = [item for item in cached_menu if item.category in drink_categories]
             
             party_orders = []
             used_items = set()
@@ -604,40 +566,42 @@ class RestaurantMenuSkill(SkillBase):
                 person_total = 0.0
                 
                 # Select random food items
-                available_food = [item for item in food_items if item['id'] not in used_items]
+                available_food = [item for item in food_items if item.id not in used_items]
                 if available_food:
                     for _ in range(min(food_per_person, len(available_food))):
                         if available_food:
-                            selected_food = random.choice(available_food)
+                            chosen_ids = [item['menu_item_id'] for item in person_items]
+                            selected_food = self._paired_choice(pairings, chosen_ids, available_food, used_items) or random.choice(available_food)
                             available_food.remove(selected_food)
-                            used_items.add(selected_food['id'])
+                            used_items.add(selected_food.id)
                             
                             person_items.append({
-                                'menu_item_id': selected_food['id'],
-                                'name': selected_food['name'],
-                                'price': selected_food['price'],
-                                'category': selected_food['category'],
+                                'menu_item_id': selected_food.id,
+                                'name': selected_food.name,
+                                'price': selected_food.price,
+                                'category': selected_food.category,
                                 'quantity': 1
                             })
-                            person_total += selected_food['price']
+                            person_total += selected_food.price
                 
                 # Select random drink items
-                available_drinks = [item for item in drink_items if item['id'] not in used_items]
+                available_drinks = [item for item in drink_items if item.id not in used_items]
                 if available_drinks:
                     for _ in range(min(drinks_per_person, len(available_drinks))):
                         if available_drinks:
-                            selected_drink = random.choice(available_drinks)
+                            chosen_ids = [item['menu_item_id'] for item in person_items]
+                            selected_drink = self._paired_choice(pairings, chosen_ids, available_drinks, used_items) or random.choice(available_drinks)
                             available_drinks.remove(selected_drink)
-                            used_items.add(selected_drink['id'])
+                            used_items.add(selected_drink.id)
                             
                             person_items.append({
-                                'menu_item_id': selected_drink['id'],
-                                'name': selected_drink['name'],
-                                'price': selected_drink['price'],
-                                'category': selected_drink['category'],
+                                'menu_item_id': selected_drink.id,
+                                'name': selected_drink.name,
+                                'price': selected_drink.price,
+                                'category': selected_drink.category,
                                 'quantity': 1
                             })
-                            person_total += selected_drink['price']
+                            person_total += selected_drink.price
                 
                 party_orders.append({
                     'person_name': person_name,
@@ -673,10 +637,10 @@ class RestaurantMenuSkill(SkillBase):
             from models import Order, OrderItem, MenuItem, db
             
             with app.app_context():
-                # Ensure menu is cached for item validation
-                cached_menu, meta_data = self._ensure_menu_cached(raw_data)
+                # Current menu snapshot for item validation
+                snapshot, meta_data = self._current_menu(raw_data)
                 
-                if not cached_menu:
+                if not snapshot:
                     result = SwaigFunctionResult("Sorry, our menu system is temporarily unavailable. Please try again later.")
                     result.set_metadata(meta_data)
                     return result
@@ -705,8 +669,6 @@ class RestaurantMenuSkill(SkillBase):
                     result.set_metadata(meta_data)
                     return result
                 
-                # Create menu lookup for faster access
-                menu_lookup = {item['name'].lower(): item for item in cached_menu}
                 
                 # Validate and process items
                 order_items = []
@@ -724,16 +686,15 @@ class RestaurantMenuSkill(SkillBase):
                     menu_item = None
                     item_name_lower = item_name.lower()
                     
-                    # Try exact match first
-                    if item_name_lower in menu_lookup:
-                        menu_item_data = menu_lookup[item_name_lower]
-                    else:
+                    # Try exact match first (the snapshot's name index, shared by every call)
+                    menu_item_data = snapshot.by_name.get(item_name_lower)
+                    if not menu_item_data:
                         # Try fuzzy matching
                         best_match = None
                         best_score = 0
                         
-                        for cached_item in cached_menu:
-                            cached_name_lower = cached_item['name'].lower()
+                        for cached_item in snapshot.longest_name_first:
+                            cached_name_lower = cached_item.name.lower()
                             
                             # Check for partial matches
                             if item_name_lower in cached_name_lower or cached_name_lower in item_name_lower:
@@ -752,8 +713,8 @@ class RestaurantMenuSkill(SkillBase):
                         result.set_metadata(meta_data)
                         return result
                     
-                    if not menu_item_data['is_available']:
-                        result = SwaigFunctionResult(f"Sorry, {menu_item_data['name']} is currently unavailable.")
+                    if not menu_item_data.is_available:
+                        result = SwaigFunctionResult(f"Sorry, {menu_item_data.name} is currently unavailable.")
                         result.set_metadata(meta_data)
                         return result
                     
@@ -767,21 +728,21 @@ class RestaurantMenuSkill(SkillBase):
                     
                     # CRITICAL FIX: Auto-populate price if missing from request
                     if item_price == 0 or item_price is None:
-                        item_price = menu_item_data['price']
-                        print(f"🔧 Auto-populated price for {menu_item_data['name']}: ${item_price:.2f}")
+                        item_price = menu_item_data.price
+                        print(f"🔧 Auto-populated price for {menu_item_data.name}: ${item_price:.2f}")
                     
                     # Validate price matches menu price (with auto-fix)
-                    if abs(item_price - menu_item_data['price']) > 0.01:  # Allow for small floating point differences
+                    if abs(item_price - menu_item_data.price) > 0.01:  # Allow for small floating point differences
                         # Instead of failing, auto-correct the price
-                        corrected_price = menu_item_data['price']
-                        print(f"🔧 Price corrected for {menu_item_data['name']}: ${item_price:.2f} → ${corrected_price:.2f}")
+                        corrected_price = menu_item_data.price
+                        print(f"🔧 Price corrected for {menu_item_data.name}: ${item_price:.2f} → ${corrected_price:.2f}")
                         item_price = corrected_price
                     
                     # Add to order
                     item_total = item_price * quantity # Use corrected item_price
                     order_items.append({
-                        'menu_item_id': menu_item_data['id'],
-                        'name': menu_item_data['name'],
+                        'menu_item_id': menu_item_data.id,
+                        'name': menu_item_data.name,
                         'quantity': quantity,
                         'price': item_price, # Store item_price in order_items
                         'total': item_total
@@ -1151,6 +1112,58 @@ class RestaurantMenuSkill(SkillBase):
             print(f"Error sending payment receipt SMS: {e}")
             return {'success': False, 'error': f"SMS sending failed: {str(e)}"}
 
+    def _orders_from_caller_snapshot(self, order_number, customer_phone, customer_name, raw_data):
+        """
+        Look up open orders in the caller snapshot prefetched for this call
+        
+        Returns:
+            Up to 5 order snapshots (newest first), or None when the snapshot can't answer
+        """
+        try:
+            from caller_prefetch import get_caller_prefetcher
+        except ImportError:
+            return None
+        
+        prefetcher = get_caller_prefetcher()
+        call_id = raw_data.get('call_id') if raw_data else None
+        snapshot = prefetcher.get(call_id) if prefetcher and call_id else None
+        if not snapshot or not snapshot.orders:
+            return None
+        
+        if customer_phone and not snapshot.matches_phone(customer_phone):
+            return None
+        
+        if order_number:
+            match = snapshot.orders_by_number.get(order_number)
+            orders = [match] if match else []
+        elif customer_phone:
+            orders = list(snapshot.orders)
+        else:
+            return None
+        
+        if customer_name and not order_number:
+            name = customer_name.lower()
+            orders = [o for o in orders if o.person_name and name in o.person_name.lower()]
+        
+        # The snapshot only holds open orders, so a miss is not authoritative
+        return orders[:5] or None
+
+    def _order_from_booking_window(self, order_number):
+        """
+        Look up an order in the in-memory booking window (today + N days)
+        
+        Returns:
+            A one-element list with the order snapshot, or None on a miss
+        """
+        try:
+            from booking_window import get_booking_window
+        except ImportError:
+            return None
+        
+        window = get_booking_window()
+        order = window.order_by_number(order_number) if window else None
+        return [order] if order else None
+
     def _check_order_status_handler(self, args, raw_data):
         """Handle getting order details and status"""
         try:
@@ -1212,8 +1225,20 @@ class RestaurantMenuSkill(SkillBase):
                     query = query.filter(Order.person_name.ilike(f"%{customer_name}%"))
                     print(f"🔍 Searching by customer name: {customer_name}")
                 
-                # Get orders, prioritizing recent ones
-                orders = query.order_by(Order.created_at.desc()).limit(5).all()
+                # Get orders, prioritizing recent ones - from the caller snapshot or the
+                # booking window when they have them
+                orders = self._orders_from_caller_snapshot(
+                    ''.join(filter(str.isdigit, order_number)) if order_number else None,
+                    phone_clean if customer_phone else None,
+                    customer_name,
+                    raw_data
+                )
+                if not orders and order_number and not customer_phone:
+                    orders = self._order_from_booking_window(''.join(filter(str.isdigit, order_number)))
+                if orders:
+                    print(f"📇 Answered from memory with {len(orders)} orders")
+                else:
+                    orders = query.order_by(Order.created_at.desc()).limit(5).all()
                 
                 if not orders:
                     if order_number:
@@ -1414,10 +1439,10 @@ class RestaurantMenuSkill(SkillBase):
                 return SwaigFunctionResult("Please specify whether you want to 'add' or 'remove' items.")
             
             with app.app_context():
-                # Ensure menu is cached for item validation
-                cached_menu, meta_data = self._ensure_menu_cached(raw_data)
+                # Current menu snapshot for item validation
+                snapshot, meta_data = self._current_menu(raw_data)
                 
-                if not cached_menu:
+                if not snapshot:
                     return SwaigFunctionResult("Sorry, our menu system is temporarily unavailable. Please try again later.")
                 
                 # Find the order using the same logic as get_order_details
@@ -1495,8 +1520,6 @@ class RestaurantMenuSkill(SkillBase):
                 if not can_update:
                     return SwaigFunctionResult(f"❌ {reason}")
                 
-                # Create menu lookup for faster access
-                menu_lookup = {item['name'].lower(): item for item in cached_menu}
                 
                 # Process items
                 updated_items = []
@@ -1521,16 +1544,15 @@ class RestaurantMenuSkill(SkillBase):
                     menu_item_data = None
                     item_name_lower = item_name.lower()
                     
-                    # Try exact match first
-                    if item_name_lower in menu_lookup:
-                        menu_item_data = menu_lookup[item_name_lower]
-                    else:
+                    # Try exact match first (the snapshot's name index, shared by every call)
+                    menu_item_data = snapshot.by_name.get(item_name_lower)
+                    if not menu_item_data:
                         # Try fuzzy matching
                         best_match = None
                         best_score = 0
                         
-                        for cached_item in cached_menu:
-                            cached_name_lower = cached_item['name'].lower()
+                        for cached_item in snapshot.longest_name_first:
+                            cached_name_lower = cached_item.name.lower()
                             
                             # Check for partial matches
                             if item_name_lower in cached_name_lower or cached_name_lower in item_name_lower:
@@ -1547,53 +1569,53 @@ class RestaurantMenuSkill(SkillBase):
                     if not menu_item_data:
                         return SwaigFunctionResult(f"Sorry, I couldn't find '{item_name}' on our menu. Please check the menu and try again.")
                     
-                    if not menu_item_data['is_available']:
-                        return SwaigFunctionResult(f"Sorry, {menu_item_data['name']} is currently unavailable.")
+                    if not menu_item_data.is_available:
+                        return SwaigFunctionResult(f"Sorry, {menu_item_data.name} is currently unavailable.")
                     
                     # Process the action
                     if action == 'add':
                         # Add items to order
                         existing_item = OrderItem.query.filter_by(
                             order_id=order.id,
-                            menu_item_id=menu_item_data['id']
+                            menu_item_id=menu_item_data.id
                         ).first()
                         
                         if existing_item:
                             existing_item.quantity += quantity
-                            updated_items.append(f"Added {quantity}x {menu_item_data['name']} (now {existing_item.quantity} total)")
+                            updated_items.append(f"Added {quantity}x {menu_item_data.name} (now {existing_item.quantity} total)")
                         else:
                             new_order_item = OrderItem(
                                 order_id=order.id,
-                                menu_item_id=menu_item_data['id'],
+                                menu_item_id=menu_item_data.id,
                                 quantity=quantity,
-                                price_at_time=menu_item_data['price']
+                                price_at_time=menu_item_data.price
                             )
                             db.session.add(new_order_item)
-                            updated_items.append(f"Added {quantity}x {menu_item_data['name']}")
+                            updated_items.append(f"Added {quantity}x {menu_item_data.name}")
                         
-                        total_change += menu_item_data['price'] * quantity
+                        total_change += menu_item_data.price * quantity
                         
                     elif action == 'remove':
                         # Remove items from order
                         existing_item = OrderItem.query.filter_by(
                             order_id=order.id,
-                            menu_item_id=menu_item_data['id']
+                            menu_item_id=menu_item_data.id
                         ).first()
                         
                         if not existing_item:
-                            return SwaigFunctionResult(f"'{menu_item_data['name']}' is not in your order, so I can't remove it.")
+                            return SwaigFunctionResult(f"'{menu_item_data.name}' is not in your order, so I can't remove it.")
                         
                         if existing_item.quantity <= quantity:
                             # Remove the item entirely
                             removed_quantity = existing_item.quantity
-                            total_change -= menu_item_data['price'] * removed_quantity
+                            total_change -= menu_item_data.price * removed_quantity
                             db.session.delete(existing_item)
-                            updated_items.append(f"Removed all {removed_quantity}x {menu_item_data['name']}")
+                            updated_items.append(f"Removed all {removed_quantity}x {menu_item_data.name}")
                         else:
                             # Reduce quantity
                             existing_item.quantity -= quantity
-                            total_change -= menu_item_data['price'] * quantity
-                            updated_items.append(f"Removed {quantity}x {menu_item_data['name']} (now {existing_item.quantity} remaining)")
+                            total_change -= menu_item_data.price * quantity
+                            updated_items.append(f"Removed {quantity}x {menu_item_data.name} (now {existing_item.quantity} remaining)")
                 
                 # Update order total
                 order.total_amount = (order.total_amount or 0.0) + total_change
@@ -2154,6 +2176,104 @@ class RestaurantMenuSkill(SkillBase):
                 "You can pay when you pick up your order. Is there anything else I can help you with?"
             ) 
 
+    def _suggest_pairings_handler(self, args, raw_data):
+        """Suggest items often ordered with the given ones, from the precomputed pairings table"""
+        try:
+            from menu_fuzzy import fuzzy_index_for
+            
+            snapshot, meta_data = self._current_menu(raw_data)
+            pairings = self._item_pairings()
+            
+            if snapshot is None or pairings is None:
+                result = SwaigFunctionResult("I can't look up pairings right now.")
+                result.set_metadata(meta_data)
+                return result
+            
+            try:
+                limit = min(max(int(args.get('limit', 2)), 1), 5)
+            except (TypeError, ValueError):
+                limit = 2
+            
+            matches = fuzzy_index_for(snapshot).resolve_many(args.get('items') or [])
+            ordered = [match.item for match in matches if match]
+            if not ordered:
+                result = SwaigFunctionResult("Which items would you like a pairing for?")
+                result.set_metadata(meta_data)
+                return result
+            
+            suggestions = []
+            for pairing in pairings.suggest([item.id for item in ordered], limit=limit * 2):
+                item = snapshot.available_by_id.get(pairing.menu_item_id)
+                if item:
+                    suggestions.append(item)
+                if len(suggestions) == limit:
+                    break
+            
+            ordered_names = " and ".join(item.name for item in ordered)
+            if not suggestions:
+                result = SwaigFunctionResult(f"I don't have a pairing suggestion for {ordered_names} yet.")
+            else:
+                offers = " or ".join(f"{item.name} for ${item.price:.2f}" for item in suggestions)
+                result = SwaigFunctionResult(f"Guests who order {ordered_names} often add {offers}. Would you like to add one?")
+            result.set_metadata(meta_data)
+            return result
+            
+        except Exception as e:
+            print(f"Error in suggest pairings handler: {e}")
+            return SwaigFunctionResult("Sorry, I couldn't look up pairings right now.")
+
+    def _get_popular_items_handler(self, args, raw_data):
+        """Name the best sellers from the in-memory sales rollup"""
+        try:
+            from item_sales import daypart_for
+            
+            snapshot, meta_data = self._current_menu(raw_data)
+            item_sales = self._item_sales()
+            
+            if snapshot is None or item_sales is None:
+                result = SwaigFunctionResult("I can't look up our most popular items right now.")
+                result.set_metadata(meta_data)
+                return result
+            
+            daypart = args.get('daypart')
+            if daypart == 'now':
+                daypart = daypart_for(datetime.now())
+            elif daypart not in ('breakfast', 'lunch', 'dinner'):
+                daypart = None
+            period = args.get('period') if args.get('period') in ('today', 'week', 'month') else 'week'
+            category = (args.get('category') or '').strip().lower()
+            try:
+                limit = min(max(int(args.get('limit', 3)), 1), 5)
+            except (TypeError, ValueError):
+                limit = 3
+            
+            popular = []
+            days = {'today': 1, 'week': 7, 'month': 28}[period]
+            for seller in item_sales.top_sellers(daypart=daypart, days=days, limit=None):
+                item = snapshot.available_by_id.get(seller.menu_item_id)
+                if item and (not category or item.category.lower() == category):
+                    popular.append(item)
+                if len(popular) == limit:
+                    break
+            
+            period_text = {'today': 'today', 'week': 'this week', 'month': 'this month'}[period]
+            if period == 'today' and daypart == 'dinner':
+                period_text = 'tonight'
+            label = " ".join(part for part in (daypart, category.replace('-', ' ') or 'items') if part)
+            
+            if not popular:
+                result = SwaigFunctionResult(f"I don't have enough orders yet to say which {label} are most popular {period_text}.")
+            else:
+                names = [f"{item.name} (${item.price:.2f})" for item in popular]
+                listed = names[0] if len(names) == 1 else ", ".join(names[:-1]) + f" and {names[-1]}"
+                result = SwaigFunctionResult(f"Our most popular {label} {period_text}: {listed}.")
+            result.set_metadata(meta_data)
+            return result
+            
+        except Exception as e:
+            print(f"Error in get popular items handler: {e}")
+            return SwaigFunctionResult("Sorry, I couldn't look up our most popular items right now.")
+
     def _get_surprise_selections_handler(self, args, raw_data):
         """Handle surprise menu selection requests"""
         try:
@@ -56,23 +56,22 @@ class RestaurantReservationSkill(SkillBase):
 
     def _find_menu_item_exact(self, item_name):
         """
-        Find menu item using exact database matching only
+        Find menu item using exact (case-insensitive) name matching only
         
         Args:
-            item_name: The exact item name from the database
+            item_name: The exact item name from the menu
             
         Returns:
-            MenuItem object if found, None otherwise
+            MenuItemSnapshot if found and available, None otherwise
         """
-        from models import MenuItem
-        
         if not item_name:
             return None
         
         # Only use exact matches - no fuzzy logic
-        menu_item = MenuItem.query.filter(
-            MenuItem.name.ilike(item_name.strip())
-        ).filter_by(is_available=True).first()
+        snapshot = self._menu_snapshot()
+        menu_item = snapshot.find(name=item_name) if snapshot else None
+        if menu_item and not menu_item.is_available:
+            menu_item = None
         
         if menu_item:
             print(f"✅ Found exact menu item: {menu_item.name} (ID: {menu_item.id})")
@@ -81,74 +80,39 @@ class RestaurantReservationSkill(SkillBase):
             
         return menu_item
     
-    def _levenshtein_distance(self, s1, s2):
-        """Calculate Levenshtein distance between two strings"""
-        if len(s1) < len(s2):
-            return self._levenshtein_distance(s2, s1)
+    def _menu_snapshot(self):
+        """Current menu snapshot of the caller's location from the shared menu catalog"""
+        import sys
+        import os
         
-        if len(s2) == 0:
-            return len(s1)
+        parent_dir = os.path.dirname(os.path.dirname(__file__))
+        if parent_dir not in sys.path:
+            sys.path.insert(0, parent_dir)
         
-        previous_row = list(range(len(s2) + 1))
-        for i, c1 in enumerate(s1):
-            current_row = [i + 1]
-            for j, c2 in enumerate(s2):
-                insertions = previous_row[j + 1] + 1
-                deletions = current_row[j] + 1
-                substitutions = previous_row[j] + (c1 != c2)
-                current_row.append(min(insertions, deletions, substitutions))
-            previous_row = current_row
+        import app  # registers the menu catalog loader
+        from menu_catalog import menu_snapshot
+        from locations import get_location
         
-        return previous_row[-1]
+        return menu_snapshot(get_location().restaurant_id)
 
     def _cache_menu_in_metadata(self, raw_data):
-        """Enhanced menu caching with robust fallback mechanisms"""
+        """Record the current menu version in meta_data; items are resolved server-side from the catalog"""
         try:
-            import sys
-            import os
+            from locations import get_location
+            from menu_catalog import stamp_menu_version
             
-            parent_dir = os.path.dirname(os.path.dirname(__file__))
-            if parent_dir not in sys.path:
-                sys.path.insert(0, parent_dir)
+            # Get current meta_data
+            meta_data = raw_data.get('meta_data', {}) if raw_data else {}
             
-            from app import app
-            from models import MenuItem
+            snapshot = self._load_menu_with_retry()
+            if snapshot is None:
+                print("❌ Menu catalog unavailable")
+                return meta_data
             
-            with app.app_context():
-                # Get current meta_data
-                meta_data = raw_data.get('meta_data', {}) if raw_data else {}
-                
-                # Enhanced cache validation
-                cache_validation_result = self._validate_cache_freshness(meta_data)
-                if cache_validation_result['is_valid']:
-                    print(f"🚀 Menu cache is fresh ({cache_validation_result['age_minutes']:.1f} min old), using cached data")
-                    return meta_data
-                
-                print(f"📊 Refreshing menu cache (reason: {cache_validation_result['reason']})")
-                
-                # Enhanced menu loading with retry logic
-                cached_menu = self._load_menu_with_retry()
-                
-                if not cached_menu:
-                    print("❌ Failed to load menu from database, attempting fallback")
-                    cached_menu = self._get_fallback_menu_data(meta_data)
-                
-                if cached_menu:
-                    # Update meta_data with enhanced metadata
-                    meta_data.update({
-                        'cached_menu': cached_menu,
-                        'menu_cached_at': datetime.now().isoformat(),
-                        'menu_item_count': len(cached_menu),
-                        'cache_version': '2.0',
-                        'cache_source': 'database' if cached_menu else 'fallback',
-                        'last_cache_refresh': datetime.now().isoformat()
-                    })
-                    
-                    print(f"✅ Cached {len(cached_menu)} menu items in meta_data")
-                    return meta_data
-                else:
-                    print("❌ All menu caching attempts failed")
-                    return meta_data
+            previous_version = stamp_menu_version(meta_data, snapshot, get_location().restaurant_id)
+            if previous_version is not None:
+                print(f"🔄 Menu changed during the call (version {previous_version} -> {snapshot.version})")
+            return meta_data
                 
         except Exception as e:
             print(f"❌ Critical error in menu caching: {e}")
@@ -158,215 +122,33 @@ class RestaurantReservationSkill(SkillBase):
             # Return existing meta_data or empty dict as ultimate fallback
             return raw_data.get('meta_data', {}) if raw_data else {}
 
-    def _validate_cache_freshness(self, meta_data):
-        """Validate cache freshness with detailed analysis"""
-        if not meta_data or not meta_data.get('cached_menu'):
-            return {'is_valid': False, 'reason': 'no_cache_data'}
-        
-        # Check cache timestamp
-        cache_time = meta_data.get('menu_cached_at')
-        if not cache_time:
-            return {'is_valid': False, 'reason': 'no_timestamp'}
-        
-        try:
-            from datetime import datetime, timedelta
-            cached_at = datetime.fromisoformat(cache_time)
-            age = datetime.now() - cached_at
-            age_minutes = age.total_seconds() / 60
-            
-            # Cache is valid for 10 minutes (increased from 5 for better performance)
-            if age < timedelta(minutes=10):
-                return {'is_valid': True, 'age_minutes': age_minutes}
-            else:
-                return {'is_valid': False, 'reason': f'expired_{age_minutes:.1f}min_old'}
-        except ValueError:
-            return {'is_valid': False, 'reason': 'invalid_timestamp_format'}
-        
-        # Check if cache has reasonable number of items
-        cached_menu = meta_data.get('cached_menu', [])
-        if len(cached_menu) < 5:  # Minimum expected menu items
-            return {'is_valid': False, 'reason': f'insufficient_items_{len(cached_menu)}'}
-        
-        return {'is_valid': True, 'age_minutes': age_minutes}
+    def _menu_lookup(self):
+        """Menu item id -> available MenuItemSnapshot from the current catalog (empty if unavailable)"""
+        snapshot = self._load_menu_with_retry()
+        return snapshot.available_by_id if snapshot else {}
 
     def _load_menu_with_retry(self, max_attempts=3):
-        """Load menu from database with retry logic"""
-        from models import MenuItem
-        
+        """Current menu snapshot, retrying a failed catalog load; None if the menu is unusable"""
         for attempt in range(max_attempts):
             try:
-                print(f"📊 Loading menu from database (attempt {attempt + 1}/{max_attempts})")
-                
-                # Enhanced query with explicit ordering for consistency
-                menu_items = MenuItem.query.filter_by(is_available=True).order_by(MenuItem.id).all()
-                
-                if not menu_items:
-                    print("⚠️ No available menu items found in database")
-                    if attempt < max_attempts - 1:
-                        continue
-                    return []
-                
-                # Convert to enhanced serializable format
-                cached_menu = []
-                for item in menu_items:
-                    try:
-                        cached_menu.append({
-                            'id': item.id,
-                            'name': item.name,
-                            'price': float(item.price),
-                            'category': item.category or 'Uncategorized',
-                            'description': item.description or '',
-                            'is_available': bool(item.is_available),
-                            'cached_at': datetime.now().isoformat()
-                        })
-                    except Exception as item_error:
-                        print(f"⚠️ Error processing menu item {item.id}: {item_error}")
-                        continue
-                
-                if cached_menu:
-                    print(f"✅ Successfully loaded {len(cached_menu)} menu items")
-                    return cached_menu
-                else:
-                    print("❌ No valid menu items after processing")
+                snapshot = self._menu_snapshot()
+                # Validated once when this menu version was built
+                if snapshot is not None and snapshot.is_valid:
+                    return snapshot
+                print(f"⚠️ Menu catalog has no usable menu (attempt {attempt + 1}/{max_attempts})")
+                return None
                     
             except Exception as e:
-                print(f"❌ Database error on attempt {attempt + 1}: {e}")
+                print(f"❌ Menu catalog error on attempt {attempt + 1}: {e}")
                 if attempt < max_attempts - 1:
                     import time
                     time.sleep(0.1)  # Brief delay between retries
                     continue
                 else:
-                    print("❌ All database retry attempts failed")
+                    print("❌ All menu catalog attempts failed")
                     break
         
-        return []
-
-    def _get_fallback_menu_data(self, meta_data):
-        """Get fallback menu data when database fails"""
-        # Try to use existing cached data even if expired
-        existing_cache = meta_data.get('cached_menu')
-        if existing_cache and len(existing_cache) > 0:
-            print(f"🔄 Using expired cache as fallback ({len(existing_cache)} items)")
-            
-            # Update timestamps to mark as fallback
-            for item in existing_cache:
-                item['fallback_used'] = True
-                item['fallback_at'] = datetime.now().isoformat()
-            
-            return existing_cache
-        
-        # Ultimate fallback: minimal menu data
-        print("🆘 Using hardcoded fallback menu")
-        return self._get_hardcoded_fallback_menu()
-
-    def _get_hardcoded_fallback_menu(self):
-        """Hardcoded fallback menu for extreme cases"""
-        return [
-            {
-                'id': 1,
-                'name': 'House Special',
-                'price': 25.00,
-                'category': 'Main Course',
-                'description': 'Restaurant special dish',
-                'is_available': True,
-                'fallback': True,
-                'fallback_at': datetime.now().isoformat()
-            },
-            {
-                'id': 2,
-                'name': 'House Salad',
-                'price': 12.00,
-                'category': 'Appetizer',
-                'description': 'Fresh mixed greens',
-                'is_available': True,
-                'fallback': True,
-                'fallback_at': datetime.now().isoformat()
-            },
-            {
-                'id': 3,
-                'name': 'House Wine',
-                'price': 8.00,
-                'category': 'Beverage',
-                'description': 'House wine selection',
-                'is_available': True,
-                'fallback': True,
-                'fallback_at': datetime.now().isoformat()
-            }
-        ]
-
-    def _refresh_menu_cache_if_needed(self, meta_data):
-        """Refresh menu cache if it's getting stale"""
-        if not self._validate_cache_freshness(meta_data)['is_valid']:
-            print("🔄 Menu cache needs refresh, updating...")
-            return self._cache_menu_in_metadata({'meta_data': meta_data})
-        return meta_data
-
-    def _validate_menu_item(self, item_data):
-        """Validate a single menu item"""
-        try:
-            if not isinstance(item_data, dict):
-                return False
-            
-            required_fields = ['id', 'name', 'price', 'category', 'is_available']
-            for field in required_fields:
-                if field not in item_data:
-                    return False
-            
-            if not isinstance(item_data['id'], int) or item_data['id'] <= 0:
-                return False
-            
-            if not isinstance(item_data['name'], str) or len(item_data['name'].strip()) == 0:
-                return False
-            
-            if not isinstance(item_data['price'], (int, float)) or item_data['price'] < 0:
-                return False
-            
-            if not isinstance(item_data['category'], str) or len(item_data['category'].strip()) == 0:
-                return False
-            
-            if not isinstance(item_data['is_available'], bool):
-                return False
-            
-            return True
-            
-        except Exception:
-            return False
-
-    def _validate_menu_cache(self, meta_data):
-        """Validate the complete menu cache"""
-        try:
-            cached_menu = meta_data.get('cached_menu', [])
-            
-            if not isinstance(cached_menu, list):
-                return False
-            
-            if len(cached_menu) == 0:
-                return False
-            
-            seen_ids = set()
-            valid_items = 0
-            
-            for i, item in enumerate(cached_menu):
-                if not self._validate_menu_item(item):
-                    return False
-                
-                item_id = item.get('id')
-                if item_id in seen_ids:
-                    return False
-                seen_ids.add(item_id)
-                valid_items += 1
-            
-            if len(cached_menu) > 500:
-                return False
-            
-            if valid_items < 5:
-                return False
-            
-            print(f"Menu cache validation passed: {valid_items} valid items")
-            return True
-            
-        except Exception:
-            return False
+        return None
 
     def _normalize_phone_number(self, phone_number, caller_id=None):
         """
@@ -522,195 +304,22 @@ class RestaurantReservationSkill(SkillBase):
         return False
     
     def _extract_food_items_from_conversation(self, conversation_text, meta_data=None):
-        """Extract food items mentioned in conversation and return with correct menu item IDs using cached menu"""
+        """Extract food items mentioned in conversation and return with correct menu item IDs using the menu catalog"""
         try:
-            import re
-            
-            # Use cached menu from meta_data if available, otherwise fall back to database query
-            if meta_data and meta_data.get('cached_menu'):
-                print("🚀 Using cached menu from meta_data for food item extraction")
-                cached_menu = meta_data['cached_menu']
-                
-                # Convert cached menu format to menu items format for compatibility
-                menu_items = []
-                class MenuItemStub:
-                    def __init__(self, item_data):
-                        self.id = item_data['id']
-                        self.name = item_data['name']
-                        self.price = item_data['price']
-                        self.category = item_data['category']
-                        self.description = item_data['description']
-                        self.is_available = item_data['is_available']
-                
-                for item_data in cached_menu:
-                    menu_items.append(MenuItemStub(item_data))
-                
-                print(f"✅ Using {len(menu_items)} cached menu items for extraction")
-            else:
-                print("📊 No cached menu found, querying database")
-                # Fall back to database query if no cached menu
-                import sys
-                import os
-                
-                # Add the parent directory to sys.path to import app
-                parent_dir = os.path.dirname(os.path.dirname(__file__))
-                if parent_dir not in sys.path:
-                    sys.path.insert(0, parent_dir)
-                
-                from app import app
-                from models import MenuItem
-                
-                with app.app_context():
-                    menu_items = MenuItem.query.filter_by(is_available=True).all()
-            
-            extracted_items = []
-            conversation_lower = conversation_text.lower()
-            
-            # CRITICAL FIX: Sort by name length (descending) to prioritize compound names
-            # This ensures "Chicken Tenders" matches before "Chicken Caesar Salad" when user says "chicken tenders"
-            menu_items = sorted(menu_items, key=lambda item: len(item.name.lower()), reverse=True)
-            
-            # Common quantity words and numbers
-            quantity_patterns = {
-                'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5,
-                'six': 6, 'seven': 7, 'eight': 8, 'nine': 9, 'ten': 10,
-                'a': 1, 'an': 1, 'single': 1, 'couple': 2, 'few': 3,
-                '1': 1, '2': 2, '3': 3, '4': 4, '5': 5, '6': 6, '7': 7, '8': 8, '9': 9, '10': 10
-            }
-            
-            # Track already matched items to avoid duplicates
-            matched_items = set()
-            
-            # Check each menu item to see if it's mentioned in conversation
-            for menu_item in menu_items:
-                item_name = menu_item.name.lower()
-                
-                # CRITICAL FIX: Only skip if we already found this EXACT item, not just the base word
-                # This allows "Chicken Tenders" to be found even if "Chicken Caesar Salad" was already matched
-                if any(existing['menu_item_id'] == menu_item.id for existing in extracted_items):
-                    continue
-                
-                # Create variations of the item name to check
-                name_variations = []
-                
-                # For exact menu item name matching
-                name_variations.append(item_name)
-                
-                # Special cases for common items with priority matching
-                if item_name == 'pepsi':  # Exact match for regular Pepsi
-                    name_variations.extend(['pepsi', 'soda', 'cola'])
-                elif item_name == 'diet pepsi':  # Only match if specifically mentioned
-                    name_variations.extend(['diet pepsi', 'diet soda'])
-                elif item_name == 'coca-cola':  # Exact match for Coca-Cola
-                    name_variations.extend(['coke', 'coca cola', 'coca-cola'])
-                elif item_name == 'bbq wings':  # PRIORITY: BBQ Wings should match first
-                    name_variations.extend(['bbq wings', 'barbecue wings', 'bbq wing'])
-                    # Special handling for "bbq" + "wings" combination
-                    if 'bbq' in conversation_lower and 'wings' in conversation_lower:
-                        name_variations.extend(['wings', 'wing'])
-                elif 'buffalo wings' in item_name:
-                    # Only match buffalo wings if BBQ wings wasn't already matched
-                    if 'bbq' not in conversation_lower:
-                        name_variations.extend(['wings', 'buffalo wing', 'wing', 'buffalo wings'])
-                elif 'draft beer' in item_name:
-                    name_variations.extend(['beer', 'draft', 'draft beer'])
-                elif 'classic cheeseburger' in item_name:
-                    name_variations.extend(['classic cheeseburger', 'cheeseburger', 'classic burger', 'burger'])
-                elif 'bbq ribs' in item_name:
-                    name_variations.extend(['bbq ribs', 'barbecue ribs', 'ribs'])
-                elif 'bbq burger' in item_name:
-                    # Only match BBQ burger if specifically mentioned, not just "bbq"
-                    name_variations.extend(['bbq burger', 'barbecue burger'])
-                elif 'mountain dew' in item_name:
-                    name_variations.extend(['mountain dew', 'dew'])
-                elif 'chicken tenders' in item_name:
-                    name_variations.extend(['chicken tenders', 'chicken tender', 'tenders', 'chicken fingers', 'fingers'])
-                elif 'truffle fries' in item_name:
-                    name_variations.extend(['truffle fries', 'truffle frie'])
-                elif 'eggs benedict' in item_name:
-                    name_variations.extend(['eggs benedict', 'egg benedict', 'benedict'])
-                else:
-                    # For other items, add common variations
-                    name_variations.append(item_name.replace(' ', ''))  # Remove spaces
-                    if ' ' in item_name:
-                        # Add individual words for partial matching, but exclude common connecting words
-                        words = item_name.split()
-                        # Filter out common connecting words and very short words that could cause false matches
-                        filtered_words = [word for word in words if word.lower() not in 
-                                        ['and', 'or', 'the', 'a', 'an', 'with', 'of', 'in', 'on'] and len(word) >= 3]
-                        name_variations.extend(filtered_words)
-                
-                # Check if any variation appears in conversation
-                for variation in name_variations:
-                    if len(variation) > 2 and variation in conversation_lower:
-                        # Special logic for Pepsi vs Diet Pepsi disambiguation
-                        if variation == 'pepsi':
-                            # If conversation contains "diet", only match Diet Pepsi with "diet pepsi"
-                            if 'diet' in conversation_lower:
-                                if item_name == 'pepsi':  # Skip regular Pepsi when diet is mentioned
-                                    continue
-                            else:
-                                if item_name == 'diet pepsi':  # Skip Diet Pepsi when diet is NOT mentioned
-                                    continue
-                        
-                        # Try to find quantity near the item mention
-                        quantity = 1  # Default
-                        
-                        # Look for numbers or quantity words near the item name
-                        patterns = [
-                            rf'(\d+)\s*{re.escape(variation)}',  # "2 pepsi"
-                            rf'{re.escape(variation)}\s*(\d+)',  # "pepsi 2"
-                            rf'(\w+)\s*{re.escape(variation)}',  # "two pepsi"
-                            rf'{re.escape(variation)}\s*(\w+)',  # "pepsi two"
-                        ]
-                        
-                        for pattern in patterns:
-                            match = re.search(pattern, conversation_lower)
-                            if match:
-                                qty_text = match.group(1).lower()
-                                if qty_text.isdigit():
-                                    quantity = int(qty_text)
-                                elif qty_text in quantity_patterns:
-                                    quantity = quantity_patterns[qty_text]
-                                break
-                        
-                        extracted_items.append({
-                            'menu_item_id': menu_item.id,
-                            'quantity': quantity,
-                            'name': menu_item.name,
-                            'matched_variation': variation
-                        })
-                        
-                        print(f"🔍 Found menu item: '{variation}' -> {menu_item.name} (ID {menu_item.id}) x{quantity}")
-                        
-                        break  # Stop checking variations for this item
+            from menu_matcher import matcher_for
             
-            print(f"🔍 Extracted {len(extracted_items)} food items from conversation")
+            snapshot = self._menu_snapshot()
+            if not snapshot:
+                return []
             
-            # POST-PROCESSING: Remove less specific matches when more specific ones exist
-            # Example: If both "Chicken Caesar Salad" (matched by "chicken") and "Chicken Tenders" (matched by "chicken tenders") 
-            # are found, keep only the more specific "Chicken Tenders"
-            filtered_items = []
+            # Compiled once per menu version: names, aliases and distinctive words,
+            # matched leftmost-longest in a single pass ("diet pepsi" before "pepsi")
+            extracted_items = matcher_for(snapshot).extract(conversation_text)
             for item in extracted_items:
-                variation = item['matched_variation']
-                
-                # Check if there's a more specific match for the same base concept
-                more_specific_exists = False
-                for other_item in extracted_items:
-                    other_variation = other_item['matched_variation']
-                    # If another item has a longer, more specific variation that contains this one
-                    if (other_variation != variation and 
-                        len(other_variation) > len(variation) and 
-                        variation in other_variation):
-                        more_specific_exists = True
-                        print(f"🔍 Removing less specific match: '{variation}' -> {item['name']} (more specific: '{other_variation}' -> {other_item['name']})")
-                        break
-                
-                if not more_specific_exists:
-                    filtered_items.append(item)
+                print(f"🔍 Found menu item: '{item['matched_variation']}' -> {item['name']} (ID {item['menu_item_id']}) x{item['quantity']}")
             
-            print(f"🔍 After filtering: {len(filtered_items)} food items")
-            return filtered_items
+            print(f"🔍 Extracted {len(extracted_items)} food items from conversation")
+            return extracted_items
             
         except Exception as e:
             print(f"❌ Error extracting food items from conversation: {e}")
@@ -1095,12 +704,12 @@ class RestaurantReservationSkill(SkillBase):
             except Exception as e:
                 logger.error(f"Failed to register check_payment_completion: {str(e)}", exc_info=True)
                 
-            # Weather forecast tool for restaurant location (zipcode 15222)
+            # Weather forecast tool for the restaurant location being called
             logger.info("Registering get_weather_forecast")
             try:
                 self.agent.define_tool(
                     name="get_weather_forecast",
-                    description="Get weather forecast for the restaurant area (zipcode 15222) for a reservation date. Use this when customers ask about weather for their reservation or the restaurant location.",
+                    description="Get weather forecast for the restaurant area for a reservation date. Use this when customers ask about weather for their reservation or the restaurant location.",
                     parameters={
                         "type": "object",
                         "properties": {
@@ -1870,11 +1479,8 @@ class RestaurantReservationSkill(SkillBase):
             from models import MenuItem
             
             with app.app_context():
-                # Enhanced menu cache validation
+                # Menu from the shared catalog (validated once per version)
                 meta_data = self._cache_menu_in_metadata(raw_data)
-                if not self._validate_menu_cache(meta_data):
-                    print("⚠️ Menu cache validation failed during order summary")
-                    meta_data = self._cache_menu_in_metadata(raw_data)
                 
                 party_orders = args.get('party_orders', [])
                 if not party_orders:
@@ -1885,15 +1491,14 @@ class RestaurantReservationSkill(SkillBase):
                 if not validated_party_orders:
                     return SwaigFunctionResult("The order items couldn't be validated. Please tell me what you'd like to order again.")
                 
-                # Use cached menu for fast lookups
-                cached_menu = meta_data.get('cached_menu', [])
-                menu_lookup = {item['id']: item for item in cached_menu} if cached_menu else {}
+                # Current menu from the shared catalog for fast lookups and accurate pricing
+                menu_lookup = self._menu_lookup()
                 
                 if not menu_lookup:
-                    # Fallback to database if no cached menu
+                    # Fallback to database if the catalog can't load
                     print("📊 Fallback to database for order summary")
                     menu_items = MenuItem.query.filter_by(is_available=True).all()
-                    menu_lookup = {item.id: {'id': item.id, 'name': item.name, 'price': float(item.price)} for item in menu_items}
+                    menu_lookup = {item.id: item for item in menu_items}
                 
                 # Enhanced order summary generation
                 summary_result = self._generate_enhanced_order_summary(
@@ -1980,8 +1585,8 @@ class RestaurantReservationSkill(SkillBase):
                             continue
                         
                         menu_info = menu_lookup[menu_item_id]
-                        item_name = menu_info['name']
-                        item_price = float(menu_info['price'])
+                        item_name = menu_info.name
+                        item_price = float(menu_info.price)
                         
                         # Validate quantity
                         if quantity <= 0:
@@ -2071,6 +1676,45 @@ class RestaurantReservationSkill(SkillBase):
             'missing_items': missing_items
         }
 
+    def _existing_reservation_result(self, reservation):
+        """Result for a create_reservation retry that matched an existing booking"""
+        from signalwire_agents.core.function_result import SwaigFunctionResult
+
+        try:
+            time_12hr = datetime.strptime(reservation.time, '%H:%M').strftime('%I:%M %p').lstrip('0')
+        except (ValueError, TypeError):
+            time_12hr = reservation.time
+
+        pre_order_total = sum(order.total_amount or 0 for order in reservation.orders)
+        party_text = "person" if reservation.party_size == 1 else "people"
+
+        message = f"You already have this reservation, so I didn't book it twice.\n\n"
+        message += f"🎯 YOUR RESERVATION NUMBER IS: {reservation.reservation_number}\n\n"
+        message += f"Reservation Details:\n"
+        message += f"• Name: {reservation.name}\n"
+        message += f"• Date: {reservation.date}\n"
+        message += f"• Time: {time_12hr}\n"
+        message += f"• Party Size: {reservation.party_size} {party_text}\n"
+        if pre_order_total > 0:
+            message += f"\nPre-Order Total: ${pre_order_total:.2f}\n"
+        message += f"\nWould you like to change anything about this reservation?"
+
+        result = SwaigFunctionResult(message)
+        result.set_metadata({
+            "reservation_created": True,
+            "duplicate_booking": True,
+            "reservation_number": reservation.reservation_number,
+            "customer_name": reservation.name,
+            "party_size": reservation.party_size,
+            "reservation_date": reservation.date,
+            "reservation_time": reservation.time,
+            "phone_number": reservation.phone_number,
+            "has_pre_orders": pre_order_total > 0,
+            "pre_order_total": pre_order_total,
+            "reservation_id": reservation.id
+        })
+        return result
+
     def _create_reservation_handler(self, args, raw_data):
         """Handler for create_reservation tool"""
         try:
@@ -2098,9 +1742,6 @@ class RestaurantReservationSkill(SkillBase):
             from models import db, Reservation
             
             with app.app_context():
-                # Cache menu in meta_data for performance
-                meta_data = self._cache_menu_in_metadata(raw_data)
-                
                 # NEW PREORDER WORKFLOW CHECK
                 # Check if this is a preorder that needs summarization first
                 current_meta_data = raw_data.get('meta_data', {}) if raw_data else {}
@@ -2627,9 +2268,16 @@ class RestaurantReservationSkill(SkillBase):
                     print(f"❌ Reservation is in the past: {reservation_datetime} < {buffer_time}")
                     return SwaigFunctionResult("I can't make a reservation for a time in the past. Please choose a future date and time.")
                 
-                # No duplicate prevention - allow all reservation requests
-                # Customers should be free to make multiple reservations as needed
-                
+                # Customers may hold several reservations, but a retry of the same
+                # booking (same phone, date, time slot and party size) returns the existing one
+                from booking_fingerprint import find_duplicate_reservation
+                existing_reservation = find_duplicate_reservation(
+                    args['phone_number'], args['date'], args['time'], args['party_size']
+                )
+                if existing_reservation:
+                    print(f"🔁 Duplicate booking request matched reservation {existing_reservation.reservation_number}")
+                    return self._existing_reservation_result(existing_reservation)
+
                 # Generate a unique 6-digit reservation number (matching Flask route logic)
                 while True:
                     reservation_number = f"{random.randint(100000, 999999)}"
@@ -2731,37 +2379,33 @@ class RestaurantReservationSkill(SkillBase):
                     print(f"   ⚠️ WARNING: Using fallback pre_order format instead of preferred party_orders")
                     print(f"   📋 Raw pre_order data: {pre_order}")
                     
-                    from models import MenuItem
-                    
-                    # Convert pre_order items to party_orders format using enhanced matching
+                    # Convert pre_order items to party_orders format, resolving every
+                    # name in one batch (exact names score 1.0, then misspellings and aliases)
                     converted_items = []
-                    for item in pre_order:
+                    unresolved_names = []
+                    menu_matches = self._find_menu_items_fuzzy([item.get('name', '') for item in pre_order])
+                    for item, menu_item in zip(pre_order, menu_matches):
                         item_name = item.get('name', '')
                         quantity = item.get('quantity', 1)
                         
-                        # Enhanced matching: try exact match first, then fuzzy match
-                        menu_item = self._find_menu_item_exact(item_name)
-                        
-                        if not menu_item:
-                            print(f"   🔍 Exact match failed for '{item_name}', trying fuzzy match...")
-                            menu_item = self._find_menu_item_fuzzy(item_name, meta_data)
-                        
                         if menu_item:
                             # Include price for transparency and validation
-                            if hasattr(menu_item, 'price'):
-                                price = float(menu_item.price)
-                            else:
-                                price = menu_item.get('price', 0.0) if isinstance(menu_item, dict) else 0.0
-                            
+                            price = float(menu_item.price)
                             converted_items.append({
-                                'menu_item_id': menu_item.id if hasattr(menu_item, 'id') else menu_item.get('id'),
+                                'menu_item_id': menu_item.id,
                                 'quantity': quantity,
                                 'name': item_name,  # Keep original name for debugging
                                 'price': price      # Include price for validation
                             })
-                            print(f"   ✅ Converted: '{item_name}' → ID {menu_item.id if hasattr(menu_item, 'id') else menu_item.get('id')} @ ${price:.2f}")
-                        else:
-                            print(f"   ❌ No match found for '{item_name}' - skipping item")
+                            print(f"   ✅ Converted: '{item_name}' → ID {menu_item.id} @ ${price:.2f}")
+                        elif item_name:
+                            unresolved_names.append(item_name)
+                            print(f"   ❓ No single match for '{item_name}' - asking the caller")
+                    
+                    if unresolved_names:
+                        # Don't book the reservation without the items the caller asked for
+                        db.session.rollback()
+                        return self._ask_which_menu_items(unresolved_names, 'make your reservation')
                     
                     if converted_items:
                         # ENHANCED: Use party distribution logic for multiple people
@@ -2819,15 +2463,14 @@ class RestaurantReservationSkill(SkillBase):
                     # SIMPLIFIED PROCESSING: Trust the provided menu IDs and use cached menu data
                     print(f"🔧 SIMPLIFIED: Using provided menu IDs directly with cached menu validation")
                     
-                    # Use cached menu for fast lookups and accurate pricing
-                    cached_menu = meta_data.get('cached_menu', [])
-                    menu_lookup = {item['id']: item for item in cached_menu} if cached_menu else {}
+                    # Current menu from the shared catalog for fast lookups and accurate pricing
+                    menu_lookup = self._menu_lookup()
                     
                     if not menu_lookup:
-                        print("⚠️ No cached menu available, querying database directly")
-                        # Fallback to database if no cached menu
+                        print("⚠️ Menu catalog unavailable, querying database directly")
+                        # Fallback to database if the catalog can't load
                         menu_items = MenuItem.query.filter_by(is_available=True).all()
-                        menu_lookup = {item.id: {'id': item.id, 'name': item.name, 'price': float(item.price), 'category': item.category} for item in menu_items}
+                        menu_lookup = {item.id: item for item in menu_items}
                     
                     print(f"📊 Using menu data with {len(menu_lookup)} items for pricing")
                     
@@ -2868,8 +2511,8 @@ class RestaurantReservationSkill(SkillBase):
                             # Get menu item info from cached data or database
                             if menu_item_id in menu_lookup:
                                 menu_info = menu_lookup[menu_item_id]
-                                menu_item_name = menu_info['name']
-                                menu_item_price = float(menu_info['price'])
+                                menu_item_name = menu_info.name
+                                menu_item_price = float(menu_info.price)
                                 print(f"      ✅ Using cached data: {menu_item_name} x{quantity} @ ${menu_item_price}")
                             else:
                                 # Fallback to database query
@@ -3083,19 +2726,16 @@ class RestaurantReservationSkill(SkillBase):
                     print(f"🌤️ Fetching weather for outdoor seating request on {args.get('date')}")
                     
                     try:
-                        import requests
                         import os
+                        from locations import fetch_location_weather
                         
                         weather_api_key = os.getenv('WEATHER_API_KEY')
-                        location = "15222"  # Restaurant zipcode
                         
                         if weather_api_key and args.get('date'):
-                            # Fetch weather forecast for reservation date
-                            api_url = f"https://api.weatherapi.com/v1/forecast.json?key={weather_api_key}&q={location}&days=10&aqi=no&alerts=no"
-                            response = requests.get(api_url, timeout=5)
+                            # Fetch weather forecast for reservation date at this location (cached per location)
+                            weather_data = fetch_location_weather('forecast', days=10, timeout=5)
                             
-                            if response.status_code == 200:
-                                weather_data = response.json()
+                            if weather_data:
                                 reservation_date = args.get('date')
                                 
                                 # Find forecast for reservation date
@@ -3159,7 +2799,7 @@ class RestaurantReservationSkill(SkillBase):
                                 else:
                                     print("⚠️ Could not find weather forecast for reservation date")
                             else:
-                                print(f"⚠️ Weather API request failed: {response.status_code}")
+                                print("⚠️ Weather API request failed")
                         else:
                             print("⚠️ Weather API key not available or no date provided")
                             
@@ -3418,6 +3058,54 @@ class RestaurantReservationSkill(SkillBase):
             print(f"   Traceback: {traceback.format_exc()}")
             return SwaigFunctionResult(f"Sorry, there was an error creating your reservation: {str(e)}")
     
+    def _reservations_from_caller_snapshot(self, args, raw_data):
+        """
+        Look up reservations in the caller snapshot prefetched for this call
+        
+        Returns:
+            List of reservation snapshots, or None when the snapshot can't answer
+        """
+        try:
+            from caller_prefetch import get_caller_prefetcher
+        except ImportError:
+            return None
+        
+        prefetcher = get_caller_prefetcher()
+        call_id = raw_data.get('call_id') if raw_data else None
+        snapshot = prefetcher.get(call_id) if prefetcher and call_id else None
+        if not snapshot or not snapshot.reservations:
+            return None
+        
+        if args.get('confirmation_number'):
+            matches = [r for r in snapshot.reservations if r.confirmation_number == args['confirmation_number']]
+        elif args.get('reservation_id'):
+            matches = [r for r in snapshot.reservations if str(r.id) == str(args['reservation_id'])]
+        elif args.get('reservation_number'):
+            match = snapshot.reservations_by_number.get(str(args['reservation_number']))
+            matches = [match] if match else []
+        elif args.get('name'):
+            name = args['name'].lower()
+            matches = [r for r in snapshot.reservations if name in r.name.lower()]
+        elif args.get('first_name') or args.get('last_name'):
+            # Rarely used; let the DB handle prefix/suffix matching
+            return None
+        elif args.get('phone_number') and snapshot.matches_phone(args['phone_number']):
+            matches = list(snapshot.reservations)
+        else:
+            return None
+        
+        if args.get('date'):
+            matches = [r for r in matches if r.date == args['date']]
+        if args.get('time'):
+            matches = [r for r in matches if r.time == args['time']]
+        if args.get('party_size'):
+            matches = [r for r in matches if str(r.party_size) == str(args['party_size'])]
+        if args.get('email'):
+            return None
+        
+        # The snapshot only holds upcoming reservations, so a miss is not authoritative
+        return matches or None
+
     def _get_reservation_handler(self, args, raw_data):
         """Handler for get_reservation tool"""
         try:
@@ -3661,8 +3349,13 @@ class RestaurantReservationSkill(SkillBase):
                 print(f"🔍 Final search criteria: {search_criteria}")
                 print(f"🔍 Query filters applied: {len(search_criteria)} filters")
                 
-                reservations = query.all()
-                print(f"🔍 Database query returned {len(reservations)} reservations")
+                # Answer from the caller snapshot warmed at call start, falling back to the DB
+                reservations = self._reservations_from_caller_snapshot(args, raw_data)
+                if reservations:
+                    print(f"📇 Caller snapshot returned {len(reservations)} reservations")
+                else:
+                    reservations = query.all()
+                    print(f"🔍 Database query returned {len(reservations)} reservations")
                 
                 # Debug: Show what we're actually searching for
                 if args:
@@ -4198,13 +3891,17 @@ class RestaurantReservationSkill(SkillBase):
                 # Handle explicit add_items parameter from function call
                 add_items = args.get('add_items', [])
                 if add_items:
-                    # Process the add_items parameter
-                    for item_spec in add_items:
+                    # Process the add_items parameter, resolving all names in one batch
+                    item_names = [item_spec.get('name', '') for item_spec in add_items]
+                    menu_matches = self._find_menu_items_fuzzy(item_names)
+                    unresolved_names = [name for name, match in zip(item_names, menu_matches) if name and not match]
+                    if unresolved_names:
+                        # Nothing is changed until every item the caller asked for is known
+                        return self._ask_which_menu_items(unresolved_names, 'update your order')
+                    for item_spec, menu_item in zip(add_items, menu_matches):
                         item_name = item_spec.get('name', '')
                         quantity = item_spec.get('quantity', 1)
                         
-                        # Find menu item by name with fuzzy matching
-                        menu_item = self._find_menu_item_fuzzy(item_name, meta_data)
                         if menu_item:
                             pre_order_items.append({
                                 'name': menu_item.name,
@@ -4213,8 +3910,6 @@ class RestaurantReservationSkill(SkillBase):
                                 'price': menu_item.price
                             })
                             print(f"🍽️ Added from add_items parameter: {quantity}x {menu_item.name}")
-                        else:
-                            print(f"⚠️ Could not find menu item for '{item_name}' from add_items parameter")
                 
                 # Handle pre-order additions (from conversation or add_items parameter)
                 if pre_order_items:
@@ -4829,8 +4524,8 @@ class RestaurantReservationSkill(SkillBase):
             return []
         
         fixed_orders = []
-        cached_menu = meta_data.get('cached_menu', [])
-        menu_lookup = {item['id']: item for item in cached_menu} if cached_menu else {}
+        # Current menu from the shared catalog for fast lookups and accurate pricing
+        menu_lookup = self._menu_lookup()
         
         for order in party_orders:
             if not isinstance(order, dict):
@@ -5026,154 +4721,76 @@ class RestaurantReservationSkill(SkillBase):
         
         return transaction_success, created_orders, total_reservation_amount
 
-    def _find_menu_item_fuzzy(self, item_name, meta_data=None):
+    def _find_menu_items_fuzzy(self, item_names):
         """
-        Find menu item using fuzzy matching with cached menu support
+        Resolve every item name of an order at once with the fuzzy menu index
         
         Args:
-            item_name: The item name to search for (potentially misspelled)
-            meta_data: Optional meta_data containing cached menu
+            item_names: Item names as spoken or typed (misspellings, aliases, single words)
             
         Returns:
-            MenuItem object or dict if found, None otherwise
+            List of MenuItemSnapshot (or None where nothing matched), in the same order
         """
-        from models import MenuItem
-        import re
-        
-        if not item_name:
-            return None
+        snapshot = self._menu_snapshot()
+        if not snapshot:
+            return [None] * len(item_names)
         
-        # Normalize the search term
-        search_term = item_name.lower().strip()
+        from menu_fuzzy import fuzzy_index_for
         
-        # Use cached menu if available, otherwise query database
-        if meta_data and meta_data.get('cached_menu'):
-            print(f"🚀 Using cached menu for fuzzy search of '{item_name}'")
-            cached_menu = meta_data['cached_menu']
-            
-            # Convert to compatible format for existing logic
-            class MenuItemStub:
-                def __init__(self, item_data):
-                    self.id = item_data['id']
-                    self.name = item_data['name']
-                    self.price = item_data['price']
-                    self.category = item_data['category']
-                    self.description = item_data['description']
-                    self.is_available = item_data['is_available']
-            
-            # First try exact match (case-insensitive)
-            for item_data in cached_menu:
-                if item_data['name'].lower() == search_term and item_data['is_available']:
-                    return MenuItemStub(item_data)
-            
-            # Try partial match
-            for item_data in cached_menu:
-                if search_term in item_data['name'].lower() and item_data['is_available']:
-                    return MenuItemStub(item_data)
-            
-            # Convert cached items to stub objects for fuzzy matching
-            menu_items = [MenuItemStub(item_data) for item_data in cached_menu if item_data['is_available']]
-        else:
-            print(f"📊 Using database query for fuzzy search of '{item_name}'")
-            
-            # First try exact match (case-insensitive)
-            menu_item = MenuItem.query.filter(
-                MenuItem.name.ilike(search_term)
-            ).filter_by(is_available=True).first()
-            if menu_item:
-                return menu_item
-            
-            # Try partial match
-            menu_item = MenuItem.query.filter(
-                MenuItem.name.ilike(f'%{search_term}%')
-            ).filter_by(is_available=True).first()
-            if menu_item:
-                return menu_item
-            
-            # Get all available menu items for fuzzy matching
-            menu_items = MenuItem.query.filter_by(is_available=True).all()
+        # Built once per menu version: names, aliases and distinctive words
+        matches = fuzzy_index_for(snapshot).resolve_many(item_names)
+        for item_name, match in zip(item_names, matches):
+            if match and match.score < 1.0:
+                print(f"🔍 Fuzzy match: '{item_name}' -> {match.item.name} (score {match.score}, via '{match.phrase}')")
+        return [match.item if match else None for match in matches]
+
+    def _ask_which_menu_items(self, item_names, action):
+        """
+        Ask the caller about item names _find_menu_items_fuzzy couldn't resolve
         
-        # Common spelling corrections and variations
-        spelling_corrections = {
-            'kraft': 'craft',
-            'coke': 'coca-cola',
-            'lemonade': 'craft lemonade',
-            'tea': 'iced tea',
-            'coffee': 'coffee',
-            'sparkling water': 'sparkling water',
-            'water': 'sparkling water',
-            'beer': 'draft beer',
-            'wine': 'house wine',
-            'chicken fingers': 'chicken tenders',
-            'fingers': 'chicken tenders'
-        }
+        A name either matched nothing or matched several items equally well
+        ("chicken" with two chicken dishes); the tied items are offered by name.
         
-        # Apply spelling corrections
-        corrected_term = search_term
-        for wrong, correct in spelling_corrections.items():
-            if wrong in search_term:
-                corrected_term = search_term.replace(wrong, correct)
-                break
+        Args:
+            item_names: The unresolved names as the caller said them
+            action: What is on hold until they answer ("make your reservation")
+        """
+        snapshot = self._menu_snapshot()
+        index = None
+        if snapshot:
+            from menu_fuzzy import fuzzy_index_for
+            index = fuzzy_index_for(snapshot)
         
-        # Try corrected term with cached menu
-        if corrected_term != search_term and meta_data and meta_data.get('cached_menu'):
-            for item_data in meta_data['cached_menu']:
-                if corrected_term in item_data['name'].lower() and item_data['is_available']:
-                    class MenuItemStub:
-                        def __init__(self, item_data):
-                            self.id = item_data['id']
-                            self.name = item_data['name']
-                            self.price = item_data['price']
-                            self.category = item_data['category']
-                            self.description = item_data['description']
-                            self.is_available = item_data['is_available']
-                    return MenuItemStub(item_data)
-        elif corrected_term != search_term:
-            menu_item = MenuItem.query.filter(
-                MenuItem.name.ilike(f'%{corrected_term}%')
-            ).filter_by(is_available=True).first()
-            if menu_item:
-                return menu_item
+        questions = []
+        for item_name in dict.fromkeys(item_names):
+            matches = index.search(item_name) if index else []
+            tied = [match.item.name for match in matches if match.score == matches[0].score]
+            if len(tied) > 1:
+                choices = ', '.join(tied[:-1]) + f" or {tied[-1]}"
+                questions.append(f"for '{item_name}', did you mean {choices}?")
+            else:
+                questions.append(f"I couldn't find '{item_name}' on our menu. What should I add instead?")
         
-        # Fuzzy matching using simple similarity
-        best_match = None
-        best_score = 0
+        message = f"Before I {action}, " + ' And '.join(questions)
+        return SwaigFunctionResult(message)
+
+    def _reservations_from_booking_window(self, start_date, end_date):
+        """
+        Non-cancelled reservations in [start_date, end_date] from the in-memory booking window
         
-        for item in menu_items:
-            item_name_lower = item.name.lower()
-            
-            # Calculate similarity score
-            score = 0
-            
-            # Exact word matches get high score
-            search_words = search_term.split()
-            item_words = item_name_lower.split()
-            
-            for search_word in search_words:
-                for item_word in item_words:
-                    if search_word == item_word:
-                        score += 10
-                    elif search_word in item_word or item_word in search_word:
-                        score += 5
-                    elif self._levenshtein_distance(search_word, item_word) <= 2:
-                        score += 3
-            
-            # Bonus for containing the search term
-            if search_term in item_name_lower:
-                score += 8
-            elif corrected_term in item_name_lower:
-                score += 6
-            
-            # Length penalty for very different lengths
-            length_diff = abs(len(search_term) - len(item_name_lower))
-            if length_diff > 5:
-                score -= 2
-            
-            if score > best_score and score >= 3:  # Minimum threshold
-                best_score = score
-                best_match = item
+        Returns:
+            List of reservation snapshots ordered by date and time, or None if the
+            window doesn't cover the range and the caller should query the database
+        """
+        try:
+            from booking_window import get_booking_window
+        except ImportError:
+            return None
         
-        return best_match
+        window = get_booking_window()
+        if not window:
+            return None
+        return window.reservations_between(start_date, end_date)
 
     def _get_calendar_events_handler(self, args, raw_data):
         """Handler for get_calendar_events tool"""
@@ -5202,12 +4819,14 @@ class RestaurantReservationSkill(SkillBase):
                     end_dt = start_dt + timedelta(days=30)
                     end_date = end_dt.strftime('%Y-%m-%d')
                 
-                # Query reservations in date range
-                reservations = Reservation.query.filter(
-                    Reservation.date >= start_date,
-                    Reservation.date <= end_date,
-                    Reservation.status != 'cancelled'
-                ).order_by(Reservation.date, Reservation.time).all()
+                # Reservations in date range - from the booking window when it covers the range
+                reservations = self._reservations_from_booking_window(start_date, end_date)
+                if reservations is None:
+                    reservations = Reservation.query.filter(
+                        Reservation.date >= start_date,
+                        Reservation.date <= end_date,
+                        Reservation.status != 'cancelled'
+                    ).order_by(Reservation.date, Reservation.time).all()
                 
                 format_type = args.get('format', 'text')
                 
@@ -5297,12 +4916,14 @@ class RestaurantReservationSkill(SkillBase):
                 # Get target date (default to today)
                 target_date = args.get('date', datetime.now().strftime('%Y-%m-%d'))
                 
-                # Query today's reservations
-                reservations = Reservation.query.filter_by(
-                    date=target_date
-                ).filter(
-                    Reservation.status != 'cancelled'
-                ).order_by(Reservation.time).all()
+                # Today's reservations - from the booking window when it covers the date
+                reservations = self._reservations_from_booking_window(target_date, target_date)
+                if reservations is None:
+                    reservations = Reservation.query.filter_by(
+                        date=target_date
+                    ).filter(
+                        Reservation.status != 'cancelled'
+                    ).order_by(Reservation.time).all()
                 
                 format_type = args.get('format', 'text')
                 
@@ -5376,12 +4997,14 @@ class RestaurantReservationSkill(SkillBase):
                     date_obj = datetime.strptime(target_date, '%Y-%m-%d')
                     date_range_text = f"for {date_obj.strftime('%A, %B %d, %Y')}"
                 
-                # Query reservations in range
-                reservations = Reservation.query.filter(
-                    Reservation.date >= start_date,
-                    Reservation.date <= end_date,
-                    Reservation.status != 'cancelled'
-                ).all()
+                # Reservations in range - from the booking window when it covers the range
+                reservations = self._reservations_from_booking_window(start_date, end_date)
+                if reservations is None:
+                    reservations = Reservation.query.filter(
+                        Reservation.date >= start_date,
+                        Reservation.date <= end_date,
+                        Reservation.status != 'cancelled'
+                    ).all()
                 
                 format_type = args.get('format', 'text')
                 
@@ -5590,11 +5213,12 @@ class RestaurantReservationSkill(SkillBase):
             return False
 
     def _get_weather_forecast_handler(self, args, raw_data):
-        """Get weather forecast for the restaurant area (zipcode 15222)"""
+        """Get weather forecast for the area of the restaurant location being called"""
         from signalwire_agents.core.function_result import SwaigFunctionResult
         import os
         import requests
         from datetime import datetime, timedelta
+        from locations import get_location, fetch_location_weather
         
         try:
             print("🌤️ Weather forecast requested")
@@ -5666,8 +5290,8 @@ class RestaurantReservationSkill(SkillBase):
             
             print(f"🔍 Using reservation date: {reservation_date}, time: {reservation_time}")
             
-            # Restaurant location - zipcode 15222 (Pittsburgh, PA area)
-            location = "15222"
+            # Zip code of the restaurant location this call was routed to
+            location = get_location().zip_code
             
             # Get weather API key
             weather_api_key = os.getenv('WEATHER_API_KEY')
@@ -5708,20 +5332,12 @@ class RestaurantReservationSkill(SkillBase):
                 except:
                     pass
             
-            # Choose API endpoint based on whether forecast is needed
-            if forecast_needed and reservation_date:
-                # Use forecast API for future dates
-                api_url = f"https://api.weatherapi.com/v1/forecast.json?key={weather_api_key}&q={location}&days=7&aqi=no&alerts=no"
-            else:
-                # Use current weather API for today or when no specific date given
-                api_url = f"https://api.weatherapi.com/v1/current.json?key={weather_api_key}&q={location}&aqi=no"
-            
-            print(f"🔗 Weather API URL: {api_url}")
-            
-            # Make the API request
-            response = requests.get(api_url, timeout=10)
-            response.raise_for_status()
-            weather_data = response.json()
+            # Forecast API for future dates, current weather for today or when no
+            # specific date is given (both cached per location)
+            weather_kind = 'forecast' if forecast_needed and reservation_date else 'current'
+            weather_data = fetch_location_weather(weather_kind, days=7, timeout=10)
+            if weather_data is None:
+                raise requests.exceptions.RequestException(f"Weather API {weather_kind} request failed")
             
             # Build the weather response
             if forecast_needed and 'forecast' in weather_data:
@@ -5934,20 +5550,18 @@ class RestaurantReservationSkill(SkillBase):
                 # Get current weather for temperature details
                 weather_details = ""
                 try:
+                    from locations import fetch_location_weather
+                    
                     weather_api_key = os.getenv('WEATHER_API_KEY')
                     if weather_api_key:
-                        location = "15222"  # Restaurant zipcode
-                        
                         # Check if reservation is for future date to determine forecast vs current
                         reservation_date = reservation.date
                         today = datetime.now().date()
                         
                         if reservation_date > today:
-                            # Use forecast for future dates
-                            api_url = f"https://api.weatherapi.com/v1/forecast.json?key={weather_api_key}&q={location}&days=7&aqi=no&alerts=no"
-                            response = requests.get(api_url, timeout=5)
-                            if response.status_code == 200:
-                                weather_data = response.json()
+                            # Use forecast for future dates (cached per location)
+                            weather_data = fetch_location_weather('forecast', days=7, timeout=5)
+                            if weather_data:
                                 # Find the forecast for the specific date
                                 for day in weather_data['forecast']['forecastday']:
                                     if day['date'] == str(reservation_date):
@@ -5959,11 +5573,9 @@ class RestaurantReservationSkill(SkillBase):
                                         weather_details = f"Weather forecast: {condition}, {max_temp}°F/{min_temp}°F, {rain_chance}% rain chance"
                                         break
                         else:
-                            # Use current weather for today
-                            api_url = f"https://api.weatherapi.com/v1/current.json?key={weather_api_key}&q={location}&aqi=no"
-                            response = requests.get(api_url, timeout=5)
-                            if response.status_code == 200:
-                                weather_data = response.json()
+                            # Use current weather for today (cached per location)
+                            weather_data = fetch_location_weather('current', timeout=5)
+                            if weather_data:
                                 current = weather_data['current']
                                 condition = current['condition']['text']
                                 temp = round(current['temp_f'])
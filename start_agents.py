@@ -19,7 +19,7 @@ def main():
 
     try:
         # Import and run the Flask app with integrated SWAIG agents
-        from app import app, cleanup_payment_sessions_on_startup, start_payment_session_cleanup_scheduler
+        from app import app, cleanup_payment_sessions_on_startup, start_payment_session_cleanup_scheduler, start_callback_dispatcher, start_booking_window, start_customer_profiles, start_audit_log, start_backup_scheduler, seed_menu_item_aliases, warm_menu_renders, start_item_pairings_scheduler, warm_item_sales, warm_swaig_documents
         
         # Clean up any orphaned payment sessions from previous runs
         cleanup_payment_sessions_on_startup()
@@ -27,6 +27,36 @@ def main():
         # Start automatic cleanup scheduler
         start_payment_session_cleanup_scheduler()
         
+        # Start the callback dispatcher
+        start_callback_dispatcher()
+        
+        # Load the in-memory booking window
+        start_booking_window()
+        
+        # Keep customer profiles current (backfills on first run)
+        start_customer_profiles()
+        
+        # Batched audit log writes, retention and compaction
+        start_audit_log()
+        
+        # Scheduled online database backups
+        start_backup_scheduler()
+        
+        # Stock menu aliases for the conversation matcher
+        seed_menu_item_aliases()
+        
+        # Spoken get_menu responses for the current menus
+        warm_menu_renders()
+        
+        # Item pairings for surprise picks and "goes well with" suggestions
+        start_item_pairings_scheduler()
+        
+        # Top sellers by daypart for "what's popular" questions
+        warm_item_sales()
+        
+        # Serialized SWAIG signatures for get_signature requests
+        warm_swaig_documents()
+        
         app.run(host="0.0.0.0", port=8080, debug=True)
 
     except KeyboardInterrupt:
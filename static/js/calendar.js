@@ -25,6 +25,48 @@ function testModal() {
     }
 }
 
+// Month grids show one summary per day; individual reservations are only
+// loaded for the week or day in focus
+function fetchCalendarEvents(fetchInfo, successCallback, failureCallback) {
+    const params = new URLSearchParams({ start: fetchInfo.startStr, end: fetchInfo.endStr });
+    const rangeDays = (fetchInfo.end - fetchInfo.start) / 86400000;
+
+    if (rangeDays <= 8) {
+        fetch(`/api/reservations/calendar?${params}`)
+            .then(response => response.json())
+            .then(successCallback)
+            .catch(failureCallback);
+        return;
+    }
+
+    fetch(`/api/reservations/calendar/summary?${params}`)
+        .then(response => response.json())
+        .then(data => {
+            if (!data.success) {
+                throw new Error(data.error || 'Failed to load calendar summary');
+            }
+            successCallback(data.days.map(day => {
+                const parts = [`${day.reservations} ${day.reservations === 1 ? 'reservation' : 'reservations'}`];
+                if (day.covers) {
+                    parts.push(`${day.covers} covers`);
+                }
+                if (day.cancelled) {
+                    parts.push(`${day.cancelled} cancelled`);
+                }
+                return {
+                    id: `summary-${day.date}`,
+                    title: parts.join(' · '),
+                    start: day.date,
+                    allDay: true,
+                    editable: false,
+                    className: day.reservations ? 'reservation-confirmed' : 'reservation-cancelled',
+                    extendedProps: { isSummary: true, ...day }
+                };
+            }));
+        })
+        .catch(failureCallback);
+}
+
 // Initialize when DOM is loaded
 document.addEventListener('DOMContentLoaded', function() {
     console.log('DOM loaded, initializing calendar...');
@@ -161,6 +203,11 @@ document.addEventListener('DOMContentLoaded', function() {
             }
         },
         eventClick: function(info) {
+            // Day summaries open that day with its individual reservations
+            if (info.event.extendedProps.isSummary) {
+                calendar.changeView('timeGridDay', info.event.startStr);
+                return;
+            }
             // Show event details in the modal
             showReservationDetails(info.event);
         },
@@ -170,7 +217,7 @@ document.addEventListener('DOMContentLoaded', function() {
             lastReservationCount = 0;
             initialCountSet = false;
         },
-        events: '/api/reservations/calendar'
+        events: fetchCalendarEvents
     });
 
         console.log('Rendering calendar...');
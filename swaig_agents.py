@@ -243,7 +243,7 @@ IMPORTANT CONVERSATION GUIDELINES:
 **PRICING AND PRE-ORDERS - CRITICAL:**
 - When customers mention food items, ALWAYS provide the price immediately using data from get_menu function
 - 🚨 NEVER use hardcoded prices - ONLY use actual database prices from get_menu function
-- 🚨 For individual price questions: Search the cached_menu data for the exact item and price
+- 🚨 For individual price questions: Use the get_menu results for the exact item and price
 - Example: '[MENU ITEM NAME] are [ACTUAL PRICE FROM DATABASE]'
 - When creating reservations with pre-orders, ALWAYS mention the total cost using actual database prices
 - Example: 'Your [ITEMS] total [ACTUAL CALCULATED TOTAL FROM DATABASE PRICES]'
@@ -483,7 +483,7 @@ When customers ask you to "surprise them" with menu items:
 - YOU CAN provide weather forecasts using the get_weather_forecast function
 - When customers ask about weather (for dining, outdoor seating, or general weather), ALWAYS call get_weather_forecast
 - Examples: "What's the weather like?", "Will it rain?", "Is it good weather for outdoor dining?"
-- The get_weather_forecast function provides detailed weather info for the restaurant area (Pittsburgh, PA 15222)
+- The get_weather_forecast function provides detailed weather info for the restaurant area (the restaurant's own zip code)
 - ALWAYS use get_weather_forecast when customers ask about weather conditions
 - If customers mention outdoor seating, get_weather_forecast will offer outdoor seating options automatically
 
@@ -558,7 +558,8 @@ When customers ask you to "surprise them" with menu items:
                 "properties": {
                     "phone_number": {"type": "string", "description": "Customer phone number for callback"},
                     "preferred_time": {"type": "string", "description": "Preferred callback time"},
-                    "reason": {"type": "string", "description": "Reason for callback"}
+                    "reason": {"type": "string", "description": "Reason for callback"},
+                    "customer_name": {"type": "string", "description": "Customer name, if known"}
                 },
                 "required": ["phone_number", "preferred_time", "reason"]
             },
@@ -670,8 +671,6 @@ When customers ask you to "surprise them" with menu items:
     def _schedule_callback_handler(self, args, raw_data):
         """Handler for schedule_callback tool"""
         try:
-            from datetime import datetime
-            
             # Extract phone number from args or raw_data
             phone_number = args.get('phone_number')
             if not phone_number and raw_data:
@@ -693,15 +692,24 @@ When customers ask you to "surprise them" with menu items:
                     'message': "I need your phone number to schedule a callback. Could you please provide your phone number?"
                 }
             
-            # Log the callback request
+            # Persist the callback and hand it to the dispatcher
+            from app import enqueue_callback
+            
+            callback = enqueue_callback(
+                phone_number=phone_number,
+                preferred_time=preferred_time,
+                reason=reason,
+                customer_name=args.get('customer_name'),
+                call_id=raw_data.get('call_id') if raw_data else None
+            )
+            
             print(f"CALLBACK REQUEST:")
+            print(f"   Callback ID: {callback['id']}")
             print(f"   Phone: {phone_number}")
             print(f"   Preferred Time: {preferred_time}")
+            print(f"   Due At: {callback['due_at']}")
             print(f"   Reason: {reason}")
-            print(f"   Timestamp: {datetime.now()}")
             
-            # In a real implementation, this would schedule an actual callback
-            # For now, we'll provide a confirmation response
             message = f"Perfect! I've scheduled a callback for {phone_number} at {preferred_time} regarding {reason}. "
             message += "One of our team members will call you back at the requested time. "
             message += "Thank you for choosing Bobby's Table!"
@@ -710,6 +718,8 @@ When customers ask you to "surprise them" with menu items:
                 'success': True,
                 'message': message,
                 'callback_scheduled': True,
+                'callback_id': callback['id'],
+                'due_at': callback['due_at'],
                 'phone_number': phone_number,
                 'preferred_time': preferred_time,
                 'reason': reason
@@ -0,0 +1,151 @@
+"""
+Pre-serialized SWAIG documents for Bobby's Table Restaurant
+The receptionist's function list, function signatures and SWML document only
+change when the agent's tools do, so each response body is built and
+serialized to JSON once and then served as bytes. Bodies are keyed by what the
+platform asked for (the requested function set, the URL root the webhooks point
+at) and dropped as soon as the agent's tool registry changes. The URL root comes
+from the request's Host header, so every per-root table is bounded.
+"""
+
+import json
+import threading
+
+
+# Distinct bodies (and SWML documents) kept; the platform only ever asks for a handful
+MAX_BODIES = 64
+
+
+def registry_token(agent):
+    """Identity of an agent's registered tools; changes when any tool is registered, replaced or removed"""
+    registry = getattr(getattr(agent, '_tool_registry', None), '_swaig_functions', None)
+    if registry is None:
+        return (id(agent),)
+    return (id(agent),) + tuple((name, id(function)) for name, function in registry.items())
+
+
+def dumps(document):
+    """Compact JSON bytes of a document"""
+    return json.dumps(document, separators=(',', ':')).encode('utf-8')
+
+
+class SwaigDocumentCache:
+    """
+    SWAIG response bodies for one agent's tool set.
+
+    The builders are registered by app.py: build_function_names(agent) ->
+    list, build_signatures(agent) -> {name: signature} and
+    build_swml(agent, url_root) -> SWML document dict.
+    """
+
+    def __init__(self, max_bodies=MAX_BODIES):
+        self._lock = threading.Lock()
+        self._builders = None
+        self._token = None
+        self._signatures = None
+        self._documents = {}  # url_root -> SWML document dict
+        self._bodies = {}     # key -> bytes
+        self.max_bodies = max_bodies
+        self.stats = {'hits': 0, 'builds': 0, 'invalidations': 0}
+
+    def register_builders(self, build_function_names, build_signatures, build_swml):
+        """Register the document builders (app.py)"""
+        with self._lock:
+            self._builders = (build_function_names, build_signatures, build_swml)
+            self._clear()
+
+    def _clear(self):
+        self._signatures = None
+        self._documents.clear()
+        self._bodies.clear()
+
+    def invalidate(self):
+        """Drop every cached document (tools were re-registered)"""
+        with self._lock:
+            self._clear()
+            self._token = None
+            self.stats['invalidations'] += 1
+
+    def _check_registry(self, agent):
+        # Called with the lock held
+        token = registry_token(agent)
+        if token != self._token:
+            if self._token is not None:
+                self.stats['invalidations'] += 1
+            self._clear()
+            self._token = token
+
+    def _body(self, agent, key, build):
+        with self._lock:
+            self._check_registry(agent)
+            body = self._bodies.get(key)
+            if body is not None:
+                self.stats['hits'] += 1
+                return body
+
+            body = dumps(build())
+            self._bodies[key] = body
+            self.stats['builds'] += 1
+            self._trim(self._bodies)
+            return body
+
+    def _trim(self, table):
+        # Called with the lock held; oldest first: dicts keep insertion order
+        while len(table) > self.max_bodies:
+            del table[next(iter(table))]
+
+    def _signature_table(self, agent):
+        # Called with the lock held
+        if self._signatures is None:
+            self._signatures = self._builders[1](agent)
+        return self._signatures
+
+    def function_names(self, agent):
+        """JSON body listing every available function"""
+        return self._body(agent, ('functions',), lambda: {'functions': self._builders[0](agent)})
+
+    def signatures(self, agent, requested_functions):
+        """JSON body of the signatures of the requested functions (unknown names are left out)"""
+        requested = tuple(requested_functions)
+
+        def build():
+            table = self._signature_table(agent)
+            missing = [name for name in requested if name not in table]
+            if missing:
+                print(f"WARNING:  Requested functions not found: {missing}")
+            return {name: table[name] for name in requested if name in table}
+
+        return self._body(agent, ('signatures', requested), build)
+
+    def _swml_document(self, agent, url_root):
+        # Called with the lock held
+        document = self._documents.get(url_root)
+        if document is None:
+            document = self._documents[url_root] = self._builders[2](agent, url_root)
+            self._trim(self._documents)
+        return document
+
+    def swml_document(self, agent, url_root):
+        """The shared SWML document dict for a URL root; callers must copy what they change"""
+        with self._lock:
+            self._check_registry(agent)
+            return self._swml_document(agent, url_root)
+
+    def swml(self, agent, url_root):
+        """JSON body of the SWML document for a URL root"""
+        return self._body(agent, ('swml', url_root), lambda: self._swml_document(agent, url_root))
+
+    def warm(self, agent):
+        """Build the function list and signature table ahead of the first call; returns how many signatures exist"""
+        self.function_names(agent)
+        with self._lock:
+            self._check_registry(agent)
+            return len(self._signature_table(agent))
+
+
+_document_cache = SwaigDocumentCache()
+
+
+def get_swaig_document_cache():
+    """The process-wide SWAIG document cache"""
+    return _document_cache
@@ -0,0 +1,51 @@
+import os
+import sys
+import threading
+from datetime import datetime
+
+# Ensure the repository root is on the path when tests are run directly
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from audit_log import AuditLogWriter, channel_for_path, compact_events
+
+
+def test_channel_for_path():
+    assert channel_for_path('/stripe-webhook') == 'stripe'
+    assert channel_for_path('/api/signalwire/payment-callback') == 'signalwire'
+    assert channel_for_path('/receptionist') == 'voice'
+    assert channel_for_path('/api/reservations/12') == 'web'
+
+
+def test_compact_events_keeps_net_field_changes():
+    def update(minute, changes, channel='web'):
+        return {
+            'created_at': datetime(2026, 9, 1, 12, minute), 'entity_type': 'reservation', 'entity_id': 7,
+            'action': 'update', 'changes': changes, 'channel': channel, 'actor': None, 'restaurant_id': 'main'
+        }
+
+    merged = compact_events([
+        update(0, {'party_size': [2, 4], 'status': ['confirmed', 'cancelled']}),
+        update(5, {'party_size': [4, 6]}),
+        update(9, {'status': ['cancelled', 'confirmed']}, channel='voice'),
+    ])
+
+    assert merged['changes'] == {'party_size': [2, 6]}
+    assert merged['created_at'] == datetime(2026, 9, 1, 12, 9)
+    assert merged['channel'] == 'mixed'
+
+
+def test_writer_batches_queued_events():
+    batches = []
+    lock = threading.Lock()
+
+    def insert_rows(rows):
+        with lock:
+            batches.append(list(rows))
+
+    writer = AuditLogWriter(insert_rows, batch_size=50, flush_interval=0.2)
+    writer.record([{'entity_id': i} for i in range(120)])
+    writer.flush()
+
+    assert sum(len(batch) for batch in batches) == 120
+    assert max(len(batch) for batch in batches) <= 50
+    assert writer.stats['written'] == 120
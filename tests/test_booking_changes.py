@@ -0,0 +1,52 @@
+import importlib
+import os
+import sys
+
+# Ensure the repository root is on the path when tests are run directly
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+
+class Recorder:
+    def __init__(self):
+        self.order_ids = []
+
+    def notify_changes(self, order_ids):
+        self.order_ids.append(set(order_ids))
+
+
+def test_cancelling_a_reservation_recounts_its_orders(tmp_path, monkeypatch):
+    # app.py keeps its database under the working directory's instance/
+    monkeypatch.chdir(tmp_path)
+    app_module = importlib.import_module('app')
+    from models import db, MenuItem, Order, OrderItem, Reservation
+
+    pairings, sales = Recorder(), Recorder()
+    monkeypatch.setattr(app_module, 'all_item_pairings', lambda: [pairings])
+    monkeypatch.setattr(app_module, 'all_item_sales', lambda: [sales])
+
+    with app_module.app.app_context():
+        wings = MenuItem(name='Test Wings', price=9.0, category='appetizers')
+        reservation = Reservation(reservation_number='900001', name='Test Guest', party_size=2,
+                                  date='2026-10-18', time='19:00', phone_number='+15550100001')
+        db.session.add_all([wings, reservation])
+        db.session.flush()
+        order = Order(order_number='90001', reservation_id=reservation.id, person_name='Test Guest',
+                      target_date='2026-10-18', target_time='19:00')
+        db.session.add(order)
+        db.session.flush()
+        db.session.add(OrderItem(order_id=order.id, menu_item_id=wings.id, quantity=2, price_at_time=9.0))
+        db.session.commit()
+        order_id, wings_id = order.id, wings.id
+        assert (order_id, wings_id) in app_module.load_item_pairing_rows(order_ids={order_id})
+
+        # Only the reservation row changes, yet its orders are sent to be recounted
+        pairings.order_ids.clear()
+        sales.order_ids.clear()
+        reservation.status = 'cancelled'
+        db.session.commit()
+        assert pairings.order_ids == [{order_id}]
+        assert sales.order_ids == [{order_id}]
+
+        # Both loaders now leave the cancelled reservation's order out
+        assert app_module.load_item_pairing_rows(order_ids={order_id}) == []
+        assert app_module.load_item_sales_rows(order_ids={order_id}) == []
@@ -0,0 +1,40 @@
+import os
+import sys
+from datetime import datetime
+from types import SimpleNamespace
+
+# Ensure the repository root is on the path when tests are run directly
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from booking_fingerprint import booking_fingerprint, booking_slot, group_duplicates
+
+
+def test_fingerprint_normalizes_phone_and_slot():
+    assert booking_slot('19:14') == '19:00'
+    assert booking_slot('19:15') == '19:15'
+
+    base = booking_fingerprint('+1 (412) 555-1234', '2026-10-18', '19:00', 2)
+    assert booking_fingerprint('4125551234', '2026-10-18', '19:10', '2') == base
+    assert booking_fingerprint('4125551234', '2026-10-18', '19:15', 2) != base
+    assert booking_fingerprint('4125551234', '2026-10-18', '19:00', 3) != base
+
+
+def test_group_duplicates_keeps_oldest_active_booking():
+    def reservation(res_id, created_hour, status='confirmed'):
+        created_at = datetime(2026, 10, 1, created_hour) if created_hour is not None else None
+        return SimpleNamespace(
+            id=res_id, reservation_number=str(100000 + res_id), name='Ann', phone_number='4125551234',
+            date='2026-10-18', time='19:00', party_size=2, status=status, payment_status='unpaid',
+            booking_fingerprint='abc', created_at=created_at
+        )
+
+    report = group_duplicates([reservation(1, 9, 'cancelled'), reservation(2, 10), reservation(3, 11)])
+    assert len(report) == 1
+    assert report[0]['keep']['id'] == 2
+    assert [r['id'] for r in report[0]['duplicates']] == [3, 1]
+
+
+    # Rows from before created_at was recorded sort as the oldest
+    report = group_duplicates([reservation(4, 10), reservation(5, None), reservation(6, 9, 'cancelled')])
+    assert report[0]['keep']['id'] == 5
+    assert [r['id'] for r in report[0]['duplicates']] == [4, 6]
@@ -0,0 +1,161 @@
+import os
+import sys
+import threading
+import time
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+# Ensure the repository root is on the path when tests are run directly
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from booking_window import BookingWindow
+
+TODAY = date.today()
+
+
+def day(offset):
+    return (TODAY + timedelta(days=offset)).strftime('%Y-%m-%d')
+
+
+def reservation(res_id, offset, time='19:00', phone='4125551234', status='confirmed'):
+    return SimpleNamespace(id=res_id, reservation_number=str(100000 + res_id), phone_number=phone,
+                           date=day(offset), time=time, status=status)
+
+
+def order(order_id, offset=None, reservation_id=None, phone=None):
+    return SimpleNamespace(id=order_id, order_number=str(20000 + order_id), customer_phone=phone,
+                           reservation_id=reservation_id, target_date=day(offset) if offset is not None else None)
+
+
+class FakeDatabase:
+    def __init__(self, reservations, orders):
+        self.reservations = {r.id: r for r in reservations}
+        self.orders = {o.id: o for o in orders}
+        self.calls = []
+
+    def range_loader(self, start_date, end_date):
+        self.calls.append(('range', start_date, end_date))
+        reservations = [r for r in self.reservations.values() if start_date <= r.date <= end_date]
+        ids = {r.id for r in reservations}
+        orders = [o for o in self.orders.values()
+                  if o.reservation_id in ids or (o.target_date and start_date <= o.target_date <= end_date)]
+        return reservations, orders
+
+    def id_loader(self, reservation_ids, order_ids):
+        self.calls.append(('ids', set(reservation_ids), set(order_ids)))
+        return ([self.reservations[i] for i in reservation_ids if i in self.reservations],
+                [self.orders[i] for i in order_ids if i in self.orders])
+
+
+def make_window(database, days=7):
+    return BookingWindow(database.range_loader, database.id_loader, days=days, restaurant_id='main')
+
+
+def test_load_indexes_the_window():
+    database = FakeDatabase(
+        [reservation(1, 0), reservation(2, 3, '18:00', phone='+1 412 555 9999'), reservation(3, 10), reservation(4, -1)],
+        [order(1, reservation_id=1), order(2, 2, phone='4125559999'), order(3, 12)]
+    )
+    window = make_window(database)
+    window.load()
+
+    assert database.calls == [('range', day(0), day(7))]
+    assert [r.id for r in window.reservations_between(day(0), day(7))] == [1, 2]
+    assert [r.id for r in window.reservations_at(day(3), '18:00')] == [2]
+    assert [r.id for r in window.reservations_for_phone('(412) 555-9999')] == [2]
+    assert window.order_by_number('20002').id == 2
+    assert window.order_by_number('20003') is None
+    assert window.orders_by_reservation[1] == {1}
+
+
+def test_out_of_window_reads_fall_back():
+    window = make_window(FakeDatabase([reservation(1, 0)], []))
+    # Not loaded yet: the database answers (marked started so covers() doesn't spawn the workers)
+    window._threads = ['started']
+    assert window.reservations_between(day(0), day(1)) is None
+
+    window.load()
+    assert window.covers(day(0), day(7))
+    assert window.reservations_between(day(-1), day(1)) is None
+    assert window.reservations_between(day(5), day(8)) is None
+    assert window.reservations_at(day(9), '19:00') is None
+    assert [r.id for r in window.reservations_between(day(0), day(1))] == [1]
+
+
+def test_changes_are_applied_outside_the_lock():
+    database = FakeDatabase([reservation(1, 0), reservation(2, 1)], [order(1, 1)])
+    window = make_window(database)
+    window.load()
+
+    lock_free = []
+
+    def id_loader(reservation_ids, order_ids):
+        # Readers must be able to take the lock while the change query runs
+        probe = threading.Thread(target=lambda: lock_free.append(window._lock.acquire(timeout=1) and not window._lock.release()))
+        probe.start()
+        probe.join()
+        return database.id_loader(reservation_ids, order_ids)
+
+    window._id_loader = id_loader
+    database.reservations[1] = reservation(1, 0, status='cancelled')
+    database.reservations[2] = reservation(2, 20)
+    database.reservations[3] = reservation(3, 2, '20:00')
+    del database.orders[1]
+    database.orders[4] = order(4, reservation_id=3)
+    window.notify_changes({1, 2, 3}, {1, 4})
+
+    # Committed changes not applied yet: the database answers
+    window._threads = ['started']  # No worker threads; applied below
+    assert not window.covers(day(0))
+
+    window.apply_pending()
+    assert lock_free == [True]
+    assert not window.has_pending
+    assert [r.id for r in window.reservations_between(day(0), day(7))] == [3]
+    assert [r.id for r in window.reservations_between(day(0), day(7), include_cancelled=True)] == [1, 3]
+    assert window.order_by_number('20001') is None
+    assert window.order_by_number('20004').reservation_id == 3
+    assert database.calls[-1] == ('ids', {1, 2, 3}, {1, 4})
+    assert window.stats['changes_applied'] == 5
+
+
+def test_change_worker_applies_changes():
+    database = FakeDatabase([reservation(1, 0)], [])
+    window = make_window(database)
+    assert window.start()
+    assert not window.start()
+
+    deadline = time.time() + 2
+    while not window.covers(day(0)) and time.time() < deadline:
+        time.sleep(0.01)
+    assert [r.id for r in window.reservations_between(day(0), day(0))] == [1]
+
+    database.reservations[2] = reservation(2, 0, '20:00')
+    window.notify_changes({2}, set())
+    while not window.covers(day(0)) and time.time() < deadline:
+        time.sleep(0.01)
+    assert [r.id for r in window.reservations_between(day(0), day(0))] == [1, 2]
+    assert [call[0] for call in database.calls] == ['range', 'ids']
+
+
+def test_midnight_roll_drops_past_days_and_loads_new_ones():
+    database = FakeDatabase(
+        [reservation(1, -1), reservation(2, 0), reservation(3, 6), reservation(4, 7)],
+        [order(1, -1), order(2, reservation_id=2), order(3, 7)]
+    )
+    window = make_window(database, days=6)
+    window.load(today=TODAY - timedelta(days=1))
+    assert sorted(window.reservations) == [1, 2]
+
+    window.roll(today=TODAY)
+    assert (window.start_date, window.end_date) == (day(0), day(6))
+    # Only the newly uncovered day is queried
+    assert database.calls[-1] == ('range', day(6), day(6))
+    assert sorted(window.reservations) == [2, 3]
+    assert sorted(window.orders) == [2]
+    assert window.stats['rolls'] == 1
+
+    # Rolling past the whole window reloads it
+    window.roll(today=TODAY + timedelta(days=10))
+    assert database.calls[-1] == ('range', day(10), day(16))
+    assert window.stats['loads'] == 2
@@ -0,0 +1,30 @@
+import os
+import sys
+
+# Ensure the repository root is on the path when tests are run directly
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from calendar_summary import DailySummaryCache, month_bounds, months_between
+
+
+def test_month_helpers():
+    assert months_between('2025-11-30', '2026-02-01') == ['2025-11', '2025-12', '2026-01', '2026-02']
+    assert month_bounds('2024-02') == ('2024-02-01', '2024-02-29')
+    assert month_bounds('2025-12') == ('2025-12-01', '2025-12-31')
+
+
+def test_months_are_loaded_once_until_invalidated():
+    calls = []
+
+    def loader(start_date, end_date):
+        calls.append(start_date[:7])
+        return [{'date': start_date, 'reservations': 1, 'covers': 2, 'cancelled': 0}]
+
+    cache = DailySummaryCache(loader)
+    assert [d['date'] for d in cache.days_between('main', '2026-01-01', '2026-02-10')] == ['2026-01-01', '2026-02-01']
+    cache.days_between('main', '2026-01-15', '2026-02-10')
+    assert calls == ['2026-01', '2026-02']
+
+    cache.invalidate(['2026-02-14'])
+    cache.days_between('main', '2026-01-01', '2026-02-28')
+    assert calls == ['2026-01', '2026-02', '2026-02']
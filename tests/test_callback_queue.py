@@ -0,0 +1,46 @@
+import os
+import sys
+from datetime import datetime, timedelta
+
+# Ensure the repository root is on the path when tests are run directly
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from callback_queue import CallbackScheduler, parse_preferred_time
+
+
+NOW = datetime(2026, 10, 18, 12, 0)
+
+
+def test_parse_preferred_time():
+    cases = [
+        ("tomorrow at 3pm", datetime(2026, 10, 19, 15, 0)),
+        ("in 30 minutes", NOW + timedelta(minutes=30)),
+        ("in two hours", NOW + timedelta(hours=2)),
+        ("5:30 pm", datetime(2026, 10, 18, 17, 30)),
+        ("at 4", datetime(2026, 10, 18, 16, 0)),
+        ("10am", datetime(2026, 10, 19, 10, 0)),
+        ("tonight", datetime(2026, 10, 18, 18, 0)),
+        ("2026-10-20T09:15", datetime(2026, 10, 20, 9, 15)),
+        ("as soon as possible", NOW),
+    ]
+    for text, expected in cases:
+        assert parse_preferred_time(text, NOW) == expected, text
+
+
+def test_scheduler_pops_in_due_order_and_skips_cancelled():
+    scheduler = CallbackScheduler(on_due=lambda callback_id: None)
+    scheduler.schedule(1, NOW + timedelta(minutes=10))
+    scheduler.schedule(2, NOW - timedelta(minutes=5))
+    scheduler.schedule(3, NOW)
+    scheduler.schedule(4, NOW - timedelta(minutes=1))
+    scheduler.cancel(4)
+
+    assert scheduler.next_due() == (NOW - timedelta(minutes=5), 2)
+    assert scheduler.pop_due(NOW) == [2, 3]
+    assert len(scheduler) == 1
+
+    # Rescheduling replaces the earlier deadline
+    scheduler.schedule(1, NOW + timedelta(minutes=1))
+    assert scheduler.pop_due(NOW + timedelta(minutes=2)) == [1]
+    assert scheduler.pop_due(NOW + timedelta(minutes=20)) == []
+    assert len(scheduler) == 0
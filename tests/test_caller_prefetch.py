@@ -0,0 +1,146 @@
+import os
+import queue
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+# Ensure the repository root is on the path when tests are run directly
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import caller_prefetch
+from caller_prefetch import CallerPrefetcher, phone_variants
+
+
+def reservation(number, payment_status='unpaid', order_total=None):
+    orders = [SimpleNamespace(total_amount=order_total)] if order_total else []
+    return SimpleNamespace(reservation_number=number, payment_status=payment_status, orders=orders)
+
+
+def order(number, total, reservation_id=None, payment_status='unpaid'):
+    return SimpleNamespace(order_number=number, total_amount=total, reservation_id=reservation_id,
+                           payment_status=payment_status)
+
+
+def make_loader(data, calls):
+    def loader(phone_number):
+        calls.append(phone_number)
+        return data[phone_number]
+    return loader
+
+
+def wait_for(prefetcher, call_id, timeout=2.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        with prefetcher._lock:
+            snapshot = prefetcher._snapshots.get(call_id)
+        if snapshot:
+            return snapshot
+        time.sleep(0.01)
+    raise AssertionError(f"no snapshot for {call_id}")
+
+
+def test_phone_variants():
+    assert phone_variants('(412) 555-1234') == ['+14125551234', '14125551234', '4125551234']
+    assert phone_variants('911') == ['911']
+
+
+def test_prefetch_once_per_call_and_snapshot_contents():
+    calls = []
+    data = {'+14125551234': ([reservation('100001', order_total=42.5), reservation('100002', 'paid')],
+                             [order('20001', 12.0), order('20002', 30.0, reservation_id=1)])}
+    prefetcher = CallerPrefetcher(make_loader(data, calls))
+
+    assert prefetcher.get('call-1') is None
+    assert prefetcher.prefetch('call-1', '+14125551234')
+    assert not prefetcher.prefetch('call-1', '+14125551234')
+    assert not prefetcher.prefetch('call-2', '555')
+
+    snapshot = wait_for(prefetcher, 'call-1')
+    assert prefetcher.get('call-1') is snapshot
+    assert calls == ['+14125551234']
+    assert snapshot.matches_phone('412-555-1234')
+    assert snapshot.reservations_by_number['100002'].payment_status == 'paid'
+    # The party order is paid through its reservation, not counted twice
+    assert snapshot.payment_state == {'unpaid_reservations': ['100001'], 'unpaid_orders': ['20001', '20002'],
+                                      'balance_due': 54.5}
+
+    # Once the call has ended its call_id can be prefetched again
+    prefetcher.discard('call-1')
+    assert prefetcher.get('call-1') is None
+    assert prefetcher.prefetch('call-1', '+14125551234')
+    wait_for(prefetcher, 'call-1')
+    assert len(calls) == 2
+
+
+def test_invalidate_phone_reloads_and_ttl_expires(monkeypatch):
+    calls = []
+    data = {'+14125551234': ([reservation('100001')], [])}
+    prefetcher = CallerPrefetcher(make_loader(data, calls))
+    prefetcher.prefetch('call-1', '+14125551234')
+    wait_for(prefetcher, 'call-1')
+
+    # Other callers' changes leave the snapshot alone
+    prefetcher.invalidate_phone('+14125559999')
+    assert prefetcher.get('call-1') is not None
+
+    data['+14125551234'] = ([reservation('100001'), reservation('100003')], [])
+    prefetcher.invalidate_phone('4125551234')
+    assert prefetcher.get('call-1') is None
+    assert list(wait_for(prefetcher, 'call-1').reservations_by_number) == ['100001', '100003']
+    assert prefetcher.stats['invalidated'] == 1
+
+    monkeypatch.setattr(caller_prefetch, 'SNAPSHOT_TTL_SECONDS', 60)
+    prefetcher._snapshots['call-1'].loaded_at -= 61
+    assert prefetcher.get('call-1') is None
+    assert 'call-1' not in prefetcher._snapshots
+    # An expired call can be prefetched again
+    assert prefetcher.prefetch('call-1', '+14125551234')
+    wait_for(prefetcher, 'call-1')
+
+
+def test_calls_that_never_end_or_are_skipped_are_forgotten(monkeypatch):
+    data = {'+14125551234': ([], [])}
+    prefetcher = CallerPrefetcher(make_loader(data, []))
+    monkeypatch.setattr(caller_prefetch, 'SNAPSHOT_TTL_SECONDS', 60)
+
+    prefetcher.prefetch('call-1', '+14125551234')
+    wait_for(prefetcher, 'call-1')
+    # call-1 never sends "ended": it is dropped once it is older than the TTL
+    prefetcher._seen['call-1'] -= 61
+    prefetcher.prefetch('call-2', '+14125551234')
+    assert list(prefetcher._seen) == ['call-2']
+    assert 'call-1' not in prefetcher._snapshots and 'call-1' not in prefetcher._locations
+
+    # A call skipped because the queue was full isn't remembered as prefetched
+    prefetcher._queue = queue.Queue(maxsize=1)
+    prefetcher._queue.put(('busy', '+14125550000'))
+    assert not prefetcher.prefetch('call-3', '+14125551234')
+    assert 'call-3' not in prefetcher._seen and 'call-3' not in prefetcher._locations
+
+
+def test_invalidation_during_load_is_not_lost():
+    started, release = threading.Event(), threading.Event()
+    calls = []
+    data = {'+14125551234': ([reservation('100001')], [])}
+
+    def loader(phone_number):
+        calls.append(phone_number)
+        if len(calls) == 1:
+            started.set()
+            release.wait(2)
+            return [reservation('100001')], []
+        return data[phone_number]
+
+    prefetcher = CallerPrefetcher(loader)
+    prefetcher.prefetch('call-1', '+14125551234')
+    assert started.wait(2)
+
+    # The booking changes while the first load is still reading the old rows
+    data['+14125551234'] = ([reservation('100001', 'paid')], [])
+    prefetcher.invalidate_phone('+14125551234')
+    release.set()
+
+    snapshot = wait_for(prefetcher, 'call-1')
+    assert len(calls) == 2
+    assert snapshot.payment_state['unpaid_reservations'] == []
@@ -0,0 +1,71 @@
+import os
+import sys
+import threading
+from datetime import datetime
+from types import SimpleNamespace
+
+# Ensure the repository root is on the path when tests are run directly
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from customer_profiles import CustomerProfileUpdater, build_customer_profile
+
+
+def _order(order_id, items, status='pending', payment_status='unpaid', total=0.0, reservation_id=None):
+    return SimpleNamespace(
+        id=order_id, status=status, payment_status=payment_status, total_amount=total,
+        reservation_id=reservation_id, person_name='Ann', created_at=datetime(2026, 1, 1),
+        items=[SimpleNamespace(menu_item=SimpleNamespace(name=name), quantity=qty) for name, qty in items]
+    )
+
+
+def _reservation(res_id, date, party_size, status='confirmed', orders=()):
+    return SimpleNamespace(
+        id=res_id, date=date, party_size=party_size, status=status, name='Ann Smith',
+        created_at=datetime(2026, 1, res_id), orders=list(orders)
+    )
+
+
+def test_profile_summarizes_visits_orders_and_balance():
+    reservations = [
+        _reservation(1, '2026-09-01', 2, orders=[_order(10, [('Wings', 2)], payment_status='paid', total=20.0, reservation_id=1)]),
+        _reservation(2, '2026-10-01', 2, orders=[_order(11, [('Wings', 1), ('Salad', 1)], total=18.5, reservation_id=2)]),
+        _reservation(3, '2026-10-10', 6, status='cancelled'),
+        _reservation(4, '2026-11-20', 4),
+    ]
+    orders = [
+        _order(20, [('Burger', 1)], total=12.0),
+        _order(21, [('Burger', 5)], status='cancelled', total=60.0),
+    ]
+
+    profile = build_customer_profile('4125551234', reservations, orders, today='2026-10-18')
+
+    assert profile['name'] == 'Ann Smith'
+    assert profile['visit_count'] == 2
+    assert profile['reservation_count'] == 3
+    assert profile['order_count'] == 1
+    assert profile['last_visit_date'] == '2026-10-01'
+    assert profile['next_reservation_date'] == '2026-11-20'
+    assert profile['usual_party_size'] == 2
+    assert profile['favorite_items'][0] == 'Wings'
+    assert 'Burger' in profile['favorite_items']
+    assert profile['unpaid_balance'] == 30.5
+
+
+def test_updater_batches_normalized_phones_per_database():
+    calls = []
+    done = threading.Event()
+
+    def refresh(phones, restaurant_id):
+        calls.append((restaurant_id, phones))
+        done.set()
+
+    updater = CustomerProfileUpdater(refresh)
+    updater.mark_dirty(['+1 (412) 555-1234', '412-555-1234', '555', None], restaurant_id='north')
+
+    assert done.wait(2)
+    assert calls == [('north', ['4125551234'])]
+
+    # A commit started the worker before startup got to it: the backfill is still claimed once
+    assert not updater.start()
+    assert updater.claim_backfill()
+    assert not updater.claim_backfill()
@@ -0,0 +1,64 @@
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+# Ensure the repository root is on the path when tests are run directly
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from db_backup import backup_database, list_snapshots, restore_database, rotate_snapshots
+
+
+def _make_database(path, rows=2000):
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE reservations (id INTEGER PRIMARY KEY, name TEXT)')
+    conn.executemany('INSERT INTO reservations (name) VALUES (?)', [(f'guest {i}' * 10,) for i in range(rows)])
+    conn.commit()
+    conn.close()
+
+
+def test_backup_during_writes_and_restore(tmp_path):
+    database = str(tmp_path / 'restaurant.db')
+    backups = str(tmp_path / 'backups')
+    _make_database(database)
+
+    stop = threading.Event()
+
+    def writer():
+        conn = sqlite3.connect(database, timeout=10)
+        while not stop.is_set():
+            conn.execute("INSERT INTO reservations (name) VALUES ('walk-in')")
+            conn.commit()
+            time.sleep(0.002)
+        conn.close()
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    try:
+        result = backup_database(database, backups, compress=True, pages=5, pause=0.001)
+    finally:
+        stop.set()
+        thread.join()
+
+    assert result['path'].endswith('.db.gz')
+    assert result['steps'] > 1
+    assert result['pages_per_second'] > 0
+
+    restored = str(tmp_path / 'restored.db')
+    restore_database(result['path'], restored)
+    conn = sqlite3.connect(restored)
+    assert conn.execute('SELECT COUNT(*) FROM reservations').fetchone()[0] >= 2000
+    conn.close()
+
+
+def test_rotation_keeps_newest(tmp_path):
+    database = str(tmp_path / 'restaurant.db')
+    for stamp in ('20261001-000000', '20261002-000000', '20261003-000000'):
+        (tmp_path / f'restaurant-{stamp}.db.gz').write_bytes(b'')
+    (tmp_path / 'other-20261001-000000.db').write_bytes(b'')
+
+    removed = rotate_snapshots(str(tmp_path), database, keep=2)
+
+    assert [os.path.basename(path) for path in removed] == ['restaurant-20261001-000000.db.gz']
+    assert len(list_snapshots(str(tmp_path), database)) == 2
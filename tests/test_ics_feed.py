@@ -0,0 +1,34 @@
+import os
+import sys
+from datetime import datetime
+from types import SimpleNamespace
+
+# Ensure the repository root is on the path when tests are run directly
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from ics_feed import escape_text, fold_line, reservation_event
+
+
+def test_escape_and_fold():
+    assert escape_text('a,b;c\\d\ne') == 'a\\,b\\;c\\\\d\\ne'
+
+    folded = fold_line('DESCRIPTION:' + 'é' * 80)
+    lines = folded[:-2].split('\r\n')
+    assert all(len(line.encode('utf-8')) <= 75 for line in lines)
+    assert ''.join(line[1:] if i else line for i, line in enumerate(lines)) == 'DESCRIPTION:' + 'é' * 80
+
+
+def test_reservation_event():
+    row = SimpleNamespace(
+        id=7, reservation_number='123456', name='Jane', party_size=2, date='2026-10-18', time='19:30',
+        phone_number='+14125551234', status='cancelled', special_requests=None,
+        created_at=datetime(2026, 10, 1, 12, 0), updated_at=None
+    )
+    event = reservation_event(row, host='example.com')
+    assert 'UID:reservation-7@example.com\r\n' in event
+    assert 'DTSTART:20261018T193000\r\n' in event
+    assert 'DTEND:20261018T213000\r\n' in event
+    assert 'SUMMARY:[CANCELLED] Jane (2 people)\r\n' in event
+    assert 'STATUS:CANCELLED\r\n' in event
+
+    assert reservation_event(SimpleNamespace(**{**vars(row), 'time': 'soon'})) == ''
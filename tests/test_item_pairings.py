@@ -0,0 +1,134 @@
+import os
+import sys
+import time
+from datetime import datetime
+from itertools import combinations
+
+import numpy as np
+
+# Ensure the repository root is on the path when tests are run directly
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from item_pairings import ItemPairings, cooccurrence_counts, seconds_until_rebuild, top_pairings
+
+
+def test_cooccurrence_counts_match_brute_force():
+    rng = np.random.default_rng(7)
+    orders = [tuple(sorted(rng.choice(12, size=rng.integers(1, 5), replace=False))) for _ in range(300)]
+
+    expected = np.zeros((12, 12), dtype=np.int64)
+    for columns in orders:
+        for column in columns:
+            expected[column, column] += 1
+        for a, b in combinations(columns, 2):
+            expected[a, b] += 1
+            expected[b, a] += 1
+
+    # Small chunks exercise the accumulation across matrix products
+    assert np.array_equal(cooccurrence_counts(orders, 12, chunk=64), expected)
+
+
+def test_top_pairings_rank_by_cosine_and_drop_rare_pairs():
+    # Wings (10) go with beer (20) far more than with soda (21); the burger (30) was paired once
+    orders = [(0, 1)] * 4 + [(0, 2)] * 2 + [(0,)] * 4 + [(3, 2)]
+    item_ids = [10, 20, 21, 30]
+    table = top_pairings(cooccurrence_counts(orders, 4), item_ids, k=2)
+
+    assert [pairing.menu_item_id for pairing in table[10]] == [20, 21]
+    assert table[10][0].orders == 4
+    assert table[10][0].score > table[10][1].score
+    assert 30 not in table
+    assert [pairing.menu_item_id for pairing in table[21]] == [10]
+
+
+def test_incremental_changes_match_a_rebuild(monkeypatch):
+    rows = {1: [10, 20], 2: [10, 20], 3: [10, 21], 4: [10, 21], 5: [20, 21]}
+    calls = []
+
+    def loader(order_ids=None):
+        calls.append(order_ids)
+        return [(order_id, menu_item_id) for order_id, items in rows.items()
+                if order_ids is None or order_id in order_ids for menu_item_id in items]
+
+    pairings = ItemPairings(loader, top_k=3)
+    pairings.rebuild()
+    assert [pairing.menu_item_id for pairing in pairings.pairings_for(10)] == [20, 21]
+    assert calls == [None]
+
+    # Order 5 is cancelled, order 4 gains a new dessert, and two new orders come in
+    del rows[5]
+    rows[4] = [10, 21, 40]
+    rows[6] = [10, 40]
+    rows[7] = [21, 40]
+    # No worker thread: the changes are applied by hand below
+    monkeypatch.setattr(pairings, 'start', lambda: False)
+    pairings.notify_changes({4, 5, 6, 7})
+    version = pairings.version
+    # Reads serve the published table and never query
+    assert pairings.pairings_for(40) == ()
+    assert len(calls) == 1
+    pairings.apply_pending()
+    incremental = pairings.pairings_for(40)
+    assert calls[1] == {4, 5, 6, 7}
+    assert pairings.version == version + 1
+
+    rebuilt = ItemPairings(loader, top_k=3)
+    rebuilt.rebuild()
+    assert incremental == rebuilt.pairings_for(40)
+    for menu_item_id in (10, 20, 21):
+        assert pairings.pairings_for(menu_item_id) == rebuilt.pairings_for(menu_item_id)
+
+    # Reads without new changes never touch the loader
+    call_count = len(calls)
+    pairings.pairings_for(10)
+    assert len(calls) == call_count
+    assert pairings.status()['orders'] == 6
+
+
+def test_suggest_combines_pairings_and_skips_excluded_items():
+    rows = {1: [1, 2, 3], 2: [1, 2, 3], 3: [1, 2, 4], 4: [1, 2, 4], 5: [1, 3], 6: [1, 3]}
+    pairings = ItemPairings(lambda order_ids=None: [
+        (order_id, menu_item_id) for order_id, items in rows.items()
+        if order_ids is None or order_id in order_ids for menu_item_id in items
+    ])
+    pairings.rebuild()
+
+    assert [pairing.menu_item_id for pairing in pairings.suggest([1])] == [2, 3, 4]
+    # Items paired with both of the given items rank first
+    assert pairings.suggest([1, 2])[0].menu_item_id == 3
+    assert [pairing.menu_item_id for pairing in pairings.suggest([1], exclude={2}, limit=1)] == [3]
+    assert pairings.suggest([99]) == []
+
+
+def wait_for_version(pairings, version, timeout=2.0):
+    deadline = time.time() + timeout
+    while pairings.version < version and time.time() < deadline:
+        time.sleep(0.01)
+    assert pairings.version >= version
+
+
+def test_change_worker_builds_and_applies_changes():
+    rows = {1: [10, 20], 2: [10, 20]}
+    pairings = ItemPairings(lambda order_ids=None: [
+        (order_id, menu_item_id) for order_id, items in rows.items()
+        if order_ids is None or order_id in order_ids for menu_item_id in items
+    ])
+
+    # Nothing built yet: the read starts the worker and returns no pairings instead of building
+    assert pairings.pairings_for(10) == ()
+    wait_for_version(pairings, 1)
+    assert [pairing.menu_item_id for pairing in pairings.pairings_for(10)] == [20]
+    assert not pairings.start()
+
+    rows[3] = [10, 30]
+    rows[4] = [10, 30]
+    pairings.notify_changes({3, 4})
+    wait_for_version(pairings, 2)
+    assert [pairing.menu_item_id for pairing in pairings.pairings_for(30)] == [10]
+    assert pairings.status()['pending_orders'] == 0
+
+
+def test_seconds_until_rebuild():
+    assert seconds_until_rebuild(datetime(2026, 10, 18, 2, 30), hour=3) == 30 * 60
+    assert seconds_until_rebuild(datetime(2026, 10, 18, 3, 0), hour=3) == 24 * 3600
+    assert seconds_until_rebuild(datetime(2026, 10, 18, 23, 0), hour=3) == 4 * 3600
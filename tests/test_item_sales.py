@@ -0,0 +1,150 @@
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+# Ensure the repository root is on the path when tests are run directly
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from item_sales import ItemSales, daypart_for
+
+
+def make_loader(rows, calls):
+    def loader(since=None, order_ids=None):
+        calls.append((since, order_ids))
+        if order_ids is not None:
+            return [row for order_id in order_ids for row in rows.get(order_id, ())]
+        return [row for order_rows in rows.values() for row in order_rows
+                if (row[1] or row[3].strftime('%Y-%m-%d')) >= since]
+    return loader
+
+
+def test_dayparts():
+    assert daypart_for('08:30') == 'breakfast'
+    assert daypart_for('11:00') == 'lunch'
+    assert daypart_for('15:59') == 'lunch'
+    assert daypart_for(datetime(2026, 10, 18, 19, 45)) == 'dinner'
+
+
+def loaded(sales, today, monkeypatch):
+    # Drive the change worker's steps by hand instead of from its thread
+    monkeypatch.setattr(sales, 'start', lambda: False)
+    sales.roll_window(today)
+    return sales
+
+
+def test_top_sellers_by_daypart_and_incremental_changes(monkeypatch):
+    rows = {
+        1: [(1, '2026-10-18', '12:15', None, 7, 2), (1, '2026-10-18', '12:15', None, 9, 1)],
+        2: [(2, '2026-10-18', '19:00', None, 9, 3)],
+        3: [(3, '2026-10-17', '18:30', None, 7, 1), (3, '2026-10-17', '18:30', None, 8, 1)],
+        4: [(4, '2026-09-01', '18:30', None, 8, 50)],
+    }
+    calls = []
+    today = datetime(2026, 10, 18, 20, 0)
+    sales = loaded(ItemSales(make_loader(rows, calls), days=7), today, monkeypatch)
+
+    assert sales.top_sellers(today=today) == [(9, 4, 2), (7, 3, 2), (8, 1, 1)]
+    assert [seller.menu_item_id for seller in sales.top_sellers('dinner', today=today)] == [9, 7, 8]
+    assert sales.top_sellers('lunch', days=1, today=today) == [(7, 2, 1), (9, 1, 1)]
+    assert sales.top_sellers('breakfast', today=today) == []
+    assert calls == [('2026-10-12', None)]
+
+    # Repeated questions are answered from the cached ranking
+    hits = sales.stats['ranking_hits']
+    sales.top_sellers(today=today, limit=1)
+    assert sales.stats['ranking_hits'] == hits + 1
+
+    # Order 2 is cancelled, order 1 moves to dinner with a new item, order 5 comes in
+    del rows[2]
+    rows[1] = [(1, '2026-10-18', '18:00', None, 7, 2), (1, '2026-10-18', '18:00', None, 10, 4)]
+    rows[5] = [(5, None, None, datetime(2026, 10, 18, 9, 5), 8, 2)]
+    sales.notify_changes({1, 2, 5})
+    # Reads keep answering from the published rollup until the worker applies the changes
+    assert sales.top_sellers(today=today) == [(9, 4, 2), (7, 3, 2), (8, 1, 1)]
+    sales.apply_pending()
+
+    assert sales.top_sellers(today=today) == [(10, 4, 1), (7, 3, 2), (8, 3, 2)]
+    assert calls[1] == (None, {1, 2, 5})
+    fresh = loaded(ItemSales(make_loader(rows, []), days=7), today, monkeypatch)
+    for daypart in (None, 'breakfast', 'lunch', 'dinner'):
+        for days in (1, 7):
+            assert sales.top_sellers(daypart, days, today=today) == fresh.top_sellers(daypart, days, today=today)
+
+    # Days that fall out of the window are dropped without reloading
+    sales.roll_window(datetime(2026, 10, 24, 12, 0))
+    assert sales.top_sellers(days=7, today=datetime(2026, 10, 24, 12, 0)) == [(10, 4, 1), (7, 2, 1), (8, 2, 1)]
+    assert len(calls) == 2
+
+
+def test_velocity_against_previous_days(monkeypatch):
+    rows = {order_id: [(order_id, f'2026-10-{11 + order_id:02d}', '19:00', None, 7, 2)] for order_id in range(7)}
+    rows[7] = [(7, '2026-10-18', '17:00', None, 7, 3), (7, '2026-10-18', '17:00', None, 9, 1)]
+    rows[8] = [(8, '2026-10-18', '12:00', None, 9, 5)]
+    now = datetime(2026, 10, 18, 18, 0)
+    sales = loaded(ItemSales(make_loader(rows, []), days=28), now, monkeypatch)
+
+    velocity = sales.velocity(now=now)
+    assert velocity['daypart'] == 'dinner'
+    assert velocity['hours_elapsed'] == 2.0
+    wings, burger = velocity['items']
+    assert (wings['menu_item_id'], wings['quantity'], wings['per_hour'], wings['usual']) == (7, 3, 1.5, 2.0)
+    # Two of eight dinner hours gone, so 3 sold against 0.5 usually sold by now
+    assert wings['pace'] == 6.0
+    assert burger['menu_item_id'] == 9 and burger['pace'] is None
+
+
+def test_cancelled_reservation_orders_are_recounted(monkeypatch):
+    # The loader leaves out orders whose reservation is cancelled; the change feed
+    # sends a reservation's order ids when the reservation itself changes
+    cancelled = set()
+    rows = {
+        1: [(1, '2026-10-18', '19:00', None, 7, 4)],
+        2: [(2, '2026-10-18', '19:00', None, 7, 1), (2, '2026-10-18', '19:00', None, 9, 2)],
+    }
+    reservation_orders = {'100001': {1}}
+    loader = make_loader(rows, [])
+
+    def reservation_loader(since=None, order_ids=None):
+        excluded = {order_id for number in cancelled for order_id in reservation_orders[number]}
+        return [row for row in loader(since, order_ids) if row[0] not in excluded]
+
+    today = datetime(2026, 10, 18, 20, 0)
+    sales = loaded(ItemSales(reservation_loader, days=7), today, monkeypatch)
+    assert sales.top_sellers(today=today) == [(7, 5, 2), (9, 2, 1)]
+
+    cancelled.add('100001')
+    sales.notify_changes(reservation_orders['100001'])
+    sales.apply_pending()
+    assert sales.top_sellers(today=today) == [(9, 2, 1), (7, 1, 1)]
+
+
+def wait_for_version(sales, version, timeout=5):
+    deadline = time.time() + timeout
+    while sales.version < version and time.time() < deadline:
+        time.sleep(0.01)
+    assert sales.version >= version
+
+
+def test_change_worker_loads_and_applies_changes():
+    today = datetime.now().strftime('%Y-%m-%d')
+    yesterday = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+    rows = {
+        1: [(1, today, '19:00', None, 7, 2)],
+        2: [(2, yesterday, '12:00', None, 9, 1)],
+    }
+    calls = []
+    sales = ItemSales(make_loader(rows, calls), days=7)
+
+    # Nothing loaded yet: the read starts the worker instead of querying on the call path
+    assert sales.top_sellers() == []
+    wait_for_version(sales, 1)
+    assert sales.top_sellers() == [(7, 2, 1), (9, 1, 1)]
+    assert not sales.start()
+
+    rows[3] = [(3, today, '19:30', None, 9, 4)]
+    sales.notify_changes({3})
+    wait_for_version(sales, 2)
+    assert sales.top_sellers() == [(9, 5, 2), (7, 2, 1)]
+    assert sales.status()['pending_orders'] == 0
+    assert len(calls) == 2
@@ -0,0 +1,40 @@
+import os
+import sys
+
+# Ensure the repository root is on the path when tests are run directly
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import locations
+from locations import Location, location_cache, resolve_restaurant_id, use_location, current_restaurant_id
+
+
+def test_calls_are_routed_by_dialed_number_and_pinned(monkeypatch):
+    monkeypatch.setattr(locations, 'LOCATIONS', {
+        'main': Location('main', phone_numbers=['+14125550100']),
+        'east': Location('east', phone_numbers=['+14125550200'])
+    })
+    monkeypatch.setattr(locations, '_locations_by_phone', {'4125550100': 'main', '4125550200': 'east'})
+
+    assert resolve_restaurant_id({'call': {'call_id': 'call-1', 'to': '(412) 555-0200'}}) == 'east'
+    # Later function calls of the same call don't repeat the dialed number
+    assert resolve_restaurant_id({'call_id': 'call-1'}) == 'east'
+    assert resolve_restaurant_id({'call_id': 'call-2', 'global_data': {'restaurant_id': 'east'}}) == 'east'
+    assert resolve_restaurant_id({'call_id': 'call-3', 'call': {'to': '+19995550000'}}) == 'main'
+    locations.release_call('call-1')
+
+
+def test_caches_are_separate_per_location(monkeypatch):
+    monkeypatch.setattr(locations, 'LOCATIONS', {'main': Location('main'), 'east': Location('east')})
+
+    with use_location('east'):
+        east_cache = location_cache('test', max_entries=1)
+        east_cache.set('menu', 'east menu')
+    assert current_restaurant_id() is None
+
+    main_cache = location_cache('test', restaurant_id='main', max_entries=1)
+    main_cache.set('menu', 'main menu')
+    main_cache.set('other', 'evicts only main entries')
+
+    assert main_cache is not east_cache
+    assert main_cache.get('menu') is None
+    assert east_cache.get('menu') == 'east menu'
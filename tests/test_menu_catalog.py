@@ -0,0 +1,105 @@
+import os
+import sys
+
+import pytest
+
+# Ensure the repository root is on the path when tests are run directly
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from menu_catalog import MenuCatalog, MenuItemSnapshot, resolve_order_lines, stamp_menu_version
+
+
+MENU = [
+    MenuItemSnapshot(1, 'Buffalo Wings', 'Hot', 12.99, 'appetizers', True),
+    MenuItemSnapshot(2, 'Ribeye Steak', '12 oz', 28.99, 'entrees', True),
+    MenuItemSnapshot(3, 'Lobster Bisque', 'Seasonal', 9.50, 'soups', False),
+]
+
+
+def test_resolves_and_prices_lines_server_side():
+    catalog = MenuCatalog(lambda: list(MENU))
+    resolved, total, errors = resolve_order_lines(catalog.snapshot(), [
+        {'name': 'buffalo wings ', 'quantity': 40, 'price': 0.01},
+        {'menu_item_id': 2, 'quantity': 3},
+        {'id': '2', 'quantity': 1},
+    ])
+    assert errors == []
+    assert [(item.id, quantity) for item, quantity in resolved] == [(1, 40), (2, 3), (2, 1)]
+    assert total == round(12.99 * 40 + 28.99 * 4, 2)
+
+
+def test_reports_unknown_unavailable_and_bad_quantities():
+    catalog = MenuCatalog(lambda: list(MENU))
+    resolved, total, errors = resolve_order_lines(catalog.snapshot(), [
+        {'name': 'Pizza', 'quantity': 1},
+        {'menu_item_id': 3, 'quantity': 1},
+        {'menu_item_id': 1, 'quantity': 0},
+        {'menu_item_id': 2, 'quantity': 'two'},
+    ])
+    assert resolved == [] and total == 0
+    assert [error['error'] for error in errors] == [
+        'Not on the menu', 'Currently unavailable', 'Quantity must be at least 1', 'Quantity must be at least 1'
+    ]
+
+
+def test_reloads_only_after_invalidate():
+    loads = []
+
+    def loader():
+        loads.append(1)
+        return list(MENU)
+
+    catalog = MenuCatalog(loader)
+    first = catalog.snapshot()
+    assert catalog.snapshot() is first
+    catalog.invalidate()
+    second = catalog.snapshot()
+    assert second is not first and second.version == first.version + 1
+    assert len(loads) == 2
+
+
+def test_snapshot_views_are_validated_once_per_version():
+    items = MENU + [
+        MenuItemSnapshot(4, 'Chicken Tenders', None, 11.0, 'appetizers', True),
+        MenuItemSnapshot(5, '   ', 'Nameless', 5.0, 'drinks', True),
+        MenuItemSnapshot(6, 'Iced Tea', '', 2.5, 'drinks', True),
+        MenuItemSnapshot(7, 'Coffee', '', 2.0, 'drinks', True),
+    ]
+    snapshot = MenuCatalog(lambda: items).snapshot()
+    assert snapshot.invalid_ids == (5,)
+    assert [item.id for item in snapshot.available] == [1, 2, 4, 6, 7]
+    assert snapshot.available[2].description == '' and snapshot.by_id[3].price == 9.5
+    assert snapshot.longest_name_first[0].name == 'Chicken Tenders'
+    assert [item.id for item in snapshot.categories['drinks']] == [6, 7]
+    assert snapshot.available_by_id[6] is snapshot.by_name['iced tea']
+    assert snapshot.is_valid
+
+    too_small = MenuCatalog(lambda: MENU).snapshot()
+    assert not too_small.is_valid
+    assert too_small.version > snapshot.version
+
+
+def test_meta_data_carries_only_the_version_token():
+    catalog = MenuCatalog(lambda: list(MENU))
+    snapshot = catalog.snapshot()
+    meta_data = {'call_id': 'abc', 'cached_menu': [{'id': 1}], 'menu_cached_at': 'x', 'menu_item_count': 1}
+    assert stamp_menu_version(meta_data, snapshot, 'main') is None
+    assert meta_data == {'call_id': 'abc', 'menu_version': snapshot.version, 'menu_restaurant_id': 'main'}
+
+    # An item is 86'd mid-call: the next request sees the bump
+    catalog.invalidate()
+    newer = catalog.snapshot()
+    assert stamp_menu_version(meta_data, newer, 'main') == snapshot.version
+    assert meta_data['menu_version'] == newer.version
+
+
+def test_menu_items_are_immutable_and_compact():
+    item = MenuItemSnapshot(1, ' Buffalo Wings ', None, '12.99', None, 1).normalized()
+    assert item.to_dict() == {
+        'id': 1, 'name': 'Buffalo Wings', 'price': 12.99, 'category': 'Uncategorized',
+        'description': '', 'is_available': True
+    }
+    with pytest.raises(AttributeError):
+        item.price = 0.01
+    assert not hasattr(item, '__dict__')
+    assert MenuItemSnapshot(2, 'Soup', '', 'n/a', 'soups', True).normalized() is None
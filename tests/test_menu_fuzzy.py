@@ -0,0 +1,75 @@
+import os
+import sys
+
+# Ensure the repository root is on the path when tests are run directly
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from menu_catalog import CatalogAlias, MenuItemSnapshot, MenuSnapshot
+from menu_fuzzy import FuzzyMenuIndex, bounded_levenshtein, fuzzy_index_for
+from menu_matcher import seed_alias_rows
+
+
+NAMES = ['Pepsi', 'Diet Pepsi', 'Coca-Cola', 'Caesar Salad', 'Chicken Caesar Salad', 'Chicken Tenders',
+         'Grilled Salmon', 'Draft Beer', 'Tiramisu', 'Crème Brûlée', 'Iced Tea', 'Chocolate Cake']
+ITEMS = [MenuItemSnapshot(i + 1, name, '', 10.0, 'entrees', True) for i, name in enumerate(NAMES)]
+ALIASES = [CatalogAlias(**row) for row in seed_alias_rows(ITEMS)]
+
+
+def best_name(index, query):
+    match = index.best(query)
+    return match.item.name if match else None
+
+
+def test_bounded_levenshtein_stops_past_the_bound():
+    assert bounded_levenshtein('tiramisu', 'tiramisoo', 2) == 2
+    assert bounded_levenshtein('tiramisu', 'tiramisoo', 1) is None
+    assert bounded_levenshtein('beer', 'chocolate cake', 3) is None
+    assert bounded_levenshtein('', 'tea', 3) == 3
+
+
+def test_misspellings_aliases_and_words_resolve():
+    index = FuzzyMenuIndex(ITEMS, ALIASES)
+    assert best_name(index, 'ceasar salad') == 'Caesar Salad'
+    assert best_name(index, 'Kraft beer') == 'Draft Beer'
+    assert best_name(index, 'tiramisoo') == 'Tiramisu'
+    assert best_name(index, 'creme brulee') == 'Crème Brûlée'
+    assert best_name(index, 'chicken fingers') == 'Chicken Tenders'
+    assert best_name(index, 'tea') == 'Iced Tea'
+    assert best_name(index, 'the grilled salmon please') == 'Grilled Salmon'
+    assert best_name(index, 'lobster thermidor') is None
+
+
+def test_search_ranks_with_scores_and_touches_few_candidates():
+    index = FuzzyMenuIndex(ITEMS, ALIASES)
+    matches = index.search('pepsi')
+    assert [match.item.name for match in matches[:2]] == ['Pepsi', 'Diet Pepsi']
+    assert matches[0].score == 1.0 and matches[0].distance == 0
+    assert matches[0].score > matches[1].score
+
+    index.search('chocolat cake')
+    assert index.stats['distances'] <= 12
+
+
+def test_resolve_many_keeps_order_and_misses():
+    index = FuzzyMenuIndex(ITEMS, ALIASES)
+    results = index.resolve_many(['coke', 'nachos', 'Coke ', 'tiramisu'])
+    assert [match.item.name if match else None for match in results] == ['Coca-Cola', None, 'Coca-Cola', 'Tiramisu']
+    # The repeated name was looked up once
+    assert index.stats['lookups'] == 3
+
+
+def test_shared_words_tied_across_items_are_ambiguous():
+    index = FuzzyMenuIndex(ITEMS, ALIASES)
+    # Both chicken dishes (and both Caesar salads) score the same: ask, don't guess
+    assert [match.item.name for match in index.search('chicken')] == ['Chicken Caesar Salad', 'Chicken Tenders']
+    assert index.best('chicken') is None
+    assert index.resolve_many(['salad', 'chicken tenders']) == [None, index.best('chicken tenders')]
+    assert index.stats['ambiguous'] == 2
+    # A word only one item has still resolves
+    assert best_name(index, 'tenders') == 'Chicken Tenders'
+
+
+def test_index_built_once_per_version():
+    first = MenuSnapshot(ITEMS, 2001)
+    assert fuzzy_index_for(first) is fuzzy_index_for(first)
+    assert fuzzy_index_for(MenuSnapshot(ITEMS, 2002)) is not fuzzy_index_for(first)
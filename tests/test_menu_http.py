@@ -0,0 +1,57 @@
+import gzip
+import os
+import sys
+from types import SimpleNamespace
+
+from werkzeug.http import parse_accept_header, parse_etags
+
+# Ensure the repository root is on the path when tests are run directly
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from menu_http import MenuBody, MenuBodyCache
+
+
+def snapshot(version, restaurant_id='main'):
+    return SimpleNamespace(version=version, restaurant_id=restaurant_id)
+
+
+PAGE = b"<html>" + b"<li>Grilled Salmon $24.00</li>" * 100 + b"</html>"
+
+
+def test_variants_etags_and_encoding_choice():
+    body = MenuBody(PAGE, 'text/html')
+    assert gzip.decompress(body.encodings['gzip']) == PAGE
+    assert body.etag('gzip') == f"{body.etag()}-gzip"
+
+    assert body.choose_encoding(parse_accept_header('gzip, deflate')) == 'gzip'
+    assert body.choose_encoding(parse_accept_header('gzip;q=0, identity')) == 'identity'
+    assert body.choose_encoding(parse_accept_header('')) == 'identity'
+
+    # A client holding either variant revalidates to a 304
+    assert body.matches(parse_etags(f'"{body.etag()}"'))
+    assert body.matches(parse_etags(f'"other", "{body.etag("gzip")}"'))
+    assert body.matches(parse_etags('*'))
+    assert not body.matches(parse_etags('"stale"'))
+
+    # Tiny bodies are served as-is
+    assert list(MenuBody(b'[]', 'application/json').encodings) == ['identity']
+
+
+def test_rendered_once_per_version_with_content_etags():
+    cache = MenuBodyCache()
+    renders = []
+
+    def render(content=PAGE):
+        renders.append(1)
+        return content, 'text/html'
+
+    first = cache.get(snapshot(7), 'page', render)
+    assert cache.get(snapshot(7), 'page', render) is first
+    assert len(renders) == 1
+
+    # Same content under a new version (a restart, another worker) keeps its ETag
+    again = cache.get(snapshot(8), 'page', render)
+    assert again is not first and again.etag() == first.etag()
+    changed = cache.get(snapshot(9), 'page', lambda: render(PAGE + b"<!-- 86'd -->"))
+    assert changed.etag() != first.etag()
+    assert cache._bodies.versions() == {'main': 9}
@@ -0,0 +1,48 @@
+import os
+import sys
+
+# Ensure the repository root is on the path when tests are run directly
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from menu_catalog import CatalogAlias, MenuItemSnapshot, MenuSnapshot
+from menu_matcher import MenuMatcher, matcher_for, seed_alias_rows
+
+
+NAMES = ['Pepsi', 'Diet Pepsi', 'Coca-Cola', 'BBQ Wings', 'Buffalo Wings', 'Chicken Tenders',
+         'Chicken Caesar Salad', 'Grilled Salmon', 'Truffle Fries', 'Ribeye Steak', 'House Salad']
+ITEMS = [MenuItemSnapshot(i + 1, name, '', 10.0, 'entrees', True) for i, name in enumerate(NAMES)]
+ALIASES = [CatalogAlias(**row) for row in seed_alias_rows(ITEMS)]
+
+
+def extracted(text, aliases=ALIASES):
+    return [(entry['name'], entry['quantity']) for entry in MenuMatcher(ITEMS, aliases).extract(text)]
+
+
+def test_leftmost_longest_with_adjacent_quantities():
+    assert extracted("I'll have two diet pepsis and 3 bbq wings") == [('Diet Pepsi', 2), ('BBQ Wings', 3)]
+    assert extracted("wings and two orders of the truffle fries") == [('Buffalo Wings', 1), ('Truffle Fries', 2)]
+    assert extracted("the chicken tenders and a coke, steak 2 for him") == [
+        ('Chicken Tenders', 1), ('Coca-Cola', 1), ('Ribeye Steak', 2)
+    ]
+
+
+def test_ambiguous_words_and_substrings_do_not_match():
+    # "salad" and "chicken" name two dishes each; "tea" inside "steak" is not a word match
+    assert extracted("a salad and some chicken please") == []
+    assert extracted("grilled salmon, then salmon again") == [('Grilled Salmon', 1)]
+
+
+def test_alias_rows_add_exclude_and_prioritize_phrases():
+    assert extracted("a diet coke") == [('Coca-Cola', 1)]
+    assert extracted("a diet coke", aliases=[]) == [('Diet Pepsi', 1)]
+    # An alias for a new phrase needs no code change
+    assert extracted("two pops", aliases=ALIASES + [CatalogAlias(1, 'pop', 2, False)]) == [('Pepsi', 2)]
+    # A higher-priority alias takes a phrase from a lower one; an excluded name word stops matching
+    rules = ALIASES + [CatalogAlias(4, 'wings', 4, False), CatalogAlias(8, 'salmon', 1, True)]
+    assert extracted("wings and the salmon", aliases=rules) == [('BBQ Wings', 1)]
+
+
+def test_matcher_compiled_once_per_version():
+    first = MenuSnapshot(ITEMS, 1001)
+    assert matcher_for(first) is matcher_for(first)
+    assert matcher_for(MenuSnapshot(ITEMS, 1002)) is not matcher_for(first)
@@ -0,0 +1,49 @@
+import json
+import os
+import sys
+
+# Ensure the repository root is on the path when tests are run directly
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from menu_catalog import MenuItemSnapshot, MenuSnapshot
+from menu_render import CATEGORY_PAGE_SIZE, MenuRenderCache
+
+
+DRINKS = [MenuItemSnapshot(i + 1, f"Soda {i + 1}", '', 2.5, 'drinks', True) for i in range(CATEGORY_PAGE_SIZE + 5)]
+MAINS = [MenuItemSnapshot(100, 'Grilled Salmon', '', 24.0, 'main-courses', True),
+         MenuItemSnapshot(101, 'Ribeye Steak', '', 32.0, 'main-courses', True)]
+
+
+def test_category_pages_and_overview_text():
+    cache = MenuRenderCache()
+    snapshot = MenuSnapshot(DRINKS + MAINS, 3001)
+
+    mains = cache.render(snapshot, 'Main-Courses')
+    assert mains.text == "Here are our main-courses items: Grilled Salmon for $24.00, Ribeye Steak for $32.00"
+
+    first = cache.render(snapshot, 'drinks')
+    assert (first.page, first.pages) == (1, 2)
+    assert first.text.endswith(" and 5 more items")
+    second = cache.render(snapshot, 'drinks', page=7)  # clamped to the last page
+    assert second.page == 2 and second.text.startswith("More of our drinks items: ")
+    assert len(json.loads(second.payload)['items']) == 5
+
+    overview = cache.render(snapshot)
+    assert overview.text.startswith(f"Here's our menu with {len(DRINKS) + 2} items: ")
+    assert "Main Courses: Grilled Salmon ($24.00), Ribeye Steak ($32.00). " in overview.text
+    assert cache.render(snapshot, 'desserts') is None
+
+
+def test_renders_once_per_version_and_warms_every_page():
+    cache = MenuRenderCache()
+    snapshot = MenuSnapshot(DRINKS + MAINS, 3002, restaurant_id='main')
+    assert cache.warm(snapshot) == 4  # overview, two drinks pages, mains
+    renders = cache.stats['renders']
+    assert cache.render(snapshot, 'drinks', 2) is cache.render(snapshot, 'DRINKS', '2')
+    assert cache.stats['renders'] == renders
+
+    # A new menu version renders afresh and drops the old version's entries
+    changed = MenuSnapshot(DRINKS[:3] + MAINS, 3003, restaurant_id='main')
+    assert cache.render(changed, 'drinks').pages == 1
+    assert cache.warm(changed) == 3
+    assert cache._versions.versions() == {'main': 3003}
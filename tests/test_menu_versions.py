@@ -0,0 +1,34 @@
+import os
+import sys
+from types import SimpleNamespace
+
+# Ensure the repository root is on the path when tests are run directly
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from menu_versions import VersionedCache
+
+
+def snapshot(version, restaurant_id):
+    return SimpleNamespace(version=version, restaurant_id=restaurant_id)
+
+
+def test_each_catalog_keeps_its_current_version():
+    cache = VersionedCache()
+    builds = []
+
+    def build(name):
+        return lambda: builds.append(name) or name
+
+    # A quiet location's menu is never pushed out by changes elsewhere
+    assert cache.get(snapshot(1, 'quiet'), build('quiet-1')) == 'quiet-1'
+    for version in range(2, 30):
+        cache.get(snapshot(version, 'busy'), build(f'busy-{version}'))
+    assert cache.get(snapshot(1, 'quiet'), build('again')) == 'quiet-1'
+    assert cache.versions() == {'quiet': 1, 'busy': 29}
+
+    # A call still holding a replaced snapshot gets a value, but it isn't kept
+    assert cache.get(snapshot(28, 'busy'), build('busy-28-again')) == 'busy-28-again'
+    assert cache.versions()['busy'] == 29
+    assert cache.get(snapshot(29, 'busy'), build('nope')) == 'busy-29'
+    assert 'again' not in builds and 'nope' not in builds
+    assert cache.stats['replaced'] == 27
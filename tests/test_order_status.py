@@ -0,0 +1,24 @@
+import os
+import sys
+
+# Ensure the repository root is on the path when tests are run directly
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from order_status import can_transition, plan_transitions, source_statuses
+
+
+def test_state_machine():
+    assert can_transition('pending', 'preparing')
+    assert can_transition(None, 'preparing')
+    assert not can_transition('completed', 'ready')
+    assert not can_transition('cancelled', 'pending')
+    assert source_statuses('completed') == ['ready']
+
+
+def test_plan_transitions_splits_batch():
+    to_update, unchanged, rejected = plan_transitions(
+        {1: 'preparing', 2: 'ready', 3: 'completed', 4: 'pending'}, 'ready'
+    )
+    assert to_update == [1, 4]
+    assert unchanged == [2]
+    assert [r['id'] for r in rejected] == [3]
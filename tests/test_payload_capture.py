@@ -0,0 +1,76 @@
+import json
+import logging
+import os
+import sys
+
+# Ensure the repository root is on the path when tests are run directly
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from payload_capture import MAX_LIST_ITEMS, MAX_STRING_LENGTH, PayloadCapture, redact
+
+
+def test_redact_summarizes_redacts_and_truncates():
+    payload = {
+        'function': 'pay_order',
+        'call_log': [{'role': 'user', 'content': 'hi'}] * 40,
+        'meta_data': {'cached_menu': [{'id': 1}] * 60, 'call_id': 'c1'},
+        'argument': {'parsed': [{'order_number': '12345', 'card_number': '4242424242424242', 'CVV': '123'}]},
+        'prompt': 'x' * 5000,
+        'numbers': list(range(50)),
+    }
+    redacted = redact(payload)
+
+    assert redacted['call_log'] == '<40 entries>'
+    assert redacted['meta_data'] == {'cached_menu': '<60 entries>', 'call_id': 'c1'}
+    parsed = redacted['argument']['parsed'][0]
+    assert parsed == {'order_number': '12345', 'card_number': '<redacted>', 'CVV': '<redacted>'}
+    assert redacted['prompt'].endswith('<5000 chars>') and len(redacted['prompt']) < MAX_STRING_LENGTH + 30
+    assert redacted['numbers'][:MAX_LIST_ITEMS] == list(range(MAX_LIST_ITEMS))
+    assert redacted['numbers'][-1] == f"<{50 - MAX_LIST_ITEMS} more>"
+    # The original payload is left alone
+    assert len(payload['call_log']) == 40
+
+
+def test_redact_covers_signalwire_pay_fields():
+    # Field names as the pay verb posts them to the payment connector
+    payload = {
+        'cardnumber': '4242 4242 4242 4242', 'cvv': '123', 'postal_code': '12345',
+        'expiry_month': '12', 'expiry_year': '2030', 'exp_month': '12', 'exp_year': '30',
+        'chargeAmount': '42.50', 'currency_code': 'usd',
+    }
+    redacted = redact({'payment_data': payload})['payment_data']
+
+    assert {key for key, value in redacted.items() if value == '<redacted>'} == {
+        'cardnumber', 'cvv', 'postal_code', 'expiry_month', 'expiry_year', 'exp_month', 'exp_year'
+    }
+    assert redacted['chargeAmount'] == '42.50' and redacted['currency_code'] == 'usd'
+
+
+def test_capture_is_gated_sampled_and_bounded():
+    logger = logging.getLogger('tests.payload_capture')
+    logger.setLevel(logging.INFO)
+    capture = PayloadCapture(logger, sample_rate=1.0, buffer_size=3)
+
+    # Not at DEBUG: nothing is captured and no thread is started
+    assert not capture.wants()
+    assert capture._thread is None
+
+    capture.configure(level='DEBUG')
+    assert capture.wants()
+    for number in range(5):
+        body = json.dumps({'call_id': f"call-{number}", 'call_log': ['x'] * number}).encode()
+        capture.capture('request', body, call_id=f"call-{number}")
+    capture.capture('params', {'order_number': '12345'}, call_id='call-4', function='pay_order')
+    capture.capture('request', b'not json', call_id='call-5')
+    capture.flush()
+
+    entries = capture.recent()
+    assert [entry['call_id'] for entry in entries] == ['call-5', 'call-4', 'call-4']
+    assert entries[0]['payload'] == 'not json'
+    assert entries[1] == {**entries[1], 'kind': 'params', 'function': 'pay_order', 'payload': {'order_number': '12345'}}
+    assert entries[2]['payload']['call_log'] == '<4 entries>' and entries[2]['size'] > 0
+    assert [entry['kind'] for entry in capture.recent(kind='request', call_id='call-4')] == ['request']
+    assert capture.status()['stats']['captured'] == 7
+
+    capture.configure(sample_rate=0)
+    assert not capture.wants()
@@ -0,0 +1,43 @@
+import os
+import sys
+from datetime import datetime
+
+# Ensure the repository root is on the path when tests are run directly
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from prep_list import PrepList
+
+
+def test_counts_by_window_and_incremental_changes():
+    rows = {
+        1: [(1, None, '2026-10-18', '18:10', 'pending', 7, 'Wings', 'appetizers', 2)],
+        2: [(2, 50, '2026-10-18', '18:45', 'pending', 7, 'Wings', 'appetizers', 1),
+            (2, 50, '2026-10-18', '18:45', 'pending', 9, 'Burger', 'entrees', 3)],
+        3: [(3, None, '2026-10-18', '17:50', 'preparing', 9, 'Burger', 'entrees', 1)],
+        4: [(4, None, '2026-10-18', '20:00', 'pending', 9, 'Burger', 'entrees', 5)],
+    }
+    calls = []
+
+    def loader(dates=None, order_ids=None, reservation_ids=None):
+        calls.append((dates, order_ids, reservation_ids))
+        if dates is not None:
+            return [row for order_rows in rows.values() for row in order_rows if row[2] in dates]
+        return [row for order_id, order_rows in rows.items() for row in order_rows
+                if order_id in order_ids or row[1] in reservation_ids]
+
+    prep_list = PrepList(loader)
+    now = datetime(2026, 10, 18, 18, 0)
+
+    items = {item['name']: item for item in prep_list.snapshot(now=now)['items']}
+    assert items['Wings']['due'] == {'30': 2, '60': 3}
+    assert items['Burger']['overdue'] == 1
+    assert items['Burger']['due'] == {'30': 0, '60': 3}
+    assert items['Burger']['orders'] == 2
+
+    # Reservation 50 is cancelled: its pre-order drops out without reloading the day
+    del rows[2]
+    prep_list.notify_changes({50}, set())
+    items = {item['name']: item for item in prep_list.snapshot(now=now)['items']}
+    assert items['Wings']['due'] == {'30': 2, '60': 2}
+    assert items['Burger']['due'] == {'30': 0, '60': 0}
+    assert len([call for call in calls if call[0] is not None]) == 1
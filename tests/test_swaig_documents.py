@@ -0,0 +1,84 @@
+import json
+import os
+import sys
+from types import SimpleNamespace
+
+# Ensure the repository root is on the path when tests are run directly
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from swaig_documents import SwaigDocumentCache
+
+
+def make_agent(*names):
+    return SimpleNamespace(_tool_registry=SimpleNamespace(_swaig_functions={name: object() for name in names}))
+
+
+def make_cache(builds):
+    def build_function_names(agent):
+        builds.append('functions')
+        return list(agent._tool_registry._swaig_functions)
+
+    def build_signatures(agent):
+        builds.append('signatures')
+        return {name: {'function': name, 'purpose': name.replace('_', ' ')} for name in agent._tool_registry._swaig_functions}
+
+    def build_swml(agent, url_root):
+        builds.append('swml')
+        return {'version': '1.0.0', 'defaults': {'web_hook_url': f"{url_root}receptionist"}}
+
+    cache = SwaigDocumentCache(max_bodies=4)
+    cache.register_builders(build_function_names, build_signatures, build_swml)
+    return cache
+
+
+def test_bodies_are_built_once_per_request_shape():
+    builds = []
+    cache = make_cache(builds)
+    agent = make_agent('get_menu', 'create_order', 'pay_order')
+
+    assert cache.warm(agent) == 3
+    assert json.loads(cache.function_names(agent)) == {'functions': ['get_menu', 'create_order', 'pay_order']}
+
+    body = cache.signatures(agent, ['pay_order', 'nope', 'get_menu'])
+    assert list(json.loads(body)) == ['pay_order', 'get_menu']
+    assert cache.signatures(agent, ['pay_order', 'nope', 'get_menu']) is body
+    assert json.loads(cache.signatures(agent, ['create_order'])) == {'create_order': {'function': 'create_order', 'purpose': 'create order'}}
+
+    first = cache.swml(agent, 'http://a.example/')
+    assert cache.swml(agent, 'http://a.example/') is first
+    assert json.loads(cache.swml(agent, 'http://b.example/'))['defaults']['web_hook_url'] == 'http://b.example/receptionist'
+    assert cache.swml_document(agent, 'http://a.example/') == json.loads(first)
+
+    # Each document was built once, however often it was served
+    assert builds == ['functions', 'signatures', 'swml', 'swml']
+
+
+def test_documents_per_url_root_are_bounded():
+    builds = []
+    cache = make_cache(builds)
+    agent = make_agent('get_menu')
+
+    # Every Host header is a new URL root; neither table grows past the limit
+    for host in range(20):
+        cache.swml(agent, f"http://{host}.example/")
+        cache.swml_document(agent, f"http://doc-{host}.example/")
+    assert len(cache._documents) == cache.max_bodies
+    assert len(cache._bodies) == cache.max_bodies
+    assert json.loads(cache.swml(agent, 'http://19.example/'))['defaults']['web_hook_url'] == 'http://19.example/receptionist'
+
+
+def test_re_registered_tools_invalidate_every_body():
+    builds = []
+    cache = make_cache(builds)
+    agent = make_agent('get_menu')
+    body = cache.signatures(agent, ['get_menu', 'suggest_pairings'])
+    assert list(json.loads(body)) == ['get_menu']
+
+    agent._tool_registry._swaig_functions['suggest_pairings'] = object()
+    assert list(json.loads(cache.signatures(agent, ['get_menu', 'suggest_pairings']))) == ['get_menu', 'suggest_pairings']
+
+    # Replacing a tool under the same name counts too
+    names = cache.function_names(agent)
+    agent._tool_registry._swaig_functions['get_menu'] = object()
+    assert cache.function_names(agent) is not names
+    assert cache.stats['invalidations'] == 2